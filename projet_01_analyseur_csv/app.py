@@ -5,7 +5,9 @@ Point d'entrée principal de l'application
 
 import streamlit as st
 import pandas as pd
+import os
 import sys
+import time
 from pathlib import Path
 from datetime import datetime
 
@@ -14,12 +16,14 @@ sys.path.append(str(Path(__file__).parent / 'src'))
 
 from src.data_loader import DataLoader
 from src.data_cleaner import DataCleaner
+from src.cleaning_recipe import CleaningRecipe
 from src.statistical_analyzer import StatisticalAnalyzer
 from src.correlation_analyzer import CorrelationAnalyzer
 from src.anomaly_detector import AnomalyDetector
 from src.visualizer import Visualizer
 from src.report_generator import ReportGenerator
 from src.modern_report_generator import ModernReportGenerator
+from src.job_runner import job_runner, dataset_hash, ACTIVE_STATUSES, STATUS_DONE, STATUS_CANCELLED, STATUS_TIMEOUT
 
 import config
 
@@ -42,6 +46,94 @@ if 'df_cleaned' not in st.session_state:
     st.session_state.df_cleaned = None
 if 'file_info' not in st.session_state:
     st.session_state.file_info = {}
+if 'cleaner' not in st.session_state:
+    st.session_state.cleaner = None
+if 'analyzers' not in st.session_state:
+    st.session_state.analyzers = None
+if 'upload_key' not in st.session_state:
+    st.session_state.upload_key = None
+if 'dataset_key' not in st.session_state:
+    st.session_state.dataset_key = (None, None)
+if 'anomaly_request' not in st.session_state:
+    st.session_state.anomaly_request = None
+if 'report_request' not in st.session_state:
+    st.session_state.report_request = None
+
+
+def reset_analysis_state():
+    """Réinitialise le nettoyage et les analyseurs après chargement d'un nouveau fichier"""
+    st.session_state.df_cleaned = None
+    st.session_state.cleaner = None
+    st.session_state.analyzers = None
+    st.session_state.anomaly_request = None
+    st.session_state.report_request = None
+
+
+def get_analyzers(df: pd.DataFrame, cleaner: DataCleaner) -> dict:
+    """
+    Retourne les analyseurs conservés en session (leurs caches survivent aux reruns)
+    
+    Les caches ne sont invalidés que pour les colonnes modifiées par le nettoyage.
+    """
+    analyzers = st.session_state.analyzers
+    if analyzers is None:
+        analyzers = {
+            'stats': StatisticalAnalyzer(df, cleaner=cleaner),
+            'corr': CorrelationAnalyzer(df, tracker=cleaner.tracker),
+            'viz': Visualizer(df, theme=config.PLOTLY_THEME, tracker=cleaner.tracker)
+        }
+        st.session_state.analyzers = analyzers
+    else:
+        for analyzer in analyzers.values():
+            analyzer.update_data(df)
+    return analyzers
+
+
+def get_dataset_key(df: pd.DataFrame, tracker) -> str:
+    """Empreinte des données courantes (recalculée seulement après un nettoyage)"""
+    version = (id(st.session_state.df), len(tracker.change_log))
+    cached_version, key = st.session_state.dataset_key
+    if cached_version != version:
+        key = dataset_hash(df)
+        st.session_state.dataset_key = (version, key)
+    return key
+
+
+def run_background_job(operation: str, df: pd.DataFrame, params: dict, label: str):
+    """
+    Exécute une opération longue en arrière-plan avec barre de progression
+    
+    Le résultat est mis en cache par (empreinte des données, opération, paramètres) :
+    un rerun récupère directement le résultat terminé.
+    
+    Returns:
+        Résultat de l'opération, ou None si annulée, expirée ou en erreur
+    """
+    job_id = job_runner.submit(operation, df, params,
+                               dataset_key=get_dataset_key(df, st.session_state.cleaner.tracker))
+    status = job_runner.get_status(job_id)
+    
+    if status['etat'] in ACTIVE_STATUSES:
+        progress_bar = st.progress(0.0, text=label)
+        if st.button(" Annuler", key=f"cancel_{job_id}"):
+            job_runner.cancel(job_id)
+        while status['etat'] in ACTIVE_STATUSES:
+            time.sleep(0.2)
+            status = job_runner.get_status(job_id)
+            progress_bar.progress(min(status['progression'], 1.0),
+                                  text=f"{label} {status['message']} ({status['duree']:.0f}s)")
+        progress_bar.empty()
+    
+    if status['etat'] == STATUS_DONE:
+        return status['resultat']
+    if status['etat'] == STATUS_CANCELLED:
+        st.warning(" Opération annulée")
+    elif status['etat'] == STATUS_TIMEOUT:
+        st.error(f" Opération interrompue : durée maximale de {job_runner.timeout}s dépassée")
+    else:
+        st.error(f" Erreur: {status['erreur']}")
+    return None
+
 
 # ============= HEADER =============
 st.title(f"{config.APP_ICON} Analyseur CSV Professionnel")
@@ -69,7 +161,10 @@ with st.sidebar:
             help=f"Formats supportés: {', '.join(config.SUPPORTED_FORMATS)}"
         )
         
-        if uploaded_file:
+        upload_key = (uploaded_file.name, uploaded_file.size) if uploaded_file else None
+        
+        # Ne recharger que si un nouveau fichier est uploadé
+        if uploaded_file and upload_key != st.session_state.upload_key:
             with st.spinner("Chargement du fichier..."):
                 success, message = loader.load_from_upload(uploaded_file)
                 
@@ -77,6 +172,8 @@ with st.sidebar:
                     st.success(message)
                     st.session_state.df = loader.get_data()
                     st.session_state.file_info = loader.get_file_info()
+                    st.session_state.upload_key = upload_key
+                    reset_analysis_state()
                 else:
                     st.error(message)
     
@@ -89,6 +186,8 @@ with st.sidebar:
                 st.success(message)
                 st.session_state.df = loader.get_data()
                 st.session_state.file_info = loader.get_file_info()
+                st.session_state.upload_key = None
+                reset_analysis_state()
             else:
                 st.error(message)
     
@@ -134,7 +233,13 @@ if st.session_state.df is None:
         """)
 
 else:
-    df = st.session_state.df
+    # Nettoyeur conservé en session : il suit les colonnes/lignes modifiées
+    if st.session_state.cleaner is None:
+        st.session_state.cleaner = DataCleaner(st.session_state.df)
+    cleaner = st.session_state.cleaner
+    df = cleaner.get_cleaned_data()
+    
+    analyzers = get_analyzers(df, cleaner)
     
     # Onglets principaux
     tabs = st.tabs([
@@ -161,7 +266,7 @@ else:
             missing_pct = (df.isnull().sum().sum() / df.size * 100)
             st.metric(" Valeurs Manquantes", f"{missing_pct:.1f}%")
         with col4:
-            st.metric(" Duplicatas", df.duplicated().sum())
+            st.metric(" Duplicatas", cleaner.count_duplicates())
         
         st.markdown("---")
         
@@ -189,8 +294,6 @@ else:
     with tabs[1]:
         st.header(" Nettoyage des Données")
         
-        cleaner = DataCleaner(df)
-        
         # Résumé des valeurs manquantes
         st.subheader(" Valeurs Manquantes")
         missing_summary = cleaner.get_missing_values_summary()
@@ -216,6 +319,44 @@ else:
         else:
             st.success(" Aucune valeur manquante !")
         
+        # Étapes appliquées : annulation et recette réutilisable
+        st.markdown("---")
+        st.subheader(" Étapes de Nettoyage")
+        steps = cleaner.get_recipe().describe()
+        if steps:
+            for i, step in enumerate(steps, 1):
+                st.write(f"{i}. {step}")
+            
+            col1, col2, col3 = st.columns(3)
+            with col1:
+                if st.button("Annuler la dernière étape"):
+                    cleaner.undo_last_step()
+                    st.session_state.df_cleaned = cleaner.get_cleaned_data()
+                    st.rerun()
+            with col2:
+                if st.button("Réinitialiser"):
+                    cleaner.reset_to_original()
+                    st.session_state.df_cleaned = None
+                    st.rerun()
+            with col3:
+                st.download_button(
+                    label="Exporter la recette (JSON)",
+                    data=cleaner.get_recipe().to_json(),
+                    file_name="recette_nettoyage.json",
+                    mime="application/json"
+                )
+        else:
+            st.info("Aucune étape appliquée")
+        
+        recipe_file = st.file_uploader("Appliquer une recette (JSON)", type=['json'])
+        if recipe_file is not None and st.button("Appliquer la recette"):
+            try:
+                cleaner.apply_recipe(CleaningRecipe.from_json(recipe_file.getvalue().decode('utf-8')))
+                st.session_state.df_cleaned = cleaner.get_cleaned_data()
+                st.rerun()
+            except (ValueError, KeyError) as e:
+                st.error(f"Recette invalide : {e}")
+        
         # Rapport de qualité
         st.markdown("---")
         st.subheader(" Rapport de Qualité")
@@ -233,7 +374,7 @@ else:
     with tabs[2]:
         st.header(" Analyse Statistique")
         
-        analyzer = StatisticalAnalyzer(df)
+        analyzer = analyzers['stats']
         
         # Résumé complet
         summary = analyzer.get_complete_summary()
@@ -282,7 +423,7 @@ else:
     with tabs[3]:
         st.header(" Analyse de Corrélation")
         
-        corr_analyzer = CorrelationAnalyzer(df)
+        corr_analyzer = analyzers['corr']
         
         # Méthode de corrélation
         method = st.selectbox(
@@ -290,10 +431,17 @@ else:
             config.CORRELATION_METHODS
         )
         
-        # Matrice de corrélation
-        corr_matrix = corr_analyzer.get_correlation_matrix(method=method)
-        
-        if not corr_matrix.empty:
+        # Matrice de corrélation (calcul complet en arrière-plan, mises à jour partielles directes)
+        corr_matrix = None
+        if corr_analyzer.needs_full_computation(method):
+            result = run_background_job('correlation', df, {'method': method},
+                                        "Calcul des corrélations...")
+            if result is not None:
+                corr_analyzer.set_correlation_matrix(result['matrix'], method, result['sample_index'])
+        if not corr_analyzer.needs_full_computation(method):
+            corr_matrix = corr_analyzer.get_correlation_matrix(method=method)
+        
+        if corr_matrix is not None and not corr_matrix.empty:
             # Résumé
             summary = corr_analyzer.get_correlation_summary(method=method)
             
@@ -309,7 +457,7 @@ else:
             
             # Heatmap
             st.subheader(" Matrice de Corrélation")
-            visualizer = Visualizer(df)
+            visualizer = analyzers['viz']
             fig = visualizer.create_correlation_heatmap(corr_matrix, method)
             st.plotly_chart(fig, use_container_width=True)
             
@@ -324,7 +472,7 @@ else:
                 st.dataframe(pairs_df, use_container_width=True)
             else:
                 st.info("Aucune paire avec corrélation supérieure au seuil")
-        else:
+        elif corr_matrix is not None:
             st.warning(" Pas assez de colonnes numériques pour calculer les corrélations")
     
     # ============= ONGLET 5: ANOMALIES =============
@@ -344,38 +492,43 @@ else:
                 threshold = st.slider("Seuil Z-Score", 2.0, 4.0, 3.0, 0.5)
         
         if st.button(" Détecter les anomalies"):
-            with st.spinner("Détection en cours..."):
-                outliers_summary = detector.detect_outliers_all_columns(
-                    method=method,
-                    threshold=threshold
-                )
-                
-                st.subheader(" Résumé des Anomalies")
-                st.dataframe(outliers_summary, use_container_width=True)
-                
-                # Sélection pour visualisation
-                numeric_cols = df.select_dtypes(include=['number']).columns.tolist()
-                selected_col = st.selectbox("Colonne à visualiser", numeric_cols)
-                
-                # Box plot
-                visualizer = Visualizer(df)
-                fig = visualizer.create_boxplot([selected_col])
-                st.plotly_chart(fig, use_container_width=True)
-                
-                # Suggestions
-                st.markdown("---")
-                st.subheader(" Suggestions de Traitement")
-                suggestions = detector.suggest_treatment(selected_col)
-                st.write(f"**Recommandation:** {suggestions['recommandation']}")
-                st.write("**Autres options:**")
-                for suggestion in suggestions['suggestions']:
-                    st.write(f"- {suggestion}")
+            st.session_state.anomaly_request = {'method': method, 'threshold': threshold}
+        
+        result = None
+        if st.session_state.anomaly_request == {'method': method, 'threshold': threshold}:
+            result = run_background_job('outliers', df, st.session_state.anomaly_request,
+                                        "Détection en cours...")
+        
+        if result is not None:
+            outliers_summary = result['resume']
+            detector.outliers_info = result['outliers_info']
+            
+            st.subheader(" Résumé des Anomalies")
+            st.dataframe(outliers_summary, use_container_width=True)
+            
+            # Sélection pour visualisation
+            numeric_cols = df.select_dtypes(include=['number']).columns.tolist()
+            selected_col = st.selectbox("Colonne à visualiser", numeric_cols)
+            
+            # Box plot
+            visualizer = analyzers['viz']
+            fig = visualizer.create_boxplot([selected_col])
+            st.plotly_chart(fig, use_container_width=True)
+            
+            # Suggestions
+            st.markdown("---")
+            st.subheader(" Suggestions de Traitement")
+            suggestions = detector.suggest_treatment(selected_col)
+            st.write(f"**Recommandation:** {suggestions['recommandation']}")
+            st.write("**Autres options:**")
+            for suggestion in suggestions['suggestions']:
+                st.write(f"- {suggestion}")
     
     # ============= ONGLET 6: VISUALISATIONS =============
     with tabs[5]:
         st.header(" Visualisations Interactives")
         
-        visualizer = Visualizer(df, theme=config.PLOTLY_THEME)
+        visualizer = analyzers['viz']
         
         viz_type = st.selectbox(
             "Type de visualisation",
@@ -459,26 +612,42 @@ else:
         # Section 1: Exports de données
         st.subheader("� Export des Données")
         
-        col1, col2, col3 = st.columns(3)
+        csv_compression = st.selectbox(
+            "Compression CSV",
+            [None, 'gzip', 'zip', 'bz2', 'xz'],
+            format_func=lambda c: "Aucune" if c is None else c
+        )
+        
+        def export_progress(label):
+            """Barre de progression alimentée par les exports par blocs"""
+            bar = st.progress(0.0, text=label)
+            def update(written, total):
+                bar.progress(written / total if total else 1.0,
+                             text=f"{label} {written:,}/{total:,} lignes")
+            return update
+        
+        col1, col2, col3, col4 = st.columns(4)
         
         with col1:
             if st.button("� CSV", use_container_width=True):
-                with st.spinner("Génération du fichier CSV..."):
-                    filepath = report_gen.export_to_csv()
-                    st.success(f" Fichier créé")
-                    with open(filepath, 'rb') as f:
-                        st.download_button(
-                            " Télécharger CSV",
-                            f,
-                            file_name=f"donnees_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv",
-                            mime='text/csv',
-                            use_container_width=True
-                        )
+                filepath = report_gen.export_to_csv(
+                    compression=csv_compression,
+                    progress_callback=export_progress("Génération du fichier CSV...")
+                )
+                st.success(f" Fichier créé")
+                with open(filepath, 'rb') as f:
+                    st.download_button(
+                        " Télécharger CSV",
+                        f,
+                        file_name=os.path.basename(filepath),
+                        mime='text/csv' if csv_compression is None else 'application/octet-stream',
+                        use_container_width=True
+                    )
         
         with col2:
             if st.button(" JSON", use_container_width=True):
                 with st.spinner("Génération du fichier JSON..."):
-                    analyzer = StatisticalAnalyzer(df)
+                    analyzer = analyzers['stats']
                     summary = analyzer.get_complete_summary()
                     filepath = report_gen.export_statistics_to_json(summary)
                     st.success(f" Fichier créé")
@@ -493,20 +662,40 @@ else:
         
         with col3:
             if st.button(" Excel", use_container_width=True):
-                with st.spinner("Génération du fichier Excel..."):
-                    analyzer = StatisticalAnalyzer(df)
-                    stats_df = {
-                        'Statistiques': analyzer.get_basic_statistics(),
-                        'Résumé': pd.DataFrame([analyzer.get_complete_summary()['dimensions']])
-                    }
-                    filepath = report_gen.create_excel_report(stats_df)
+                analyzer = analyzers['stats']
+                stats_df = {
+                    'Statistiques': analyzer.get_basic_statistics(),
+                    'Résumé': pd.DataFrame([analyzer.get_complete_summary()['dimensions']])
+                }
+                filepath = report_gen.create_excel_report(
+                    stats_df, progress_callback=export_progress("Génération du fichier Excel...")
+                )
+                st.success(f" Fichier créé")
+                with open(filepath, 'rb') as f:
+                    st.download_button(
+                        " Télécharger Excel",
+                        f,
+                        file_name=f"rapport_{datetime.now().strftime('%Y%m%d_%H%M%S')}.xlsx",
+                        mime='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
+                        use_container_width=True
+                    )
+        
+        with col4:
+            if st.button(" Parquet", use_container_width=True):
+                try:
+                    filepath = report_gen.export_to_parquet(
+                        progress_callback=export_progress("Génération du fichier Parquet...")
+                    )
+                except ImportError as e:
+                    st.error(str(e))
+                else:
                     st.success(f" Fichier créé")
                     with open(filepath, 'rb') as f:
                         st.download_button(
-                            " Télécharger Excel",
+                            " Télécharger Parquet",
                             f,
-                            file_name=f"rapport_{datetime.now().strftime('%Y%m%d_%H%M%S')}.xlsx",
-                            mime='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
+                            file_name=f"donnees_{datetime.now().strftime('%Y%m%d_%H%M%S')}.parquet",
+                            mime='application/octet-stream',
                             use_container_width=True
                         )
         
@@ -517,63 +706,61 @@ else:
         
         col1, col2, col3 = st.columns(3)
         
-        with col1:
-            if st.button(" PDF", use_container_width=True, type="primary"):
-                with st.spinner("Génération du rapport PDF professionnel..."):
-                    try:
-                        filepath = modern_gen.generate_pdf_report(
-                            company_name=company_name,
-                            include_charts=include_charts
-                        )
-                        st.success(f" Rapport PDF créé !")
-                        with open(filepath, 'rb') as f:
-                            st.download_button(
-                                " Télécharger PDF",
-                                f,
-                                file_name=f"rapport_{datetime.now().strftime('%Y%m%d_%H%M%S')}.pdf",
-                                mime='application/pdf',
-                                use_container_width=True
-                            )
-                    except Exception as e:
-                        st.error(f" Erreur: {str(e)}")
-                        st.info(" Installez les dépendances: pip install reportlab")
-        
-        with col2:
-            if st.button(" DOCX (Word)", use_container_width=True, type="primary"):
-                with st.spinner("Génération du rapport Word..."):
-                    try:
-                        filepath = modern_gen.generate_docx_report(company_name=company_name)
-                        st.success(f" Rapport DOCX créé !")
+        report_params = {
+            'pdf': {'format': 'pdf', 'company_name': company_name, 'include_charts': include_charts},
+            'docx': {'format': 'docx', 'company_name': company_name},
+            'html': {'format': 'html', 'include_interactive_charts': include_charts},
+        }
+        report_buttons = [
+            (col1, 'pdf', " PDF", "Génération du rapport PDF professionnel...", 'application/pdf'),
+            (col2, 'docx', " DOCX (Word)", "Génération du rapport Word...",
+             'application/vnd.openxmlformats-officedocument.wordprocessingml.document'),
+            (col3, 'html', " HTML", "Génération du rapport HTML interactif...", 'text/html'),
+        ]
+        
+        for column, report_format, label, progress_label, mime in report_buttons:
+            with column:
+                if st.button(label, use_container_width=True, type="primary"):
+                    st.session_state.report_request = report_format
+                
+                if st.session_state.report_request == report_format:
+                    # Génération en arrière-plan (résultat réutilisé si données/paramètres inchangés)
+                    filepath = run_background_job('report', df, report_params[report_format],
+                                                  progress_label)
+                    if filepath is not None:
+                        st.success(f" Rapport {report_format.upper()} créé !")
                         with open(filepath, 'rb') as f:
                             st.download_button(
-                                " Télécharger DOCX",
+                                f" Télécharger {report_format.upper()}",
                                 f,
-                                file_name=f"rapport_{datetime.now().strftime('%Y%m%d_%H%M%S')}.docx",
-                                mime='application/vnd.openxmlformats-officedocument.wordprocessingml.document',
+                                file_name=f"rapport_{datetime.now().strftime('%Y%m%d_%H%M%S')}.{report_format}",
+                                mime=mime,
                                 use_container_width=True
                             )
-                    except Exception as e:
-                        st.error(f" Erreur: {str(e)}")
-                        st.info(" Installez les dépendances: pip install python-docx")
-        
-        with col3:
-            if st.button(" HTML", use_container_width=True, type="primary"):
-                with st.spinner("Génération du rapport HTML interactif..."):
-                    try:
-                        filepath = modern_gen.generate_html_report(
-                            include_interactive_charts=include_charts
+
+        # Tous les formats : contenu calculé une fois, formats générés en parallèle
+        if st.button(" Tous les formats (PDF, DOCX, HTML)", use_container_width=True):
+            st.session_state.report_request = 'all'
+        
+        if st.session_state.report_request == 'all':
+            filepaths = run_background_job(
+                'reports', df,
+                {'formats': ('pdf', 'docx', 'html'), 'company_name': company_name,
+                 'include_charts': include_charts},
+                "Génération de tous les rapports..."
+            )
+            if filepaths is not None:
+                st.success(" Rapports PDF, DOCX et HTML créés !")
+                download_cols = st.columns(len(filepaths))
+                for download_col, (report_format, filepath) in zip(download_cols, filepaths.items()):
+                    with download_col, open(filepath, 'rb') as f:
+                        st.download_button(
+                            f" Télécharger {report_format.upper()}",
+                            f,
+                            file_name=f"rapport_{datetime.now().strftime('%Y%m%d_%H%M%S')}.{report_format}",
+                            key=f"download_all_{report_format}",
+                            use_container_width=True
                         )
-                        st.success(f" Rapport HTML créé !")
-                        with open(filepath, 'rb') as f:
-                            st.download_button(
-                                " Télécharger HTML",
-                                f,
-                                file_name=f"rapport_{datetime.now().strftime('%Y%m%d_%H%M%S')}.html",
-                                mime='text/html',
-                                use_container_width=True
-                            )
-                    except Exception as e:
-                        st.error(f" Erreur: {str(e)}")
         
         st.markdown("---")
         
@@ -583,7 +770,7 @@ else:
         tab1, tab2 = st.tabs([" Markdown", " Recommandations"])
         
         with tab1:
-            analyzer = StatisticalAnalyzer(df)
+            analyzer = analyzers['stats']
             summary = analyzer.get_complete_summary()
             report_preview = report_gen.generate_markdown_report(summary)
             st.markdown(report_preview)
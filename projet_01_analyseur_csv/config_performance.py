@@ -8,6 +8,11 @@ MAX_FILE_SIZE_MB = 500  # Taille maximale de fichier (MB)
 CHUNK_THRESHOLD_MB = 10  # Seuil pour chargement par chunks (MB)
 CHUNK_SIZE_ROWS = 50_000  # Nombre de lignes par chunk
 
+# ============= EXPORTS =============
+EXPORT_MEMORY_BUDGET_MB = 64  # Mémoire max d'un bloc en cours d'export (MB)
+EXPORT_CSV_COMPRESSION = None  # Compression CSV par défaut (None, 'gzip', 'bz2', 'zip', 'xz')
+EXPORT_PARQUET_COMPRESSION = 'snappy'  # Codec Parquet par défaut
+
 # ============= ÉCHANTILLONNAGE =============
 ENABLE_AUTO_SAMPLING = True  # Activer échantillonnage automatique
 SAMPLE_THRESHOLD_ROWS = 100_000  # Seuil pour échantillonnage (lignes)
@@ -18,14 +23,16 @@ SAMPLE_SIZE_VISUALIZATION = 10_000  # Taille échantillon pour visualisations
 ENABLE_PARALLEL_PROCESSING = True  # Activer parallélisation
 MAX_WORKERS = 4  # Nombre de threads pour calculs parallèles
 MIN_COLUMNS_FOR_PARALLEL = 3  # Nombre minimum de colonnes pour parallélisation
+INLINE_JOB_MAX_CELLS = 50_000  # Analyses plus petites (lignes × colonnes) exécutées sans pool de processus
 
 # ============= LIMITES DE COLONNES =============
-MAX_COLUMNS_CORRELATION = 50  # Nombre max de colonnes pour matrice corrélation
+MAX_COLUMNS_CORRELATION = None  # Nombre max de colonnes pour matrice corrélation (None = illimité, calcul par blocs)
 MAX_BINS_HISTOGRAM = 50  # Nombre max de bins pour histogrammes
 
 # ============= CACHE =============
 ENABLE_CACHE = True  # Activer système de cache
 CACHE_TTL = 3600  # Durée de vie du cache (secondes)
+MAX_CACHED_JOBS = 32  # Tâches terminées (et leurs résultats) gardées en mémoire
 
 # ============= ENCODAGE =============
 ENCODING_SAMPLE_SIZE = 10_000  # Taille échantillon pour détection encodage (bytes)
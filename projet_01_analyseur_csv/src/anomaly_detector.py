@@ -7,7 +7,7 @@ Version 2.2 - Optimisée avec parallélisation
 import pandas as pd
 import numpy as np
 from scipy import stats
-from typing import Dict, List
+from typing import Callable, Dict, List, Optional
 from concurrent.futures import ThreadPoolExecutor, as_completed
 
 
@@ -96,18 +96,21 @@ class AnomalyDetector:
         }
     
     def detect_outliers_all_columns(self, method: str = 'IQR', 
-                                   threshold: float = 1.5) -> pd.DataFrame:
+                                   threshold: float = 1.5,
+                                   progress_callback: Optional[Callable[[int, int], None]] = None) -> pd.DataFrame:
         """
         Détecte les outliers pour toutes les colonnes numériques (OPTIMISÉ - parallèle)
         
         Args:
             method: Méthode de détection ('IQR' ou 'Z-Score')
             threshold: Seuil (1.5 pour IQR, 3 pour Z-Score)
+            progress_callback: Fonction appelée après chaque colonne (colonnes_faites, colonnes_total)
             
         Returns:
             DataFrame avec le résumé des outliers
         """
         results = []
+        total_columns = len(self.numeric_columns)
         
         # Version parallélisée si activée et plusieurs colonnes
         if self.ENABLE_PARALLEL and len(self.numeric_columns) > 2:
@@ -138,6 +141,9 @@ class AnomalyDetector:
                     except Exception as e:
                         # En cas d'erreur, continuer avec les autres colonnes
                         pass
+                    
+                    if progress_callback:
+                        progress_callback(len(results), total_columns)
         else:
             # Version séquentielle (fallback)
             for col in self.numeric_columns:
@@ -157,6 +163,9 @@ class AnomalyDetector:
                 
                 # Stocker pour référence
                 self.outliers_info[col] = result
+                
+                if progress_callback:
+                    progress_callback(len(results), total_columns)
         
         return pd.DataFrame(results).sort_values('Nombre_Outliers', ascending=False)
     
@@ -0,0 +1,319 @@
+"""
+Module des recettes de nettoyage
+Responsabilité: Décrire les étapes de nettoyage sous forme de plan rejouable
+(valeurs de remplissage et bornes figées), l'exporter en JSON et le rejouer
+sur un DataFrame ou sur un fichier CSV en une seule passe par chunks
+"""
+
+import json
+from typing import Callable, Dict, Hashable, Iterable, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from src.duplicate_detector import ChunkedDuplicateFinder, find_duplicates
+
+
+RECIPE_VERSION = 1
+
+
+def _to_builtin(value):
+    """Convertit un scalaire numpy en type JSON natif (sérialisation)"""
+    if isinstance(value, np.generic):
+        return value.item()
+    raise TypeError(f"Valeur non sérialisable: {value!r}")
+
+
+def describe_step(step: Dict) -> str:
+    """Description lisible d'une étape"""
+    operation = step['operation']
+    if operation == 'dropna':
+        return f"Suppression des lignes avec valeurs manquantes ({len(step['columns'])} colonnes)"
+    if operation == 'fillna':
+        return f"Remplissage ({step.get('strategy', 'custom')}) de {len(step['values'])} colonnes"
+    if operation == 'drop_duplicates':
+        return "Suppression des doublons"
+    if operation == 'convert':
+        return f"Conversion de '{step['column']}' en {step['target_type']}"
+    if operation == 'rename':
+        return "Normalisation des noms de colonnes"
+    if operation == 'filter_range':
+        return f"Suppression des outliers (IQR) sur {len(step['bounds'])} colonnes"
+    return operation
+
+
+def convert_series(series: pd.Series, target_type: str) -> pd.Series:
+    """
+    Convertit une colonne vers un type cible
+
+    Args:
+        series: Colonne à convertir
+        target_type: Type cible ('int', 'float', 'str', 'datetime', 'category')
+
+    Returns:
+        Nouvelle colonne convertie
+    """
+    if target_type == 'int':
+        return pd.to_numeric(series, errors='coerce').astype('Int64')
+    if target_type == 'float':
+        return pd.to_numeric(series, errors='coerce')
+    if target_type == 'str':
+        return series.astype(str)
+    if target_type == 'datetime':
+        return pd.to_datetime(series, errors='coerce')
+    if target_type == 'category':
+        return series.astype('category')
+    raise ValueError(f"Type cible inconnu: {target_type}")
+
+
+def range_mask(df: pd.DataFrame, bounds: Dict[Hashable, Tuple[float, float]]) -> np.ndarray:
+    """Masque des lignes dont toutes les colonnes sont dans leurs bornes (NaN exclus)"""
+    mask = np.ones(len(df), dtype=bool)
+    for col, (low, high) in bounds.items():
+        mask &= df[col].between(low, high).to_numpy(dtype=bool)
+    return mask
+
+
+def resolve_step_columns(step: Dict, columns: Iterable[Hashable]) -> Dict:
+    """
+    Rapproche les noms de colonnes d'une étape des colonnes réelles des données
+
+    En JSON, les clés de dictionnaire (valeurs de remplissage, renommage,
+    bornes) deviennent des chaînes : la colonne 0 d'un fichier lu sans en-tête
+    revient sous la forme '0'. Un nom absent des données est remplacé par la
+    colonne de même forme texte.
+
+    Args:
+        step: Étape (éventuellement rechargée depuis JSON)
+        columns: Colonnes des données au moment de l'étape
+
+    Returns:
+        Étape dont les noms de colonnes sont ceux des données
+    """
+    columns = list(columns)
+    existing = set(columns)
+    by_text = {str(col): col for col in columns}
+
+    def resolve(name: Hashable) -> Hashable:
+        return name if name in existing else by_text.get(str(name), name)
+
+    step = dict(step)
+    if step.get('columns') is not None:
+        step['columns'] = [resolve(col) for col in step['columns']]
+    if step.get('subset') is not None:
+        step['subset'] = [resolve(col) for col in step['subset']]
+    if 'column' in step:
+        step['column'] = resolve(step['column'])
+    for key in ('values', 'mapping', 'bounds'):
+        if key in step:
+            step[key] = {resolve(col): value for col, value in step[key].items()}
+    return step
+
+
+def apply_step(df: pd.DataFrame, step: Dict,
+               duplicated: Optional[np.ndarray] = None) -> Tuple[pd.DataFrame, List[Hashable], int]:
+    """
+    Applique une étape sans copier les colonnes non modifiées
+
+    Les colonnes modifiées sont remplacées (jamais écrites en place) : un
+    DataFrame partageant ses données avec la source ne modifie pas celle-ci.
+
+    Args:
+        df: Données (modifiées sur place pour les étapes colonne par colonne)
+        step: Étape résolue
+        duplicated: Masque des doublons déjà calculé (étape drop_duplicates)
+
+    Returns:
+        Tuple (données, colonnes modifiées, nombre de lignes supprimées)
+    """
+    operation = step['operation']
+    initial_rows = len(df)
+
+    if operation == 'dropna':
+        df = df.dropna(subset=step['columns'])
+        return df, [], initial_rows - len(df)
+
+    if operation == 'fillna':
+        changed = []
+        for col, value in step['values'].items():
+            if df[col].isnull().any():
+                df[col] = df[col].fillna(value)
+                changed.append(col)
+        return df, changed, 0
+
+    if operation == 'drop_duplicates':
+        if duplicated is None:
+            duplicated = find_duplicates(df, step.get('subset'))
+        if duplicated.any():
+            df = df[~duplicated]
+        return df, [], initial_rows - len(df)
+
+    if operation == 'convert':
+        df[step['column']] = convert_series(df[step['column']], step['target_type'])
+        return df, [step['column']], 0
+
+    if operation == 'rename':
+        df.columns = [step['mapping'].get(col, col) for col in df.columns]
+        return df, [], 0
+
+    if operation == 'filter_range':
+        mask = range_mask(df, step['bounds'])
+        if not mask.all():
+            df = df[mask]
+        return df, [], initial_rows - len(df)
+
+    raise ValueError(f"Opération inconnue: {operation}")
+
+
+class CleaningRecipe:
+    """
+    Plan de nettoyage rejouable
+
+    Les étapes sont enregistrées sous forme résolue (valeurs de remplissage,
+    bornes IQR) : rejouer la recette sur un autre fichier de même structure
+    applique exactement les mêmes transformations.
+    """
+
+    def __init__(self, columns: Optional[Iterable[Hashable]] = None,
+                 steps: Optional[List[Dict]] = None):
+        self.columns = [str(col) for col in columns] if columns is not None else None
+        self.steps: List[Dict] = list(steps or [])
+
+    def add_step(self, step: Dict) -> None:
+        """Ajoute une étape résolue au plan"""
+        self.steps.append(step)
+
+    def pop_step(self) -> Optional[Dict]:
+        """Retire et retourne la dernière étape (None si le plan est vide)"""
+        return self.steps.pop() if self.steps else None
+
+    def clear(self) -> None:
+        """Vide le plan"""
+        self.steps = []
+
+    def describe(self) -> List[str]:
+        """Descriptions lisibles des étapes"""
+        return [describe_step(step) for step in self.steps]
+
+    def _check_columns(self, columns: Iterable[Hashable]) -> None:
+        """Vérifie que les données ont la structure attendue par la recette"""
+        if self.columns is None:
+            return
+        available = set(map(str, columns))
+        missing = [col for col in self.columns if col not in available]
+        if missing:
+            raise ValueError(f"Colonnes absentes pour la recette: {missing}")
+
+    def apply(self, df: pd.DataFrame) -> pd.DataFrame:
+        """
+        Rejoue la recette sur un DataFrame (la source n'est pas modifiée)
+
+        Args:
+            df: Données de même structure que celles de la recette
+
+        Returns:
+            Données nettoyées
+        """
+        self._check_columns(df.columns)
+        result = df.copy(deep=False)
+        for step in self.steps:
+            result, _, _ = apply_step(result, resolve_step_columns(step, result.columns))
+        return result
+
+    def apply_to_csv(self, input_path: str, output_path: str, chunksize: int = 50_000,
+                     encoding: str = 'utf-8',
+                     progress_callback: Optional[Callable[[int], None]] = None) -> Dict:
+        """
+        Rejoue la recette sur un fichier CSV en une seule passe par chunks
+
+        Les doublons sont détectés entre chunks à l'aide d'empreintes des
+        lignes (ChunkedDuplicateFinder) ; la mémoire utilisée ne dépend que de la taille d'un chunk
+        (et du nombre de lignes distinctes si la recette supprime les doublons).
+
+        Args:
+            input_path: Fichier CSV source
+            output_path: Fichier CSV nettoyé
+            chunksize: Nombre de lignes par chunk
+            encoding: Encodage du fichier source
+            progress_callback: Appelée avec le nombre de lignes lues
+
+        Returns:
+            Dictionnaire {'lignes_lues', 'lignes_ecrites'}
+        """
+        # Étapes rapprochées des colonnes du fichier (au premier chunk)
+        resolved: List[Dict] = []
+        # Doublons suivis entre chunks, par étape de suppression des doublons
+        finders: Dict[int, ChunkedDuplicateFinder] = {}
+        rows_read, rows_written = 0, 0
+        header = True
+
+        for chunk in pd.read_csv(input_path, encoding=encoding, chunksize=chunksize):
+            if header:
+                self._check_columns(chunk.columns)
+            rows_read += len(chunk)
+
+            for i, step in enumerate(self.steps):
+                if i == len(resolved):
+                    resolved.append(resolve_step_columns(step, chunk.columns))
+                step = resolved[i]
+                if step['operation'] == 'drop_duplicates':
+                    if i not in finders:
+                        finders[i] = ChunkedDuplicateFinder(step.get('subset'))
+                    chunk = chunk[~finders[i].process(chunk)]
+                else:
+                    chunk, _, _ = apply_step(chunk, step)
+
+            chunk.to_csv(output_path, mode='w' if header else 'a', header=header, index=False)
+            header = False
+            rows_written += len(chunk)
+
+            if progress_callback is not None:
+                progress_callback(rows_read)
+
+        return {'lignes_lues': rows_read, 'lignes_ecrites': rows_written}
+
+    def to_dict(self) -> Dict:
+        """Représentation sérialisable de la recette"""
+        return {'version': RECIPE_VERSION, 'colonnes': self.columns, 'etapes': self.steps}
+
+    def to_json(self) -> str:
+        """Recette au format JSON"""
+        return json.dumps(self.to_dict(), indent=4, ensure_ascii=False, default=_to_builtin)
+
+    def save(self, filepath: str) -> str:
+        """
+        Exporte la recette au format JSON
+
+        Args:
+            filepath: Chemin du fichier
+
+        Returns:
+            Chemin du fichier créé
+        """
+        with open(filepath, 'w', encoding='utf-8') as f:
+            f.write(self.to_json())
+        return filepath
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> 'CleaningRecipe':
+        """Reconstruit une recette depuis sa représentation sérialisée"""
+        if data.get('version') != RECIPE_VERSION:
+            raise ValueError(f"Version de recette non supportée: {data.get('version')}")
+        steps = []
+        for step in data['etapes']:
+            step = dict(step)
+            if step['operation'] == 'filter_range':
+                step['bounds'] = {col: tuple(bounds) for col, bounds in step['bounds'].items()}
+            steps.append(step)
+        return cls(data.get('colonnes'), steps)
+
+    @classmethod
+    def from_json(cls, text: str) -> 'CleaningRecipe':
+        """Charge une recette depuis une chaîne JSON"""
+        return cls.from_dict(json.loads(text))
+
+    @classmethod
+    def load(cls, filepath: str) -> 'CleaningRecipe':
+        """Charge une recette depuis un fichier JSON"""
+        with open(filepath, 'r', encoding='utf-8') as f:
+            return cls.from_json(f.read())
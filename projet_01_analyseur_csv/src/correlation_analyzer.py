@@ -1,36 +1,122 @@
 """
 Module d'analyse de corrélation
 Responsabilité: Calculer et analyser les corrélations entre variables
-Version 2.2 - Optimisée avec cache et échantillonnage
+Version 2.3 - Moteur matriciel par blocs (float32) sans limite de colonnes
 """
 
+import warnings
+
 import pandas as pd
 import numpy as np
 from scipy import stats
-from typing import Dict, List, Tuple, Optional
+from typing import Callable, Dict, List, Tuple, Optional
+
+import config_performance as perf_config
+from src.dependency_tracker import DependencyTracker
 
 
 class CorrelationAnalyzer:
     """Classe pour analyser les corrélations entre variables (Version Optimisée)"""
     
     # Constantes d'optimisation
-    MAX_COLUMNS = 50  # Limiter le nombre de colonnes pour la matrice
-    SAMPLE_THRESHOLD = 100_000  # Si > 100K lignes, échantillonner
-    SAMPLE_SIZE = 50_000  # Taille de l'échantillon
+    MAX_COLUMNS = perf_config.MAX_COLUMNS_CORRELATION  # Limite de colonnes pour la matrice (None = aucune)
+    SAMPLE_THRESHOLD = perf_config.SAMPLE_THRESHOLD_ROWS  # Au-delà, échantillonner
+    SAMPLE_SIZE = perf_config.SAMPLE_SIZE_CORRELATION  # Taille de l'échantillon
+    BLOCK_SIZE = 256  # Colonnes par bloc pour le produit matriciel
+    RERANK_CHUNK = 16  # Colonnes partenaires par passe du reclassement Spearman
+    MATRIX_METHODS = ('pearson', 'spearman')  # Méthodes calculées par produit matriciel
     
-    def __init__(self, df: pd.DataFrame):
+    def __init__(self, df: pd.DataFrame, tracker: Optional[DependencyTracker] = None):
         self.df = df
         self.numeric_columns = df.select_dtypes(include=['number']).columns.tolist()
-        # Cache pour matrice de corrélation
+        # Suivi des modifications (None = cache jamais invalidé)
+        self.tracker = tracker
+        # Cache pour matrice de corrélation : clé -> (version lignes, versions colonnes, index échantillon, matrice)
         self._corr_cache = {}
     
-    def get_correlation_matrix(self, method: str = 'pearson', use_sample: bool = None) -> pd.DataFrame:
+    def update_data(self, df: pd.DataFrame) -> None:
+        """
+        Remplace les données en conservant les matrices de corrélation en cache
+        
+        Seules les lignes/colonnes des variables modifiées seront recalculées.
+        
+        Args:
+            df: Nouvelles données (après nettoyage)
+        """
+        self.df = df
+        self.numeric_columns = df.select_dtypes(include=['number']).columns.tolist()
+        if self.tracker is None:
+            self._corr_cache = {}
+    
+    def _get_columns_to_use(self) -> List[str]:
+        """Colonnes numériques retenues pour la matrice (limite éventuelle)"""
+        if self.MAX_COLUMNS is not None and len(self.numeric_columns) > self.MAX_COLUMNS:
+            return self.numeric_columns[:self.MAX_COLUMNS]
+        return self.numeric_columns
+    
+    def _resolve_sampling(self, use_sample: Optional[bool]) -> bool:
+        """Décide si l'échantillonnage est nécessaire"""
+        if use_sample is None:
+            use_sample = len(self.df) > self.SAMPLE_THRESHOLD
+        return bool(use_sample and len(self.df) > self.SAMPLE_THRESHOLD)
+    
+    def needs_full_computation(self, method: str = 'pearson', use_sample: bool = None) -> bool:
+        """
+        Indique si la matrice doit être calculée entièrement (pas de cache réutilisable)
+        
+        Permet de déléguer les calculs longs à une tâche en arrière-plan ; les
+        mises à jour partielles (colonnes modifiées) restent rapides.
+        
+        Args:
+            method: Méthode de corrélation
+            use_sample: Forcer échantillonnage (None = auto)
+            
+        Returns:
+            True si aucun résultat en cache n'est exploitable
+        """
+        if len(self.numeric_columns) < 2:
+            return False
+        cached = self._corr_cache.get(f"corr_{method}_{self._resolve_sampling(use_sample)}")
+        row_version = self.tracker.row_version if self.tracker else 0
+        return cached is None or cached[0] != row_version
+    
+    def get_sample_index(self, method: str = 'pearson', use_sample: bool = None) -> Optional[pd.Index]:
+        """
+        Index de l'échantillon utilisé pour la matrice en cache (None = données complètes)
+        
+        Args:
+            method: Méthode de corrélation
+            use_sample: Forcer échantillonnage (None = auto)
+        """
+        cached = self._corr_cache.get(f"corr_{method}_{self._resolve_sampling(use_sample)}")
+        return cached[2] if cached is not None else None
+    
+    def set_correlation_matrix(self, corr_matrix: pd.DataFrame, method: str = 'pearson',
+                               sample_index: Optional[pd.Index] = None) -> None:
+        """
+        Enregistre dans le cache une matrice calculée ailleurs (tâche en arrière-plan)
+        
+        Args:
+            corr_matrix: Matrice calculée sur les données courantes
+            method: Méthode de corrélation utilisée
+            sample_index: Index de l'échantillon utilisé (None = données complètes)
+        """
+        columns = corr_matrix.columns.tolist()
+        row_version = self.tracker.row_version if self.tracker else 0
+        versions = self.tracker.snapshot(columns) if self.tracker else {col: 0 for col in columns}
+        cache_key = f"corr_{method}_{sample_index is not None}"
+        self._corr_cache[cache_key] = (row_version, versions, sample_index, corr_matrix)
+    
+    def get_correlation_matrix(self, method: str = 'pearson', use_sample: bool = None,
+                               progress_callback: Optional[Callable[[int, int], None]] = None) -> pd.DataFrame:
         """
         Calcule la matrice de corrélation (OPTIMISÉ avec cache et échantillonnage)
         
         Args:
             method: Méthode de corrélation ('pearson', 'spearman', 'kendall')
             use_sample: Forcer échantillonnage (None = auto si > 100K lignes)
+            progress_callback: Fonction appelée après chaque étape (faites, total) : blocs puis
+                colonnes incomplètes reclassées (Spearman)
             
         Returns:
             DataFrame avec la matrice de corrélation
@@ -38,30 +124,368 @@ class CorrelationAnalyzer:
         if len(self.numeric_columns) < 2:
             return pd.DataFrame()
         
-        # Vérifier le cache
-        cache_key = f"corr_{method}"
-        if cache_key in self._corr_cache:
-            return self._corr_cache[cache_key]
-        
-        # Limiter le nombre de colonnes si trop nombreuses
-        cols_to_use = self.numeric_columns[:self.MAX_COLUMNS] if len(self.numeric_columns) > self.MAX_COLUMNS else self.numeric_columns
+        # Limiter le nombre de colonnes si une limite est configurée
+        cols_to_use = self._get_columns_to_use()
         
         # Décider si échantillonnage nécessaire
-        if use_sample is None:
-            use_sample = len(self.df) > self.SAMPLE_THRESHOLD
+        use_sample = self._resolve_sampling(use_sample)
         
-        # Préparer les données
-        if use_sample and len(self.df) > self.SAMPLE_THRESHOLD:
-            # Échantillonnage aléatoire pour gros datasets
-            df_sample = self.df[cols_to_use].sample(n=self.SAMPLE_SIZE, random_state=42)
-            corr_matrix = df_sample.corr(method=method)
+        # Vérifier le cache
+        cache_key = f"corr_{method}_{use_sample}"
+        row_version = self.tracker.row_version if self.tracker else 0
+        cached = self._corr_cache.get(cache_key)
+        
+        if cached is not None and cached[0] == row_version:
+            _, versions, sample_index, cached_matrix = cached
+            # Colonnes nouvelles ou modifiées depuis le calcul
+            stale = [col for col in cols_to_use if col not in versions]
+            if self.tracker is not None:
+                stale += [col for col in self.tracker.get_changed_columns(versions)
+                          if col in cols_to_use and col not in stale]
+            
+            if not stale and list(cached_matrix.columns) == cols_to_use:
+                return cached_matrix
+            
+            data = self.df.loc[sample_index, cols_to_use] if sample_index is not None else self.df[cols_to_use]
+            corr_matrix = self._update_correlation_block(cached_matrix, data, stale, method)
         else:
-            corr_matrix = self.df[cols_to_use].corr(method=method)
+            # Préparer les données
+            if use_sample:
+                # Échantillonnage aléatoire pour gros datasets
+                df_sample = self.df[cols_to_use].sample(n=self.SAMPLE_SIZE, random_state=42)
+                sample_index = df_sample.index
+                corr_matrix = self._compute_correlation(df_sample, method, progress_callback)
+            else:
+                sample_index = None
+                corr_matrix = self._compute_correlation(self.df[cols_to_use], method, progress_callback)
         
         # Mettre en cache
-        self._corr_cache[cache_key] = corr_matrix
+        versions = self.tracker.snapshot(cols_to_use) if self.tracker else {col: 0 for col in cols_to_use}
+        self._corr_cache[cache_key] = (row_version, versions, sample_index, corr_matrix)
         return corr_matrix
     
+    def _update_correlation_block(self, cached_matrix: pd.DataFrame, data: pd.DataFrame,
+                                  stale: List[str], method: str) -> pd.DataFrame:
+        """
+        Recalcule uniquement les lignes/colonnes de la matrice des variables modifiées
+        
+        Args:
+            cached_matrix: Matrice précédemment calculée
+            data: Données (ou échantillon) sur les colonnes à utiliser
+            stale: Colonnes à recalculer
+            method: Méthode de corrélation
+            
+        Returns:
+            Matrice de corrélation mise à jour
+        """
+        columns = data.columns.tolist()
+        corr_matrix = cached_matrix.reindex(index=columns, columns=columns)
+        
+        if method not in self.MATRIX_METHODS:
+            for col in stale:
+                # corrwith utilise les observations complètes par paire, comme DataFrame.corr
+                corr_col = data.corrwith(data[col], method=method)
+                corr_matrix.loc[col, :] = corr_col
+                corr_matrix.loc[:, col] = corr_col
+            return corr_matrix
+        
+        # Un seul bloc (variables modifiées × toutes les variables)
+        z, mask, complete = self._standardize(data, method)
+        stale_idx = [columns.index(col) for col in stale]
+        block = self._block_correlation(z[:, stale_idx], mask[:, stale_idx], z, mask, complete)
+        
+        values = corr_matrix.to_numpy(dtype=np.float64, copy=True)
+        values[stale_idx, :] = block
+        values[:, stale_idx] = block.T
+        if method == 'spearman' and not complete:
+            self._rerank_missing_pairs(data, values, stale_idx)
+        values[stale_idx, stale_idx] = np.where(np.isnan(values[stale_idx, stale_idx]), np.nan, 1.0)
+        
+        return pd.DataFrame(values, index=columns, columns=columns)
+    
+    def _compute_correlation(self, data: pd.DataFrame, method: str,
+                             progress_callback: Optional[Callable[[int, int], None]] = None) -> pd.DataFrame:
+        """
+        Calcule la matrice de corrélation par produit matriciel standardisé (float32, par blocs)
+        
+        Pearson et Spearman sont calculés comme Z^T Z sur les colonnes standardisées
+        (Spearman : un seul classement par colonne). Avec des valeurs manquantes,
+        les moments sont corrigés par paire via les masques de présence, comme
+        DataFrame.corr ; pour Spearman, les paires touchant une colonne incomplète
+        sont reclassées sur leurs observations communes (_rerank_missing_pairs).
+        Kendall n'a pas de forme matricielle et passe par pandas.
+        
+        Args:
+            data: Colonnes numériques à corréler
+            method: Méthode de corrélation
+            progress_callback: Fonction appelée après chaque étape (faites, total) : blocs puis
+                colonnes incomplètes reclassées (Spearman)
+            
+        Returns:
+            DataFrame avec la matrice de corrélation
+        """
+        if method not in self.MATRIX_METHODS:
+            corr_matrix = data.corr(method=method)
+            if progress_callback:
+                progress_callback(1, 1)
+            return corr_matrix
+        
+        columns = data.columns.tolist()
+        n_cols = len(columns)
+        z, mask, complete = self._standardize(data, method)
+        result = np.empty((n_cols, n_cols), dtype=np.float64)
+        
+        n_blocks = -(-n_cols // self.BLOCK_SIZE)
+        total_blocks = n_blocks * (n_blocks + 1) // 2
+        done_blocks = 0
+        # Spearman incomplet : une étape de reclassement par colonne incomplète
+        n_incomplete = 0
+        if method == 'spearman' and not complete:
+            n_incomplete = int((mask.min(axis=0) == 0).sum())
+        total_steps = total_blocks + n_incomplete
+        
+        # Blocs triangulaires supérieurs : mémoire bornée pour les données larges
+        for start_i in range(0, n_cols, self.BLOCK_SIZE):
+            block_i = slice(start_i, min(start_i + self.BLOCK_SIZE, n_cols))
+            for start_j in range(start_i, n_cols, self.BLOCK_SIZE):
+                block_j = slice(start_j, min(start_j + self.BLOCK_SIZE, n_cols))
+                block = self._block_correlation(
+                    z[:, block_i], mask[:, block_i], z[:, block_j], mask[:, block_j], complete
+                )
+                result[block_i, block_j] = block
+                result[block_j, block_i] = block.T
+                
+                done_blocks += 1
+                if progress_callback:
+                    progress_callback(done_blocks, total_steps)
+        
+        if n_incomplete:
+            self._rerank_missing_pairs(
+                data, result,
+                progress_callback=(lambda done, _: progress_callback(total_blocks + done, total_steps))
+                if progress_callback else None
+            )
+        
+        # Diagonale exacte (NaN pour les colonnes constantes, comme pandas)
+        diagonal = np.diag(result).copy()
+        np.fill_diagonal(result, np.where(np.isnan(diagonal), np.nan, 1.0))
+        
+        return pd.DataFrame(result, index=columns, columns=columns)
+    
+    @staticmethod
+    def _standardize(data: pd.DataFrame, method: str) -> Tuple[np.ndarray, np.ndarray, bool]:
+        """
+        Centre-réduit chaque colonne (classement préalable pour Spearman)
+        
+        Args:
+            data: Colonnes numériques
+            method: 'pearson' ou 'spearman'
+            
+        Returns:
+            Tuple (valeurs standardisées float32 avec NaN -> 0, masque de présence float32, données complètes)
+        """
+        if method == 'spearman':
+            # Classement une seule fois par colonne (sur ses valeurs présentes)
+            data = data.rank()
+        
+        values = data.to_numpy(dtype=np.float64, na_value=np.nan)
+        present = ~np.isnan(values)
+        complete = bool(present.all())
+        
+        with np.errstate(invalid='ignore', divide='ignore'), warnings.catch_warnings():
+            # Colonnes entièrement vides : moyenne NaN, corrélations NaN comme pandas
+            warnings.simplefilter('ignore', RuntimeWarning)
+            mean = np.nanmean(values, axis=0) if not complete else values.mean(axis=0)
+            std = np.nanstd(values, axis=0) if not complete else values.std(axis=0)
+        # Colonnes constantes : z = 0, la variance nulle donnera NaN
+        std = np.where((std > 0) & np.isfinite(std), std, 1.0)
+        
+        z = (values - mean) / std
+        z[~present] = 0.0
+        
+        return z.astype(np.float32), present.astype(np.float32), complete
+    
+    @staticmethod
+    def _masked_ranks(sorted_mask: np.ndarray, group_start: np.ndarray,
+                      group_stop: np.ndarray) -> np.ndarray:
+        """
+        Rangs moyens doublés (comme pandas, × 2) restreints à un sous-ensemble de lignes
+        
+        Args:
+            sorted_mask: Lignes retenues (colonnes × lignes), dans l'ordre croissant des valeurs
+            group_start, group_stop: Bornes [début, fin) du groupe d'ex aequo de chaque
+                position triée (même forme, ou une seule ligne diffusée)
+            
+        Returns:
+            Rangs doublés dans l'ordre trié, valables aux positions retenues
+        """
+        # cumulative[:, p] = lignes retenues parmi les positions < p
+        cumulative = np.zeros((sorted_mask.shape[0], sorted_mask.shape[1] + 1), dtype=np.int32)
+        np.cumsum(sorted_mask, axis=1, out=cumulative[:, 1:])
+        if group_start.ndim == 1:
+            before = cumulative[:, group_start]
+            through = cumulative[:, group_stop]
+        else:
+            before = np.take_along_axis(cumulative, group_start, axis=1)
+            through = np.take_along_axis(cumulative, group_stop, axis=1)
+        # rang = avant + (dans le groupe + 1) / 2
+        return before + through + 1
+    
+    @staticmethod
+    def _tie_groups(sorted_values: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """Bornes [début, fin) du groupe d'ex aequo de chaque position (colonnes × lignes triées)"""
+        n = sorted_values.shape[1]
+        positions = np.broadcast_to(np.arange(n, dtype=np.intp), sorted_values.shape)
+        new_group = np.ones(sorted_values.shape, dtype=bool)
+        new_group[:, 1:] = sorted_values[:, 1:] != sorted_values[:, :-1]
+        last_of_group = np.ones(sorted_values.shape, dtype=bool)
+        last_of_group[:, :-1] = new_group[:, 1:]
+        group_start = np.maximum.accumulate(np.where(new_group, positions, 0), axis=1)
+        group_stop = np.flip(np.minimum.accumulate(
+            np.flip(np.where(last_of_group, positions, n - 1), axis=1), axis=1), axis=1) + 1
+        return group_start, group_stop
+    
+    @classmethod
+    def _rerank_missing_pairs(cls, data: pd.DataFrame, result: np.ndarray,
+                              stale_idx: Optional[List[int]] = None,
+                              progress_callback: Optional[Callable[[int, int], None]] = None) -> None:
+        """
+        Recalcule les corrélations de Spearman des paires touchant une colonne incomplète
+        
+        pandas classe chaque paire sur ses seules observations communes : le
+        classement unique par colonne n'est exact que sans valeur manquante.
+        Chaque colonne est triée une fois ; pour une colonne incomplète i, les
+        rangs de toutes ses paires sur leurs lignes communes sont obtenus par
+        sommes cumulées du masque de présence dans l'ordre trié (rangs moyens
+        pour les ex aequo), sans boucle sur les paires.
+        
+        Args:
+            data: Colonnes numériques (avec valeurs manquantes)
+            result: Matrice de corrélation float64, modifiée sur place
+            stale_idx: Si fourni, seules les paires touchant ces colonnes sont recalculées
+            progress_callback: Appelée après chaque colonne incomplète (faites, total)
+        """
+        # Disposition colonnes × lignes : tris et sommes cumulées le long des lignes contiguës
+        values = np.ascontiguousarray(data.to_numpy(dtype=np.float64, na_value=np.nan).T)
+        present = ~np.isnan(values)
+        incomplete = np.flatnonzero(~present.all(axis=1))
+        if stale_idx is not None:
+            stale = np.array(sorted(stale_idx), dtype=np.intp)
+            incomplete = np.union1d(incomplete, stale)
+        else:
+            stale = None
+        
+        # Tri de chaque colonne (NaN en fin) et groupes d'ex aequo, une seule fois
+        order = np.argsort(values, axis=1, kind='stable')
+        group_start, group_stop = cls._tie_groups(np.take_along_axis(values, order, axis=1))
+        all_idx = np.arange(values.shape[0])
+        
+        processed = np.zeros(values.shape[0], dtype=bool)
+        for done, i in enumerate(incomplete, start=1):
+            candidates = all_idx if stale is None or i in stale else stale
+            # Les paires avec une colonne déjà traitée sont déjà recalculées
+            partners = candidates[~processed[candidates]]
+            processed[i] = True
+            if present[i].all():
+                partners = partners[~present[partners].all(axis=1)]
+            
+            # Blocs de colonnes partenaires tenant en cache
+            for offset in range(0, len(partners), cls.RERANK_CHUNK):
+                chunk = partners[offset:offset + cls.RERANK_CHUNK]
+                corr = cls._masked_spearman(present, order, group_start, group_stop, i, chunk)
+                result[i, chunk] = corr
+                result[chunk, i] = corr
+            
+            if progress_callback:
+                progress_callback(done, len(incomplete))
+    
+    @classmethod
+    def _masked_spearman(cls, present: np.ndarray, order: np.ndarray,
+                         group_start: np.ndarray, group_stop: np.ndarray,
+                         i: int, partners: np.ndarray) -> np.ndarray:
+        """
+        Spearman de la colonne i avec chaque partenaire, classés sur leurs lignes communes
+        
+        Args:
+            present, order, group_start, group_stop: Présence, tri et ex aequo (colonnes × lignes)
+            i: Indice de la colonne
+            partners: Indices des colonnes partenaires
+            
+        Returns:
+            Corrélations (NaN si moins de deux observations ou variance nulle)
+        """
+        # Lignes communes de chaque paire (i, j)
+        common = present[partners] & present[i]
+        count = common.sum(axis=1).astype(np.float64)
+        
+        # Rangs doublés de chaque colonne j sur ses lignes communes avec i
+        partner_order = order[partners]
+        ranks_j = np.empty(common.shape, dtype=np.float64)
+        np.put_along_axis(ranks_j, partner_order, cls._masked_ranks(
+            np.take_along_axis(common, partner_order, axis=1),
+            group_start[partners], group_stop[partners]
+        ), axis=1)
+        
+        # Rangs doublés de i sur les lignes communes avec chaque colonne j
+        ranks_i = np.empty(common.shape, dtype=np.float64)
+        ranks_i[:, order[i]] = cls._masked_ranks(
+            common[:, order[i]], group_start[i], group_stop[i]
+        )
+        
+        # Pearson des rangs : moyenne des rangs doublés = n + 1
+        ranks_j[~common] = 0.0
+        ranks_i[~common] = 0.0
+        center = count * (count + 1) ** 2
+        with np.errstate(invalid='ignore', divide='ignore'):
+            covariance = np.einsum('ij,ij->i', ranks_i, ranks_j) - center
+            variance_i = np.einsum('ij,ij->i', ranks_i, ranks_i) - center
+            variance_j = np.einsum('ij,ij->i', ranks_j, ranks_j) - center
+            denominator = np.sqrt(variance_i * variance_j)
+            # Variance nulle (colonne constante) ou moins de deux observations : NaN
+            return np.where((count > 1) & (denominator > 1e-9 * count ** 3),
+                            covariance / denominator, np.nan)
+    
+    @staticmethod
+    def _block_correlation(z_a: np.ndarray, mask_a: np.ndarray,
+                           z_b: np.ndarray, mask_b: np.ndarray,
+                           complete: bool) -> np.ndarray:
+        """
+        Corrélations entre deux blocs de colonnes standardisées
+        
+        Args:
+            z_a, mask_a: Bloc de colonnes A et son masque de présence
+            z_b, mask_b: Bloc de colonnes B et son masque de présence
+            complete: Aucune valeur manquante (un seul produit matriciel suffit)
+            
+        Returns:
+            Matrice (colonnes A × colonnes B) en float64
+        """
+        with np.errstate(invalid='ignore', divide='ignore'):
+            if complete:
+                # Moyenne et variance identiques pour toutes les paires
+                cov = (z_a.T @ z_b).astype(np.float64)
+                var_a = (z_a * z_a).sum(axis=0, dtype=np.float64)[:, None]
+                var_b = (z_b * z_b).sum(axis=0, dtype=np.float64)[None, :]
+                corr = cov / np.sqrt(var_a * var_b)
+            else:
+                # Moments restreints aux observations complètes de chaque paire
+                n = (mask_a.T @ mask_b).astype(np.float64)
+                sum_ab = (z_a.T @ z_b).astype(np.float64)
+                sum_a = (z_a.T @ mask_b).astype(np.float64)
+                sum_b = (mask_a.T @ z_b).astype(np.float64)
+                sum_aa = ((z_a * z_a).T @ mask_b).astype(np.float64)
+                sum_bb = (mask_a.T @ (z_b * z_b)).astype(np.float64)
+                
+                cov = sum_ab - sum_a * sum_b / n
+                var_a = sum_aa - sum_a ** 2 / n
+                var_b = sum_bb - sum_b ** 2 / n
+                corr = cov / np.sqrt(var_a * var_b)
+            
+            # Variance nulle (colonne constante ou < 2 observations) : NaN comme pandas
+            corr = np.where((var_a > 0) & (var_b > 0), corr, np.nan)
+        
+        return np.clip(corr, -1.0, 1.0)
+    
     def get_correlation_pairs(self, threshold: float = 0.7, 
                              method: str = 'pearson') -> List[Dict]:
         """
@@ -79,26 +503,42 @@ class CorrelationAnalyzer:
         if corr_matrix.empty:
             return []
         
-        pairs = []
+        rows, cols, values = self._upper_triangle_pairs(corr_matrix, threshold)
         
-        # Parcourir la matrice triangulaire supérieure
-        for i in range(len(corr_matrix.columns)):
-            for j in range(i+1, len(corr_matrix.columns)):
-                corr_value = corr_matrix.iloc[i, j]
-                
-                if abs(corr_value) >= threshold:
-                    pairs.append({
-                        'variable_1': corr_matrix.columns[i],
-                        'variable_2': corr_matrix.columns[j],
-                        'correlation': round(corr_value, 3),
-                        'force': self._interpret_correlation(abs(corr_value)),
-                        'direction': 'Positive' if corr_value > 0 else 'Négative'
-                    })
-        
-        # Trier par valeur absolue de corrélation
-        pairs.sort(key=lambda x: abs(x['correlation']), reverse=True)
-        
-        return pairs
+        # Trier par valeur absolue de corrélation arrondie (tri stable)
+        rounded = np.round(values, 3)
+        order = np.argsort(-np.abs(rounded), kind='stable')
+        columns = corr_matrix.columns
+        
+        return [
+            {
+                'variable_1': columns[rows[k]],
+                'variable_2': columns[cols[k]],
+                'correlation': float(rounded[k]),
+                'force': self._interpret_correlation(abs(values[k])),
+                'direction': 'Positive' if values[k] > 0 else 'Négative'
+            }
+            for k in order
+        ]
+    
+    @staticmethod
+    def _upper_triangle_pairs(corr_matrix: pd.DataFrame,
+                              threshold: float = 0.0) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Extrait les paires du triangle supérieur (sans diagonale) au-dessus du seuil
+        
+        Args:
+            corr_matrix: Matrice de corrélation
+            threshold: Seuil sur la valeur absolue (les NaN sont exclus)
+            
+        Returns:
+            Tuple (indices lignes, indices colonnes, valeurs) dans l'ordre ligne par ligne
+        """
+        rows, cols = np.triu_indices(len(corr_matrix.columns), k=1)
+        values = corr_matrix.to_numpy(dtype=np.float64)[rows, cols]
+        with np.errstate(invalid='ignore'):
+            keep = np.abs(values) >= threshold
+        return rows[keep], cols[keep], values[keep]
     
     def _interpret_correlation(self, corr_value: float) -> str:
         """
@@ -209,8 +649,8 @@ class CorrelationAnalyzer:
             }
         
         # Extraire les valeurs triangulaires supérieures (sans diagonale)
-        mask = np.triu(np.ones_like(corr_matrix, dtype=bool), k=1)
-        correlations = corr_matrix.where(mask).stack().values
+        _, _, correlations = self._upper_triangle_pairs(corr_matrix)
+        abs_corr = np.abs(correlations)
         
         return {
             'nombre_variables': len(self.numeric_columns),
@@ -218,9 +658,9 @@ class CorrelationAnalyzer:
             'correlation_moyenne': round(np.mean(correlations), 3),
             'correlation_max': round(np.max(correlations), 3),
             'correlation_min': round(np.min(correlations), 3),
-            'paires_fortement_correlees': len([c for c in correlations if abs(c) >= 0.7]),
-            'paires_moderement_correlees': len([c for c in correlations if 0.5 <= abs(c) < 0.7]),
-            'paires_faiblement_correlees': len([c for c in correlations if abs(c) < 0.5])
+            'paires_fortement_correlees': int(np.count_nonzero(abs_corr >= 0.7)),
+            'paires_moderement_correlees': int(np.count_nonzero((abs_corr >= 0.5) & (abs_corr < 0.7))),
+            'paires_faiblement_correlees': int(np.count_nonzero(abs_corr < 0.5))
         }
     
     def detect_multicollinearity(self, threshold: float = 0.9) -> List[Tuple[str, str, float]]:
@@ -238,20 +678,13 @@ class CorrelationAnalyzer:
         if corr_matrix.empty:
             return []
         
-        multicollinear = []
+        rows, cols, values = self._upper_triangle_pairs(corr_matrix, threshold)
+        columns = corr_matrix.columns
         
-        for i in range(len(corr_matrix.columns)):
-            for j in range(i+1, len(corr_matrix.columns)):
-                corr_value = corr_matrix.iloc[i, j]
-                
-                if abs(corr_value) >= threshold:
-                    multicollinear.append((
-                        corr_matrix.columns[i],
-                        corr_matrix.columns[j],
-                        round(corr_value, 3)
-                    ))
-        
-        return multicollinear
+        return [
+            (columns[i], columns[j], round(float(value), 3))
+            for i, j, value in zip(rows, cols, values)
+        ]
     
     def calculate_partial_correlation(self, x: str, y: str, control_vars: List[str]) -> float:
         """
@@ -1,20 +1,56 @@
 """
 Module de nettoyage et preprocessing des données
 Responsabilité: Traiter les valeurs manquantes, duplicatas, conversions
+Les étapes sont enregistrées dans un plan rejouable (annulation, recette)
 """
 
 import pandas as pd
 import numpy as np
 from typing import Optional, Dict, List
 
+from src.dependency_tracker import DependencyTracker
+from src.cleaning_recipe import CleaningRecipe, apply_step, describe_step
+from src.duplicate_detector import find_duplicates, hash_rows
+
 
 class DataCleaner:
-    """Classe pour nettoyer et prétraiter les données"""
+    """
+    Classe pour nettoyer et prétraiter les données
+    
+    Les données source ne sont jamais copiées ni modifiées : le DataFrame de
+    travail partage les colonnes non modifiées avec la source, et chaque étape
+    remplace seulement les colonnes qu'elle change. Le plan des étapes permet
+    d'annuler (rejeu depuis la source) et d'exporter une recette réutilisable.
+    """
     
     def __init__(self, df: pd.DataFrame):
-        self.df = df.copy()
-        self.original_df = df.copy()
+        # Source conservée telle quelle (référence, pas de copie)
+        self.original_df = df
+        self.df = df.copy(deep=False)
         self.cleaning_log = []
+        # Plan des étapes appliquées (valeurs de remplissage et bornes figées)
+        self.recipe = CleaningRecipe(df.columns)
+        # Suivi des colonnes/lignes modifiées (invalidation ciblée des caches)
+        self.tracker = DependencyTracker(self.df.columns)
+        # Empreintes de lignes et doublons : subset -> (signature, empreintes, masque)
+        self._duplicate_cache = {}
+    
+    def _apply_step(self, operation: str, step: Dict, **kwargs) -> int:
+        """
+        Applique une étape, l'ajoute au plan et signale les colonnes modifiées
+        
+        Args:
+            operation: Nom de l'opération (journal des dépendances)
+            step: Étape résolue
+            **kwargs: Transmis à apply_step (masque des doublons déjà calculé)
+            
+        Returns:
+            Nombre de lignes supprimées
+        """
+        self.df, columns, rows_removed = apply_step(self.df, step, **kwargs)
+        self.recipe.add_step(step)
+        self.tracker.record_change(operation, columns=columns, rows_removed=rows_removed)
+        return rows_removed
     
     def get_missing_values_summary(self) -> pd.DataFrame:
         """
@@ -50,37 +86,71 @@ class DataCleaner:
         if columns is None:
             columns = self.df.columns.tolist()
         
-        initial_rows = len(self.df)
-        
         if strategy == 'drop':
-            self.df = self.df.dropna(subset=columns)
+            removed = self._apply_step('handle_missing_values',
+                                       {'operation': 'dropna', 'columns': list(columns)})
+            self.cleaning_log.append(f"Supprimé {removed} lignes avec valeurs manquantes")
+            return
+        
+        if strategy in ['mean', 'median', 'mode']:
+            numeric_columns = set(self.df.select_dtypes(include=['number']).columns)
+            columns = [col for col in columns if col in numeric_columns]
+            fill_values = {}
+            for col in columns:
+                if strategy == 'mean':
+                    fill_values[col] = self.df[col].mean()
+                elif strategy == 'median':
+                    fill_values[col] = self.df[col].median()
+                else:  # mode
+                    mode = self.df[col].mode()
+                    fill_values[col] = mode[0] if not mode.empty else 0
+            label = strategy
+        elif strategy == 'custom' and fill_value is not None:
+            fill_values = {col: fill_value for col in columns}
+            label = fill_value
+        else:
+            return
+        
+        missing_counts = self.df[columns].isnull().sum()
+        self._apply_step('handle_missing_values',
+                         {'operation': 'fillna', 'strategy': strategy, 'values': fill_values})
+        for col in columns:
             self.cleaning_log.append(
-                f"Supprimé {initial_rows - len(self.df)} lignes avec valeurs manquantes"
+                f"Rempli {missing_counts[col]} valeurs manquantes dans '{col}' avec {label}"
             )
+    
+    def _get_duplicates(self, subset: Optional[List[str]] = None) -> tuple:
+        """
+        Empreintes de lignes et masque des doublons (calculés une fois par version des données)
         
-        elif strategy in ['mean', 'median', 'mode']:
-            for col in columns:
-                if col in self.df.select_dtypes(include=['number']).columns:
-                    if strategy == 'mean':
-                        fill_val = self.df[col].mean()
-                    elif strategy == 'median':
-                        fill_val = self.df[col].median()
-                    else:  # mode
-                        fill_val = self.df[col].mode()[0] if not self.df[col].mode().empty else 0
-                    
-                    missing_count = self.df[col].isnull().sum()
-                    self.df[col].fillna(fill_val, inplace=True)
-                    self.cleaning_log.append(
-                        f"Rempli {missing_count} valeurs manquantes dans '{col}' avec {strategy}"
-                    )
+        Args:
+            subset: Colonnes à considérer (None = toutes)
+            
+        Returns:
+            Tuple (empreintes, masque des doublons)
+        """
+        key = tuple(subset) if subset is not None else None
+        columns = list(subset) if subset is not None else self.df.columns.tolist()
+        signature = self.tracker.get_signature(columns)
         
-        elif strategy == 'custom' and fill_value is not None:
-            for col in columns:
-                missing_count = self.df[col].isnull().sum()
-                self.df[col].fillna(fill_value, inplace=True)
-                self.cleaning_log.append(
-                    f"Rempli {missing_count} valeurs manquantes dans '{col}' avec {fill_value}"
-                )
+        cached = self._duplicate_cache.get(key)
+        if cached is None or cached[0] != signature:
+            hashes = hash_rows(self.df, subset)
+            cached = (signature, hashes, find_duplicates(self.df, subset, hashes=hashes))
+            self._duplicate_cache[key] = cached
+        return cached[1], cached[2]
+    
+    def count_duplicates(self, subset: Optional[List[str]] = None) -> int:
+        """
+        Nombre de lignes dupliquées (empreintes partagées avec remove_duplicates)
+        
+        Args:
+            subset: Colonnes à considérer (None = toutes)
+            
+        Returns:
+            Nombre de doublons
+        """
+        return int(self._get_duplicates(subset)[1].sum())
     
     def remove_duplicates(self, subset: Optional[List[str]] = None) -> int:
         """
@@ -92,12 +162,19 @@ class DataCleaner:
         Returns:
             Nombre de duplicatas supprimés
         """
-        initial_rows = len(self.df)
-        self.df = self.df.drop_duplicates(subset=subset, keep='first')
-        removed = initial_rows - len(self.df)
+        hashes, duplicated = self._get_duplicates(subset)
+        step = {'operation': 'drop_duplicates',
+                'subset': list(subset) if subset is not None else None}
+        removed = self._apply_step('remove_duplicates', step, duplicated=duplicated)
         
         if removed > 0:
             self.cleaning_log.append(f"Supprimé {removed} lignes dupliquées")
+            # Les empreintes des lignes restantes restent valides : plus aucun doublon
+            key = tuple(subset) if subset is not None else None
+            columns = list(subset) if subset is not None else self.df.columns.tolist()
+            self._duplicate_cache = {key: (self.tracker.get_signature(columns),
+                                           hashes[~duplicated],
+                                           np.zeros(len(self.df), dtype=bool))}
         
         return removed
     
@@ -113,17 +190,8 @@ class DataCleaner:
             bool: Succès de la conversion
         """
         try:
-            if target_type == 'int':
-                self.df[column] = pd.to_numeric(self.df[column], errors='coerce').astype('Int64')
-            elif target_type == 'float':
-                self.df[column] = pd.to_numeric(self.df[column], errors='coerce')
-            elif target_type == 'str':
-                self.df[column] = self.df[column].astype(str)
-            elif target_type == 'datetime':
-                self.df[column] = pd.to_datetime(self.df[column], errors='coerce')
-            elif target_type == 'category':
-                self.df[column] = self.df[column].astype('category')
-            
+            self._apply_step('convert_column_type',
+                             {'operation': 'convert', 'column': column, 'target_type': target_type})
             self.cleaning_log.append(f"Converti '{column}' en {target_type}")
             return True
             
@@ -132,15 +200,19 @@ class DataCleaner:
             return False
     
     def normalize_column_names(self) -> None:
-        """Normalise les noms de colonnes (minuscules, sans espaces)"""
+        """Normalise les noms de colonnes (texte en minuscules, sans espaces)"""
         old_names = self.df.columns.tolist()
-        self.df.columns = (
-            self.df.columns
+        new_names = (
+            self.df.columns.astype(str)
             .str.strip()
             .str.lower()
             .str.replace(' ', '_')
             .str.replace('[^a-z0-9_]', '', regex=True)
         )
+        mapping = {old: new for old, new in zip(old_names, new_names) if old != new}
+        self.df, _, _ = apply_step(self.df, {'operation': 'rename', 'mapping': mapping})
+        self.recipe.add_step({'operation': 'rename', 'mapping': mapping})
+        self.tracker.record_rename(mapping)
         self.cleaning_log.append("Noms de colonnes normalisés")
     
     def remove_outliers_iqr(self, columns: Optional[List[str]] = None, 
@@ -148,6 +220,9 @@ class DataCleaner:
         """
         Supprime les outliers selon la méthode IQR
         
+        Les bornes de chaque colonne sont calculées sur les lignes conservées
+        par les colonnes précédentes ; les lignes sont filtrées en une fois.
+        
         Args:
             columns: Colonnes numériques à traiter
             multiplier: Multiplicateur IQR (défaut: 1.5)
@@ -158,21 +233,22 @@ class DataCleaner:
         if columns is None:
             columns = self.df.select_dtypes(include=['number']).columns.tolist()
         
-        initial_rows = len(self.df)
-        
+        bounds = {}
+        mask = np.ones(len(self.df), dtype=bool)
         for col in columns:
-            Q1 = self.df[col].quantile(0.25)
-            Q3 = self.df[col].quantile(0.75)
+            values = self.df[col][mask]
+            Q1 = values.quantile(0.25)
+            Q3 = values.quantile(0.75)
             IQR = Q3 - Q1
             
             lower_bound = Q1 - multiplier * IQR
             upper_bound = Q3 + multiplier * IQR
             
-            self.df = self.df[
-                (self.df[col] >= lower_bound) & (self.df[col] <= upper_bound)
-            ]
+            bounds[col] = (lower_bound, upper_bound)
+            mask &= self.df[col].between(lower_bound, upper_bound).to_numpy(dtype=bool)
         
-        removed = initial_rows - len(self.df)
+        removed = self._apply_step('remove_outliers_iqr',
+                                   {'operation': 'filter_range', 'bounds': bounds})
         if removed > 0:
             self.cleaning_log.append(f"Supprimé {removed} outliers (méthode IQR)")
         
@@ -186,11 +262,62 @@ class DataCleaner:
         """Retourne le journal de nettoyage"""
         return self.cleaning_log
     
+    def get_recipe(self) -> CleaningRecipe:
+        """Retourne le plan des étapes appliquées (exportable en JSON)"""
+        return self.recipe
+    
+    def export_recipe(self, filepath: str) -> str:
+        """
+        Exporte les étapes appliquées sous forme de recette JSON
+        
+        Args:
+            filepath: Chemin du fichier
+            
+        Returns:
+            Chemin du fichier créé
+        """
+        return self.recipe.save(filepath)
+    
+    def apply_recipe(self, recipe: CleaningRecipe) -> None:
+        """
+        Applique une recette enregistrée (mêmes valeurs et bornes) aux données courantes
+        
+        Args:
+            recipe: Recette à rejouer
+        """
+        recipe._check_columns(self.df.columns)
+        for step in recipe.steps:
+            if step['operation'] == 'rename':
+                self.df, _, _ = apply_step(self.df, step)
+                self.recipe.add_step(step)
+                self.tracker.record_rename(step['mapping'])
+            else:
+                self._apply_step(step['operation'], step)
+            self.cleaning_log.append(f"Recette : {describe_step(step)}")
+    
+    def undo_last_step(self) -> bool:
+        """
+        Annule la dernière étape en rejouant le plan depuis les données source
+        
+        Returns:
+            bool: True si une étape a été annulée
+        """
+        step = self.recipe.pop_step()
+        if step is None:
+            return False
+        
+        self.df = self.recipe.apply(self.original_df)
+        self.cleaning_log.append(f"Étape annulée : {describe_step(step)}")
+        self.tracker.record_reset(self.df.columns)
+        return True
+    
     def reset_to_original(self) -> None:
         """Réinitialise aux données originales"""
-        self.df = self.original_df.copy()
+        self.df = self.original_df.copy(deep=False)
+        self.recipe.clear()
         self.cleaning_log = []
         self.cleaning_log.append("Données réinitialisées")
+        self.tracker.record_reset(self.df.columns)
     
     def get_data_quality_report(self) -> Dict:
         """
@@ -204,6 +331,6 @@ class DataCleaner:
             'colonnes_total': len(self.df.columns),
             'valeurs_manquantes_total': self.df.isnull().sum().sum(),
             'pourcentage_completude': (1 - self.df.isnull().sum().sum() / (len(self.df) * len(self.df.columns))) * 100,
-            'duplicatas': self.df.duplicated().sum(),
+            'duplicatas': self.count_duplicates(),
             'memoire_utilise': f"{self.df.memory_usage(deep=True).sum() / 1024 / 1024:.2f} MB"
         }
@@ -0,0 +1,134 @@
+"""
+Module de suivi des dépendances colonne par colonne
+Responsabilité: Enregistrer les colonnes/lignes modifiées par le nettoyage
+afin que les analyseurs n'invalident que les caches réellement affectés
+"""
+
+from typing import Dict, Hashable, Iterable, List, Optional, Tuple
+
+
+class DependencyTracker:
+    """
+    Suivi des versions par colonne et de la version des lignes
+
+    Chaque opération de nettoyage incrémente la version des colonnes dont les
+    valeurs changent. Si l'ensemble des lignes change (suppression), la version
+    des lignes est incrémentée : toutes les statistiques deviennent invalides.
+    Les analyseurs stockent la signature des colonnes utilisées avec chaque
+    entrée de cache et ne recalculent que si cette signature a changé.
+    """
+
+    def __init__(self, columns: Optional[Iterable[Hashable]] = None):
+        self._counter = 0
+        self.row_version = 0
+        self._column_versions: Dict[Hashable, int] = {}
+        self.change_log: List[Dict] = []
+        if columns is not None:
+            for col in columns:
+                self._column_versions[col] = 0
+
+    def _next_version(self) -> int:
+        self._counter += 1
+        return self._counter
+
+    def record_change(self, operation: str,
+                      columns: Optional[Iterable[Hashable]] = None,
+                      rows_removed: int = 0) -> None:
+        """
+        Enregistre une modification des données
+
+        Args:
+            operation: Nom de l'opération de nettoyage
+            columns: Colonnes dont les valeurs ont changé
+            rows_removed: Nombre de lignes supprimées (> 0 = toutes colonnes affectées)
+        """
+        columns = list(columns) if columns is not None else []
+        if not columns and rows_removed == 0:
+            return
+
+        version = self._next_version()
+        for col in columns:
+            self._column_versions[col] = version
+        if rows_removed > 0:
+            self.row_version = version
+
+        self.change_log.append({
+            'operation': operation,
+            'colonnes': columns,
+            'lignes_supprimees': rows_removed,
+            'version': version
+        })
+
+    def record_rename(self, mapping: Dict[Hashable, Hashable]) -> None:
+        """
+        Enregistre un renommage de colonnes (les nouveaux noms reçoivent une nouvelle version)
+
+        Args:
+            mapping: Dictionnaire ancien_nom -> nouveau_nom
+        """
+        renamed = {old: new for old, new in mapping.items() if old != new}
+        if not renamed:
+            return
+
+        version = self._next_version()
+        for old, new in renamed.items():
+            self._column_versions.pop(old, None)
+            self._column_versions[new] = version
+
+        self.change_log.append({
+            'operation': 'rename',
+            'colonnes': list(renamed.values()),
+            'lignes_supprimees': 0,
+            'version': version
+        })
+
+    def record_reset(self, columns: Iterable[Hashable]) -> None:
+        """
+        Enregistre une réinitialisation complète (toutes les colonnes et lignes changent)
+
+        Args:
+            columns: Colonnes des données réinitialisées
+        """
+        version = self._next_version()
+        self.row_version = version
+        self._column_versions = {col: version for col in columns}
+        self.change_log.append({
+            'operation': 'reset',
+            'colonnes': list(self._column_versions),
+            'lignes_supprimees': 0,
+            'version': version
+        })
+
+    def get_column_version(self, column: Hashable) -> int:
+        """Retourne la version courante d'une colonne"""
+        return self._column_versions.get(column, 0)
+
+    def get_signature(self, columns: Iterable[Hashable]) -> Tuple:
+        """
+        Signature de cache pour un ensemble de colonnes
+
+        Args:
+            columns: Colonnes dont dépend le résultat
+
+        Returns:
+            Tuple (version des lignes, versions des colonnes)
+        """
+        return (self.row_version,
+                tuple(self.get_column_version(col) for col in columns))
+
+    def get_changed_columns(self, versions: Dict[Hashable, int]) -> List[Hashable]:
+        """
+        Colonnes modifiées depuis un instantané de versions
+
+        Args:
+            versions: Instantané {colonne: version} pris lors du calcul
+
+        Returns:
+            Liste des colonnes dont la version a changé
+        """
+        return [col for col, version in versions.items()
+                if self.get_column_version(col) != version]
+
+    def snapshot(self, columns: Iterable[Hashable]) -> Dict[Hashable, int]:
+        """Retourne les versions courantes des colonnes demandées"""
+        return {col: self.get_column_version(col) for col in columns}
@@ -0,0 +1,272 @@
+"""
+Module de détection rapide des doublons
+Responsabilité: Détecter les lignes dupliquées par empreinte de ligne
+(pd.util.hash_pandas_object) avec vérification des collisions, en mémoire
+ou par chunks pour les fichiers trop volumineux
+"""
+
+from typing import Callable, Dict, Hashable, List, Optional
+
+import numpy as np
+import pandas as pd
+
+
+# Clé de la seconde empreinte (vérification des collisions entre chunks)
+SECONDARY_HASH_KEY = '9f3c1a7e5b2d4086'
+
+# Clé par défaut de pandas (pd.util.hash_pandas_object)
+DEFAULT_HASH_KEY = '0123456789123456'
+
+_INT64_BOUND = float(2 ** 63)
+
+
+def hash_rows(df: pd.DataFrame, subset: Optional[List[Hashable]] = None,
+              hash_key: Optional[str] = None) -> np.ndarray:
+    """
+    Empreinte 64 bits de chaque ligne (index ignoré)
+
+    Args:
+        df: Données
+        subset: Colonnes à considérer (None = toutes)
+        hash_key: Clé de hachage (None = clé par défaut de pandas)
+
+    Returns:
+        Tableau uint64 d'une empreinte par ligne
+    """
+    data = df if subset is None else df[list(subset)]
+    # -0.0 et 0.0 sont égaux pour DataFrame.duplicated mais pas pour le hachage
+    float_columns = data.select_dtypes(include=['floating']).columns
+    if len(float_columns):
+        data = data.copy(deep=False)
+        for col in float_columns:
+            data[col] = data[col] + 0.0
+    kwargs = {'hash_key': hash_key} if hash_key is not None else {}
+    return pd.util.hash_pandas_object(data, index=False, **kwargs).to_numpy(dtype=np.uint64)
+
+
+def _key_salt(hash_key: str) -> np.uint64:
+    """Valeur 64 bits dérivée d'une clé de hachage"""
+    return pd.util.hash_array(np.array([hash_key], dtype=object), hash_key=hash_key)[0]
+
+
+def _numeric_hashes(values: np.ndarray, salt: np.uint64) -> np.ndarray:
+    """
+    Empreinte de valeurs numériques indépendante du type lu (entier ou flottant)
+
+    Un nombre entier a la même empreinte qu'il soit lu en int64 ou en float64
+    (10 == 10.0), sans passer les entiers par float64 : deux entiers distincts
+    au-delà de 2^53 gardent des empreintes distinctes.
+
+    Args:
+        values: Tableau numérique (entiers, booléens ou flottants)
+        salt: Valeur dérivée de la clé (pandas ignore la clé pour les nombres)
+
+    Returns:
+        Tableau uint64 d'une empreinte par valeur
+    """
+    if values.dtype.kind in 'biu':
+        bits = values.astype(np.uint64 if values.dtype.kind == 'u' else np.int64).view(np.uint64)
+        return pd.util.hash_array(bits ^ salt)
+
+    floats = values.astype(np.float64) + 0.0  # -0.0 -> 0.0
+    floats[np.isnan(floats)] = np.nan  # NaN canonique
+    integral = (floats == np.floor(floats)) & (np.abs(floats) < _INT64_BOUND)
+    # Flottants non entiers : marqués pour ne pas rencontrer l'empreinte d'un entier
+    bits = floats.view(np.uint64) ^ salt ^ pd.util.hash_array(np.array([salt]))[0]
+    bits[integral] = floats[integral].astype(np.int64).view(np.uint64) ^ salt
+    return pd.util.hash_array(bits)
+
+
+def hash_rows_exact(df: pd.DataFrame, hash_key: str = DEFAULT_HASH_KEY) -> np.ndarray:
+    """
+    Empreinte 64 bits de chaque ligne, stable d'un chunk à l'autre
+
+    Les colonnes numériques sont hachées par valeur (voir _numeric_hashes) :
+    une colonne lue en entiers dans un chunk et en flottants dans le suivant
+    (valeurs manquantes) donne les mêmes empreintes. La clé s'applique à
+    toutes les colonnes, y compris numériques.
+
+    Args:
+        df: Données
+        hash_key: Clé de hachage (16 caractères)
+
+    Returns:
+        Tableau uint64 d'une empreinte par ligne
+    """
+    salt = _key_salt(hash_key)
+    # Combinaison ordonnée des colonnes, propre à la clé
+    multiplier = np.uint64(0x100000001B3) | (salt & np.uint64(0xFFFF0000))
+    combined = np.full(len(df), salt, dtype=np.uint64)
+    for col in range(df.shape[1]):
+        series = df.iloc[:, col]
+        if isinstance(series.dtype, np.dtype) and series.dtype.kind in 'biuf':
+            column_hashes = _numeric_hashes(series.to_numpy(), salt)
+        else:
+            column_hashes = pd.util.hash_pandas_object(series, index=False,
+                                                       hash_key=hash_key).to_numpy(dtype=np.uint64)
+        combined = (combined ^ column_hashes) * multiplier
+    return pd.util.hash_array(combined)
+
+
+def _rows_equal(data: pd.DataFrame, left: np.ndarray, right: np.ndarray) -> np.ndarray:
+    """Compare les lignes left[i] et right[i] colonne par colonne (NaN == NaN)"""
+    equal = np.ones(len(left), dtype=bool)
+    for col in range(data.shape[1]):
+        series = data.iloc[:, col]
+        if isinstance(series.dtype, np.dtype):
+            values = series.to_numpy()
+        else:  # Types d'extension (Int64, category...) : NA -> None
+            values = series.to_numpy(dtype=object, na_value=None)
+        a, b = values[left], values[right]
+        equal &= (a == b) | (pd.isna(a) & pd.isna(b))
+    return equal
+
+
+def find_duplicates(df: pd.DataFrame, subset: Optional[List[Hashable]] = None,
+                    hashes: Optional[np.ndarray] = None) -> np.ndarray:
+    """
+    Masque des lignes dupliquées (première occurrence conservée, comme DataFrame.duplicated)
+
+    Les lignes de même empreinte sont comparées à la première ligne de leur
+    groupe ; en cas de collision, le groupe est vérifié exactement par pandas.
+
+    Args:
+        df: Données
+        subset: Colonnes à considérer (None = toutes)
+        hashes: Empreintes déjà calculées (évite un nouveau hachage)
+
+    Returns:
+        Tableau booléen (True = doublon)
+    """
+    data = df if subset is None else df[list(subset)]
+    n_rows = len(data)
+    duplicated = np.zeros(n_rows, dtype=bool)
+    if n_rows == 0:
+        return duplicated
+    if hashes is None:
+        hashes = hash_rows(data)
+
+    codes, uniques = pd.factorize(hashes)
+    if len(uniques) == n_rows:
+        return duplicated
+
+    # Position de la première ligne de chaque empreinte
+    first_positions = np.full(len(uniques), n_rows, dtype=np.int64)
+    np.minimum.at(first_positions, codes, np.arange(n_rows))
+    reference = first_positions[codes]
+    candidates = np.flatnonzero(reference != np.arange(n_rows))
+
+    equal = _rows_equal(data, candidates, reference[candidates])
+    duplicated[candidates[equal]] = True
+
+    # Collisions d'empreinte (très rares) : vérification exacte des groupes concernés
+    collisions = candidates[~equal]
+    if len(collisions):
+        rows = np.flatnonzero(np.isin(codes, codes[collisions]))
+        duplicated[rows] = data.iloc[rows].duplicated(keep='first').to_numpy()
+
+    return duplicated
+
+
+class ChunkedDuplicateFinder:
+    """
+    Détection des doublons à travers des chunks successifs d'un même fichier
+
+    Seules les empreintes des lignes déjà vues sont conservées (deux empreintes
+    64 bits de clés différentes par ligne, colonnes numériques comprises : une
+    correspondance sur les deux vaut vérification de collision). Les empreintes sont stockées en séries triées
+    fusionnées progressivement pour garder des recherches et ajouts en O(log n).
+    """
+
+    def __init__(self, subset: Optional[List[Hashable]] = None):
+        self.subset = list(subset) if subset is not None else None
+        # Séries triées (empreinte principale, empreinte secondaire)
+        self._runs: List[tuple] = []
+        self.rows_seen = 0
+        self.duplicates_found = 0
+
+    @property
+    def unique_rows(self) -> int:
+        """Nombre de lignes distinctes vues"""
+        return sum(len(primary) for primary, _ in self._runs)
+
+    def _is_seen(self, primary: np.ndarray, secondary: np.ndarray) -> np.ndarray:
+        """Lignes dont les deux empreintes ont déjà été vues"""
+        seen = np.zeros(len(primary), dtype=bool)
+        for run_primary, run_secondary in self._runs:
+            left = np.searchsorted(run_primary, primary, side='left')
+            right = np.searchsorted(run_primary, primary, side='right')
+            found = np.flatnonzero(right > left)
+            # Cas courant : une seule entrée par empreinte principale
+            single = found[right[found] - left[found] == 1]
+            seen[single] |= run_secondary[left[single]] == secondary[single]
+            for i in found[right[found] - left[found] > 1]:
+                seen[i] |= bool(np.any(run_secondary[left[i]:right[i]] == secondary[i]))
+        return seen
+
+    def _add(self, primary: np.ndarray, secondary: np.ndarray) -> None:
+        """Ajoute des empreintes et fusionne les séries de tailles voisines"""
+        order = np.argsort(primary, kind='stable')
+        self._runs.append((primary[order], secondary[order]))
+        while len(self._runs) > 1 and len(self._runs[-2][0]) <= 2 * len(self._runs[-1][0]):
+            (p2, s2), (p1, s1) = self._runs.pop(), self._runs.pop()
+            merged_primary = np.concatenate([p1, p2])
+            merged_secondary = np.concatenate([s1, s2])
+            order = np.argsort(merged_primary, kind='stable')
+            self._runs.append((merged_primary[order], merged_secondary[order]))
+
+    def process(self, chunk: pd.DataFrame) -> np.ndarray:
+        """
+        Marque les doublons d'un chunk (dans le chunk et avec les chunks précédents)
+
+        Args:
+            chunk: Lignes suivantes du fichier
+
+        Returns:
+            Tableau booléen (True = doublon)
+        """
+        data = chunk if self.subset is None else chunk[self.subset]
+        # Un même nombre peut être lu en entier ou en flottant selon le chunk
+        primary = hash_rows_exact(data)
+        secondary = hash_rows_exact(data, hash_key=SECONDARY_HASH_KEY)
+
+        duplicated = find_duplicates(data, hashes=primary)
+        new_rows = np.flatnonzero(~duplicated)
+        duplicated[new_rows] = self._is_seen(primary[new_rows], secondary[new_rows])
+
+        first_seen = ~duplicated
+        if first_seen.any():
+            self._add(primary[first_seen], secondary[first_seen])
+
+        self.rows_seen += len(chunk)
+        self.duplicates_found += int(duplicated.sum())
+        return duplicated
+
+
+def scan_csv_duplicates(filepath: str, subset: Optional[List[Hashable]] = None,
+                        chunksize: int = 100_000, encoding: str = 'utf-8',
+                        progress_callback: Optional[Callable[[int], None]] = None) -> Dict:
+    """
+    Compte les doublons d'un fichier CSV sans le charger entièrement
+
+    Args:
+        filepath: Fichier CSV
+        subset: Colonnes à considérer (None = toutes)
+        chunksize: Nombre de lignes par chunk
+        encoding: Encodage du fichier
+        progress_callback: Appelée avec le nombre de lignes lues
+
+    Returns:
+        Dictionnaire {'lignes', 'duplicatas', 'lignes_uniques'}
+    """
+    finder = ChunkedDuplicateFinder(subset)
+    for chunk in pd.read_csv(filepath, encoding=encoding, chunksize=chunksize):
+        finder.process(chunk)
+        if progress_callback is not None:
+            progress_callback(finder.rows_seen)
+
+    return {
+        'lignes': finder.rows_seen,
+        'duplicatas': finder.duplicates_found,
+        'lignes_uniques': finder.rows_seen - finder.duplicates_found
+    }
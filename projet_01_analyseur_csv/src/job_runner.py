@@ -0,0 +1,481 @@
+"""
+Module d'exécution des analyses longues en arrière-plan
+Responsabilité: Soumettre les opérations lourdes (outliers, corrélations, rapports)
+à un pool de processus, suivre leur progression, les annuler, appliquer le
+timeout configuré et mettre en cache les résultats terminés
+"""
+
+import hashlib
+import multiprocessing
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Dict, Optional
+
+import numpy as np
+import pandas as pd
+
+import config_performance as perf_config
+
+
+# États d'une tâche
+STATUS_PENDING = 'en_attente'
+STATUS_RUNNING = 'en_cours'
+STATUS_DONE = 'termine'
+STATUS_CANCELLED = 'annule'
+STATUS_TIMEOUT = 'expire'
+STATUS_ERROR = 'erreur'
+
+ACTIVE_STATUSES = (STATUS_PENDING, STATUS_RUNNING)
+
+# Opérations rapides sur de petites données : exécutées directement (les
+# rapports, longs même sur peu de lignes, passent toujours par le pool)
+INLINE_OPERATIONS = ('outliers', 'correlation')
+
+# Délai laissé aux processus arrêtés lors du remplacement du pool (secondes)
+TERMINATE_GRACE = 1.0
+
+
+class JobCancelledError(Exception):
+    """Levée dans le processus de calcul quand la tâche est annulée"""
+
+
+class JobTimeoutError(Exception):
+    """Levée dans le processus de calcul quand MAX_OPERATION_TIME est dépassé"""
+
+
+def dataset_hash(df: pd.DataFrame) -> str:
+    """
+    Empreinte du contenu d'un DataFrame (valeurs, index, colonnes et types)
+
+    Args:
+        df: DataFrame à hacher
+
+    Returns:
+        Empreinte hexadécimale SHA-1
+    """
+    digest = hashlib.sha1()
+    digest.update(repr(list(zip(df.columns, df.dtypes.astype(str)))).encode('utf-8'))
+    if len(df) > 0:
+        row_hashes = pd.util.hash_pandas_object(df, index=True).to_numpy(dtype=np.uint64)
+        digest.update(row_hashes.tobytes())
+    return digest.hexdigest()
+
+
+def _freeze_params(params: Optional[Dict]) -> tuple:
+    """Convertit les paramètres en clé hachable (ordre indépendant)"""
+    return tuple(sorted((params or {}).items()))
+
+
+class ProgressReporter:
+    """
+    Rapporteur de progression transmis au processus de calcul
+
+    Chaque appel publie la progression et vérifie l'annulation et le délai :
+    l'opération s'interrompt proprement à la frontière de chunk suivante.
+    Le délai court à partir du début de l'exécution (start), pas de la
+    soumission : l'attente dans la file du pool n'est pas décomptée.
+    """
+
+    def __init__(self, progress: Dict, started: Dict, job_id: str, cancel_event, timeout: float):
+        self.progress = progress
+        self.started = started
+        self.job_id = job_id
+        self.cancel_event = cancel_event
+        self.timeout = timeout
+        self.deadline: Optional[float] = None
+
+    def start(self) -> None:
+        """Début de l'exécution : publie l'heure de début et fixe le délai"""
+        now = time.time()
+        self.deadline = now + self.timeout
+        self.started[self.job_id] = now
+
+    def check(self) -> None:
+        """Lève une exception si la tâche est annulée ou a expiré"""
+        if self.cancel_event.is_set():
+            raise JobCancelledError(self.job_id)
+        if self.deadline is not None and time.time() > self.deadline:
+            raise JobTimeoutError(self.job_id)
+
+    def update(self, done: int, total: int, message: str = '') -> None:
+        """
+        Publie la progression d'un chunk terminé
+
+        Args:
+            done: Nombre de chunks terminés
+            total: Nombre total de chunks
+            message: Description de l'étape en cours
+        """
+        self.progress[self.job_id] = (done, total, message)
+        self.check()
+
+
+def _run_outliers(df: pd.DataFrame, params: Dict, reporter: ProgressReporter) -> Dict:
+    """Détection d'outliers colonne par colonne"""
+    from src.anomaly_detector import AnomalyDetector
+
+    detector = AnomalyDetector(df)
+    summary = detector.detect_outliers_all_columns(
+        method=params.get('method', 'IQR'),
+        threshold=params.get('threshold', 1.5),
+        progress_callback=lambda done, total: reporter.update(done, total, 'Colonnes analysées')
+    )
+    return {'resume': summary, 'outliers_info': detector.outliers_info}
+
+
+def _run_correlation(df: pd.DataFrame, params: Dict, reporter: ProgressReporter) -> Dict:
+    """Matrice de corrélation calculée bloc par bloc"""
+    from src.correlation_analyzer import CorrelationAnalyzer
+
+    analyzer = CorrelationAnalyzer(df)
+    method = params.get('method', 'pearson')
+    matrix = analyzer.get_correlation_matrix(
+        method=method,
+        use_sample=params.get('use_sample'),
+        progress_callback=lambda done, total: reporter.update(done, total, 'Blocs calculés')
+    )
+    sample_index = analyzer.get_sample_index(method, use_sample=params.get('use_sample'))
+    return {'matrix': matrix, 'sample_index': sample_index}
+
+
+def _run_report(df: pd.DataFrame, params: Dict, reporter: ProgressReporter) -> str:
+    """Génération d'un rapport PDF, DOCX ou HTML"""
+    from src.modern_report_generator import ModernReportGenerator
+
+    params = dict(params)
+    report_format = params.pop('format')
+    reporter.update(0, 1, f'Génération du rapport {report_format.upper()}')
+    generator = ModernReportGenerator(df)
+    writers = {
+        'pdf': generator.generate_pdf_report,
+        'docx': generator.generate_docx_report,
+        'html': generator.generate_html_report,
+    }
+    filepath = writers[report_format](**params)
+    reporter.update(1, 1, 'Rapport généré')
+    return filepath
+
+
+def _run_all_reports(df: pd.DataFrame, params: Dict, reporter: ProgressReporter) -> Dict[str, str]:
+    """Génération de plusieurs formats en parallèle à partir d'un seul modèle de rapport"""
+    from src.modern_report_generator import ModernReportGenerator
+
+    reporter.update(0, 1, 'Génération des rapports')
+    filepaths = ModernReportGenerator(df).generate_all_reports(**params)
+    reporter.update(1, 1, 'Rapports générés')
+    return filepaths
+
+
+OPERATIONS = {
+    'outliers': _run_outliers,
+    'correlation': _run_correlation,
+    'report': _run_report,
+    'reports': _run_all_reports,
+}
+
+
+def _execute_job(operation: str, df: pd.DataFrame, params: Dict,
+                 reporter: ProgressReporter) -> Any:
+    """Point d'entrée exécuté dans le processus de calcul"""
+    reporter.start()
+    reporter.check()
+    return OPERATIONS[operation](df, params, reporter)
+
+
+class JobRunner:
+    """Gestionnaire de tâches en arrière-plan avec progression, annulation et cache"""
+
+    def __init__(self, max_workers: int = perf_config.MAX_WORKERS,
+                 timeout: float = perf_config.MAX_OPERATION_TIME,
+                 use_processes: bool = perf_config.ENABLE_PARALLEL_PROCESSING,
+                 max_results: int = perf_config.MAX_CACHED_JOBS,
+                 inline_max_cells: int = perf_config.INLINE_JOB_MAX_CELLS):
+        self.max_workers = max_workers
+        self.timeout = timeout
+        self.use_processes = use_processes
+        self.max_results = max_results
+        self.inline_max_cells = inline_max_cells
+        self._executor = None
+        self._manager = None
+        self._progress = None
+        # job_id -> heure de début d'exécution (publiée par le processus de calcul)
+        self._started = None
+        self._lock = threading.RLock()
+        # job_id -> informations de la tâche
+        self._jobs: Dict[str, Dict] = {}
+        # (empreinte, opération, paramètres) -> job_id
+        self._job_keys: Dict[tuple, str] = {}
+        # (empreinte, opération, paramètres) -> résultat terminé
+        self._results: Dict[tuple, Any] = {}
+        # Tâches terminées, de la moins à la plus récemment utilisée (LRU)
+        self._finished: 'OrderedDict[str, None]' = OrderedDict()
+
+    def _ensure_started(self) -> None:
+        """Démarre le pool (et le gestionnaire d'état partagé) à la première tâche"""
+        if self._executor is not None:
+            return
+        if self.use_processes:
+            self._manager = multiprocessing.Manager()
+            self._progress = self._manager.dict()
+            self._started = self._manager.dict()
+            self._executor = ProcessPoolExecutor(max_workers=self.max_workers)
+        else:
+            self._progress = {}
+            self._started = {}
+            self._executor = ThreadPoolExecutor(max_workers=self.max_workers)
+
+    def _new_event(self):
+        return self._manager.Event() if self.use_processes else threading.Event()
+
+    def submit(self, operation: str, df: pd.DataFrame, params: Optional[Dict] = None,
+               dataset_key: Optional[str] = None) -> str:
+        """
+        Soumet une opération (ou réutilise la tâche/le résultat existant)
+
+        Les petites analyses (INLINE_OPERATIONS, au plus inline_max_cells
+        cellules) sont exécutées directement : la tâche est déjà terminée au
+        retour, sans démarrer le pool ni le gestionnaire.
+
+        Args:
+            operation: 'outliers', 'correlation', 'report' ou 'reports'
+            df: Données à analyser
+            params: Paramètres de l'opération
+            dataset_key: Empreinte des données si déjà calculée
+
+        Returns:
+            Identifiant de la tâche
+        """
+        if operation not in OPERATIONS:
+            raise ValueError(f"Opération inconnue: {operation}")
+
+        params = params or {}
+        cache_key = (dataset_key or dataset_hash(df), operation, _freeze_params(params))
+
+        with self._lock:
+            job_id = self._job_keys.get(cache_key)
+            if job_id is not None:
+                job = self._jobs[job_id]
+                # Tâche terminée ou en cours : la réutiliser au lieu de recalculer
+                if cache_key in self._results or job['etat'] in ACTIVE_STATUSES:
+                    if job_id in self._finished:
+                        self._finished.move_to_end(job_id)
+                    return job_id
+                # Annulée, expirée ou en erreur : remplacée par la nouvelle tâche
+                self._forget(job_id)
+
+            job_id = uuid.uuid4().hex
+            job = {
+                'operation': operation,
+                'cle': cache_key,
+                'soumission': (operation, df, params),
+                'future': None,
+                'cancel_event': None,
+                'debut': time.time(),
+                'etat': STATUS_PENDING,
+                'erreur': None
+            }
+            self._jobs[job_id] = job
+            self._job_keys[cache_key] = job_id
+
+            if operation in INLINE_OPERATIONS and df.size <= self.inline_max_cells:
+                self._run_inline(job_id, job)
+            else:
+                self._ensure_started()
+                self._dispatch(job_id, job)
+
+        return job_id
+
+    def _run_inline(self, job_id: str, job: Dict) -> None:
+        """Exécute une petite tâche dans le thread appelant"""
+        job['cancel_event'] = threading.Event()
+        reporter = ProgressReporter({}, {}, job_id, job['cancel_event'], timeout=self.timeout)
+        future = Future()
+        try:
+            future.set_result(_execute_job(*job['soumission'], reporter))
+        except Exception as error:
+            future.set_exception(error)
+        job['future'] = future
+        self._on_done(job_id, future)
+
+    def _dispatch(self, job_id: str, job: Dict) -> None:
+        """Soumet une tâche au pool courant"""
+        if job['cancel_event'] is None:
+            job['cancel_event'] = self._new_event()
+        reporter = ProgressReporter(self._progress, self._started, job_id, job['cancel_event'],
+                                    timeout=self.timeout)
+        self._progress[job_id] = (0, 0, '')
+        future = self._executor.submit(_execute_job, *job['soumission'], reporter)
+        job['future'] = future
+        future.add_done_callback(lambda f, job_id=job_id: self._on_done(job_id, f))
+
+    def _recycle_pool(self) -> None:
+        """
+        Remplace le pool de processus pour arrêter une tâche en cours
+
+        Un processus du pool ne peut pas être arrêté seul : tous sont arrêtés,
+        puis les autres tâches actives sont resoumises au nouveau pool (elles
+        repartent du début). Appelée avec le verrou, après avoir donné son état
+        final à la tâche à interrompre.
+        """
+        old_executor = self._executor
+        processes = list((getattr(old_executor, '_processes', None) or {}).values())
+        old_executor.shutdown(wait=False, cancel_futures=True)
+        for process in processes:
+            process.terminate()
+        for process in processes:
+            process.join(TERMINATE_GRACE)
+
+        self._executor = ProcessPoolExecutor(max_workers=self.max_workers)
+        for job_id, job in self._jobs.items():
+            if job['etat'] in ACTIVE_STATUSES:
+                self._started.pop(job_id, None)
+                job['etat'] = STATUS_PENDING
+                self._dispatch(job_id, job)
+
+    def _finish(self, job_id: str, status: str, error: Optional[str] = None) -> None:
+        """Donne son état final à une tâche et applique la limite de tâches gardées"""
+        job = self._jobs[job_id]
+        job['etat'] = status
+        job['erreur'] = error
+        # Les données soumises ne servent plus (resoumission après remplacement du pool)
+        job['soumission'] = None
+        self._finished[job_id] = None
+        while len(self._finished) > self.max_results:
+            self._forget(next(iter(self._finished)))
+
+    def _forget(self, job_id: str) -> None:
+        """Oublie une tâche et son résultat"""
+        job = self._jobs.pop(job_id)
+        self._finished.pop(job_id, None)
+        if self._job_keys.get(job['cle']) == job_id:
+            del self._job_keys[job['cle']]
+            self._results.pop(job['cle'], None)
+        if self._progress is not None:
+            self._progress.pop(job_id, None)
+            self._started.pop(job_id, None)
+
+    def _on_done(self, job_id: str, future: Future) -> None:
+        """Enregistre le résultat (ou l'erreur) d'une tâche terminée"""
+        with self._lock:
+            job = self._jobs.get(job_id)
+            # Tâche oubliée, resoumise à un autre pool, ou état final déjà fixé
+            # (annulée ou expirée côté interface, même si le calcul a abouti)
+            if job is None or job['future'] is not future or job['etat'] not in ACTIVE_STATUSES:
+                return
+            if future.cancelled():
+                self._finish(job_id, STATUS_CANCELLED)
+                return
+            error = future.exception()
+            if error is None:
+                self._results[job['cle']] = future.result()
+                self._finish(job_id, STATUS_DONE)
+            elif isinstance(error, JobCancelledError):
+                self._finish(job_id, STATUS_CANCELLED)
+            elif isinstance(error, JobTimeoutError):
+                self._finish(job_id, STATUS_TIMEOUT)
+            else:
+                self._finish(job_id, STATUS_ERROR, str(error))
+
+    def _interrupt(self, job_id: str, status: str) -> None:
+        """
+        Arrête une tâche active : immédiatement si elle n'a pas commencé ou
+        tourne dans le pool de processus, au prochain chunk dans un thread
+        """
+        job = self._jobs[job_id]
+        job['cancel_event'].set()
+        running = job['future'].cancel() is False and self._started.get(job_id) is not None
+        self._finish(job_id, status)
+        if running and self.use_processes:
+            self._recycle_pool()
+
+    def cancel(self, job_id: str) -> None:
+        """
+        Annule une tâche (immédiatement en mode processus, au prochain chunk en mode threads)
+
+        Args:
+            job_id: Identifiant de la tâche
+        """
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None or job['etat'] not in ACTIVE_STATUSES:
+                return
+            self._interrupt(job_id, STATUS_CANCELLED)
+
+    def get_status(self, job_id: str) -> Dict:
+        """
+        Retourne l'état d'une tâche
+
+        Args:
+            job_id: Identifiant de la tâche
+
+        Returns:
+            Dictionnaire (etat, progression 0-1, message, duree depuis la soumission,
+            resultat, erreur)
+        """
+        with self._lock:
+            job = self._jobs[job_id]
+            now = time.time()
+            started = self._started.get(job_id) if self._started is not None else None
+
+            if job['etat'] == STATUS_PENDING and started is not None:
+                job['etat'] = STATUS_RUNNING
+            # Timeout appliqué côté interface même si le calcul n'a pas encore vérifié
+            if job['etat'] == STATUS_RUNNING and now - started > self.timeout:
+                self._interrupt(job_id, STATUS_TIMEOUT)
+
+            progress = self._progress.get(job_id) if self._progress is not None else None
+            done, total, message = progress or (0, 0, '')
+            if job['etat'] == STATUS_DONE:
+                done, total = 1, 1
+
+            return {
+                'etat': job['etat'],
+                'progression': done / total if total else 0.0,
+                'message': message,
+                'duree': now - job['debut'],
+                'resultat': self._results.get(job['cle']) if job['etat'] == STATUS_DONE else None,
+                'erreur': job['erreur']
+            }
+
+    def get_cached_result(self, operation: str, df: pd.DataFrame, params: Optional[Dict] = None,
+                          dataset_key: Optional[str] = None) -> Optional[Any]:
+        """Retourne le résultat en cache d'une opération déjà terminée (ou None)"""
+        cache_key = (dataset_key or dataset_hash(df), operation, _freeze_params(params))
+        with self._lock:
+            job_id = self._job_keys.get(cache_key)
+            if job_id in self._finished:
+                self._finished.move_to_end(job_id)
+            return self._results.get(cache_key)
+
+    def clear_cache(self) -> None:
+        """Vide le cache des résultats"""
+        with self._lock:
+            for job_id in list(self._finished):
+                self._forget(job_id)
+
+    def shutdown(self) -> None:
+        """Arrête le pool de processus (et les tâches en cours)"""
+        with self._lock:
+            for job_id, job in list(self._jobs.items()):
+                if job['etat'] in ACTIVE_STATUSES:
+                    job['cancel_event'].set()
+                    job['future'].cancel()
+                    job['etat'] = STATUS_CANCELLED
+            if self._executor is not None:
+                processes = list((getattr(self._executor, '_processes', None) or {}).values())
+                self._executor.shutdown(wait=False, cancel_futures=True)
+                for process in processes:
+                    process.terminate()
+                self._executor = None
+            if self._manager is not None:
+                self._manager.shutdown()
+                self._manager = None
+                self._progress = None
+                self._started = None
+
+
+# Instance globale (partagée entre les reruns Streamlit)
+job_runner = JobRunner()
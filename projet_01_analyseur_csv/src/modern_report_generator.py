@@ -1,10 +1,13 @@
 """
 Module de génération de rapports modernes (PDF, DOCX, PPTX)
 Responsabilité: Créer des rapports professionnels avec graphiques intégrés
+Le contenu est calculé une fois (ReportModel) puis mis en forme par format
 """
 
+import os
 import pandas as pd
 import numpy as np
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from typing import Dict, List, Optional
 import io
@@ -31,17 +34,122 @@ from pptx.util import Inches as PptxInches, Pt as PptxPt
 import plotly.graph_objects as go
 import plotly.io as pio
 
+from src.report_model import ChartEngineUnavailable, ReportModel, chart_image_cache
+from src.visualizer import Visualizer
+
 
 class ModernReportGenerator:
     """Générateur de rapports modernes avec graphiques"""
     
+    # Taille des images de graphiques (pixels)
+    CHART_WIDTH = 900
+    CHART_HEIGHT = 450
+    
     def __init__(self, df: pd.DataFrame, stats_summary: Dict = None, 
-                 correlation_data: Dict = None, outliers_data: Dict = None):
+                 correlation_data: Dict = None, outliers_data: Dict = None,
+                 dataset_key: Optional[str] = None):
         self.df = df
         self.stats_summary = stats_summary or {}
         self.correlation_data = correlation_data or {}
         self.outliers_data = outliers_data or {}
         self.timestamp = datetime.now().strftime("%Y-%m-%d_%H-%M-%S")
+        self._dataset_key = dataset_key
+        self._model: Optional[ReportModel] = None
+        self._visualizer: Optional[Visualizer] = None
+    
+    @property
+    def model(self) -> ReportModel:
+        """Contenu du rapport (calculé à la première utilisation, partagé par les formats)"""
+        if self._model is None:
+            self._model = ReportModel(self.df, dataset_key=self._dataset_key)
+        return self._model
+    
+    def _get_visualizer(self) -> Visualizer:
+        if self._visualizer is None:
+            self._visualizer = Visualizer(self.df)
+        return self._visualizer
+    
+    def _create_chart(self, spec: tuple) -> go.Figure:
+        """Construit la figure Plotly décrite par spec"""
+        kind, column, nbins = spec
+        return self._get_visualizer().create_histogram(column, nbins=nbins)
+    
+    def _get_chart_image(self, spec: tuple) -> Optional[bytes]:
+        """
+        Image PNG d'un graphique (cache partagé par empreinte des données)
+        
+        Args:
+            spec: Description du graphique (type, colonne, bins)
+            
+        Returns:
+            Image PNG ou None si le rendu statique est indisponible
+        """
+        image_spec = spec + ('png', self.CHART_WIDTH, self.CHART_HEIGHT)
+        
+        def render() -> bytes:
+            figure = self._create_chart(spec)
+            try:
+                return figure.to_image(format='png', width=self.CHART_WIDTH,
+                                       height=self.CHART_HEIGHT)
+            except (ImportError, ValueError, RuntimeError) as e:
+                # kaleido absent (ImportError/ValueError) ou sans navigateur (RuntimeError)
+                raise ChartEngineUnavailable(str(e)) from e
+        
+        return chart_image_cache.get_or_render(self.model.dataset_key, image_spec, render)
+    
+    def _get_chart_images(self) -> List[tuple]:
+        """Liste (colonne, image PNG) des graphiques disponibles"""
+        images = []
+        for spec in self.model.chart_specs:
+            image = self._get_chart_image(spec)
+            if image is not None:
+                images.append((spec[1], image))
+        return images
+    
+    def generate_all_reports(self, formats: List[str] = ('pdf', 'docx', 'html'),
+                             output_dir: str = '.', include_charts: bool = True,
+                             company_name: str = "Analyse de Données",
+                             max_workers: int = 3) -> Dict[str, str]:
+        """
+        Génère plusieurs formats en parallèle à partir du même modèle
+        
+        Le modèle et les images sont calculés une seule fois avant de lancer
+        les générateurs de chaque format en parallèle.
+        
+        Args:
+            formats: Formats à générer ('pdf', 'docx', 'html')
+            output_dir: Dossier de sortie
+            include_charts: Inclure les graphiques
+            company_name: Nom de l'entreprise/projet
+            max_workers: Nombre de formats générés simultanément
+            
+        Returns:
+            Dictionnaire {format: chemin du fichier}
+        """
+        # Contenu et images calculés une fois, avant de paralléliser la mise en forme
+        model = self.model
+        if include_charts and {'pdf', 'docx'} & set(formats):
+            self._get_chart_images()
+        if include_charts and 'html' in formats and model.chart_specs:
+            self._get_visualizer()
+        
+        writers = {
+            'pdf': lambda path: self.generate_pdf_report(path, include_charts=include_charts,
+                                                        company_name=company_name),
+            'docx': lambda path: self.generate_docx_report(path, company_name=company_name,
+                                                          include_charts=include_charts),
+            'html': lambda path: self.generate_html_report(path, include_interactive_charts=include_charts),
+        }
+        
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            futures = {
+                report_format: executor.submit(
+                    writers[report_format],
+                    os.path.join(output_dir, f"rapport_analyse_{self.timestamp}.{report_format}")
+                )
+                for report_format in formats
+            }
+            return {report_format: future.result() for report_format, future in futures.items()}
         
     def generate_pdf_report(self, filepath: str = None, 
                            include_charts: bool = True,
@@ -91,15 +199,17 @@ class ModernReportGenerator:
         story.append(Paragraph(f"Date: {datetime.now().strftime('%d/%m/%Y %H:%M')}", styles['Normal']))
         story.append(Spacer(1, 0.3*inch))
         
+        model = self.model
+        
         # Résumé Exécutif
         story.append(Paragraph("RESUME EXECUTIF", subtitle_style))
         summary_data = [
             ['Metrique', 'Valeur'],
-            ['Nombre de lignes', f"{len(self.df):,}"],
-            ['Nombre de colonnes', str(len(self.df.columns))],
-            ['Colonnes numeriques', str(len(self.df.select_dtypes(include=['number']).columns))],
-            ['Valeurs manquantes', f"{self.df.isnull().sum().sum():,}"],
-            ['Taux de completude', f"{(1 - self.df.isnull().sum().sum()/self.df.size)*100:.1f}%"],
+            ['Nombre de lignes', f"{model.summary['lignes']:,}"],
+            ['Nombre de colonnes', str(model.summary['colonnes'])],
+            ['Colonnes numeriques', str(model.summary['colonnes_numeriques'])],
+            ['Valeurs manquantes', f"{model.summary['valeurs_manquantes']:,}"],
+            ['Taux de completude', f"{model.summary['completude']:.1f}%"],
         ]
         
         # Largeur adaptative pour éviter la coupure
@@ -117,23 +227,17 @@ class ModernReportGenerator:
         story.append(t)
         story.append(Spacer(1, 0.3*inch))
         
-        # Statistiques Descriptives
-        numeric_cols = self.df.select_dtypes(include=['number']).columns[:5]  # Top 5
-        if len(numeric_cols) > 0:
+        # Statistiques Descriptives (Top 5 colonnes numériques)
+        if len(model.stats_table) > 0:
             story.append(Paragraph("STATISTIQUES DESCRIPTIVES", subtitle_style))
             
-            for col in numeric_cols:
+            for col, col_stats in model.stats_table.iterrows():
                 # Nettoyage du nom de colonne pour éviter les problèmes d'encodage
                 col_name = str(col).encode('ascii', 'ignore').decode('ascii') if isinstance(col, str) else str(col)
                 story.append(Paragraph(f"<b>Colonne: {col_name}</b>", styles['Heading3']))
                 
-                stats_data = [
-                    ['Statistique', 'Valeur'],
-                    ['Moyenne', f"{self.df[col].mean():.2f}"],
-                    ['Mediane', f"{self.df[col].median():.2f}"],
-                    ['Ecart-type', f"{self.df[col].std():.2f}"],
-                    ['Minimum', f"{self.df[col].min():.2f}"],
-                    ['Maximum', f"{self.df[col].max():.2f}"],
+                stats_data = [['Statistique', 'Valeur']] + [
+                    [stat_name, f"{value:.2f}"] for stat_name, value in col_stats.items()
                 ]
                 
                 # Largeur adaptée pour éviter la coupure
@@ -153,11 +257,21 @@ class ModernReportGenerator:
                 story.append(t)
                 story.append(Spacer(1, 0.2*inch))
         
+        # Graphiques (images mises en cache)
+        if include_charts:
+            chart_images = self._get_chart_images()
+            if chart_images:
+                story.append(PageBreak())
+                story.append(Paragraph("GRAPHIQUES", subtitle_style))
+                for col, image in chart_images:
+                    story.append(Image(io.BytesIO(image), width=6.5*inch, height=3.25*inch))
+                    story.append(Spacer(1, 0.2*inch))
+        
         # Recommandations
         story.append(PageBreak())
         story.append(Paragraph("RECOMMANDATIONS", subtitle_style))
         
-        recommendations = self._generate_recommendations()
+        recommendations = model.recommendations
         for i, rec in enumerate(recommendations, 1):
             # Nettoyer la recommandation des emojis
             clean_rec = rec.encode('ascii', 'ignore').decode('ascii')
@@ -169,13 +283,15 @@ class ModernReportGenerator:
         return filepath
     
     def generate_docx_report(self, filepath: str = None,
-                            company_name: str = "Analyse de Données") -> str:
+                            company_name: str = "Analyse de Données",
+                            include_charts: bool = True) -> str:
         """
         Génère un rapport DOCX (Word) professionnel
         
         Args:
             filepath: Chemin du fichier
             company_name: Nom de l'entreprise/projet
+            include_charts: Inclure les graphiques
             
         Returns:
             Chemin du fichier créé
@@ -211,14 +327,15 @@ class ModernReportGenerator:
             row.cells[0].width = Inches(3.5)
             row.cells[1].width = Inches(2.5)
         
+        model = self.model
         summary_data = [
             ('Metrique', 'Valeur'),
-            ('Nombre de lignes', f"{len(self.df):,}"),
-            ('Nombre de colonnes', str(len(self.df.columns))),
-            ('Colonnes numeriques', str(len(self.df.select_dtypes(include=['number']).columns))),
-            ('Valeurs manquantes', f"{self.df.isnull().sum().sum():,}"),
-            ('Taux de completude', f"{(1 - self.df.isnull().sum().sum()/self.df.size)*100:.1f}%"),
-            ('Lignes dupliquees', str(self.df.duplicated().sum())),
+            ('Nombre de lignes', f"{model.summary['lignes']:,}"),
+            ('Nombre de colonnes', str(model.summary['colonnes'])),
+            ('Colonnes numeriques', str(model.summary['colonnes_numeriques'])),
+            ('Valeurs manquantes', f"{model.summary['valeurs_manquantes']:,}"),
+            ('Taux de completude', f"{model.summary['completude']:.1f}%"),
+            ('Lignes dupliquees', str(model.summary['duplicatas'])),
         ]
         
         for i, (key, value) in enumerate(summary_data):
@@ -239,8 +356,7 @@ class ModernReportGenerator:
         # Statistiques Descriptives (sans emoji)
         doc.add_heading('STATISTIQUES DESCRIPTIVES', level=1)
         
-        numeric_cols = self.df.select_dtypes(include=['number']).columns[:5]
-        for col in numeric_cols:
+        for col, col_stats in model.stats_table.iterrows():
             # Nettoyer le nom de colonne
             col_name = str(col).encode('ascii', 'ignore').decode('ascii') if isinstance(col, str) else str(col)
             doc.add_heading(f'Colonne: {col_name}', level=2)
@@ -253,24 +369,25 @@ class ModernReportGenerator:
                 row.cells[0].width = Inches(2.5)
                 row.cells[1].width = Inches(2.5)
             
-            stats = [
-                ('Moyenne', f"{self.df[col].mean():.2f}"),
-                ('Mediane', f"{self.df[col].median():.2f}"),
-                ('Ecart-type', f"{self.df[col].std():.2f}"),
-                ('Minimum', f"{self.df[col].min():.2f}"),
-                ('Maximum', f"{self.df[col].max():.2f}"),
-            ]
-            
-            for i, (stat_name, stat_value) in enumerate(stats):
+            for i, (stat_name, value) in enumerate(col_stats.items()):
                 row = stats_table.rows[i]
                 row.cells[0].text = stat_name
-                row.cells[1].text = stat_value
+                row.cells[1].text = f"{value:.2f}"
+        
+        # Graphiques (images mises en cache)
+        if include_charts:
+            chart_images = self._get_chart_images()
+            if chart_images:
+                doc.add_page_break()
+                doc.add_heading('GRAPHIQUES', level=1)
+                for col, image in chart_images:
+                    doc.add_picture(io.BytesIO(image), width=Inches(6))
         
         # Recommandations
         doc.add_page_break()
         doc.add_heading('RECOMMANDATIONS', level=1)
         
-        recommendations = self._generate_recommendations()
+        recommendations = model.recommendations
         for i, rec in enumerate(recommendations, 1):
             # Nettoyer la recommandation des emojis
             clean_rec = rec.encode('ascii', 'ignore').decode('ascii')
@@ -281,7 +398,7 @@ class ModernReportGenerator:
         doc.add_heading('CONCLUSION', level=1)
         conclusion = doc.add_paragraph(
             f"Ce rapport a été généré automatiquement le {datetime.now().strftime('%d/%m/%Y à %H:%M')}. "
-            f"L'analyse porte sur un dataset de {len(self.df):,} lignes et {len(self.df.columns)} colonnes."
+            f"L'analyse porte sur un dataset de {model.summary['lignes']:,} lignes et {model.summary['colonnes']} colonnes."
         )
         
         # Sauvegarder
@@ -303,6 +420,8 @@ class ModernReportGenerator:
         if filepath is None:
             filepath = f"rapport_analyse_{self.timestamp}.html"
         
+        model = self.model
+        
         html_content = f"""
 <!DOCTYPE html>
 <html lang="fr">
@@ -400,19 +519,19 @@ class ModernReportGenerator:
         <h2> Résumé Exécutif</h2>
         <div style="text-align: center;">
             <div class="metric">
-                <div class="metric-value">{len(self.df):,}</div>
+                <div class="metric-value">{model.summary['lignes']:,}</div>
                 <div class="metric-label">Lignes</div>
             </div>
             <div class="metric">
-                <div class="metric-value">{len(self.df.columns)}</div>
+                <div class="metric-value">{model.summary['colonnes']}</div>
                 <div class="metric-label">Colonnes</div>
             </div>
             <div class="metric">
-                <div class="metric-value">{(1 - self.df.isnull().sum().sum()/self.df.size)*100:.1f}%</div>
+                <div class="metric-value">{model.summary['completude']:.1f}%</div>
                 <div class="metric-label">Complétude</div>
             </div>
             <div class="metric">
-                <div class="metric-value">{self.df.duplicated().sum()}</div>
+                <div class="metric-value">{model.summary['duplicatas']}</div>
                 <div class="metric-label">Duplicatas</div>
             </div>
         </div>
@@ -420,6 +539,8 @@ class ModernReportGenerator:
         <h2> Statistiques Descriptives</h2>
         {self._generate_stats_html_table()}
         
+        {self._generate_charts_html() if include_interactive_charts else ""}
+        
         <h2> Recommandations</h2>
         {self._generate_recommendations_html()}
         
@@ -439,88 +560,45 @@ class ModernReportGenerator:
     
     def _generate_stats_html_table(self) -> str:
         """Génère le HTML pour les statistiques"""
-        numeric_cols = self.df.select_dtypes(include=['number']).columns[:5]
+        stats_table = self.model.stats_table
         
-        if len(numeric_cols) == 0:
+        if len(stats_table) == 0:
             return "<p>Aucune colonne numérique à analyser.</p>"
         
         html = "<table><thead><tr><th>Colonne</th><th>Moyenne</th><th>Mediane</th><th>Ecart-type</th><th>Min</th><th>Max</th></tr></thead><tbody>"
         
-        for col in numeric_cols:
+        for col, col_stats in stats_table.iterrows():
             html += f"""
             <tr>
                 <td><strong>{col}</strong></td>
-                <td>{self.df[col].mean():.2f}</td>
-                <td>{self.df[col].median():.2f}</td>
-                <td>{self.df[col].std():.2f}</td>
-                <td>{self.df[col].min():.2f}</td>
-                <td>{self.df[col].max():.2f}</td>
+                <td>{col_stats['Moyenne']:.2f}</td>
+                <td>{col_stats['Mediane']:.2f}</td>
+                <td>{col_stats['Ecart-type']:.2f}</td>
+                <td>{col_stats['Minimum']:.2f}</td>
+                <td>{col_stats['Maximum']:.2f}</td>
             </tr>
             """
         
         html += "</tbody></table>"
         return html
     
+    def _generate_charts_html(self) -> str:
+        """Génère le HTML des graphiques interactifs (données pré-agrégées)"""
+        if not self.model.chart_specs:
+            return ""
+        
+        html = "<h2> Graphiques</h2>"
+        for spec in self.model.chart_specs:
+            html += self._create_chart(spec).to_html(full_html=False, include_plotlyjs=False)
+        return html
+    
     def _generate_recommendations(self) -> List[str]:
-        """Génère des recommandations automatiques basées sur l'analyse"""
-        recommendations = []
-        
-        # Vérifier les valeurs manquantes
-        missing_pct = (self.df.isnull().sum().sum() / self.df.size) * 100
-        if missing_pct > 5:
-            recommendations.append(
-                f"ATTENTION: Le dataset contient {missing_pct:.1f}% de valeurs manquantes. "
-                "Envisagez un nettoyage des donnees ou une imputation appropriee."
-            )
-        elif missing_pct > 0:
-            recommendations.append(
-                f"Le dataset contient {missing_pct:.1f}% de valeurs manquantes, ce qui est acceptable."
-            )
-        else:
-            recommendations.append("Excellente qualite : aucune valeur manquante detectee.")
-        
-        # Vérifier les duplicatas
-        duplicates = self.df.duplicated().sum()
-        if duplicates > 0:
-            recommendations.append(
-                f"INFO: {duplicates} lignes dupliquees detectees ({duplicates/len(self.df)*100:.1f}%). "
-                "Considerez leur suppression si non intentionnelles."
-            )
-        else:
-            recommendations.append("Aucune ligne dupliquee detectee.")
-        
-        # Analyser les colonnes numériques
-        numeric_cols = self.df.select_dtypes(include=['number']).columns
-        if len(numeric_cols) > 0:
-            recommendations.append(
-                f"STATISTIQUES: {len(numeric_cols)} colonnes numeriques disponibles pour des analyses statistiques avancees."
-            )
-            
-            # Vérifier la variance
-            for col in numeric_cols:
-                cv = (self.df[col].std() / self.df[col].mean()) * 100 if self.df[col].mean() != 0 else 0
-                if cv > 100:
-                    col_name = str(col).encode('ascii', 'ignore').decode('ascii') if isinstance(col, str) else str(col)
-                    recommendations.append(
-                        f"VARIABILITE: La colonne '{col_name}' a une forte variabilite (CV = {cv:.1f}%). "
-                        "Considerez une normalisation pour certaines analyses."
-                    )
-        
-        # Taille du dataset
-        if len(self.df) < 100:
-            recommendations.append(
-                "ATTENTION: Dataset de petite taille. Les analyses statistiques peuvent etre moins fiables."
-            )
-        elif len(self.df) > 10000:
-            recommendations.append(
-                "Dataset de grande taille excellent pour des analyses robustes."
-            )
-        
-        return recommendations
+        """Retourne les recommandations automatiques (calculées par le modèle)"""
+        return self.model.recommendations
     
     def _generate_recommendations_html(self) -> str:
         """Génère le HTML pour les recommandations"""
-        recommendations = self._generate_recommendations()
+        recommendations = self.model.recommendations
         html = ""
         
         for i, rec in enumerate(recommendations, 1):
@@ -6,15 +6,19 @@ Version 2.2
 import time
 import streamlit as st
 from functools import wraps
-from typing import Callable, Any
+from typing import Callable, Any, Dict, List
 import config_performance as perf_config
 
+from src.profiling import StageProfiler, save_results
+
 
 class PerformanceMonitor:
     """Classe pour monitorer les performances"""
     
     def __init__(self):
         self.timings = {}
+        # Historique complet des mesures (un enregistrement par appel)
+        self.history: List[Dict] = []
     
     def measure_time(self, func: Callable) -> Callable:
         """
@@ -28,13 +32,24 @@ class PerformanceMonitor:
         """
         @wraps(func)
         def wrapper(*args, **kwargs):
-            start_time = time.time()
-            result = func(*args, **kwargs)
-            elapsed_time = time.time() - start_time
+            func_name = func.__name__
+            
+            if perf_config.ENABLE_PROFILING:
+                # Profilage détaillé : pic RSS et allocations tracemalloc
+                with StageProfiler(func_name) as profiler:
+                    result = func(*args, **kwargs)
+                record = profiler.result
+                elapsed_time = record['temps_s']
+            else:
+                start_time = time.time()
+                result = func(*args, **kwargs)
+                elapsed_time = time.time() - start_time
+                record = {'etape': func_name, 'temps_s': round(elapsed_time, 4)}
             
             # Stocker le timing
-            func_name = func.__name__
             self.timings[func_name] = elapsed_time
+            record['horodatage'] = time.time()
+            self.history.append(record)
             
             # Logger si lent
             if perf_config.LOG_SLOW_OPERATIONS and elapsed_time > perf_config.SLOW_OPERATION_THRESHOLD:
@@ -51,9 +66,43 @@ class PerformanceMonitor:
         """Retourne tous les timings enregistrés"""
         return self.timings
     
+    def get_history(self) -> List[Dict]:
+        """Retourne l'historique complet des mesures"""
+        return self.history
+    
+    def get_summary(self) -> Dict[str, Dict]:
+        """
+        Agrège l'historique par fonction
+        
+        Returns:
+            Dictionnaire {fonction: {appels, total_s, moyenne_s, max_s}}
+        """
+        summary = {}
+        for record in self.history:
+            entry = summary.setdefault(record['etape'], {'appels': 0, 'total_s': 0.0, 'max_s': 0.0})
+            entry['appels'] += 1
+            entry['total_s'] += record['temps_s']
+            entry['max_s'] = max(entry['max_s'], record['temps_s'])
+        for entry in summary.values():
+            entry['moyenne_s'] = entry['total_s'] / entry['appels']
+        return summary
+    
+    def export_json(self, filepath: str) -> str:
+        """
+        Exporte l'historique et le résumé en JSON
+        
+        Args:
+            filepath: Chemin du fichier
+            
+        Returns:
+            Chemin du fichier créé
+        """
+        return save_results({'historique': self.history, 'resume': self.get_summary()}, filepath)
+    
     def reset(self):
         """Réinitialise les timings"""
         self.timings = {}
+        self.history = []
 
 
 def format_memory_size(bytes_size: int) -> str:
@@ -0,0 +1,187 @@
+"""
+Module de profilage structuré
+Responsabilité: Mesurer chaque étape (temps, pic RSS, allocations tracemalloc),
+exporter les mesures en JSON et les comparer à une référence
+"""
+
+import json
+import os
+import threading
+import time
+import tracemalloc
+from datetime import datetime
+from typing import Dict, List, Optional
+
+try:
+    import psutil
+except ImportError:  # psutil optionnel
+    psutil = None
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+
+def get_current_rss() -> int:
+    """
+    Mémoire résidente actuelle du processus (bytes)
+
+    Returns:
+        RSS courant (0 si indisponible)
+    """
+    if psutil is not None:
+        return psutil.Process(os.getpid()).memory_info().rss
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, AttributeError):
+        pass
+    if resource is not None:
+        # ru_maxrss : pic depuis le démarrage (KB sous Linux)
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+    return 0
+
+
+class StageProfiler:
+    """
+    Context manager mesurant une étape : temps, pic RSS, allocations Python
+
+    Le pic RSS est échantillonné par un thread pendant l'étape ; les allocations
+    proviennent de tracemalloc (pic et bilan net de l'étape).
+    """
+
+    SAMPLING_INTERVAL = 0.01  # Intervalle d'échantillonnage du RSS (secondes)
+
+    def __init__(self, name: str, trace_allocations: bool = True):
+        self.name = name
+        self.trace_allocations = trace_allocations
+        self.result: Dict = {}
+        self._stop = threading.Event()
+        self._peak_rss = 0
+        self._sampler: Optional[threading.Thread] = None
+        self._started_tracemalloc = False
+
+    def _sample_rss(self) -> None:
+        while not self._stop.is_set():
+            self._peak_rss = max(self._peak_rss, get_current_rss())
+            self._stop.wait(self.SAMPLING_INTERVAL)
+
+    def __enter__(self) -> 'StageProfiler':
+        if self.trace_allocations:
+            if not tracemalloc.is_tracing():
+                tracemalloc.start()
+                self._started_tracemalloc = True
+            tracemalloc.reset_peak()
+            self._alloc_start = tracemalloc.get_traced_memory()[0]
+
+        self._rss_start = get_current_rss()
+        self._peak_rss = self._rss_start
+        self._sampler = threading.Thread(target=self._sample_rss, daemon=True)
+        self._sampler.start()
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> bool:
+        elapsed = time.perf_counter() - self._start
+        self._stop.set()
+        self._sampler.join()
+        self._peak_rss = max(self._peak_rss, get_current_rss())
+
+        self.result = {
+            'etape': self.name,
+            'temps_s': round(elapsed, 4),
+            'rss_debut_mb': round(self._rss_start / 1024 / 1024, 2),
+            'rss_pic_mb': round(self._peak_rss / 1024 / 1024, 2),
+        }
+
+        if self.trace_allocations:
+            current, peak = tracemalloc.get_traced_memory()
+            self.result['allocations_pic_mb'] = round((peak - self._alloc_start) / 1024 / 1024, 2)
+            self.result['allocations_net_mb'] = round((current - self._alloc_start) / 1024 / 1024, 2)
+            if self._started_tracemalloc:
+                tracemalloc.stop()
+
+        if exc_type is not None:
+            self.result['erreur'] = str(exc_value)
+        return False
+
+
+def save_results(results: Dict, filepath: str) -> str:
+    """
+    Sauvegarde des mesures au format JSON
+
+    Args:
+        results: Mesures (dictionnaire sérialisable)
+        filepath: Chemin du fichier
+
+    Returns:
+        Chemin du fichier créé
+    """
+    with open(filepath, 'w', encoding='utf-8') as f:
+        json.dump(results, f, indent=4, ensure_ascii=False)
+    return filepath
+
+
+def load_results(filepath: str) -> Dict:
+    """Charge des mesures JSON (référence ou résultats précédents)"""
+    with open(filepath, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def compare_to_baseline(results: Dict, baseline: Dict, tolerance: float = 0.2,
+                        min_time: float = 0.05,
+                        metrics: tuple = ('temps_s', 'rss_pic_mb', 'allocations_pic_mb')) -> List[Dict]:
+    """
+    Compare des mesures à une référence et signale les régressions
+
+    Args:
+        results: Mesures courantes {'datasets': {taille: {'etapes': [...]}}}
+        baseline: Mesures de référence (même structure)
+        tolerance: Hausse relative tolérée (0.2 = +20%)
+        min_time: Durée en dessous de laquelle les écarts de temps sont ignorés (bruit)
+        metrics: Métriques comparées
+
+    Returns:
+        Liste des régressions (dataset, étape, métrique, référence, valeur, écart)
+    """
+    regressions = []
+
+    for dataset, data in results.get('datasets', {}).items():
+        baseline_stages = {
+            stage['etape']: stage
+            for stage in baseline.get('datasets', {}).get(dataset, {}).get('etapes', [])
+        }
+        for stage in data.get('etapes', []):
+            reference = baseline_stages.get(stage['etape'])
+            if reference is None:
+                continue
+            for metric in metrics:
+                if metric not in stage or metric not in reference:
+                    continue
+                ref_value, value = reference[metric], stage[metric]
+                if metric == 'temps_s' and max(ref_value, value) < min_time:
+                    continue
+                if ref_value <= 0:
+                    continue
+                change = (value - ref_value) / ref_value
+                if change > tolerance:
+                    regressions.append({
+                        'dataset': dataset,
+                        'etape': stage['etape'],
+                        'metrique': metric,
+                        'reference': ref_value,
+                        'valeur': value,
+                        'ecart_pct': round(change * 100, 1)
+                    })
+
+    return regressions
+
+
+def build_run_metadata() -> Dict:
+    """Métadonnées d'une exécution (date, machine)"""
+    return {
+        'date': datetime.now().isoformat(),
+        'cpu_count': os.cpu_count(),
+        'pid': os.getpid()
+    }
@@ -8,30 +8,69 @@ import json
 from datetime import datetime
 from typing import Dict, Optional
 
+import config_performance as perf_config
+from src.streaming_export import (COMPRESSION_EXTENSIONS, ProgressCallback,
+                                  write_csv_chunks, write_excel_chunks, write_parquet_chunks)
+
 
 class ReportGenerator:
     """Classe pour générer et exporter des rapports"""
     
-    def __init__(self, df: pd.DataFrame, analysis_results: Dict = None):
+    def __init__(self, df: pd.DataFrame, analysis_results: Dict = None,
+                 memory_budget_mb: float = None):
         self.df = df
         self.analysis_results = analysis_results or {}
         self.timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        # Budget mémoire des exports par blocs (indépendant du nombre de lignes)
+        self.memory_budget_mb = memory_budget_mb or perf_config.EXPORT_MEMORY_BUDGET_MB
     
-    def export_to_csv(self, filepath: str = None) -> str:
+    def export_to_csv(self, filepath: str = None, compression: Optional[str] = None,
+                      progress_callback: Optional[ProgressCallback] = None) -> str:
         """
-        Export les données en CSV
+        Export les données en CSV, par blocs
         
         Args:
             filepath: Chemin du fichier (optionnel)
+            compression: None, 'gzip', 'bz2', 'zip' ou 'xz' (défaut: configuration)
+            progress_callback: Appelée avec (lignes écrites, lignes totales)
             
         Returns:
             Chemin du fichier créé
         """
+        return self._write_csv(self.df, filepath, "export_donnees", compression, progress_callback)
+    
+    def _write_csv(self, df: pd.DataFrame, filepath: Optional[str], prefix: str,
+                   compression: Optional[str],
+                   progress_callback: Optional[ProgressCallback]) -> str:
+        """Écrit un CSV par blocs (nom horodaté par défaut)"""
+        compression = compression or perf_config.EXPORT_CSV_COMPRESSION
         if filepath is None:
-            filepath = f"export_donnees_{self.timestamp}.csv"
+            filepath = f"{prefix}_{self.timestamp}.csv{COMPRESSION_EXTENSIONS.get(compression, '')}"
         
-        self.df.to_csv(filepath, index=False, encoding='utf-8-sig')
-        return filepath
+        return write_csv_chunks(df, filepath, compression=compression,
+                                memory_budget_mb=self.memory_budget_mb,
+                                progress_callback=progress_callback)
+    
+    def export_to_parquet(self, filepath: str = None, compression: Optional[str] = None,
+                          progress_callback: Optional[ProgressCallback] = None) -> str:
+        """
+        Export les données en Parquet (un groupe de lignes par bloc)
+        
+        Args:
+            filepath: Chemin du fichier (optionnel)
+            compression: Codec Parquet (défaut: configuration)
+            progress_callback: Appelée avec (lignes écrites, lignes totales)
+            
+        Returns:
+            Chemin du fichier créé
+        """
+        if filepath is None:
+            filepath = f"export_donnees_{self.timestamp}.parquet"
+        
+        return write_parquet_chunks(self.df, filepath,
+                                    compression=compression or perf_config.EXPORT_PARQUET_COMPRESSION,
+                                    memory_budget_mb=self.memory_budget_mb,
+                                    progress_callback=progress_callback)
     
     def export_statistics_to_json(self, stats_dict: Dict, 
                                   filepath: str = None) -> str:
@@ -157,22 +196,22 @@ class ReportGenerator:
         return filepath
     
     def export_cleaned_data(self, cleaned_df: pd.DataFrame, 
-                          filepath: str = None) -> str:
+                          filepath: str = None, compression: Optional[str] = None,
+                          progress_callback: Optional[ProgressCallback] = None) -> str:
         """
-        Export les données nettoyées
+        Export les données nettoyées, par blocs
         
         Args:
             cleaned_df: DataFrame nettoyé
             filepath: Chemin du fichier
+            compression: None, 'gzip', 'bz2', 'zip' ou 'xz' (défaut: configuration)
+            progress_callback: Appelée avec (lignes écrites, lignes totales)
             
         Returns:
             Chemin du fichier créé
         """
-        if filepath is None:
-            filepath = f"donnees_nettoyees_{self.timestamp}.csv"
-        
-        cleaned_df.to_csv(filepath, index=False, encoding='utf-8-sig')
-        return filepath
+        return self._write_csv(cleaned_df, filepath, "donnees_nettoyees", compression,
+                               progress_callback)
     
     def generate_summary_dict(self) -> Dict:
         """
@@ -216,13 +255,19 @@ class ReportGenerator:
         return summary
     
     def create_excel_report(self, stats_df: Dict[str, pd.DataFrame], 
-                          filepath: str = None) -> str:
+                          filepath: str = None,
+                          progress_callback: Optional[ProgressCallback] = None) -> str:
         """
-        Crée un rapport Excel avec plusieurs feuilles
+        Crée un rapport Excel avec plusieurs feuilles, à mémoire constante
+        
+        Les données sont écrites ligne à ligne (xlsxwriter en mode constant_memory,
+        openpyxl en écriture seule à défaut) et se poursuivent sur d'autres
+        feuilles au-delà de la limite d'Excel.
         
         Args:
             stats_df: Dictionnaire de DataFrames (nom_feuille: DataFrame)
             filepath: Chemin du fichier
+            progress_callback: Appelée avec (lignes écrites, lignes totales)
             
         Returns:
             Chemin du fichier créé
@@ -230,12 +275,7 @@ class ReportGenerator:
         if filepath is None:
             filepath = f"rapport_complet_{self.timestamp}.xlsx"
         
-        with pd.ExcelWriter(filepath, engine='openpyxl') as writer:
-            # Feuille des données brutes
-            self.df.to_excel(writer, sheet_name='Données', index=False)
-            
-            # Feuilles additionnelles
-            for sheet_name, df in stats_df.items():
-                df.to_excel(writer, sheet_name=sheet_name, index=True)
-        
-        return filepath
+        return write_excel_chunks(self.df, filepath, sheet_name='Données',
+                                  extra_sheets=stats_df,
+                                  memory_budget_mb=self.memory_budget_mb,
+                                  progress_callback=progress_callback)
@@ -0,0 +1,214 @@
+"""
+Module du modèle de rapport
+Responsabilité: Calculer une seule fois le contenu commun des rapports
+(résumé, tableau statistique, recommandations) et mettre en cache les images
+des graphiques par (empreinte des données, description du graphique)
+"""
+
+import threading
+from collections import OrderedDict
+from datetime import datetime
+from typing import Callable, Dict, List, Optional
+
+import pandas as pd
+
+from src.duplicate_detector import find_duplicates
+
+
+class ReportModel:
+    """
+    Contenu d'un rapport, indépendant du format de sortie
+
+    Toutes les métriques sont calculées à la construction, en un passage par
+    type d'agrégat ; les générateurs PDF, DOCX et HTML ne font que la mise en forme.
+    """
+
+    MAX_STATS_COLUMNS = 5  # Colonnes détaillées dans le tableau statistique
+    MAX_CHART_COLUMNS = 3  # Colonnes illustrées par un histogramme
+    CHART_BINS = 30
+
+    def __init__(self, df: pd.DataFrame, dataset_key: Optional[str] = None):
+        self.df = df
+        self._dataset_key = dataset_key
+        self.generated_at = datetime.now()
+
+        self.numeric_columns = df.select_dtypes(include=['number']).columns.tolist()
+        missing_total = int(df.isnull().sum().sum())
+        duplicates = int(find_duplicates(df).sum())
+
+        self.summary = {
+            'lignes': len(df),
+            'colonnes': len(df.columns),
+            'colonnes_numeriques': len(self.numeric_columns),
+            'valeurs_manquantes': missing_total,
+            'completude': (1 - missing_total / df.size) * 100 if df.size else 100.0,
+            'duplicatas': duplicates,
+        }
+
+        # Un seul agrégat pour toutes les colonnes numériques
+        if self.numeric_columns:
+            aggregates = df[self.numeric_columns].agg(['mean', 'median', 'std', 'min', 'max']).T
+        else:
+            aggregates = pd.DataFrame(columns=['mean', 'median', 'std', 'min', 'max'])
+        self.stats_table = aggregates.iloc[:self.MAX_STATS_COLUMNS].rename(columns={
+            'mean': 'Moyenne', 'median': 'Mediane', 'std': 'Ecart-type',
+            'min': 'Minimum', 'max': 'Maximum'
+        })
+
+        self.recommendations = self._build_recommendations(aggregates)
+        self.chart_specs = [('histogram', col, self.CHART_BINS)
+                            for col in self.numeric_columns[:self.MAX_CHART_COLUMNS]]
+
+    @property
+    def dataset_key(self) -> str:
+        """Empreinte des données (calculée seulement si des graphiques sont rendus)"""
+        if self._dataset_key is None:
+            from src.job_runner import dataset_hash
+            self._dataset_key = dataset_hash(self.df)
+        return self._dataset_key
+
+    def _build_recommendations(self, aggregates: pd.DataFrame) -> List[str]:
+        """Génère des recommandations automatiques basées sur l'analyse"""
+        recommendations = []
+        n_rows = self.summary['lignes']
+
+        # Vérifier les valeurs manquantes
+        missing_pct = 100 - self.summary['completude']
+        if missing_pct > 5:
+            recommendations.append(
+                f"ATTENTION: Le dataset contient {missing_pct:.1f}% de valeurs manquantes. "
+                "Envisagez un nettoyage des donnees ou une imputation appropriee."
+            )
+        elif missing_pct > 0:
+            recommendations.append(
+                f"Le dataset contient {missing_pct:.1f}% de valeurs manquantes, ce qui est acceptable."
+            )
+        else:
+            recommendations.append("Excellente qualite : aucune valeur manquante detectee.")
+
+        # Vérifier les duplicatas
+        duplicates = self.summary['duplicatas']
+        if duplicates > 0:
+            recommendations.append(
+                f"INFO: {duplicates} lignes dupliquees detectees ({duplicates/n_rows*100:.1f}%). "
+                "Considerez leur suppression si non intentionnelles."
+            )
+        else:
+            recommendations.append("Aucune ligne dupliquee detectee.")
+
+        # Analyser les colonnes numériques
+        if self.numeric_columns:
+            recommendations.append(
+                f"STATISTIQUES: {len(self.numeric_columns)} colonnes numeriques disponibles pour des analyses statistiques avancees."
+            )
+
+            # Vérifier la variance (coefficient de variation calculé sur l'agrégat)
+            means, stds = aggregates['mean'], aggregates['std']
+            cv = (stds / means.where(means != 0)) * 100
+            for col in cv.index[cv > 100]:
+                col_name = str(col).encode('ascii', 'ignore').decode('ascii') if isinstance(col, str) else str(col)
+                recommendations.append(
+                    f"VARIABILITE: La colonne '{col_name}' a une forte variabilite (CV = {cv[col]:.1f}%). "
+                    "Considerez une normalisation pour certaines analyses."
+                )
+
+        # Taille du dataset
+        if n_rows < 100:
+            recommendations.append(
+                "ATTENTION: Dataset de petite taille. Les analyses statistiques peuvent etre moins fiables."
+            )
+        elif n_rows > 10000:
+            recommendations.append(
+                "Dataset de grande taille excellent pour des analyses robustes."
+            )
+
+        return recommendations
+
+
+class ChartEngineUnavailable(Exception):
+    """Moteur de rendu statique (kaleido) absent ou inutilisable"""
+
+
+class ChartImageCache:
+    """
+    Cache LRU des images de graphiques, partagé entre rapports et formats
+
+    Clé : (empreinte des données, description du graphique). Si le moteur de
+    rendu est indisponible (ChartEngineUnavailable), l'échec est mémorisé pour
+    ne pas le retenter à chaque graphique ; l'échec d'un seul graphique ne fait
+    qu'ignorer ce graphique.
+
+    Le cache vit dans le processus qui génère les rapports : avec JobRunner
+    (ProcessPoolExecutor), chaque worker a le sien, conservé tant qu'il vit.
+    """
+
+    def __init__(self, max_entries: int = 64):
+        self.max_entries = max_entries
+        self._images: 'OrderedDict[tuple, bytes]' = OrderedDict()
+        self._lock = threading.Lock()
+        # Verrou par clé : un graphique demandé par plusieurs formats n'est rendu qu'une fois
+        self._key_locks: Dict[tuple, threading.Lock] = {}
+        self.available = True
+        self.hits = 0
+        self.misses = 0
+
+    def get_or_render(self, dataset_key: str, spec: tuple,
+                      render: Callable[[], bytes]) -> Optional[bytes]:
+        """
+        Retourne l'image en cache ou la rend et la met en cache
+
+        Args:
+            dataset_key: Empreinte des données
+            spec: Description hachable du graphique
+            render: Fonction de rendu retournant l'image (bytes), lève
+                ChartEngineUnavailable si le moteur de rendu manque
+
+        Returns:
+            Image (bytes) ou None si le rendu est indisponible ou a échoué
+        """
+        key = (dataset_key, spec)
+        with self._lock:
+            if key in self._images:
+                self._images.move_to_end(key)
+                self.hits += 1
+                return self._images[key]
+            if not self.available:
+                return None
+            key_lock = self._key_locks.setdefault(key, threading.Lock())
+
+        with key_lock:
+            with self._lock:
+                if key in self._images:
+                    self.hits += 1
+                    return self._images[key]
+                if not self.available:
+                    return None
+            try:
+                image = render()
+            except ChartEngineUnavailable:
+                # Moteur de rendu absent ou mal configuré : graphiques ignorés
+                self.available = False
+                return None
+            except Exception:
+                # Échec propre à ce graphique : les suivants sont tentés
+                with self._lock:
+                    self._key_locks.pop(key, None)
+                return None
+
+            with self._lock:
+                self.misses += 1
+                self._images[key] = image
+                self._key_locks.pop(key, None)
+                while len(self._images) > self.max_entries:
+                    self._images.popitem(last=False)
+            return image
+
+    def clear(self) -> None:
+        """Vide le cache et réautorise le rendu"""
+        with self._lock:
+            self._images.clear()
+            self.available = True
+
+
+# Instance du processus (partagée entre générateurs et reruns Streamlit)
+chart_image_cache = ChartImageCache()
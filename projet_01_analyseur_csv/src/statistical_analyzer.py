@@ -10,16 +10,54 @@ from scipy import stats
 from typing import Dict, List, Optional
 from functools import lru_cache
 
+from src.data_cleaner import DataCleaner
+from src.dependency_tracker import DependencyTracker
+from src.duplicate_detector import find_duplicates
+
 
 class StatisticalAnalyzer:
     """Classe pour effectuer l'analyse statistique descriptive (Version Optimisée)"""
     
-    def __init__(self, df: pd.DataFrame):
+    def __init__(self, df: pd.DataFrame, tracker: Optional[DependencyTracker] = None,
+                 cleaner: Optional[DataCleaner] = None):
         self.df = df
         self.numeric_columns = df.select_dtypes(include=['number']).columns.tolist()
-        # Cache pour éviter recalculs
+        # Nettoyeur produisant df : ses empreintes de lignes servent au comptage des doublons
+        self.cleaner = cleaner
+        # Suivi des modifications (None = cache jamais invalidé)
+        self.tracker = tracker if tracker is not None or cleaner is None else cleaner.tracker
+        # Cache pour éviter recalculs : clé -> (signature, valeur)
         self._stats_cache = {}
     
+    def update_data(self, df: pd.DataFrame) -> None:
+        """
+        Remplace les données en conservant les entrées de cache encore valides
+        
+        Args:
+            df: Nouvelles données (après nettoyage)
+        """
+        self.df = df
+        self.numeric_columns = df.select_dtypes(include=['number']).columns.tolist()
+        if self.tracker is None:
+            self._stats_cache = {}
+    
+    def _signature(self, columns: List[str]) -> tuple:
+        """Signature de cache des colonnes utilisées"""
+        if self.tracker is None:
+            return None
+        return self.tracker.get_signature(columns)
+    
+    def _get_cached(self, key: str, columns: List[str]):
+        """Retourne la valeur en cache si ses colonnes n'ont pas changé"""
+        entry = self._stats_cache.get(key)
+        if entry is not None and entry[0] == self._signature(columns):
+            return entry[1]
+        return None
+    
+    def _set_cached(self, key: str, columns: List[str], value) -> None:
+        """Met une valeur en cache avec la signature de ses colonnes"""
+        self._stats_cache[key] = (self._signature(columns), value)
+    
     def get_basic_statistics(self, column: Optional[str] = None) -> pd.DataFrame:
         """
         Calcule les statistiques de base (OPTIMISÉ - un seul passage)
@@ -30,13 +68,18 @@ class StatisticalAnalyzer:
         Returns:
             DataFrame avec les statistiques
         """
-        if column:
-            data = self.df[[column]]
-        else:
-            data = self.df[self.numeric_columns]
+        columns = [column] if column else self.numeric_columns
         
-        # Utiliser describe() qui est optimisé en C - UN SEUL PASSAGE
-        desc = data.describe()
+        # Ne recalculer describe() que pour les colonnes modifiées
+        cached = {col: self._get_cached(f"describe_{col}", [col]) for col in columns}
+        stale = [col for col, value in cached.items() if value is None]
+        if stale:
+            # Utiliser describe() qui est optimisé en C - UN SEUL PASSAGE
+            fresh = self.df[stale].describe()
+            for col in stale:
+                cached[col] = fresh[col]
+                self._set_cached(f"describe_{col}", [col], fresh[col])
+        desc = pd.DataFrame({col: cached[col] for col in columns})
         
         # Calculer les stats supplémentaires en un passage
         q1 = desc.loc['25%']
@@ -74,8 +117,9 @@ class StatisticalAnalyzer:
         """
         # Vérifier le cache
         cache_key = f"advanced_{column}"
-        if cache_key in self._stats_cache:
-            return self._stats_cache[cache_key]
+        cached = self._get_cached(cache_key, [column])
+        if cached is not None:
+            return cached
         
         data = self.df[column].dropna()
         
@@ -95,7 +139,7 @@ class StatisticalAnalyzer:
         }
         
         # Mettre en cache
-        self._stats_cache[cache_key] = result
+        self._set_cached(cache_key, [column], result)
         return result
     
     def get_distribution_analysis(self, column: str) -> Dict:
@@ -227,6 +271,18 @@ class StatisticalAnalyzer:
             ('Compte', 'count')
         ]).round(2)
     
+    def _count_duplicates(self) -> int:
+        """Nombre de lignes dupliquées (empreintes du nettoyeur si df en provient)"""
+        if self.cleaner is not None and self.cleaner.get_cleaned_data() is self.df:
+            return self.cleaner.count_duplicates()
+        
+        columns = self.df.columns.tolist()
+        count = self._get_cached('duplicatas', columns)
+        if count is None:
+            count = int(find_duplicates(self.df).sum())
+            self._set_cached('duplicatas', columns, count)
+        return count
+    
     def get_complete_summary(self) -> Dict:
         """
         Résumé complet de toutes les analyses
@@ -245,7 +301,7 @@ class StatisticalAnalyzer:
                 'valeurs_totales': self.df.size,
                 'valeurs_manquantes': self.df.isnull().sum().sum(),
                 'pourcentage_completude': ((1 - self.df.isnull().sum().sum() / self.df.size) * 100).round(2),
-                'duplicatas': self.df.duplicated().sum()
+                'duplicatas': self._count_duplicates()
             },
             'memoire': f"{self.df.memory_usage(deep=True).sum() / 1024 / 1024:.2f} MB"
         }
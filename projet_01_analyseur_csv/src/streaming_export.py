@@ -0,0 +1,297 @@
+"""
+Module d'export en flux
+Responsabilité: Écrire un DataFrame en CSV (compressé ou non), Excel et Parquet
+par blocs de lignes dont la taille découle d'un budget mémoire fixe, avec
+suivi de la progression
+"""
+
+import bz2
+import gzip
+import io
+import lzma
+import os
+import zipfile
+from typing import Callable, Dict, Hashable, Iterator, Optional
+
+import pandas as pd
+
+try:
+    import xlsxwriter
+except ImportError:  # xlsxwriter optionnel (repli sur openpyxl en écriture seule)
+    xlsxwriter = None
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # pyarrow optionnel (export Parquet indisponible)
+    pa = None
+    pq = None
+
+
+DEFAULT_MEMORY_BUDGET_MB = 64
+MIN_CHUNK_ROWS = 1_000
+MAX_CHUNK_ROWS = 500_000
+EXCEL_MAX_ROWS = 1_048_576  # Limite d'une feuille Excel (en-tête compris)
+CSV_COMPRESSIONS = ('gzip', 'bz2', 'zip', 'xz')
+COMPRESSION_EXTENSIONS = {'gzip': '.gz', 'bz2': '.bz2', 'zip': '.zip', 'xz': '.xz'}
+
+ProgressCallback = Callable[[int, int], None]
+
+
+def estimate_row_bytes(df: pd.DataFrame, sample_rows: int = 1_000) -> float:
+    """
+    Taille mémoire moyenne d'une ligne, mesurée sur un échantillon
+
+    Args:
+        df: Données
+        sample_rows: Nombre de lignes mesurées (les chaînes sont comptées en profondeur)
+
+    Returns:
+        Nombre d'octets par ligne
+    """
+    if len(df) == 0:
+        return 1.0
+    sample = df.iloc[:sample_rows]
+    return max(sample.memory_usage(index=False, deep=True).sum() / len(sample), 1.0)
+
+
+def chunk_rows_for_budget(df: pd.DataFrame,
+                          memory_budget_mb: float = DEFAULT_MEMORY_BUDGET_MB,
+                          overhead: float = 4.0) -> int:
+    """
+    Nombre de lignes par bloc pour rester dans un budget mémoire
+
+    Args:
+        df: Données à exporter
+        memory_budget_mb: Mémoire allouable à un bloc en cours d'écriture (MB)
+        overhead: Facteur de conversion (objets Python, texte formaté, tampons)
+
+    Returns:
+        Nombre de lignes par bloc
+    """
+    rows = int(memory_budget_mb * 1024 * 1024 / (estimate_row_bytes(df) * overhead))
+    return min(max(rows, MIN_CHUNK_ROWS), MAX_CHUNK_ROWS)
+
+
+def iter_chunks(df: pd.DataFrame, chunk_rows: int) -> Iterator[pd.DataFrame]:
+    """Parcourt le DataFrame par tranches de lignes (vues, sans copie)"""
+    for start in range(0, len(df), chunk_rows):
+        yield df.iloc[start:start + chunk_rows]
+
+
+def _python_rows(chunk: pd.DataFrame, index: bool = False) -> Iterator[tuple]:
+    """Lignes d'un bloc en objets Python, valeurs manquantes -> None"""
+    values = chunk.astype(object)
+    values = values.where(chunk.notna(), None)
+    return values.itertuples(index=index, name=None)
+
+
+def _open_compressed(filepath: str, compression: Optional[str], encoding: str):
+    """
+    Ouvre un flux texte (éventuellement compressé) pour l'écriture
+
+    Returns:
+        Tuple (flux texte, liste des flux à fermer ensuite)
+    """
+    if compression is None:
+        handle = open(filepath, 'w', encoding=encoding, newline='')
+        return handle, []
+    if compression == 'gzip':
+        raw = gzip.open(filepath, 'wb')
+        closers = [raw]
+    elif compression == 'bz2':
+        raw = bz2.open(filepath, 'wb')
+        closers = [raw]
+    elif compression == 'xz':
+        raw = lzma.open(filepath, 'wb')
+        closers = [raw]
+    elif compression == 'zip':
+        archive = zipfile.ZipFile(filepath, 'w', compression=zipfile.ZIP_DEFLATED)
+        member = os.path.basename(filepath)
+        if member.endswith('.zip'):
+            member = member[:-4]
+        raw = archive.open(member if member.endswith('.csv') else f"{member}.csv", 'w',
+                           force_zip64=True)
+        closers = [raw, archive]
+    else:
+        raise ValueError(f"Compression inconnue: {compression} (attendu: {', '.join(CSV_COMPRESSIONS)})")
+    return io.TextIOWrapper(raw, encoding=encoding, newline=''), closers
+
+
+def write_csv_chunks(df: pd.DataFrame, filepath: str, compression: Optional[str] = None,
+                     chunk_rows: Optional[int] = None, encoding: str = 'utf-8-sig',
+                     memory_budget_mb: float = DEFAULT_MEMORY_BUDGET_MB,
+                     progress_callback: Optional[ProgressCallback] = None) -> str:
+    """
+    Écrit un DataFrame en CSV bloc par bloc
+
+    Args:
+        df: Données
+        filepath: Fichier de sortie
+        compression: None, 'gzip', 'bz2', 'zip' ou 'xz'
+        chunk_rows: Lignes par bloc (None = déduit du budget mémoire)
+        encoding: Encodage (utf-8-sig par défaut pour Excel)
+        memory_budget_mb: Budget mémoire d'un bloc (MB)
+        progress_callback: Appelée avec (lignes écrites, lignes totales)
+
+    Returns:
+        Chemin du fichier créé
+    """
+    chunk_rows = chunk_rows or chunk_rows_for_budget(df, memory_budget_mb)
+    total = len(df)
+    handle, closers = _open_compressed(filepath, compression, encoding)
+    try:
+        if total == 0:
+            df.to_csv(handle, index=False)
+        written = 0
+        for chunk in iter_chunks(df, chunk_rows):
+            chunk.to_csv(handle, header=written == 0, index=False)
+            written += len(chunk)
+            if progress_callback is not None:
+                progress_callback(written, total)
+    finally:
+        handle.close()
+        for closer in closers:
+            closer.close()
+    return filepath
+
+
+class _ExcelSheetWriter:
+    """Écriture ligne à ligne dans un classeur (xlsxwriter ou openpyxl)"""
+
+    def __init__(self, filepath: str):
+        if xlsxwriter is not None:
+            # constant_memory : chaque ligne est vidée sur disque dès la suivante
+            self.workbook = xlsxwriter.Workbook(filepath, {
+                'constant_memory': True,
+                'remove_timezone': True,
+                'nan_inf_to_errors': True,
+                'default_date_format': 'yyyy-mm-dd hh:mm:ss',
+            })
+            self.engine = 'xlsxwriter'
+        else:
+            from openpyxl import Workbook
+            self.workbook = Workbook(write_only=True)
+            self.engine = 'openpyxl'
+        self.filepath = filepath
+        self._sheet = None
+        self.row = 0
+
+    def add_sheet(self, name: str) -> None:
+        """Crée une feuille (les lignes suivantes y sont écrites)"""
+        name = str(name)[:31]
+        if self.engine == 'xlsxwriter':
+            self._sheet = self.workbook.add_worksheet(name)
+        else:
+            self._sheet = self.workbook.create_sheet(name)
+        self.row = 0
+
+    def write_row(self, values) -> None:
+        """Ajoute une ligne à la feuille courante"""
+        if self.engine == 'xlsxwriter':
+            self._sheet.write_row(self.row, 0, values)
+        else:
+            self._sheet.append([value.tz_localize(None) if isinstance(value, pd.Timestamp)
+                                and value.tzinfo is not None else value for value in values])
+        self.row += 1
+
+    def close(self) -> None:
+        """Finalise le classeur"""
+        if self.engine == 'xlsxwriter':
+            self.workbook.close()
+        else:
+            self.workbook.save(self.filepath)
+
+
+def write_excel_chunks(df: pd.DataFrame, filepath: str, sheet_name: str = 'Données',
+                       extra_sheets: Optional[Dict[Hashable, pd.DataFrame]] = None,
+                       chunk_rows: Optional[int] = None,
+                       memory_budget_mb: float = DEFAULT_MEMORY_BUDGET_MB,
+                       progress_callback: Optional[ProgressCallback] = None) -> str:
+    """
+    Écrit un classeur Excel ligne à ligne, à mémoire constante
+
+    Au-delà de la limite d'une feuille Excel, les données se poursuivent dans
+    des feuilles suivantes ("Données (2)", ...). Les feuilles additionnelles
+    (statistiques, de petite taille) sont écrites avec leur index.
+
+    Args:
+        df: Données principales
+        filepath: Fichier .xlsx de sortie
+        sheet_name: Nom de la feuille des données
+        extra_sheets: Feuilles additionnelles {nom: DataFrame}
+        chunk_rows: Lignes converties à la fois (None = déduit du budget mémoire)
+        memory_budget_mb: Budget mémoire d'un bloc (MB)
+        progress_callback: Appelée avec (lignes écrites, lignes totales)
+
+    Returns:
+        Chemin du fichier créé
+    """
+    chunk_rows = chunk_rows or chunk_rows_for_budget(df, memory_budget_mb)
+    rows_per_sheet = EXCEL_MAX_ROWS - 1
+    header = [str(col) for col in df.columns]
+    total = len(df)
+    writer = _ExcelSheetWriter(filepath)
+    try:
+        written = 0
+        sheet_number = 1
+        writer.add_sheet(sheet_name)
+        writer.write_row(header)
+        for chunk in iter_chunks(df, chunk_rows):
+            for row in _python_rows(chunk):
+                if writer.row > rows_per_sheet:
+                    sheet_number += 1
+                    writer.add_sheet(f"{sheet_name} ({sheet_number})")
+                    writer.write_row(header)
+                writer.write_row(row)
+            written += len(chunk)
+            if progress_callback is not None:
+                progress_callback(written, total)
+
+        for name, extra in (extra_sheets or {}).items():
+            writer.add_sheet(name)
+            index_name = extra.index.name if extra.index.name is not None else ''
+            writer.write_row([str(index_name)] + [str(col) for col in extra.columns])
+            for row in _python_rows(extra, index=True):
+                writer.write_row((str(row[0]),) + row[1:])
+    finally:
+        writer.close()
+    return filepath
+
+
+def write_parquet_chunks(df: pd.DataFrame, filepath: str, compression: str = 'snappy',
+                         chunk_rows: Optional[int] = None,
+                         memory_budget_mb: float = DEFAULT_MEMORY_BUDGET_MB,
+                         progress_callback: Optional[ProgressCallback] = None) -> str:
+    """
+    Écrit un DataFrame en Parquet, un groupe de lignes par bloc
+
+    Args:
+        df: Données
+        filepath: Fichier .parquet de sortie
+        compression: Codec Parquet ('snappy', 'gzip', 'zstd', 'none'...)
+        chunk_rows: Lignes par groupe (None = déduit du budget mémoire)
+        memory_budget_mb: Budget mémoire d'un bloc (MB)
+        progress_callback: Appelée avec (lignes écrites, lignes totales)
+
+    Returns:
+        Chemin du fichier créé
+    """
+    if pq is None:
+        raise ImportError("L'export Parquet nécessite pyarrow (pip install pyarrow)")
+
+    chunk_rows = chunk_rows or chunk_rows_for_budget(df, memory_budget_mb)
+    # Schéma commun à tous les blocs (un bloc sans valeur ne doit pas changer les types)
+    data = df.rename(columns=str) if not all(isinstance(col, str) for col in df.columns) else df
+    schema = pa.Schema.from_pandas(data, preserve_index=False)
+    total = len(data)
+    written = 0
+    with pq.ParquetWriter(filepath, schema, compression=compression) as writer:
+        if total == 0:
+            writer.write_table(pa.Table.from_pandas(data, schema=schema, preserve_index=False))
+        for chunk in iter_chunks(data, chunk_rows):
+            writer.write_table(pa.Table.from_pandas(chunk, schema=schema, preserve_index=False))
+            written += len(chunk)
+            if progress_callback is not None:
+                progress_callback(written, total)
+    return filepath
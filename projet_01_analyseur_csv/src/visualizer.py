@@ -1,7 +1,7 @@
 """
 Module de visualisation avec Plotly
 Responsabilité: Créer tous les graphiques interactifs
-Version 2.2 - Optimisée avec échantillonnage et cache
+Version 2.3 - Histogrammes et box plots pré-agrégés sur la colonne complète
 """
 
 import pandas as pd
@@ -9,41 +9,263 @@ import numpy as np
 import plotly.express as px
 import plotly.graph_objects as go
 from plotly.subplots import make_subplots
-from typing import List, Optional
+from typing import Dict, List, Optional
+
+from src.dependency_tracker import DependencyTracker
 
 
 class Visualizer:
     """Classe pour créer des visualisations interactives avec Plotly (Version Optimisée)"""
     
     # Constantes d'optimisation
-    SAMPLE_THRESHOLD = 50_000  # Si > 50K lignes, échantillonner
-    SAMPLE_SIZE = 10_000  # Taille de l'échantillon pour visualisations
     MAX_BINS = 50  # Nombre maximum de bins pour histogrammes
+    MAX_OUTLIER_POINTS = 500  # Outliers affichés par box plot (les plus extrêmes)
+    DENSITY_GRID_SIZE = 256  # Points de la grille d'estimation de densité (violin)
     
-    def __init__(self, df: pd.DataFrame, theme: str = 'plotly_white'):
+    def __init__(self, df: pd.DataFrame, theme: str = 'plotly_white',
+                 tracker: Optional[DependencyTracker] = None):
         self.df = df
         self.theme = theme
         self.color_palette = px.colors.qualitative.Set2
-        # Cache pour stats déjà calculées
+        # Suivi des modifications (None = cache jamais invalidé)
+        self.tracker = tracker
+        # Cache des résumés (stats, histogrammes, boîtes) : clé -> (signature, valeur)
         self._stats_cache = {}
     
-    def _get_sample(self, df: pd.DataFrame) -> pd.DataFrame:
-        """Échantillonne les données si trop volumineuses"""
-        if len(df) > self.SAMPLE_THRESHOLD:
-            return df.sample(n=self.SAMPLE_SIZE, random_state=42)
-        return df
+    def update_data(self, df: pd.DataFrame) -> None:
+        """
+        Remplace les données en conservant les résumés encore valides
+        
+        Args:
+            df: Nouvelles données (après nettoyage)
+        """
+        self.df = df
+        if self.tracker is None:
+            self._stats_cache = {}
+    
+    def _signature(self, columns: List[str]) -> tuple:
+        """Signature de cache des colonnes utilisées"""
+        if self.tracker is None:
+            return None
+        return self.tracker.get_signature(columns)
+    
+    def _get_cached(self, key: tuple, columns: List[str]):
+        """Retourne le résumé en cache si ses colonnes n'ont pas changé"""
+        entry = self._stats_cache.get(key)
+        if entry is not None and entry[0] == self._signature(columns):
+            return entry[1]
+        return None
+    
+    def _set_cached(self, key: tuple, columns: List[str], value) -> None:
+        """Met un résumé en cache avec la signature de ses colonnes"""
+        self._stats_cache[key] = (self._signature(columns), value)
+    
+    def _get_values(self, column: str) -> np.ndarray:
+        """Valeurs finies d'une colonne numérique (colonne complète)"""
+        values = self.df[column].to_numpy(dtype=np.float64, na_value=np.nan)
+        return values[np.isfinite(values)]
     
     def _get_cached_stats(self, column: str) -> tuple:
-        """Récupère ou calcule mean/std (avec cache)"""
-        if column not in self._stats_cache:
+        """Récupère ou calcule mean/std/min/max (avec cache)"""
+        stats = self._get_cached(('stats', column), [column])
+        if stats is None:
             data = self.df[column].dropna()
-            self._stats_cache[column] = (data.mean(), data.std(), data.min(), data.max())
-        return self._stats_cache[column]
+            stats = (data.mean(), data.std(), data.min(), data.max())
+            self._set_cached(('stats', column), [column], stats)
+        return stats
+    
+    def get_histogram_data(self, column: str, nbins: int = 30) -> Dict:
+        """
+        Histogramme exact de la colonne complète (np.histogram)
+        
+        Args:
+            column: Nom de la colonne
+            nbins: Nombre de bins
+            
+        Returns:
+            Dictionnaire {'counts', 'edges', 'n'}
+        """
+        key = ('histogram', column, nbins)
+        histogram = self._get_cached(key, [column])
+        if histogram is None:
+            values = self._get_values(column)
+            if len(values) == 0:
+                counts, edges = np.zeros(0, dtype=np.int64), np.zeros(1)
+            else:
+                counts, edges = np.histogram(values, bins=nbins)
+            histogram = {'counts': counts, 'edges': edges, 'n': len(values)}
+            self._set_cached(key, [column], histogram)
+        return histogram
+    
+    @classmethod
+    def _compute_box_stats(cls, values: np.ndarray) -> Dict:
+        """
+        Statistiques exactes d'une boîte à moustaches (règle 1.5 × IQR)
+        
+        Args:
+            values: Valeurs finies
+            
+        Returns:
+            Dictionnaire (quartiles, moustaches, moyenne, écart-type, outliers plafonnés)
+        """
+        if len(values) == 0:
+            return None
+        
+        q1, median, q3 = np.percentile(values, [25, 50, 75])
+        iqr = q3 - q1
+        low_limit, high_limit = q1 - 1.5 * iqr, q3 + 1.5 * iqr
+        inside = values[(values >= low_limit) & (values <= high_limit)]
+        outliers = values[(values < low_limit) | (values > high_limit)]
+        
+        # Ne garder que les outliers les plus extrêmes pour borner la taille du graphique
+        if len(outliers) > cls.MAX_OUTLIER_POINTS:
+            distance = np.abs(outliers - median)
+            keep = np.argpartition(distance, -cls.MAX_OUTLIER_POINTS)[-cls.MAX_OUTLIER_POINTS:]
+            outliers = outliers[keep]
+        
+        return {
+            'q1': q1,
+            'median': median,
+            'q3': q3,
+            'lowerfence': inside.min() if len(inside) else q1,
+            'upperfence': inside.max() if len(inside) else q3,
+            'mean': values.mean(),
+            'sd': values.std(ddof=1) if len(values) > 1 else 0.0,
+            'outliers': np.sort(outliers),
+            'n_outliers': int(((values < low_limit) | (values > high_limit)).sum()),
+            'n': len(values)
+        }
+    
+    def get_box_stats(self, column: str) -> Optional[Dict]:
+        """
+        Statistiques de boîte à moustaches de la colonne complète (avec cache)
+        
+        Args:
+            column: Nom de la colonne
+            
+        Returns:
+            Dictionnaire des statistiques (None si aucune valeur)
+        """
+        key = ('box', column)
+        stats = self._get_cached(key, [column])
+        if stats is None:
+            stats = self._compute_box_stats(self._get_values(column))
+            self._set_cached(key, [column], stats)
+        return stats
+    
+    @classmethod
+    def _compute_density(cls, values: np.ndarray) -> Optional[Dict]:
+        """
+        Estimation de densité par noyau gaussien sur grille (histogramme fin lissé)
+        
+        Args:
+            values: Valeurs finies
+            
+        Returns:
+            Dictionnaire {'grid', 'density'} (None si moins de 2 valeurs)
+        """
+        if len(values) < 2:
+            return None
+        
+        # Largeur de bande de Silverman
+        std = values.std(ddof=1)
+        q1, q3 = np.percentile(values, [25, 75])
+        spread = min(std, (q3 - q1) / 1.34) or std
+        bandwidth = 0.9 * spread * len(values) ** (-0.2) if spread > 0 else 1.0
+        
+        low, high = values.min() - 3 * bandwidth, values.max() + 3 * bandwidth
+        counts, edges = np.histogram(values, bins=cls.DENSITY_GRID_SIZE, range=(low, high))
+        step = edges[1] - edges[0]
+        
+        half_width = min(int(np.ceil(4 * bandwidth / step)), cls.DENSITY_GRID_SIZE - 1)
+        offsets = np.arange(-half_width, half_width + 1) * step
+        kernel = np.exp(-0.5 * (offsets / bandwidth) ** 2)
+        kernel /= kernel.sum()
+        
+        density = np.convolve(counts, kernel, mode='same') / (len(values) * step)
+        return {'grid': (edges[:-1] + edges[1:]) / 2, 'density': density}
+    
+    def get_violin_data(self, column: str, by: Optional[str] = None) -> Dict:
+        """
+        Densités et boîtes par groupe pour un violin plot (avec cache)
+        
+        Args:
+            column: Colonne numérique
+            by: Colonne catégorique pour grouper
+            
+        Returns:
+            Dictionnaire {groupe: {'density': ..., 'box': ...}}
+        """
+        columns = [column] if by is None else [column, by]
+        key = ('violin', column, by)
+        data = self._get_cached(key, columns)
+        if data is None:
+            if by is None:
+                groups = [(column, self._get_values(column))]
+            else:
+                values = self.df[column].to_numpy(dtype=np.float64, na_value=np.nan)
+                codes, categories = pd.factorize(self.df[by], sort=False)
+                valid = np.isfinite(values) & (codes >= 0)
+                order = np.argsort(codes[valid], kind='stable')
+                sorted_values = values[valid][order]
+                bounds = np.searchsorted(codes[valid][order], np.arange(len(categories) + 1))
+                groups = [(categories[i], sorted_values[bounds[i]:bounds[i + 1]])
+                          for i in range(len(categories))]
+            
+            data = {
+                str(name): {'density': self._compute_density(values),
+                            'box': self._compute_box_stats(values)}
+                for name, values in groups
+            }
+            self._set_cached(key, columns, data)
+        return data
+    
+    def _box_traces(self, name: str, stats: Dict, color: str, 
+                    orientation: str = 'v', position=None) -> List:
+        """
+        Traces Plotly d'une boîte pré-calculée et de ses outliers
+        
+        Args:
+            name: Nom de la boîte
+            stats: Statistiques (voir _compute_box_stats)
+            color: Couleur
+            orientation: 'v' ou 'h'
+            position: Position sur l'axe des catégories (défaut : nom)
+            
+        Returns:
+            Liste de traces (boîte, outliers)
+        """
+        position = name if position is None else position
+        value_axis, category_axis = ('y', 'x') if orientation == 'v' else ('x', 'y')
+        
+        box = go.Box(
+            name=name,
+            q1=[stats['q1']], median=[stats['median']], q3=[stats['q3']],
+            lowerfence=[stats['lowerfence']], upperfence=[stats['upperfence']],
+            mean=[stats['mean']], sd=[stats['sd']],
+            boxpoints=False,
+            orientation=orientation,
+            marker_color=color,
+            legendgroup=name,
+            **{category_axis: [position]}
+        )
+        
+        outliers = go.Scatter(
+            name=f'{name} - outliers ({stats["n_outliers"]:,})',
+            mode='markers',
+            marker=dict(color=color, size=5, opacity=0.7),
+            legendgroup=name,
+            showlegend=False,
+            **{value_axis: stats['outliers'],
+               category_axis: [position] * len(stats['outliers'])}
+        )
+        
+        return [box, outliers]
     
     def create_histogram(self, column: str, nbins: int = 30, 
                         show_distribution: bool = True) -> go.Figure:
         """
-        Crée un histogramme interactif (OPTIMISÉ avec échantillonnage)
+        Crée un histogramme interactif (OPTIMISÉ : bins calculés sur la colonne complète)
         
         Args:
             column: Nom de la colonne
@@ -53,53 +275,53 @@ class Visualizer:
         Returns:
             Figure Plotly
         """
-        # Échantillonner si nécessaire
-        df_viz = self._get_sample(self.df)
-        
         # Limiter le nombre de bins pour gros datasets
         effective_bins = min(nbins, self.MAX_BINS)
+        histogram = self.get_histogram_data(column, effective_bins)
+        edges = histogram['edges']
         
         fig = go.Figure()
         
-        # Histogramme
-        fig.add_trace(go.Histogram(
-            x=df_viz[column],
-            nbinsx=effective_bins,
+        # Histogramme pré-agrégé : une barre par bin
+        fig.add_trace(go.Bar(
+            x=(edges[:-1] + edges[1:]) / 2,
+            y=histogram['counts'],
+            width=np.diff(edges),
+            customdata=np.column_stack([edges[:-1], edges[1:]]) if len(edges) > 1 else None,
+            hovertemplate='[%{customdata[0]:.4g} ; %{customdata[1]:.4g}[ : %{y}<extra></extra>',
             name='Distribution',
             marker_color=self.color_palette[0],
             opacity=0.7
         ))
         
         # Ajouter la courbe de distribution normale si demandé
-        if show_distribution:
+        if show_distribution and histogram['n'] > 1:
             # Utiliser stats cachées au lieu de recalculer
             mean, std, min_val, max_val = self._get_cached_stats(column)
             
-            x_range = np.linspace(min_val, max_val, 100)
-            y_normal = ((1 / (std * np.sqrt(2 * np.pi))) * 
-                       np.exp(-0.5 * ((x_range - mean) / std) ** 2))
-            
-            # Normaliser pour l'histogramme
-            y_normal = y_normal * len(df_viz) * (max_val - min_val) / effective_bins
-            
-            fig.add_trace(go.Scatter(
-                x=x_range,
-                y=y_normal,
-                mode='lines',
-                name='Distribution Normale',
-                line=dict(color='red', width=2)
-            ))
-        
-        title = f'Distribution de {column}'
-        if len(self.df) > self.SAMPLE_THRESHOLD:
-            title += f' (échantillon de {self.SAMPLE_SIZE:,} lignes)'
+            if std > 0:
+                x_range = np.linspace(min_val, max_val, 100)
+                y_normal = ((1 / (std * np.sqrt(2 * np.pi))) * 
+                           np.exp(-0.5 * ((x_range - mean) / std) ** 2))
+                
+                # Normaliser pour l'histogramme
+                y_normal = y_normal * histogram['n'] * (edges[1] - edges[0])
+                
+                fig.add_trace(go.Scatter(
+                    x=x_range,
+                    y=y_normal,
+                    mode='lines',
+                    name='Distribution Normale',
+                    line=dict(color='red', width=2)
+                ))
         
         fig.update_layout(
-            title=title,
+            title=f'Distribution de {column} ({histogram["n"]:,} valeurs)',
             xaxis_title=column,
             yaxis_title='Fréquence',
             template=self.theme,
-            hovermode='x unified'
+            hovermode='x unified',
+            bargap=0
         )
         
         return fig
@@ -107,7 +329,7 @@ class Visualizer:
     def create_boxplot(self, columns: List[str] = None, 
                       orientation: str = 'v') -> go.Figure:
         """
-        Crée des box plots pour visualiser les outliers (OPTIMISÉ avec échantillonnage)
+        Crée des box plots pour visualiser les outliers (OPTIMISÉ : statistiques pré-calculées)
         
         Args:
             columns: Liste des colonnes (None = toutes numériques)
@@ -119,33 +341,17 @@ class Visualizer:
         if columns is None:
             columns = self.df.select_dtypes(include=['number']).columns.tolist()
         
-        # Échantillonner si nécessaire
-        df_viz = self._get_sample(self.df)
-        
         fig = go.Figure()
         
         for i, col in enumerate(columns):
-            if orientation == 'v':
-                fig.add_trace(go.Box(
-                    y=df_viz[col],
-                    name=col,
-                    marker_color=self.color_palette[i % len(self.color_palette)],
-                    boxmean='sd'  # Affiche moyenne et écart-type
-                ))
-            else:
-                fig.add_trace(go.Box(
-                    x=df_viz[col],
-                    name=col,
-                    marker_color=self.color_palette[i % len(self.color_palette)],
-                    boxmean='sd'
-                ))
-        
-        title = 'Box Plots - Détection des Outliers'
-        if len(self.df) > self.SAMPLE_THRESHOLD:
-            title += f' (échantillon de {self.SAMPLE_SIZE:,} lignes)'
+            stats = self.get_box_stats(col)
+            if stats is None:
+                continue
+            color = self.color_palette[i % len(self.color_palette)]
+            fig.add_traces(self._box_traces(col, stats, color, orientation))
         
         fig.update_layout(
-            title=title,
+            title='Box Plots - Détection des Outliers',
             template=self.theme,
             showlegend=True,
             hovermode='closest'
@@ -310,7 +516,7 @@ class Visualizer:
     
     def create_violin_plot(self, column: str, by: Optional[str] = None) -> go.Figure:
         """
-        Crée un violin plot
+        Crée un violin plot (densités estimées sur la colonne complète)
         
         Args:
             column: Colonne numérique
@@ -319,35 +525,40 @@ class Visualizer:
         Returns:
             Figure Plotly
         """
-        if by:
-            fig = go.Figure()
-            categories = self.df[by].unique()
+        groups = self.get_violin_data(column, by)
+        fig = go.Figure()
+        
+        for i, (name, data) in enumerate(groups.items()):
+            color = self.color_palette[i % len(self.color_palette)]
             
-            for i, cat in enumerate(categories):
-                data = self.df[self.df[by] == cat][column]
-                fig.add_trace(go.Violin(
-                    y=data,
-                    name=str(cat),
-                    box_visible=True,
-                    meanline_visible=True,
-                    fillcolor=self.color_palette[i % len(self.color_palette)],
-                    opacity=0.6
+            if data['density'] is not None:
+                grid, density = data['density']['grid'], data['density']['density']
+                half_width = 0.4 * density / density.max()
+                fig.add_trace(go.Scatter(
+                    x=np.concatenate([i - half_width, (i + half_width)[::-1]]),
+                    y=np.concatenate([grid, grid[::-1]]),
+                    fill='toself',
+                    fillcolor=color,
+                    opacity=0.6,
+                    mode='lines',
+                    line=dict(color=color, width=1),
+                    name=name,
+                    legendgroup=name,
+                    hoverinfo='skip'
                 ))
             
-            title = f'Distribution de {column} par {by}'
-        else:
-            fig = go.Figure(data=go.Violin(
-                y=self.df[column],
-                box_visible=True,
-                meanline_visible=True,
-                fillcolor=self.color_palette[0],
-                opacity=0.6
-            ))
-            title = f'Distribution de {column}'
+            if data['box'] is not None:
+                box, outliers = self._box_traces(name, data['box'], color, position=i)
+                box.update(width=0.08, boxmean=True, fillcolor='white', showlegend=False)
+                fig.add_traces([box, outliers])
+        
+        title = f'Distribution de {column} par {by}' if by else f'Distribution de {column}'
         
         fig.update_layout(
             title=title,
             yaxis_title=column,
+            xaxis=dict(tickmode='array', tickvals=list(range(len(groups))),
+                       ticktext=list(groups.keys())),
             template=self.theme
         )
         
@@ -431,22 +642,25 @@ class Visualizer:
                 'Valeurs Manquantes',
                 'Statistiques'
             ),
-            specs=[[{'type': 'histogram'}, {'type': 'box'}],
+            specs=[[{'type': 'xy'}, {'type': 'xy'}],
                    [{'type': 'bar'}, {'type': 'table'}]]
         )
         
         if len(numeric_cols) > 0:
-            # Histogramme
+            # Histogramme pré-agrégé
+            histogram = self.get_histogram_data(numeric_cols[0], self.MAX_BINS)
+            edges = histogram['edges']
             fig.add_trace(
-                go.Histogram(x=self.df[numeric_cols[0]], name=numeric_cols[0]),
+                go.Bar(x=(edges[:-1] + edges[1:]) / 2, y=histogram['counts'],
+                       width=np.diff(edges), name=numeric_cols[0]),
                 row=1, col=1
             )
             
-            # Box plot
-            fig.add_trace(
-                go.Box(y=self.df[numeric_cols[0]], name=numeric_cols[0]),
-                row=1, col=2
-            )
+            # Box plot pré-calculé
+            stats = self.get_box_stats(numeric_cols[0])
+            if stats is not None:
+                for trace in self._box_traces(numeric_cols[0], stats, self.color_palette[0]):
+                    fig.add_trace(trace, row=1, col=2)
         
         # Valeurs manquantes
         missing = self.df.isnull().sum()
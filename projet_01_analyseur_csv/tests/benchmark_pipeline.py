@@ -0,0 +1,229 @@
+"""
+Benchmark de bout en bout du pipeline de l'analyseur CSV
+chargement → nettoyage → statistiques → outliers → corrélations → rapport
+
+Chaque étape est mesurée (temps, pic RSS, allocations tracemalloc) et les
+résultats sont écrits en JSON. Une référence enregistrée permet de détecter
+les régressions.
+
+Utilisation :
+    python tests/benchmark_pipeline.py --sizes 10000 1000000 10000000
+    python tests/benchmark_pipeline.py --sizes 10000 --save-baseline
+    python tests/benchmark_pipeline.py --baseline tests/benchmark_baseline.json
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+from datetime import datetime
+from typing import Dict, List
+
+import numpy as np
+import pandas as pd
+
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, project_root)
+
+from src.data_loader import DataLoader
+from src.data_cleaner import DataCleaner
+from src.statistical_analyzer import StatisticalAnalyzer
+from src.anomaly_detector import AnomalyDetector
+from src.correlation_analyzer import CorrelationAnalyzer
+from src.modern_report_generator import ModernReportGenerator
+from src.profiling import (StageProfiler, build_run_metadata, compare_to_baseline,
+                           load_results, save_results)
+
+
+DEFAULT_SIZES = [10_000, 1_000_000, 10_000_000]
+DEFAULT_BASELINE = os.path.join(project_root, 'tests', 'benchmark_baseline.json')
+DEFAULT_OUTPUT_DIR = os.path.join(project_root, 'outputs', 'benchmarks')
+
+
+def generate_synthetic_dataset(n_rows: int, n_cols: int = 12, seed: int = 42) -> pd.DataFrame:
+    """
+    Génère un dataset synthétique (vectorisé) : colonnes normales, uniformes,
+    avec outliers et valeurs manquantes, une colonne catégorique et des doublons
+
+    Args:
+        n_rows: Nombre de lignes
+        n_cols: Nombre de colonnes numériques
+        seed: Graine aléatoire
+
+    Returns:
+        DataFrame synthétique
+    """
+    rng = np.random.default_rng(seed)
+    data = {}
+    for i in range(n_cols):
+        if i % 3 == 0:
+            values = rng.normal(100, 15, n_rows)
+        elif i % 3 == 1:
+            values = rng.normal(50, 10, n_rows)
+            outliers = rng.random(n_rows) < 0.02
+            values[outliers] = rng.uniform(200, 300, outliers.sum())
+        else:
+            values = rng.uniform(0, 1000, n_rows)
+        values[rng.random(n_rows) < 0.01] = np.nan
+        data[f'col_{i}'] = values.astype(np.float32) if i % 2 else values
+
+    data['categorie'] = rng.choice(np.array(['A', 'B', 'C', 'D']), size=n_rows)
+    df = pd.DataFrame(data)
+
+    # ~0.5 % de lignes dupliquées
+    n_duplicates = n_rows // 200
+    if n_duplicates:
+        source = rng.integers(0, n_rows, n_duplicates)
+        target = rng.integers(0, n_rows, n_duplicates)
+        df.iloc[target] = df.iloc[source].to_numpy()
+
+    return df
+
+
+def run_pipeline_benchmark(n_rows: int, n_cols: int = 12, workdir: str = None,
+                           trace_allocations: bool = True,
+                           report_formats: List[str] = ('html',)) -> Dict:
+    """
+    Exécute et mesure le pipeline complet sur un dataset synthétique
+
+    Args:
+        n_rows: Nombre de lignes
+        n_cols: Nombre de colonnes numériques
+        workdir: Dossier de travail (fichier CSV généré et rapports)
+        trace_allocations: Mesurer les allocations avec tracemalloc (coûteux)
+        report_formats: Formats de rapport générés ('html', 'pdf', 'docx')
+
+    Returns:
+        Dictionnaire {'lignes', 'colonnes', 'etapes': [...], 'total_s'}
+    """
+    workdir = workdir or tempfile.mkdtemp(prefix='benchmark_csv_')
+    csv_path = os.path.join(workdir, f'synthetique_{n_rows}x{n_cols}.csv')
+    if not os.path.exists(csv_path):
+        generate_synthetic_dataset(n_rows, n_cols).to_csv(csv_path, index=False)
+
+    stages = []
+
+    def measure(name):
+        profiler = StageProfiler(name, trace_allocations=trace_allocations)
+        stages.append(profiler)
+        return profiler
+
+    with measure('chargement'):
+        loader = DataLoader()
+        success, message = loader.load_from_path(csv_path)
+        if not success:
+            raise RuntimeError(message)
+        df = loader.get_data()
+
+    with measure('nettoyage'):
+        cleaner = DataCleaner(df)
+        cleaner.handle_missing_values(strategy='median')
+        cleaner.remove_duplicates()
+        df = cleaner.get_cleaned_data()
+        del cleaner
+
+    with measure('statistiques'):
+        analyzer = StatisticalAnalyzer(df)
+        analyzer.get_basic_statistics()
+        for col in analyzer.numeric_columns:
+            analyzer.get_advanced_statistics(col)
+
+    with measure('outliers'):
+        AnomalyDetector(df).detect_outliers_all_columns(method='IQR', threshold=1.5)
+
+    with measure('correlations'):
+        corr = CorrelationAnalyzer(df)
+        corr.get_correlation_matrix(method='pearson')
+        corr.get_correlation_pairs(threshold=0.7)
+
+    with measure('rapport'):
+        generator = ModernReportGenerator(df)
+        for report_format in report_formats:
+            filepath = os.path.join(workdir, f'rapport_benchmark.{report_format}')
+            if report_format == 'pdf':
+                generator.generate_pdf_report(filepath=filepath, include_charts=False)
+            elif report_format == 'docx':
+                generator.generate_docx_report(filepath=filepath)
+            else:
+                generator.generate_html_report(filepath=filepath, include_interactive_charts=False)
+
+    results = [stage.result for stage in stages]
+    return {
+        'lignes': n_rows,
+        'colonnes': n_cols + 1,
+        'etapes': results,
+        'total_s': round(sum(stage['temps_s'] for stage in results), 4)
+    }
+
+
+def print_results(results: Dict) -> None:
+    """Affiche un tableau récapitulatif des mesures"""
+    print(f"{'Dataset':<12} {'Étape':<14} {'Temps (s)':>10} {'Pic RSS (MB)':>13} {'Alloc. pic (MB)':>16}")
+    print("-" * 70)
+    for dataset, data in results['datasets'].items():
+        for stage in data['etapes']:
+            alloc = stage.get('allocations_pic_mb', float('nan'))
+            print(f"{int(dataset):<12,} {stage['etape']:<14} {stage['temps_s']:>10.3f} "
+                  f"{stage['rss_pic_mb']:>13.1f} {alloc:>16.1f}")
+        print(f"{'':<12} {'TOTAL':<14} {data['total_s']:>10.3f}")
+        print()
+
+
+def main(argv: List[str] = None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark du pipeline de l'analyseur CSV")
+    parser.add_argument('--sizes', type=int, nargs='+', default=DEFAULT_SIZES,
+                        help='Nombres de lignes des datasets synthétiques')
+    parser.add_argument('--cols', type=int, default=12, help='Nombre de colonnes numériques')
+    parser.add_argument('--workdir', default=None, help='Dossier des fichiers générés (réutilisés)')
+    parser.add_argument('--output', default=None, help='Fichier JSON des résultats')
+    parser.add_argument('--baseline', default=DEFAULT_BASELINE, help='Référence JSON à comparer')
+    parser.add_argument('--save-baseline', action='store_true',
+                        help='Enregistrer les résultats comme nouvelle référence')
+    parser.add_argument('--tolerance', type=float, default=0.2,
+                        help='Hausse relative tolérée avant régression (0.2 = +20%%)')
+    parser.add_argument('--no-tracemalloc', action='store_true',
+                        help='Désactiver la mesure des allocations (plus rapide)')
+    parser.add_argument('--report-formats', nargs='+', default=['html'],
+                        choices=['html', 'pdf', 'docx'])
+    args = parser.parse_args(argv)
+
+    results = {'meta': build_run_metadata(), 'datasets': {}}
+    for n_rows in args.sizes:
+        print(f"→ Dataset {n_rows:,} lignes × {args.cols} colonnes...")
+        results['datasets'][str(n_rows)] = run_pipeline_benchmark(
+            n_rows, args.cols, workdir=args.workdir,
+            trace_allocations=not args.no_tracemalloc,
+            report_formats=args.report_formats
+        )
+
+    print()
+    print_results(results)
+
+    output = args.output
+    if output is None:
+        os.makedirs(DEFAULT_OUTPUT_DIR, exist_ok=True)
+        output = os.path.join(DEFAULT_OUTPUT_DIR,
+                              f"benchmark_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json")
+    save_results(results, output)
+    print(f"✓ Résultats enregistrés : {output}")
+
+    if args.save_baseline:
+        save_results(results, args.baseline)
+        print(f"✓ Référence enregistrée : {args.baseline}")
+        return 0
+
+    if os.path.exists(args.baseline):
+        regressions = compare_to_baseline(results, load_results(args.baseline), args.tolerance)
+        if regressions:
+            print(f"✗ {len(regressions)} régression(s) détectée(s) :")
+            for reg in regressions:
+                print(f"  - {int(reg['dataset']):,} lignes / {reg['etape']} / {reg['metrique']}: "
+                      f"{reg['reference']} → {reg['valeur']} (+{reg['ecart_pct']}%)")
+            return 1
+        print("✓ Aucune régression par rapport à la référence")
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
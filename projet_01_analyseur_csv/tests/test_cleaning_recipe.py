@@ -0,0 +1,111 @@
+"""
+Tests du nettoyage sans copie : plan des étapes, annulation et recettes
+"""
+
+import sys
+import os
+import tempfile
+
+import numpy as np
+import pandas as pd
+
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, project_root)
+
+from src.data_cleaner import DataCleaner
+from src.cleaning_recipe import CleaningRecipe
+
+
+def _make_data(n_rows: int = 5000) -> pd.DataFrame:
+    rng = np.random.default_rng(3)
+    df = pd.DataFrame({
+        'Prix Unitaire': rng.normal(100, 20, n_rows),
+        'quantite': rng.integers(1, 10, n_rows).astype(float),
+        'region': rng.choice(['Nord', 'Sud'], n_rows)
+    })
+    df.loc[::9, 'Prix Unitaire'] = np.nan
+    df.iloc[100:150] = df.iloc[0:50].to_numpy()
+    return df
+
+
+def _clean(cleaner: DataCleaner) -> None:
+    cleaner.handle_missing_values(strategy='median')
+    cleaner.remove_duplicates()
+    cleaner.remove_outliers_iqr()
+    cleaner.normalize_column_names()
+
+
+def test_source_is_never_copied_nor_modified():
+    """La source reste intacte et les colonnes non modifiées sont partagées"""
+    df = _make_data()
+    snapshot = df.copy()
+    cleaner = DataCleaner(df)
+
+    cleaner.handle_missing_values(strategy='mean', columns=['Prix Unitaire'])
+    assert np.shares_memory(cleaner.get_cleaned_data()['quantite'].to_numpy(),
+                            df['quantite'].to_numpy())
+
+    cleaner.remove_duplicates()
+    cleaner.normalize_column_names()
+    pd.testing.assert_frame_equal(df, snapshot)
+
+
+def test_undo_replays_plan_from_source():
+    """Annuler la dernière étape équivaut à ne pas l'avoir appliquée"""
+    df = _make_data()
+    cleaner = DataCleaner(df)
+    cleaner.handle_missing_values(strategy='median')
+    expected = cleaner.get_cleaned_data().copy()
+
+    cleaner.remove_outliers_iqr()
+    assert cleaner.undo_last_step()
+    pd.testing.assert_frame_equal(cleaner.get_cleaned_data(), expected)
+
+    cleaner.reset_to_original()
+    pd.testing.assert_frame_equal(cleaner.get_cleaned_data(), df)
+    assert cleaner.get_recipe().steps == []
+
+
+def test_recipe_replay_matches_session_and_streams_csv():
+    """La recette exportée rejoue les mêmes étapes, en mémoire comme par chunks"""
+    df = _make_data()
+    cleaner = DataCleaner(df)
+    _clean(cleaner)
+    expected = cleaner.get_cleaned_data()
+
+    recipe = CleaningRecipe.from_json(cleaner.get_recipe().to_json())
+    pd.testing.assert_frame_equal(recipe.apply(df), expected)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        source, output = os.path.join(tmp, 'source.csv'), os.path.join(tmp, 'propre.csv')
+        df.to_csv(source, index=False)
+        result = recipe.apply_to_csv(source, output, chunksize=700)
+        streamed = pd.read_csv(output)
+
+    assert result == {'lignes_lues': len(df), 'lignes_ecrites': len(expected)}
+    assert streamed.columns.tolist() == expected.columns.tolist()
+    np.testing.assert_allclose(streamed['prix_unitaire'], expected['prix_unitaire'])
+
+
+def test_recipe_from_json_replays_on_integer_column_names():
+    """Colonnes entières (fichier lu sans en-tête) : les clés devenues chaînes en JSON sont rapprochées"""
+    df = _make_data()
+    df.columns = range(df.shape[1])
+    cleaner = DataCleaner(df)
+    cleaner.handle_missing_values(strategy='median')
+    cleaner.remove_duplicates(subset=[0, 1])
+    cleaner.remove_outliers_iqr()
+    cleaner.convert_column_type(1, 'int')
+    cleaner.normalize_column_names()
+    expected = cleaner.get_cleaned_data()
+
+    recipe = CleaningRecipe.from_json(cleaner.get_recipe().to_json())
+    pd.testing.assert_frame_equal(recipe.apply(df), expected)
+
+
+if __name__ == "__main__":
+    test_source_is_never_copied_nor_modified()
+    test_undo_replays_plan_from_source()
+    test_recipe_replay_matches_session_and_streams_csv()
+    test_recipe_from_json_replays_on_integer_column_names()
+    print("✓ Tests des recettes de nettoyage réussis")
@@ -0,0 +1,122 @@
+"""
+Tests du moteur de corrélation matriciel (comparaison avec pandas)
+"""
+
+import sys
+import os
+
+import numpy as np
+import pandas as pd
+
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, project_root)
+
+from src.correlation_analyzer import CorrelationAnalyzer
+from src.dependency_tracker import DependencyTracker
+
+
+def _make_wide_data(n_rows: int = 2000, n_cols: int = 300) -> pd.DataFrame:
+    rng = np.random.default_rng(42)
+    df = pd.DataFrame(rng.normal(size=(n_rows, n_cols)),
+                      columns=[f'capteur_{i}' for i in range(n_cols)])
+    df['capteur_1'] = df['capteur_0'] * 3 + rng.normal(scale=0.05, size=n_rows)
+    df['constante'] = 1.0
+    return df
+
+
+def test_matrix_matches_pandas_without_column_cap():
+    """Pearson/Spearman par blocs identiques à pandas, sans limite de colonnes"""
+    df = _make_wide_data()
+    analyzer = CorrelationAnalyzer(df)
+    analyzer.BLOCK_SIZE = 64  # Forcer plusieurs blocs
+
+    for method in ['pearson', 'spearman']:
+        result = analyzer.get_correlation_matrix(method=method)
+        expected = df.corr(method=method)
+        assert result.shape == expected.shape
+        np.testing.assert_allclose(result.values, expected.values, atol=1e-5)
+
+
+def test_matrix_with_missing_values_is_pairwise():
+    """Les valeurs manquantes sont traitées par paire, comme DataFrame.corr"""
+    df = _make_wide_data(500, 20)
+    df.iloc[::7, 2] = np.nan
+    df.iloc[::3, 5] = np.nan
+
+    result = CorrelationAnalyzer(df).get_correlation_matrix(method='pearson')
+    np.testing.assert_allclose(result.values, df.corr().values, atol=1e-5)
+
+
+def test_spearman_with_missing_values_reranks_each_pair():
+    """Spearman avec valeurs manquantes : chaque paire est reclassée sur ses lignes communes, comme pandas"""
+    df = _make_wide_data(500, 20)
+    df.iloc[::7, 2] = np.nan
+    df.iloc[::3, 5] = np.nan
+    df.iloc[::4, 9] = np.nan
+    df['vide'] = np.nan
+    expected = df.corr(method='spearman')
+
+    # Un classement unique par colonne, sans reclassement, s'écarte de pandas
+    single_ranking = df.rank().corr(method='pearson')
+    assert np.nanmax(np.abs(single_ranking.values - expected.values)) > 1e-3
+
+    tracker = DependencyTracker()
+    analyzer = CorrelationAnalyzer(df, tracker=tracker)
+    analyzer.BLOCK_SIZE = 8
+    result = analyzer.get_correlation_matrix(method='spearman')
+    np.testing.assert_allclose(result.values, expected.values, atol=1e-5)
+
+    # Mise à jour incrémentale d'une colonne complète : ses paires avec les colonnes incomplètes aussi
+    modified = df.copy()
+    modified['capteur_3'] = modified['capteur_3'] ** 3 - modified['capteur_4']
+    tracker.record_change('test', columns=['capteur_3'])
+    analyzer.update_data(modified)
+    updated = analyzer.get_correlation_matrix(method='spearman')
+    np.testing.assert_allclose(updated.values, modified.corr(method='spearman').values, atol=1e-5)
+
+
+def test_spearman_rerank_handles_ties_and_reports_progress():
+    """Spearman avec ex aequo et valeurs manquantes : identique à pandas, progression jusqu'au total"""
+    rng = np.random.default_rng(3)
+    df = pd.DataFrame(rng.integers(0, 6, size=(400, 12)).astype(float),
+                      columns=[f"note_{i}" for i in range(12)])
+    df = df.mask(rng.random(df.shape) < 0.15)
+    df['constante'] = 1.0
+    df.loc[:3, 'constante'] = np.nan
+    df['rare'] = np.nan
+    df.loc[:0, 'rare'] = 2.0
+
+    steps = []
+    analyzer = CorrelationAnalyzer(df)
+    analyzer.RERANK_CHUNK = 5
+    result = analyzer.get_correlation_matrix(method='spearman',
+                                             progress_callback=lambda done, total: steps.append((done, total)))
+    np.testing.assert_allclose(result.values, df.corr(method='spearman').values, atol=1e-9)
+    assert [done for done, _ in steps] == list(range(1, len(steps) + 1))
+    assert steps[-1][0] == steps[-1][1] > 1
+
+
+def test_max_columns_read_from_performance_config():
+    """La limite de colonnes vient de config_performance"""
+    import config_performance as perf_config
+    assert CorrelationAnalyzer.MAX_COLUMNS == perf_config.MAX_COLUMNS_CORRELATION
+
+
+def test_pairs_extraction_sorted_and_filtered():
+    """Extraction vectorisée des paires au-dessus du seuil"""
+    df = _make_wide_data(1000, 30)
+    pairs = CorrelationAnalyzer(df).get_correlation_pairs(threshold=0.9)
+
+    assert len(pairs) == 1
+    assert (pairs[0]['variable_1'], pairs[0]['variable_2']) == ('capteur_0', 'capteur_1')
+    assert pairs[0]['direction'] == 'Positive'
+
+
+if __name__ == "__main__":
+    test_matrix_matches_pandas_without_column_cap()
+    test_matrix_with_missing_values_is_pairwise()
+    test_spearman_with_missing_values_reranks_each_pair()
+    test_spearman_rerank_handles_ties_and_reports_progress()
+    test_max_columns_read_from_performance_config()
+    test_pairs_extraction_sorted_and_filtered()
+    print("✓ Tests du moteur de corrélation réussis")
@@ -0,0 +1,96 @@
+"""
+Tests du suivi des dépendances entre nettoyage et caches d'analyse
+"""
+
+import sys
+import os
+
+import numpy as np
+import pandas as pd
+
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, project_root)
+
+from src.data_cleaner import DataCleaner
+from src.statistical_analyzer import StatisticalAnalyzer
+from src.correlation_analyzer import CorrelationAnalyzer
+
+
+def _make_data() -> pd.DataFrame:
+    rng = np.random.default_rng(0)
+    df = pd.DataFrame({
+        'a': rng.normal(0, 1, 200),
+        'b': rng.normal(5, 2, 200),
+        'c': rng.uniform(0, 10, 200),
+    })
+    df.loc[::10, 'a'] = np.nan
+    return df
+
+
+def test_fill_invalidates_only_modified_column():
+    """Remplir une colonne ne recalcule que les statistiques de cette colonne"""
+    cleaner = DataCleaner(_make_data())
+    analyzer = StatisticalAnalyzer(cleaner.get_cleaned_data(), tracker=cleaner.tracker)
+
+    stats_b = analyzer.get_advanced_statistics('b')
+    stats_a = analyzer.get_advanced_statistics('a')
+
+    cleaner.handle_missing_values(strategy='mean', columns=['a', 'b'])
+    analyzer.update_data(cleaner.get_cleaned_data())
+
+    assert analyzer.get_advanced_statistics('b') is stats_b
+    assert analyzer.get_advanced_statistics('a') is not stats_a
+
+
+def test_row_removal_invalidates_all_columns():
+    """Supprimer des lignes invalide toutes les statistiques"""
+    cleaner = DataCleaner(_make_data())
+    analyzer = StatisticalAnalyzer(cleaner.get_cleaned_data(), tracker=cleaner.tracker)
+
+    stats_b = analyzer.get_advanced_statistics('b')
+    cleaner.handle_missing_values(strategy='drop')
+    analyzer.update_data(cleaner.get_cleaned_data())
+
+    assert analyzer.get_advanced_statistics('b') is not stats_b
+
+
+def test_partial_correlation_update_matches_full_recompute():
+    """La mise à jour partielle de la matrice donne le même résultat qu'un recalcul complet"""
+    cleaner = DataCleaner(_make_data())
+    corr = CorrelationAnalyzer(cleaner.get_cleaned_data(), tracker=cleaner.tracker)
+    corr.get_correlation_matrix(method='pearson')
+
+    cleaner.handle_missing_values(strategy='median', columns=['a'])
+    df = cleaner.get_cleaned_data()
+    corr.update_data(df)
+
+    updated = corr.get_correlation_matrix(method='pearson')
+    expected = df[['a', 'b', 'c']].corr(method='pearson')
+
+    np.testing.assert_allclose(updated.values, expected.values, atol=1e-5)
+
+
+def test_summary_reuses_cleaner_row_hashes():
+    """Le résumé compte les doublons avec les empreintes déjà calculées par le nettoyeur"""
+    df = _make_data()
+    df = pd.concat([df, df.iloc[:15]], ignore_index=True)
+    cleaner = DataCleaner(df)
+    analyzer = StatisticalAnalyzer(cleaner.get_cleaned_data(), cleaner=cleaner)
+
+    assert cleaner.count_duplicates() == 15
+    hashes = cleaner._get_duplicates()[0]
+    assert analyzer.get_complete_summary()['qualite_donnees']['duplicatas'] == 15
+    assert cleaner._get_duplicates()[0] is hashes
+
+    cleaner.remove_duplicates()
+    analyzer.update_data(cleaner.get_cleaned_data())
+    assert analyzer.get_complete_summary()['qualite_donnees']['duplicatas'] == 0
+    assert not analyzer._stats_cache
+
+
+if __name__ == "__main__":
+    test_fill_invalidates_only_modified_column()
+    test_row_removal_invalidates_all_columns()
+    test_partial_correlation_update_matches_full_recompute()
+    test_summary_reuses_cleaner_row_hashes()
+    print("✓ Tests du suivi des dépendances réussis")
@@ -0,0 +1,106 @@
+"""
+Tests de la détection des doublons par empreinte de ligne
+"""
+
+import sys
+import os
+
+import numpy as np
+import pandas as pd
+
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, project_root)
+
+import src.data_cleaner as data_cleaner
+from src.data_cleaner import DataCleaner
+from src.duplicate_detector import ChunkedDuplicateFinder, find_duplicates
+
+
+def _make_data(n_rows: int = 20_000) -> pd.DataFrame:
+    rng = np.random.default_rng(5)
+    df = pd.DataFrame({
+        'code': rng.integers(0, 50, n_rows),
+        'libelle': rng.choice(['produit_' + 'x' * 40 + str(i) for i in range(30)], n_rows),
+        'valeur': rng.normal(size=n_rows).round(1),
+    })
+    df.loc[::11, 'valeur'] = np.nan
+    df.loc[::17, 'valeur'] = -0.0
+    df['stock'] = pd.array(rng.integers(0, 3, n_rows), dtype='Int64')
+    df.loc[::7, 'stock'] = pd.NA
+    split = n_rows * 3 // 4
+    df.iloc[split:] = df.iloc[:n_rows - split].to_numpy()
+    return df
+
+
+def test_hash_detection_matches_pandas():
+    """Même résultat que DataFrame.duplicated (NaN, -0.0, types d'extension, subset)"""
+    df = _make_data()
+    np.testing.assert_array_equal(find_duplicates(df), df.duplicated().to_numpy())
+    np.testing.assert_array_equal(find_duplicates(df, ['code', 'libelle']),
+                                  df.duplicated(['code', 'libelle']).to_numpy())
+
+
+def test_hash_collisions_are_rechecked():
+    """Des empreintes identiques pour des lignes différentes ne créent pas de faux doublons"""
+    df = _make_data(500)
+    colliding = np.zeros(len(df), dtype=np.uint64)
+    np.testing.assert_array_equal(find_duplicates(df, hashes=colliding),
+                                  df.duplicated().to_numpy())
+
+
+def test_chunked_detection_across_chunks():
+    """Les doublons sont détectés entre chunks successifs"""
+    df = _make_data()
+    finder = ChunkedDuplicateFinder()
+    chunked = np.concatenate([finder.process(df.iloc[start:start + 3000])
+                              for start in range(0, len(df), 3000)])
+
+    np.testing.assert_array_equal(chunked, df.duplicated().to_numpy())
+    assert finder.unique_rows == (~df.duplicated()).sum()
+
+
+def test_chunked_detection_keeps_large_integer_ids_distinct():
+    """Des identifiants entiers au-delà de 2^53 ne sont pas confondus"""
+    ids = pd.DataFrame({'id': [2 ** 53, 2 ** 53 + 1, 2 ** 62 + 7, 2 ** 62 + 7]})
+    finder = ChunkedDuplicateFinder()
+
+    np.testing.assert_array_equal(finder.process(ids.iloc[:2]), [False, False])
+    np.testing.assert_array_equal(finder.process(ids.iloc[2:]), [False, True])
+    np.testing.assert_array_equal(finder.process(ids.iloc[:2]), [True, True])
+
+
+def test_chunked_detection_matches_integers_read_as_floats():
+    """Une colonne lue en entiers puis en flottants (valeurs manquantes) garde ses doublons"""
+    finder = ChunkedDuplicateFinder()
+    first = pd.DataFrame({'code': [1, 2, 3], 'libelle': ['a', 'b', 'c']})
+    second = pd.DataFrame({'code': [1.0, np.nan, 2.5, -0.0], 'libelle': ['a', 'b', 'b', 'c']})
+
+    np.testing.assert_array_equal(finder.process(first), [False, False, False])
+    np.testing.assert_array_equal(finder.process(second), [True, False, False, False])
+
+
+def test_quality_report_and_removal_share_row_hashes(monkeypatch):
+    """Le rapport de qualité et la suppression utilisent un seul calcul d'empreintes"""
+    calls = []
+    original_hash_rows = data_cleaner.hash_rows
+    monkeypatch.setattr(data_cleaner, 'hash_rows',
+                        lambda *args, **kwargs: calls.append(1) or original_hash_rows(*args, **kwargs))
+
+    df = _make_data()
+    cleaner = DataCleaner(df)
+    expected = int(df.duplicated().sum())
+
+    assert cleaner.get_data_quality_report()['duplicatas'] == expected
+    assert cleaner.remove_duplicates() == expected
+    assert cleaner.get_data_quality_report()['duplicatas'] == 0
+    assert len(calls) == 1
+    pd.testing.assert_frame_equal(cleaner.get_cleaned_data(), df.drop_duplicates())
+
+
+if __name__ == "__main__":
+    test_hash_detection_matches_pandas()
+    test_hash_collisions_are_rechecked()
+    test_chunked_detection_across_chunks()
+    test_chunked_detection_keeps_large_integer_ids_distinct()
+    test_chunked_detection_matches_integers_read_as_floats()
+    print("✓ Tests de détection des doublons réussis (test avec monkeypatch : lancer via pytest)")
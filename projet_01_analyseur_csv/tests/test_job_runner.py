@@ -0,0 +1,180 @@
+"""
+Tests de l'exécution des analyses en arrière-plan
+"""
+
+import sys
+import os
+import time
+
+import numpy as np
+import pandas as pd
+
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, project_root)
+
+import src.job_runner as job_runner
+from src.job_runner import JobRunner, ACTIVE_STATUSES, STATUS_DONE, STATUS_TIMEOUT, dataset_hash
+
+
+def _make_data() -> pd.DataFrame:
+    rng = np.random.default_rng(7)
+    return pd.DataFrame(rng.normal(size=(5000, 12)), columns=[f'col_{i}' for i in range(12)])
+
+
+def _wait(runner: JobRunner, job_id: str) -> dict:
+    status = runner.get_status(job_id)
+    while status['etat'] in ACTIVE_STATUSES:
+        time.sleep(0.05)
+        status = runner.get_status(job_id)
+    return status
+
+
+def test_outliers_job_result_is_cached():
+    """Un résultat terminé est réutilisé pour les mêmes données et paramètres"""
+    df = _make_data()
+    runner = JobRunner(max_workers=2)
+    try:
+        job_id = runner.submit('outliers', df, {'method': 'IQR', 'threshold': 1.5})
+        status = _wait(runner, job_id)
+        assert status['etat'] == STATUS_DONE
+        assert status['progression'] == 1.0
+        assert len(status['resultat']['resume']) == 12
+
+        assert runner.submit('outliers', df.copy(), {'threshold': 1.5, 'method': 'IQR'}) == job_id
+    finally:
+        runner.shutdown()
+
+
+def test_timeout_is_enforced():
+    """MAX_OPERATION_TIME interrompt la tâche"""
+    runner = JobRunner(max_workers=1, timeout=0.0, use_processes=False)
+    try:
+        job_id = runner.submit('correlation', _make_data(), {'method': 'pearson'})
+        assert _wait(runner, job_id)['etat'] == STATUS_TIMEOUT
+    finally:
+        runner.shutdown()
+
+
+def _sleep_operation(df: pd.DataFrame, params: dict, reporter) -> float:
+    """Opération factice : attend sans vérifier le délai"""
+    time.sleep(params['duree'])
+    return params['duree']
+
+
+def test_timeout_starts_when_execution_begins(monkeypatch):
+    """L'attente dans la file du pool n'est pas décomptée du délai"""
+    monkeypatch.setitem(job_runner.OPERATIONS, 'attente', _sleep_operation)
+    runner = JobRunner(max_workers=1, timeout=0.5, use_processes=False)
+    try:
+        first = runner.submit('attente', _make_data(), {'duree': 0.4})
+        queued = runner.submit('attente', _make_data(), {'duree': 0.2})
+        time.sleep(0.3)
+        assert runner.get_status(queued)['etat'] == job_runner.STATUS_PENDING
+        assert _wait(runner, first)['etat'] == STATUS_DONE
+        assert _wait(runner, queued)['etat'] == STATUS_DONE
+    finally:
+        runner.shutdown()
+
+
+def test_timeout_status_is_final(monkeypatch):
+    """Une tâche expirée reste expirée même si le calcul aboutit ensuite"""
+    monkeypatch.setitem(job_runner.OPERATIONS, 'attente', _sleep_operation)
+    runner = JobRunner(max_workers=1, timeout=0.1, use_processes=False)
+    try:
+        job_id = runner.submit('attente', _make_data(), {'duree': 0.3})
+        assert _wait(runner, job_id)['etat'] == STATUS_TIMEOUT
+        runner._jobs[job_id]['future'].result()
+        status = runner.get_status(job_id)
+        assert status['etat'] == STATUS_TIMEOUT
+        assert status['resultat'] is None
+    finally:
+        runner.shutdown()
+
+
+def _wait_running(runner: JobRunner, job_id: str) -> None:
+    while runner.get_status(job_id)['etat'] != job_runner.STATUS_RUNNING:
+        time.sleep(0.05)
+
+
+def test_cancel_stops_running_process(monkeypatch):
+    """En mode processus, l'annulation arrête le calcul en cours ; les autres tâches repartent"""
+    monkeypatch.setitem(job_runner.OPERATIONS, 'attente', _sleep_operation)
+    runner = JobRunner(max_workers=2)
+    try:
+        long_job = runner.submit('attente', _make_data(), {'duree': 60})
+        other_job = runner.submit('attente', _make_data(), {'duree': 0.5})
+        _wait_running(runner, long_job)
+        processes = list(runner._executor._processes.values())
+
+        runner.cancel(long_job)
+        assert runner.get_status(long_job)['etat'] == job_runner.STATUS_CANCELLED
+        assert not any(process.is_alive() for process in processes)
+        assert _wait(runner, other_job)['etat'] == STATUS_DONE
+    finally:
+        runner.shutdown()
+
+
+def test_timeout_stops_running_process(monkeypatch):
+    """En mode processus, une opération sans point de contrôle est arrêtée au délai"""
+    monkeypatch.setitem(job_runner.OPERATIONS, 'attente', _sleep_operation)
+    runner = JobRunner(max_workers=1, timeout=0.5)
+    try:
+        job_id = runner.submit('attente', _make_data(), {'duree': 60})
+        _wait_running(runner, job_id)
+        processes = list(runner._executor._processes.values())
+        start = time.time()
+        assert _wait(runner, job_id)['etat'] == STATUS_TIMEOUT
+        assert time.time() - start < 5
+        assert not any(process.is_alive() for process in processes)
+    finally:
+        runner.shutdown()
+
+
+def test_small_job_runs_inline():
+    """Une petite analyse est exécutée directement, sans démarrer le pool ni le gestionnaire"""
+    df = _make_data().head(200)
+    runner = JobRunner()
+    try:
+        job_id = runner.submit('correlation', df, {'method': 'pearson'})
+        status = runner.get_status(job_id)
+        assert status['etat'] == STATUS_DONE
+        assert status['resultat']['matrix'].shape == (12, 12)
+        assert runner._executor is None and runner._manager is None
+    finally:
+        runner.shutdown()
+
+
+def test_finished_jobs_are_bounded():
+    """Seules les max_results tâches terminées les plus récemment utilisées sont gardées"""
+    df = _make_data().head(200)
+    runner = JobRunner(max_results=2)
+    try:
+        first = runner.submit('outliers', df, {'threshold': 1.5})
+        runner.submit('outliers', df, {'threshold': 2.0})
+        # Réutiliser la première la rend la plus récente : la deuxième est évincée
+        assert runner.submit('outliers', df, {'threshold': 1.5}) == first
+        runner.submit('outliers', df, {'threshold': 3.0})
+
+        assert len(runner._jobs) == 2
+        assert runner.get_cached_result('outliers', df, {'threshold': 1.5}) is not None
+        assert runner.get_cached_result('outliers', df, {'threshold': 2.0}) is None
+    finally:
+        runner.shutdown()
+
+
+def test_dataset_hash_changes_with_content():
+    """L'empreinte change dès qu'une valeur change"""
+    df = _make_data()
+    modified = df.copy()
+    modified.iloc[0, 0] += 1
+    assert dataset_hash(df) == dataset_hash(df.copy())
+    assert dataset_hash(df) != dataset_hash(modified)
+
+
+if __name__ == "__main__":
+    test_outliers_job_result_is_cached()
+    test_timeout_is_enforced()
+    test_small_job_runs_inline()
+    test_finished_jobs_are_bounded()
+    test_dataset_hash_changes_with_content()
+    print("✓ Tests des tâches en arrière-plan réussis (tests avec monkeypatch : lancer via pytest)")
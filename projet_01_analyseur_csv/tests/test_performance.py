@@ -42,7 +42,7 @@ def generate_test_data(n_rows: int, n_cols: int) -> pd.DataFrame:
     return pd.DataFrame(data)
 
 
-def test_statistics_performance(df: pd.DataFrame) -> float:
+def measure_statistics_performance(df: pd.DataFrame) -> float:
     """Teste les performances des statistiques"""
     analyzer = StatisticalAnalyzer(df)
     
@@ -55,7 +55,7 @@ def test_statistics_performance(df: pd.DataFrame) -> float:
     return elapsed
 
 
-def test_correlation_performance(df: pd.DataFrame) -> float:
+def measure_correlation_performance(df: pd.DataFrame) -> float:
     """Teste les performances des corrélations"""
     analyzer = CorrelationAnalyzer(df)
     
@@ -67,7 +67,7 @@ def test_correlation_performance(df: pd.DataFrame) -> float:
     return elapsed
 
 
-def test_anomaly_performance(df: pd.DataFrame) -> float:
+def measure_anomaly_performance(df: pd.DataFrame) -> float:
     """Teste les performances de détection d'anomalies"""
     detector = AnomalyDetector(df)
     
@@ -78,7 +78,7 @@ def test_anomaly_performance(df: pd.DataFrame) -> float:
     return elapsed
 
 
-def test_visualization_performance(df: pd.DataFrame) -> float:
+def measure_visualization_performance(df: pd.DataFrame) -> float:
     """Teste les performances des visualisations"""
     viz = Visualizer(df)
     
@@ -124,19 +124,19 @@ def run_performance_tests():
         print("Tests des modules:")
         
         print("  1. Statistiques...")
-        stats_time = test_statistics_performance(df)
+        stats_time = measure_statistics_performance(df)
         print(f"     ✓ Terminé en {stats_time:.2f}s")
         
         print("  2. Corrélations...")
-        corr_time = test_correlation_performance(df)
+        corr_time = measure_correlation_performance(df)
         print(f"     ✓ Terminé en {corr_time:.2f}s")
         
         print("  3. Détection d'anomalies...")
-        anomaly_time = test_anomaly_performance(df)
+        anomaly_time = measure_anomaly_performance(df)
         print(f"     ✓ Terminé en {anomaly_time:.2f}s")
         
         print("  4. Visualisations...")
-        viz_time = test_visualization_performance(df)
+        viz_time = measure_visualization_performance(df)
         print(f"     ✓ Terminé en {viz_time:.2f}s")
         
         total_time = stats_time + corr_time + anomaly_time + viz_time
@@ -0,0 +1,62 @@
+"""
+Tests du profilage structuré et du benchmark du pipeline
+"""
+
+import sys
+import os
+import tempfile
+
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, project_root)
+
+from src.profiling import StageProfiler, compare_to_baseline
+from tests.benchmark_pipeline import run_pipeline_benchmark
+
+
+def test_pipeline_benchmark_records_every_stage():
+    """Le benchmark mesure chaque étape du pipeline (temps, RSS, allocations)"""
+    with tempfile.TemporaryDirectory() as workdir:
+        result = run_pipeline_benchmark(2000, n_cols=4, workdir=workdir)
+
+    stages = [stage['etape'] for stage in result['etapes']]
+    assert stages == ['chargement', 'nettoyage', 'statistiques', 'outliers', 'correlations', 'rapport']
+    for stage in result['etapes']:
+        assert 'erreur' not in stage
+        assert stage['temps_s'] >= 0
+        assert stage['rss_pic_mb'] >= stage['rss_debut_mb']
+        assert 'allocations_pic_mb' in stage
+
+
+def test_stage_profiler_records_error():
+    """Une exception dans l'étape est enregistrée puis propagée"""
+    profiler = StageProfiler('echec', trace_allocations=False)
+    try:
+        with profiler:
+            raise ValueError('boom')
+    except ValueError:
+        pass
+    assert profiler.result['erreur'] == 'boom'
+
+
+def test_compare_to_baseline_flags_regressions():
+    """Seules les hausses au-delà de la tolérance sont signalées"""
+    baseline = {'datasets': {'1000': {'etapes': [
+        {'etape': 'chargement', 'temps_s': 1.0, 'rss_pic_mb': 100.0},
+        {'etape': 'rapport', 'temps_s': 0.01, 'rss_pic_mb': 100.0},
+    ]}}}
+    results = {'datasets': {'1000': {'etapes': [
+        {'etape': 'chargement', 'temps_s': 1.5, 'rss_pic_mb': 110.0},
+        {'etape': 'rapport', 'temps_s': 0.03, 'rss_pic_mb': 100.0},
+    ]}}}
+
+    regressions = compare_to_baseline(results, baseline, tolerance=0.2)
+
+    assert len(regressions) == 1
+    assert (regressions[0]['etape'], regressions[0]['metrique']) == ('chargement', 'temps_s')
+
+
+if __name__ == "__main__":
+    test_pipeline_benchmark_records_every_stage()
+    test_stage_profiler_records_error()
+    test_compare_to_baseline_flags_regressions()
+    print("✓ Tests du profilage réussis")
@@ -0,0 +1,111 @@
+"""
+Tests du modèle de rapport, du cache d'images et de la génération multi-formats
+"""
+
+import sys
+import os
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, project_root)
+
+import src.modern_report_generator as modern_report_generator
+from src.modern_report_generator import ModernReportGenerator
+from src.report_model import ChartEngineUnavailable, ChartImageCache, ReportModel
+
+
+def _make_data() -> pd.DataFrame:
+    rng = np.random.default_rng(11)
+    df = pd.DataFrame({
+        'ventes': rng.normal(100, 20, 500),
+        'remise': rng.exponential(1, 500) - 0.9,
+        'region': rng.choice(['Nord', 'Sud'], 500)
+    })
+    df.loc[::25, 'ventes'] = np.nan
+    df.iloc[400:410] = df.iloc[0:10].to_numpy()
+    return df
+
+
+def test_model_matches_direct_computation():
+    """Résumé et tableau statistique identiques aux calculs pandas directs"""
+    df = _make_data()
+    model = ReportModel(df)
+
+    assert model.summary['duplicatas'] == df.duplicated().sum()
+    assert model.summary['valeurs_manquantes'] == df.isnull().sum().sum()
+    assert model.stats_table.loc['ventes', 'Mediane'] == df['ventes'].median()
+    assert model.stats_table.loc['remise', 'Ecart-type'] == df['remise'].std()
+    assert any('VARIABILITE' in rec and 'remise' in rec for rec in model.recommendations)
+
+
+def test_all_formats_share_one_model(monkeypatch):
+    """Les trois formats sont générés à partir d'un seul calcul du modèle"""
+    built = []
+
+    class CountingModel(ReportModel):
+        def __init__(self, *args, **kwargs):
+            built.append(1)
+            super().__init__(*args, **kwargs)
+
+    monkeypatch.setattr(modern_report_generator, 'ReportModel', CountingModel)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        filepaths = ModernReportGenerator(_make_data()).generate_all_reports(
+            output_dir=tmp, include_charts=False
+        )
+        assert sorted(filepaths) == ['docx', 'html', 'pdf']
+        assert all(os.path.getsize(path) > 0 for path in filepaths.values())
+
+    assert len(built) == 1
+
+
+def test_chart_cache_renders_each_chart_once():
+    """Un graphique demandé simultanément par plusieurs formats n'est rendu qu'une fois"""
+    cache = ChartImageCache(max_entries=2)
+    renders = []
+    lock = threading.Lock()
+
+    def render():
+        with lock:
+            renders.append(1)
+        return b'png'
+
+    with ThreadPoolExecutor(max_workers=3) as executor:
+        images = list(executor.map(
+            lambda _: cache.get_or_render('abc', ('histogram', 'ventes', 30), render), range(3)
+        ))
+
+    assert images == [b'png'] * 3
+    assert len(renders) == 1
+
+
+def test_chart_cache_failures():
+    """Un graphique en échec est ignoré ; seul un moteur absent désactive le rendu"""
+    cache = ChartImageCache()
+    assert cache.get_or_render('abc', ('histogram', 'a', 30), lambda: 1 / 0) is None
+    assert cache.available
+    assert cache.get_or_render('abc', ('histogram', 'b', 30), lambda: b'png') == b'png'
+
+    # Moteur de rendu indisponible : échec mémorisé, pas de nouvelle tentative
+    attempts = []
+
+    def missing_engine():
+        attempts.append(1)
+        raise ChartEngineUnavailable("kaleido absent")
+
+    assert cache.get_or_render('abc', ('histogram', 'c', 30), missing_engine) is None
+    assert cache.get_or_render('abc', ('histogram', 'd', 30), lambda: attempts.append(1)) is None
+    assert len(attempts) == 1
+    assert not cache.available
+
+
+if __name__ == "__main__":
+    test_model_matches_direct_computation()
+    test_chart_cache_renders_each_chart_once()
+    test_chart_cache_failures()
+    print("✓ Tests du modèle de rapport réussis (test avec monkeypatch : lancer via pytest)")
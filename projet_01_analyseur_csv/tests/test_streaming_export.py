@@ -0,0 +1,109 @@
+"""
+Tests des exports par blocs (CSV compressé, Excel à mémoire constante, Parquet)
+"""
+
+import sys
+import os
+import tempfile
+
+import numpy as np
+import pandas as pd
+
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, project_root)
+
+import src.streaming_export as streaming_export
+from src.report_generator import ReportGenerator
+from src.streaming_export import chunk_rows_for_budget, write_csv_chunks, write_parquet_chunks
+
+
+def _make_data(n_rows: int = 2_500) -> pd.DataFrame:
+    rng = np.random.default_rng(3)
+    df = pd.DataFrame({
+        'montant': rng.normal(100, 20, n_rows),
+        'quantite': rng.integers(0, 50, n_rows),
+        'region': rng.choice(['Nord', 'Sud', 'Île-de-France'], n_rows),
+        'date': pd.date_range('2024-01-01', periods=n_rows, freq='h')
+    })
+    df.loc[::40, 'montant'] = np.nan
+    df.loc[::55, 'region'] = np.nan
+    return df
+
+
+def test_csv_chunks_match_pandas_for_each_compression():
+    """CSV par blocs identique à l'écriture pandas en un appel, compressé ou non"""
+    df = _make_data()
+    with tempfile.TemporaryDirectory() as tmpdir:
+        for compression in [None, 'gzip', 'bz2', 'zip', 'xz']:
+            path = os.path.join(tmpdir, f"export_{compression}.csv")
+            progress = []
+            write_csv_chunks(df, path, compression=compression, chunk_rows=700,
+                             progress_callback=lambda w, t: progress.append((w, t)))
+
+            assert progress == [(700, 2500), (1400, 2500), (2100, 2500), (2500, 2500)]
+            loaded = pd.read_csv(path, compression=compression, encoding='utf-8-sig',
+                                 parse_dates=['date'])
+            pd.testing.assert_frame_equal(loaded, df)
+
+
+def test_chunk_size_follows_memory_budget():
+    """La taille des blocs dépend du budget mémoire, pas du nombre de lignes"""
+    df = _make_data(5_000)
+    small = chunk_rows_for_budget(df, memory_budget_mb=1)
+    large = chunk_rows_for_budget(df, memory_budget_mb=16)
+
+    assert small < large
+    assert chunk_rows_for_budget(pd.concat([df] * 4), memory_budget_mb=1) == small
+
+
+def test_excel_report_roundtrip_and_sheet_overflow(monkeypatch):
+    """Classeur relisible, feuilles statistiques avec index, débordement sur plusieurs feuilles"""
+    df = _make_data(1_200)
+    stats = df[['montant', 'quantite']].describe()
+    monkeypatch.setattr(streaming_export, 'EXCEL_MAX_ROWS', 501)
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        path = os.path.join(tmpdir, 'rapport.xlsx')
+        progress = []
+        ReportGenerator(df).create_excel_report(
+            {'Statistiques': stats}, filepath=path,
+            progress_callback=lambda w, t: progress.append(w)
+        )
+        sheets = pd.read_excel(path, sheet_name=None)
+
+    assert list(sheets) == ['Données', 'Données (2)', 'Données (3)', 'Statistiques']
+    assert [len(sheets[name]) for name in list(sheets)[:3]] == [500, 500, 200]
+    assert progress[-1] == 1200
+
+    data = pd.concat([sheets[name] for name in list(sheets)[:3]], ignore_index=True)
+    np.testing.assert_allclose(data['montant'], df['montant'])
+    assert data['region'].isna().sum() == df['region'].isna().sum()
+    assert (pd.to_datetime(data['date']) == df['date']).all()
+
+    relu = sheets['Statistiques'].set_index(sheets['Statistiques'].columns[0])
+    np.testing.assert_allclose(relu.loc['mean', 'montant'], stats.loc['mean', 'montant'])
+
+
+def test_parquet_row_groups_keep_schema():
+    """Un groupe de lignes par bloc et types conservés, même si un bloc est vide de valeurs"""
+    df = _make_data(3_000)
+    df['commentaire'] = None
+    df.loc[2_900:, 'commentaire'] = 'tardif'
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        path = os.path.join(tmpdir, 'export.parquet')
+        write_parquet_chunks(df, path, chunk_rows=1_000)
+
+        import pyarrow.parquet as pq
+        assert pq.ParquetFile(path).num_row_groups == 3
+        loaded = pd.read_parquet(path)
+
+    pd.testing.assert_frame_equal(loaded.drop(columns='region'), df.drop(columns='region'))
+    assert (loaded['region'].isna() == df['region'].isna()).all()
+
+
+if __name__ == "__main__":
+    test_csv_chunks_match_pandas_for_each_compression()
+    test_chunk_size_follows_memory_budget()
+    test_parquet_row_groups_keep_schema()
+    print("✓ Tests des exports par blocs réussis")
@@ -0,0 +1,73 @@
+"""
+Tests des graphiques pré-agrégés du Visualizer (histogrammes et box plots exacts)
+"""
+
+import sys
+import os
+
+import numpy as np
+import pandas as pd
+
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, project_root)
+
+from src.visualizer import Visualizer
+
+
+def _make_data(n_rows: int) -> pd.DataFrame:
+    rng = np.random.default_rng(7)
+    df = pd.DataFrame({
+        'valeur': rng.lognormal(0, 1, n_rows),
+        'groupe': rng.choice(['A', 'B', 'C'], n_rows)
+    })
+    df.loc[::50, 'valeur'] = np.nan
+    return df
+
+
+def test_histogram_is_exact_on_full_column():
+    """Les comptes couvrent toute la colonne et correspondent à np.histogram"""
+    df = _make_data(120_000)
+    histogram = Visualizer(df).get_histogram_data('valeur', nbins=40)
+
+    expected_counts, expected_edges = np.histogram(df['valeur'].dropna(), bins=40)
+    np.testing.assert_array_equal(histogram['counts'], expected_counts)
+    np.testing.assert_allclose(histogram['edges'], expected_edges)
+    assert histogram['counts'].sum() == df['valeur'].notna().sum()
+
+
+def test_box_stats_match_pandas_and_cap_outliers():
+    """Quartiles exacts, moustaches selon 1.5 × IQR et liste d'outliers plafonnée"""
+    df = _make_data(120_000)
+    stats = Visualizer(df).get_box_stats('valeur')
+
+    values = df['valeur'].dropna()
+    q1, median, q3 = values.quantile([0.25, 0.5, 0.75])
+    iqr = q3 - q1
+    inside = values[(values >= q1 - 1.5 * iqr) & (values <= q3 + 1.5 * iqr)]
+
+    np.testing.assert_allclose([stats['q1'], stats['median'], stats['q3']], [q1, median, q3])
+    assert stats['upperfence'] == inside.max()
+    assert stats['n_outliers'] == len(values) - len(inside)
+    assert len(stats['outliers']) == Visualizer.MAX_OUTLIER_POINTS
+
+
+def test_chart_payload_independent_of_row_count():
+    """La taille des figures ne dépend pas du nombre de lignes"""
+    sizes = []
+    for n_rows in [20_000, 400_000]:
+        viz = Visualizer(_make_data(n_rows))
+        sizes.append((
+            len(viz.create_histogram('valeur').to_json()),
+            len(viz.create_boxplot(['valeur']).to_json()),
+            len(viz.create_violin_plot('valeur', by='groupe').to_json())
+        ))
+
+    for small, large in zip(*sizes):
+        assert large < small * 1.2
+
+
+if __name__ == "__main__":
+    test_histogram_is_exact_on_full_column()
+    test_box_stats_match_pandas_and_cap_outliers()
+    test_chart_payload_independent_of_row_count()
+    print("✓ Tests des graphiques pré-agrégés réussis")
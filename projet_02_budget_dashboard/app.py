@@ -5,6 +5,7 @@ Projet 2 du Challenge 50 Projets Python
 import streamlit as st
 import pandas as pd
 from datetime import datetime, timedelta
+import calendar
 import os
 import sys
 
@@ -12,7 +13,7 @@ import sys
 sys.path.insert(0, os.path.dirname(__file__))
 
 from src.data_manager import DataManager
-from src.budget_analyzer import BudgetAnalyzer
+from src.budget_analyzer import BudgetAnalyzer, build_cube
 from src.visualizer import Visualizer
 import config
 
@@ -70,7 +71,9 @@ st.markdown("""
 
 # Initialisation du session state
 if 'data_manager' not in st.session_state:
-    st.session_state.data_manager = DataManager(config.TRANSACTIONS_FILE)
+    st.session_state.data_manager = DataManager(config.TRANSACTIONS_DB)
+    # Migration unique de l'ancien fichier JSON vers SQLite
+    st.session_state.data_manager.migrate_from_json(config.TRANSACTIONS_FILE)
 
 if 'show_add_form' not in st.session_state:
     st.session_state.show_add_form = False
@@ -79,20 +82,30 @@ if 'show_edit_form' not in st.session_state:
     st.session_state.show_edit_form = False
     st.session_state.edit_transaction_id = None
 
+def get_transactions_cube(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Cube (jour, type, catégorie) des transactions, recalculé seulement quand
+    les données changent (clé : DataManager.data_version)
+    """
+    version = st.session_state.data_manager.data_version()
+    cached = st.session_state.get('transactions_cube')
+    if cached is None or cached[0] != version:
+        cached = (version, build_cube(df))
+        st.session_state.transactions_cube = cached
+    return cached[1]
+
 # Initialiser les données exemple si fichier vide
 def init_example_data():
     """Charge les données exemple si aucune transaction"""
-    if not os.path.exists(config.TRANSACTIONS_FILE) or \
-       len(st.session_state.data_manager.get_all_transactions()) == 0:
+    if st.session_state.data_manager.count_transactions() == 0:
         
         if os.path.exists(config.EXAMPLE_FILE):
             import json
             with open(config.EXAMPLE_FILE, 'r', encoding='utf-8') as f:
                 example_data = json.load(f)
             
-            # Copier les données exemple
-            for transaction in example_data:
-                st.session_state.data_manager.add_transaction(transaction)
+            # Copier les données exemple (une seule écriture)
+            st.session_state.data_manager.add_transactions(example_data)
             
             return True
     return False
@@ -267,6 +280,23 @@ def show_transactions_history():
     
     # Options d'actions
     st.markdown("---")
+    with st.expander("Importer un CSV"):
+        st.caption("Colonnes requises : date (AAAA-MM-JJ ou JJ/MM/AAAA), type, montant, categorie "
+                   "(description et mode_paiement optionnels)")
+        uploaded_file = st.file_uploader("Fichier CSV", type=["csv"])
+        skip_duplicates = st.checkbox("Ignorer les transactions déjà présentes (date, montant, description)",
+                                      value=True)
+        if uploaded_file is not None and st.button("Importer", type="primary"):
+            try:
+                result = st.session_state.data_manager.import_dataframe(
+                    pd.read_csv(uploaded_file), skip_duplicates=skip_duplicates
+                )
+                st.success(f"{result['importees']} transactions importées "
+                           f"({result['doublons']} doublons, {result['invalides']} lignes invalides ignorées)")
+                st.rerun()
+            except Exception as e:
+                st.error(f"Erreur lors de l'import CSV: {str(e)}")
+    
     col1, col2, col3 = st.columns(3)
     
     with col1:
@@ -312,9 +342,6 @@ def show_dashboard():
                 st.rerun()
         return
     
-    # Créer l'analyseur
-    analyzer = BudgetAnalyzer(df)
-    
     # Filtres de période
     st.sidebar.subheader("Période d'analyse")
     period_option = st.sidebar.radio(
@@ -322,21 +349,18 @@ def show_dashboard():
         ["Tout", "Mois actuel", "30 derniers jours", "90 derniers jours", "Personnalisé"]
     )
     
-    # Filtrer selon la période
-    df_filtered = df.copy()
+    # Filtrer selon la période : tranche du cube des transactions (non recalculé)
+    history_analyzer = BudgetAnalyzer(df, cube=get_transactions_cube(df))
+    analyzer = history_analyzer
     
     if period_option == "Mois actuel":
-        today = datetime.now()
-        df_filtered = df[
-            (df['date'].dt.year == today.year) &
-            (df['date'].dt.month == today.month)
-        ]
+        today = datetime.now().date()
+        last_day = calendar.monthrange(today.year, today.month)[1]
+        analyzer = analyzer.filter_period(today.replace(day=1), today.replace(day=last_day))
     elif period_option == "30 derniers jours":
-        cutoff_date = datetime.now() - timedelta(days=30)
-        df_filtered = df[df['date'] >= cutoff_date]
+        analyzer = analyzer.filter_period(start=datetime.now() - timedelta(days=30))
     elif period_option == "90 derniers jours":
-        cutoff_date = datetime.now() - timedelta(days=90)
-        df_filtered = df[df['date'] >= cutoff_date]
+        analyzer = analyzer.filter_period(start=datetime.now() - timedelta(days=90))
     elif period_option == "Personnalisé":
         col1, col2 = st.sidebar.columns(2)
         with col1:
@@ -344,13 +368,8 @@ def show_dashboard():
         with col2:
             end_date = st.date_input("À", value=df['date'].max().date())
         
-        df_filtered = df[
-            (df['date'].dt.date >= start_date) &
-            (df['date'].dt.date <= end_date)
-        ]
+        analyzer = analyzer.filter_period(start_date, end_date)
     
-    # Recréer l'analyseur avec les données filtrées
-    analyzer = BudgetAnalyzer(df_filtered)
     metrics = analyzer.get_summary_metrics()
     
     # Afficher les métriques
@@ -418,6 +437,26 @@ def show_dashboard():
         with st.expander("Détails des budgets"):
             st.dataframe(budget_status, use_container_width=True, hide_index=True)
     
+    # Tendances mensuelles (tout l'historique, indépendamment de la période)
+    st.subheader("Tendances Mensuelles")
+    monthly_comparison = history_analyzer.get_monthly_comparison(window=3, months=12)
+    fig_monthly = visualizer.create_monthly_comparison_chart(monthly_comparison, title="")
+    st.plotly_chart(fig_monthly, use_container_width=True)
+    
+    with st.expander("Dépenses par catégorie (12 derniers mois)"):
+        category_trends = history_analyzer.get_category_trends(months=12, window=3)
+        if not category_trends.empty:
+            st.dataframe(category_trends, use_container_width=True, hide_index=True)
+        else:
+            st.info("Aucune dépense enregistrée")
+    
+    with st.expander("Prévision des dépenses de fin de mois"):
+        forecast = history_analyzer.forecast_month_end()
+        if not forecast.empty:
+            st.dataframe(forecast, use_container_width=True, hide_index=True)
+        else:
+            st.info("Pas assez d'historique pour une prévision")
+    
     # Top dépenses
     st.subheader("Top 10 des Plus Grandes Dépenses")
     top_transactions = analyzer.get_top_transactions(n=10, transaction_type='depense')
@@ -477,7 +516,7 @@ def main():
         
         st.markdown("### Fichiers")
         st.info(f"""
-        - **Transactions**: `{config.TRANSACTIONS_FILE}`
+        - **Transactions**: `{config.TRANSACTIONS_DB}`
         - **Exports**: `{config.OUTPUTS_DIR}/`
         """)
 
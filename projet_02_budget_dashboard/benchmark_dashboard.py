@@ -0,0 +1,116 @@
+"""
+Benchmark du rendu du dashboard sur des volumes réalistes
+Génère 10K / 100K / 1M transactions, puis mesure les calculs de BudgetAnalyzer
+et la construction des graphiques du Visualizer (premier rendu puis rerun)
+
+Utilisation :
+    python benchmark_dashboard.py --sizes 10000 100000 1000000
+    python benchmark_dashboard.py --sizes 100000 --storage   # inclut l'écriture et la relecture SQLite
+"""
+import argparse
+import os
+import tempfile
+import time
+from typing import Dict, List
+
+import config
+from generate_example_data import generate_transactions_frame, write_to_storage
+from src.budget_analyzer import BudgetAnalyzer, build_cube
+from src.data_manager import DataManager
+from src.visualizer import Visualizer
+
+DEFAULT_SIZES = [10_000, 100_000, 1_000_000]
+
+
+def render_dashboard(df, visualizer: Visualizer, cube=None) -> Dict[str, float]:
+    """
+    Reproduit les calculs d'un rendu du dashboard (période "Tout")
+    cube: agrégat déjà calculé (sinon calculé pendant le rendu)
+    Returns: {étape: durée en secondes}
+    """
+    timings = {}
+
+    def measure(name, func):
+        start = time.perf_counter()
+        result = func()
+        timings[name] = time.perf_counter() - start
+        return result
+
+    analyzer = BudgetAnalyzer(df, cube=cube)
+    measure('metriques', analyzer.get_summary_metrics)
+    measure('alertes', lambda: analyzer.get_alerts(config.BUDGETS_DEFAUT, config.SEUIL_ALERTE_WARNING,
+                                                   config.SEUIL_ALERTE_DANGER))
+    trend = measure('tendance', analyzer.get_daily_trend)
+    measure('graph_tendance', lambda: visualizer.create_trend_chart(trend))
+    spending = measure('depenses_categorie', analyzer.get_spending_by_category)
+    measure('graph_depenses', lambda: visualizer.create_pie_chart(spending, 'Montant', 'Catégorie', ''))
+    income = measure('revenus_categorie', analyzer.get_income_by_category)
+    measure('graph_revenus', lambda: visualizer.create_pie_chart(income, 'Montant', 'Catégorie', ''))
+    status = measure('etat_budgets', lambda: analyzer.get_budget_status(config.BUDGETS_DEFAUT))
+    measure('graph_budgets', lambda: visualizer.create_budget_status_chart(status))
+    monthly = measure('comparaison_mensuelle', lambda: analyzer.get_monthly_comparison(window=3, months=12))
+    measure('graph_mensuel', lambda: visualizer.create_monthly_comparison_chart(monthly))
+    measure('tendances_categories', lambda: analyzer.get_category_trends(months=12))
+    measure('prevision', analyzer.forecast_month_end)
+    measure('top_depenses', lambda: analyzer.get_top_transactions(n=10))
+    timings['total'] = sum(timings.values())
+    return timings
+
+
+def run_benchmark(size: int, days: int, use_storage: bool, workdir: str) -> Dict:
+    """Génère un jeu de données et mesure un premier rendu puis un rerun"""
+    result = {'lignes': size}
+
+    start = time.perf_counter()
+    df = generate_transactions_frame(size, days=days, seed=42)
+    result['generation_s'] = time.perf_counter() - start
+
+    if use_storage:
+        db_file = os.path.join(workdir, f'transactions_{size}.db')
+        if os.path.exists(db_file):
+            os.remove(db_file)
+        start = time.perf_counter()
+        write_to_storage(df, db_file)
+        result['ecriture_s'] = time.perf_counter() - start
+
+        manager = DataManager(db_file)
+        start = time.perf_counter()
+        df = manager.get_transactions_dataframe()
+        result['lecture_s'] = time.perf_counter() - start
+        manager.storage.close()
+
+    cube = build_cube(df)
+
+    visualizer = Visualizer(config.COLORS)
+    result['premier_rendu'] = render_dashboard(df, visualizer)
+    result['rerun'] = render_dashboard(df, visualizer, cube)  # cube en cache pour cette version
+    return result
+
+
+def main(argv: List[str] = None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark du dashboard budget")
+    parser.add_argument('--sizes', type=int, nargs='+', default=DEFAULT_SIZES,
+                        help='Nombres de transactions')
+    parser.add_argument('--days', type=int, default=3650, help="Jours d'historique")
+    parser.add_argument('--storage', action='store_true',
+                        help='Inclure écriture et relecture via SQLite')
+    args = parser.parse_args(argv)
+
+    workdir = tempfile.mkdtemp(prefix='benchmark_dashboard_')
+    results = [run_benchmark(size, args.days, args.storage, workdir) for size in args.sizes]
+
+    steps = list(results[0]['premier_rendu'])
+    header = f"{'Étape':<24}" + ''.join(f"{r['lignes']:>14,}" for r in results)
+    print(header)
+    print("-" * len(header))
+    for key in ['generation_s', 'ecriture_s', 'lecture_s']:
+        if key in results[0]:
+            print(f"{key:<24}" + ''.join(f"{r[key] * 1000:>12.1f}ms" for r in results))
+    for step in steps:
+        print(f"{step:<24}" + ''.join(f"{r['premier_rendu'][step] * 1000:>12.1f}ms" for r in results))
+    print(f"{'total (rerun)':<24}" + ''.join(f"{r['rerun']['total'] * 1000:>12.1f}ms" for r in results))
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,107 @@
+"""
+Benchmark des moteurs de stockage (JSON historique vs SQLite indexé)
+Mesure la latence d'ajout, de mise à jour et de suppression d'une transaction
+
+Utilisation :
+    python benchmark_storage.py --size 100000 --ops 20
+"""
+import argparse
+import os
+import statistics
+import tempfile
+import time
+import uuid
+from typing import Dict, List
+
+from generate_example_data import generate_example_transactions
+from src.data_manager import DataManager
+from src.storage import JSONStorage, SQLiteStorage
+
+
+def _measure(operation, repeats: int) -> Dict:
+    """Latences (ms) d'une opération répétée"""
+    latencies = []
+    for i in range(repeats):
+        start = time.perf_counter()
+        operation(i)
+        latencies.append((time.perf_counter() - start) * 1000)
+    latencies.sort()
+    return {
+        'mediane_ms': statistics.median(latencies),
+        'p95_ms': latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))],
+        'max_ms': latencies[-1]
+    }
+
+
+def benchmark_backend(manager: DataManager, ids: List[str], repeats: int) -> Dict:
+    """Mesure add/update/delete sur un gestionnaire déjà rempli"""
+    new_transaction = {
+        'date': '2025-01-15', 'type': 'depense', 'montant': 42.0,
+        'categorie': 'Alimentation', 'description': 'Benchmark', 'mode_paiement': 'Carte Bancaire'
+    }
+    added = []
+
+    def add(_):
+        added.append(manager.add_transaction(dict(new_transaction)))
+
+    def update(i):
+        manager.update_transaction(ids[i], dict(new_transaction, montant=float(i)))
+
+    def delete(i):
+        manager.delete_transaction(added[i])
+
+    return {
+        'ajout': _measure(add, repeats),
+        'mise_a_jour': _measure(update, repeats),
+        'suppression': _measure(delete, repeats),
+    }
+
+
+def run_benchmark(size: int, repeats: int, workdir: str) -> Dict:
+    """
+    Remplit chaque moteur avec `size` transactions puis mesure les opérations
+    Returns: {moteur: {operation: latences}}
+    """
+    transactions = generate_example_transactions(size)
+    for transaction in transactions:
+        transaction['id'] = str(uuid.uuid4())
+    ids = [t['id'] for t in transactions]
+
+    results = {}
+    backends = {
+        'json': (JSONStorage, os.path.join(workdir, f'transactions_{size}.json')),
+        'sqlite': (SQLiteStorage, os.path.join(workdir, f'transactions_{size}.db')),
+    }
+    for name, (backend, path) in backends.items():
+        storage = backend(path)
+        storage.clear()
+        start = time.perf_counter()
+        storage.insert_many(transactions)
+        print(f"→ {name}: {size:,} transactions chargées en {time.perf_counter() - start:.2f} s")
+        results[name] = benchmark_backend(DataManager(path, storage=storage), ids, repeats)
+        storage.close()
+    return results
+
+
+def main(argv: List[str] = None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark des moteurs de stockage")
+    parser.add_argument('--size', type=int, default=100_000, help='Nombre de transactions')
+    parser.add_argument('--ops', type=int, default=20, help='Répétitions par opération')
+    parser.add_argument('--workdir', default=None, help='Dossier des fichiers générés')
+    args = parser.parse_args(argv)
+
+    workdir = args.workdir or tempfile.mkdtemp(prefix='benchmark_budget_')
+    results = run_benchmark(args.size, args.ops, workdir)
+
+    print()
+    print(f"{'Moteur':<8} {'Opération':<12} {'Médiane (ms)':>13} {'p95 (ms)':>10} {'Max (ms)':>10}")
+    print("-" * 57)
+    for name, operations in results.items():
+        for operation, stats in operations.items():
+            print(f"{name:<8} {operation:<12} {stats['mediane_ms']:>13.2f} "
+                  f"{stats['p95_ms']:>10.2f} {stats['max_ms']:>10.2f}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -54,7 +54,8 @@ SEUIL_ALERTE_DANGER = 100   # Alerte à 100%
 
 # Chemins des fichiers
 DATA_DIR = "data"
-TRANSACTIONS_FILE = f"{DATA_DIR}/transactions.json"
+TRANSACTIONS_DB = f"{DATA_DIR}/transactions.db"  # Stockage principal (SQLite)
+TRANSACTIONS_FILE = f"{DATA_DIR}/transactions.json"  # Ancien stockage JSON (migré au démarrage)
 EXAMPLE_FILE = f"{DATA_DIR}/exemple_transactions.json"
 OUTPUTS_DIR = "outputs"
 
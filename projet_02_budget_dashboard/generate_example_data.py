@@ -1,151 +1,225 @@
 """
 Générateur de données exemple pour le dashboard
+Génération vectorisée (NumPy) : de 100 transactions de démonstration à
+plusieurs millions pour les tests de charge, écrites en JSON ou directement
+dans le stockage (SQLite) en une seule écriture
+
+Utilisation :
+    python generate_example_data.py                          # 100 transactions -> exemple JSON
+    python generate_example_data.py -n 1000000 --days 3650 --storage data/charge.db
 """
+import argparse
 import json
-import random
-from datetime import datetime, timedelta
-import uuid
+from datetime import datetime
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+
+# Catégories et montants typiques
+DEPENSES_CONFIG = {
+    " Alimentation": {"min": 5, "max": 150, "freq": 0.25},
+    " Logement": {"min": 500, "max": 1000, "freq": 0.05},
+    " Transport": {"min": 2, "max": 80, "freq": 0.15},
+    " Factures": {"min": 30, "max": 150, "freq": 0.08},
+    " Loisirs": {"min": 10, "max": 100, "freq": 0.15},
+    " Shopping": {"min": 20, "max": 200, "freq": 0.12},
+    " Santé": {"min": 15, "max": 80, "freq": 0.05},
+    " Éducation": {"min": 20, "max": 100, "freq": 0.05},
+    " Épargne": {"min": 100, "max": 500, "freq": 0.05},
+    " Autres": {"min": 10, "max": 100, "freq": 0.05}
+}
+
+REVENUS_CONFIG = {
+    " Salaire": {"min": 2000, "max": 3500, "freq": 0.7},
+    " Prime/Bonus": {"min": 200, "max": 1000, "freq": 0.1},
+    " Freelance": {"min": 150, "max": 800, "freq": 0.15},
+    " Investissements": {"min": 50, "max": 300, "freq": 0.03},
+    " Autres": {"min": 20, "max": 200, "freq": 0.02}
+}
+
+DESCRIPTIONS_DEPENSES = {
+    " Alimentation": ["Courses Carrefour", "Restaurant", "Boulangerie", "Marché", "Lidl", "Auchan"],
+    " Logement": ["Loyer", "Charges", "Assurance habitation"],
+    " Transport": ["Essence", "Ticket métro", "Uber", "Péage", "Parking"],
+    " Factures": ["EDF", "Internet Orange", "Téléphone", "Netflix", "Spotify"],
+    " Loisirs": ["Cinéma", "Concert", "Bar", "Restaurant", "Sport"],
+    " Shopping": ["Vêtements", "Chaussures", "Accessoires", "Amazon"],
+    " Santé": ["Pharmacie", "Médecin", "Dentiste", "Mutuelle"],
+    " Éducation": ["Livres", "Formation", "Cours en ligne"],
+    " Épargne": ["Livret A", "PEL", "Assurance-vie"],
+    " Autres": ["Cadeau", "Divers", "Frais bancaires"]
+}
+
+DESCRIPTIONS_REVENUS = {
+    " Salaire": ["Salaire mensuel", "Salaire"],
+    " Prime/Bonus": ["Prime annuelle", "Bonus performance", "13ème mois"],
+    " Freelance": ["Mission freelance", "Projet client", "Prestation"],
+    " Investissements": ["Dividendes", "Intérêts", "Plus-value"],
+    " Autres": ["Remboursement", "Vente occasion", "Autre revenu"]
+}
+
+MODES_PAIEMENT = [" Carte Bancaire", " Espèces", " Virement", " Mobile Payment", " Prélèvement Automatique"]
+
+# Saisonnalité des dépenses (janvier -> décembre) : volume et montants
+SAISONNALITE_DEPENSES = np.array([0.95, 0.85, 0.95, 1.0, 1.0, 1.05, 1.15, 1.15, 1.0, 0.95, 1.05, 1.3])
+
+# Part des dépenses / revenus
+PART_DEPENSES = 0.85
+
+
+def _random_uuids(rng: np.random.Generator, n: int) -> np.ndarray:
+    """UUID version 4 générés en bloc (formatage hexadécimal vectorisé)"""
+    raw = rng.integers(0, 256, size=(n, 16), dtype=np.uint8)
+    raw[:, 6] = (raw[:, 6] & 0x0F) | 0x40  # version 4
+    raw[:, 8] = (raw[:, 8] & 0x3F) | 0x80  # variante RFC 4122
+
+    hex_chars = np.frombuffer(b'0123456789abcdef', dtype=np.uint8)
+    digits = np.empty((n, 32), dtype=np.uint8)
+    digits[:, 0::2] = hex_chars[raw >> 4]
+    digits[:, 1::2] = hex_chars[raw & 0x0F]
 
-def generate_example_transactions(num_transactions: int = 100) -> list:
+    # Gabarit 8-4-4-4-12 : tirets aux positions 8, 13, 18 et 23
+    text = np.full((n, 36), ord('-'), dtype=np.uint8)
+    positions = [i for i in range(36) if i not in (8, 13, 18, 23)]
+    text[:, positions] = digits
+    return text.view('S36').ravel().astype(str)
+
+
+def _pick(rng: np.random.Generator, config: dict, descriptions: dict, n: int):
+    """Tire catégories, montants et descriptions selon les fréquences de la configuration"""
+    categories = np.array(list(config.keys()))
+    weights = np.array([c["freq"] for c in config.values()], dtype=float)
+    codes = rng.choice(len(categories), size=n, p=weights / weights.sum())
+
+    low = np.array([c["min"] for c in config.values()], dtype=float)[codes]
+    high = np.array([c["max"] for c in config.values()], dtype=float)[codes]
+    amounts = rng.uniform(low, high)
+
+    # Descriptions : listes concaténées, indexées par décalage de catégorie
+    lists = [descriptions[cat] for cat in categories]
+    flat = np.array([d for desc in lists for d in desc])
+    counts = np.array([len(desc) for desc in lists])
+    offsets = np.concatenate([[0], np.cumsum(counts)[:-1]])
+    desc_idx = offsets[codes] + (rng.random(n) * counts[codes]).astype(int)
+
+    return categories[codes], amounts, flat[desc_idx]
+
+
+def generate_transactions_frame(num_transactions: int = 100, days: int = 90,
+                                seed: Optional[int] = None,
+                                end_date: Optional[datetime] = None) -> pd.DataFrame:
     """
-    Génère des transactions exemple réalistes
+    Génère des transactions réalistes sous forme de DataFrame (vectorisé)
+
+    - 85% dépenses, catégories et montants selon leurs fréquences typiques
+    - dépenses saisonnières (plus nombreuses et plus élevées l'été et en décembre)
+    - salaire récurrent le 1er de chaque mois, autres revenus aléatoires
     """
-    
-    # Catégories et montants typiques
-    depenses_config = {
-        " Alimentation": {"min": 5, "max": 150, "freq": 0.25},
-        " Logement": {"min": 500, "max": 1000, "freq": 0.05},
-        " Transport": {"min": 2, "max": 80, "freq": 0.15},
-        " Factures": {"min": 30, "max": 150, "freq": 0.08},
-        " Loisirs": {"min": 10, "max": 100, "freq": 0.15},
-        " Shopping": {"min": 20, "max": 200, "freq": 0.12},
-        " Santé": {"min": 15, "max": 80, "freq": 0.05},
-        " Éducation": {"min": 20, "max": 100, "freq": 0.05},
-        " Épargne": {"min": 100, "max": 500, "freq": 0.05},
-        " Autres": {"min": 10, "max": 100, "freq": 0.05}
-    }
-    
-    revenus_config = {
-        " Salaire": {"min": 2000, "max": 3500, "freq": 0.7},
-        " Prime/Bonus": {"min": 200, "max": 1000, "freq": 0.1},
-        " Freelance": {"min": 150, "max": 800, "freq": 0.15},
-        " Investissements": {"min": 50, "max": 300, "freq": 0.03},
-        " Autres": {"min": 20, "max": 200, "freq": 0.02}
-    }
-    
-    descriptions_depenses = {
-        " Alimentation": ["Courses Carrefour", "Restaurant", "Boulangerie", "Marché", "Lidl", "Auchan"],
-        " Logement": ["Loyer", "Charges", "Assurance habitation"],
-        " Transport": ["Essence", "Ticket métro", "Uber", "Péage", "Parking"],
-        " Factures": ["EDF", "Internet Orange", "Téléphone", "Netflix", "Spotify"],
-        " Loisirs": ["Cinéma", "Concert", "Bar", "Restaurant", "Sport"],
-        " Shopping": ["Vêtements", "Chaussures", "Accessoires", "Amazon"],
-        " Santé": ["Pharmacie", "Médecin", "Dentiste", "Mutuelle"],
-        " Éducation": ["Livres", "Formation", "Cours en ligne"],
-        " Épargne": ["Livret A", "PEL", "Assurance-vie"],
-        " Autres": ["Cadeau", "Divers", "Frais bancaires"]
-    }
-    
-    descriptions_revenus = {
-        " Salaire": ["Salaire mensuel", "Salaire"],
-        " Prime/Bonus": ["Prime annuelle", "Bonus performance", "13ème mois"],
-        " Freelance": ["Mission freelance", "Projet client", "Prestation"],
-        " Investissements": ["Dividendes", "Intérêts", "Plus-value"],
-        " Autres": ["Remboursement", "Vente occasion", "Autre revenu"]
-    }
-    
-    modes_paiement = [" Carte Bancaire", " Espèces", " Virement", " Mobile Payment", " Prélèvement Automatique"]
-    
-    transactions = []
-    
-    # Générer des transactions sur les 90 derniers jours
-    start_date = datetime.now() - timedelta(days=90)
-    
-    # Calculer le nombre de dépenses et revenus
-    num_depenses = int(num_transactions * 0.85)  # 85% dépenses
+    rng = np.random.default_rng(seed)
+    end = pd.Timestamp(end_date or datetime.now()).normalize()
+    start = end - pd.Timedelta(days=days)
+    calendar_days = pd.date_range(start, end, freq='D')
+
+    num_depenses = int(num_transactions * PART_DEPENSES)
     num_revenus = num_transactions - num_depenses
-    
-    # Générer les dépenses
-    for _ in range(num_depenses):
-        # Choisir une catégorie selon la fréquence
-        categories = list(depenses_config.keys())
-        weights = [depenses_config[cat]["freq"] for cat in categories]
-        categorie = random.choices(categories, weights=weights)[0]
-        
-        config = depenses_config[categorie]
-        montant = round(random.uniform(config["min"], config["max"]), 2)
-        
-        # Date aléatoire
-        days_ago = random.randint(0, 90)
-        date = start_date + timedelta(days=days_ago)
-        
-        # Description
-        description = random.choice(descriptions_depenses[categorie])
-        
-        # Mode de paiement
-        mode = random.choice(modes_paiement)
-        
-        transaction = {
-            "id": str(uuid.uuid4()),
-            "date": date.strftime("%Y-%m-%d"),
-            "type": "depense",
-            "montant": montant,
-            "categorie": categorie,
-            "description": description,
-            "mode_paiement": mode,
-            "created_at": datetime.now().isoformat()
-        }
-        
-        transactions.append(transaction)
-    
-    # Générer les revenus
-    for _ in range(num_revenus):
-        # Choisir une catégorie selon la fréquence
-        categories = list(revenus_config.keys())
-        weights = [revenus_config[cat]["freq"] for cat in categories]
-        categorie = random.choices(categories, weights=weights)[0]
-        
-        config = revenus_config[categorie]
-        montant = round(random.uniform(config["min"], config["max"]), 2)
-        
-        # Date aléatoire (salaires plutôt en début de mois)
-        if categorie == " Salaire":
-            # Salaire au début du mois
-            month_offset = random.randint(0, 2)
-            date = datetime.now() - timedelta(days=30*month_offset)
-            date = date.replace(day=1)
-        else:
-            days_ago = random.randint(0, 90)
-            date = start_date + timedelta(days=days_ago)
-        
-        # Description
-        description = random.choice(descriptions_revenus[categorie])
-        
-        transaction = {
-            "id": str(uuid.uuid4()),
-            "date": date.strftime("%Y-%m-%d"),
-            "type": "revenu",
-            "montant": montant,
-            "categorie": categorie,
-            "description": description,
-            "mode_paiement": " Virement",
-            "created_at": datetime.now().isoformat()
-        }
-        
-        transactions.append(transaction)
-    
+
+    # Dépenses : jours tirés selon la saisonnalité, montants modulés par le mois
+    seasonality = SAISONNALITE_DEPENSES[calendar_days.month - 1]
+    day_idx = rng.choice(len(calendar_days), size=num_depenses, p=seasonality / seasonality.sum())
+    categories, amounts, descriptions = _pick(rng, DEPENSES_CONFIG, DESCRIPTIONS_DEPENSES, num_depenses)
+    depenses = pd.DataFrame({
+        'date': calendar_days[day_idx],
+        'type': 'depense',
+        'montant': amounts * seasonality[day_idx],
+        'categorie': categories,
+        'description': descriptions,
+        'mode_paiement': np.array(MODES_PAIEMENT)[rng.integers(0, len(MODES_PAIEMENT), num_depenses)],
+    })
+
+    # Salaires récurrents : le 1er de chaque mois, montant de base stable (+/- 3%)
+    month_starts = calendar_days[calendar_days.day == 1][-num_revenus:] if num_revenus else calendar_days[:0]
+    base_salary = rng.uniform(REVENUS_CONFIG[" Salaire"]["min"], REVENUS_CONFIG[" Salaire"]["max"])
+    salaires = pd.DataFrame({
+        'date': month_starts,
+        'type': 'revenu',
+        'montant': base_salary * rng.normal(1.0, 0.03, len(month_starts)),
+        'categorie': " Salaire",
+        'description': "Salaire mensuel",
+        'mode_paiement': " Virement",
+    })
+
+    # Autres revenus ponctuels
+    num_autres = num_revenus - len(salaires)
+    autres_config = {k: v for k, v in REVENUS_CONFIG.items() if k != " Salaire"}
+    categories, amounts, descriptions = _pick(rng, autres_config, DESCRIPTIONS_REVENUS, num_autres)
+    autres = pd.DataFrame({
+        'date': calendar_days[rng.integers(0, len(calendar_days), num_autres)],
+        'type': 'revenu',
+        'montant': amounts,
+        'categorie': categories,
+        'description': descriptions,
+        'mode_paiement': " Virement",
+    })
+
+    df = pd.concat([depenses, salaires, autres], ignore_index=True)
+    df['montant'] = df['montant'].round(2)
+    df['id'] = _random_uuids(rng, len(df))
+    df['created_at'] = datetime.now().isoformat()
+
     # Trier par date (plus récent en premier)
-    transactions.sort(key=lambda x: x["date"], reverse=True)
-    
-    return transactions
+    df = df.sort_values('date', ascending=False, kind='stable', ignore_index=True)
+    return df[['id', 'date', 'type', 'montant', 'categorie', 'description', 'mode_paiement', 'created_at']]
 
 
-if __name__ == "__main__":
+def generate_example_transactions(num_transactions: int = 100, days: int = 90,
+                                  seed: Optional[int] = None) -> list:
+    """
+    Génère des transactions exemple réalistes
+    Returns: Liste de dictionnaires (dates au format AAAA-MM-JJ)
+    """
+    df = generate_transactions_frame(num_transactions, days=days, seed=seed)
+    df['date'] = df['date'].dt.strftime("%Y-%m-%d")
+    return df.to_dict('records')
+
+
+def write_to_storage(df: pd.DataFrame, data_file: str) -> int:
+    """
+    Écrit les transactions générées dans un stockage en une seule écriture
+    Returns: Nombre de transactions écrites
+    """
+    from src.data_manager import DataManager
+
+    df = df.assign(date=df['date'].dt.strftime("%Y-%m-%d"))
+    return DataManager(data_file).add_transactions_frame(df)
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Génération de transactions exemple")
+    parser.add_argument('-n', '--num', type=int, default=100, help='Nombre de transactions')
+    parser.add_argument('--days', type=int, default=90, help='Nombre de jours couverts')
+    parser.add_argument('--seed', type=int, default=None, help='Graine aléatoire')
+    parser.add_argument('--output', default="data/exemple_transactions.json",
+                        help='Fichier JSON de sortie')
+    parser.add_argument('--storage', default=None,
+                        help='Écrire dans ce stockage (.db SQLite ou .json) au lieu du fichier exemple')
+    args = parser.parse_args(argv)
+
+    if args.storage:
+        df = generate_transactions_frame(args.num, days=args.days, seed=args.seed)
+        count = write_to_storage(df, args.storage)
+        print(f" {count} transactions écrites dans {args.storage}")
+        return 0
+
     # Générer et sauvegarder les données exemple
-    transactions = generate_example_transactions(100)
-    
-    output_file = "data/exemple_transactions.json"
-    with open(output_file, 'w', encoding='utf-8') as f:
+    transactions = generate_example_transactions(args.num, days=args.days, seed=args.seed)
+
+    with open(args.output, 'w', encoding='utf-8') as f:
         json.dump(transactions, f, indent=2, ensure_ascii=False)
-    
-    print(f" {len(transactions)} transactions générées dans {output_file}")
+
+    print(f" {len(transactions)} transactions générées dans {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
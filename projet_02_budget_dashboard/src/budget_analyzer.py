@@ -1,21 +1,107 @@
 """
 Analyseur de budget - Calculs et statistiques
+Toutes les vues sont des tranches d'un cube (jour, type, catégorie) calculé
+une seule fois par version des données (l'application le garde en cache par
+DataManager.data_version)
 """
 import pandas as pd
 from datetime import datetime, timedelta
-from typing import Dict, List, Tuple
+from typing import Dict, List, Optional
 import calendar
 
+
+def build_cube(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Agrège les transactions en un seul groupby (jour, type, catégorie)
+    Returns: DataFrame jour, type, categorie, montant, nombre, annee, mois
+    """
+    if df.empty:
+        return pd.DataFrame(columns=['jour', 'type', 'categorie', 'montant', 'nombre', 'annee', 'mois'])
+    
+    jour = df['date'].dt.normalize().rename('jour')
+    cube = (df.groupby([jour, 'type', 'categorie'], dropna=False, sort=True)['montant']
+              .agg(montant='sum', nombre='count')
+              .reset_index())
+    cube['annee'] = cube['jour'].dt.year
+    cube['mois'] = cube['jour'].dt.month
+    return cube
+
+
 class BudgetAnalyzer:
-    def __init__(self, df: pd.DataFrame):
+    def __init__(self, df: pd.DataFrame, cube: Optional[pd.DataFrame] = None):
         """
         Initialise l'analyseur avec un DataFrame de transactions
+        Un DataFrame déjà typé (ex: DataManager.get_transactions_dataframe)
+        est utilisé tel quel, sans copie : l'analyseur ne le modifie jamais
+        cube: agrégat déjà calculé pour ces transactions (build_cube, mis en cache par
+              l'appelant), sinon calculé à la demande et conservé par l'analyseur
         """
-        self.df = df.copy() if not df.empty else pd.DataFrame()
+        if df.empty:
+            self.df = pd.DataFrame()
+        elif self._is_typed(df):
+            self.df = df
+        else:
+            self.df = df.copy()
+            if 'date' in self.df.columns:
+                self.df['date'] = pd.to_datetime(self.df['date'])
+                self.df['montant'] = pd.to_numeric(self.df['montant'], errors='coerce')
+    
+        self._cube = cube
+    
+    @staticmethod
+    def _is_typed(df: pd.DataFrame) -> bool:
+        """Dates déjà en datetime et montants déjà numériques"""
+        return ('date' in df.columns and 'montant' in df.columns and
+                pd.api.types.is_datetime64_any_dtype(df['date']) and
+                pd.api.types.is_numeric_dtype(df['montant']))
+    
+    @property
+    def cube(self) -> pd.DataFrame:
+        """Agrégat (jour, type, catégorie) des transactions"""
+        if self._cube is None:
+            self._cube = build_cube(self.df)
+        return self._cube
+    
+    def filter_period(self, start: Optional[datetime] = None,
+                      end: Optional[datetime] = None) -> 'BudgetAnalyzer':
+        """
+        Analyseur restreint à une période (bornes incluses, au jour près)
+        Le cube est découpé, pas recalculé
+        """
+        if self.df.empty:
+            return self
+        
+        cube = self.cube
+        cube_mask = pd.Series(True, index=cube.index)
+        df_mask = pd.Series(True, index=self.df.index)
+        if start is not None:
+            start = pd.Timestamp(start).normalize()
+            cube_mask &= cube['jour'] >= start
+            df_mask &= self.df['date'] >= start
+        if end is not None:
+            end = pd.Timestamp(end).normalize()
+            cube_mask &= cube['jour'] <= end
+            df_mask &= self.df['date'].dt.normalize() <= end
+        
+        return BudgetAnalyzer(self.df[df_mask], cube=cube[cube_mask])
+    
+    @staticmethod
+    def _metrics_from_cube(cube: pd.DataFrame) -> Dict:
+        """Métriques principales à partir d'une tranche du cube"""
+        totals = cube.groupby('type')['montant'].sum()
+        revenus = totals.get('revenu', 0.0)
+        depenses = totals.get('depense', 0.0)
+        solde = revenus - depenses
+        economies = revenus - depenses
+        taux_epargne = (economies / revenus * 100) if revenus > 0 else 0
         
-        if not self.df.empty and 'date' in self.df.columns:
-            self.df['date'] = pd.to_datetime(self.df['date'])
-            self.df['montant'] = pd.to_numeric(self.df['montant'], errors='coerce')
+        return {
+            'solde': round(solde, 2),
+            'revenus': round(revenus, 2),
+            'depenses': round(depenses, 2),
+            'economies': round(economies, 2),
+            'taux_epargne': round(taux_epargne, 1)
+        }
     
     def get_summary_metrics(self) -> Dict:
         """
@@ -31,19 +117,7 @@ class BudgetAnalyzer:
                 'taux_epargne': 0.0
             }
         
-        revenus = self.df[self.df['type'] == 'revenu']['montant'].sum()
-        depenses = self.df[self.df['type'] == 'depense']['montant'].sum()
-        solde = revenus - depenses
-        economies = revenus - depenses
-        taux_epargne = (economies / revenus * 100) if revenus > 0 else 0
-        
-        return {
-            'solde': round(solde, 2),
-            'revenus': round(revenus, 2),
-            'depenses': round(depenses, 2),
-            'economies': round(economies, 2),
-            'taux_epargne': round(taux_epargne, 1)
-        }
+        return self._metrics_from_cube(self.cube)
     
     def get_monthly_summary(self, year: int = None, month: int = None) -> Dict:
         """
@@ -58,63 +132,47 @@ class BudgetAnalyzer:
             year = today.year
             month = today.month
         
-        # Filtrer par mois
-        df_month = self.df[
-            (self.df['date'].dt.year == year) & 
-            (self.df['date'].dt.month == month)
-        ]
+        # Tranche du mois dans le cube
+        cube = self.cube
+        cube_month = cube[(cube['annee'] == year) & (cube['mois'] == month)]
         
-        if df_month.empty:
+        if cube_month.empty:
             return self.get_summary_metrics()
         
-        analyzer = BudgetAnalyzer(df_month)
-        return analyzer.get_summary_metrics()
+        return self._metrics_from_cube(cube_month)
     
-    def get_spending_by_category(self) -> pd.DataFrame:
-        """
-        Dépenses regroupées par catégorie
-        Returns: DataFrame avec catégorie, montant, pourcentage
-        """
+    def _by_category(self, transaction_type: str) -> pd.DataFrame:
+        """Montants d'un type regroupés par catégorie, avec pourcentage du total"""
         if self.df.empty:
             return pd.DataFrame()
         
-        df_depenses = self.df[self.df['type'] == 'depense'].copy()
+        cube = self.cube
+        by_category = cube[cube['type'] == transaction_type].groupby('categorie')['montant'].sum()
         
-        if df_depenses.empty:
+        if by_category.empty:
             return pd.DataFrame()
         
-        category_spending = df_depenses.groupby('categorie')['montant'].sum().reset_index()
-        category_spending.columns = ['Catégorie', 'Montant']
-        
-        total = category_spending['Montant'].sum()
-        category_spending['Pourcentage'] = (category_spending['Montant'] / total * 100).round(1)
+        result = by_category.reset_index()
+        result.columns = ['Catégorie', 'Montant']
         
-        category_spending = category_spending.sort_values('Montant', ascending=False)
+        total = result['Montant'].sum()
+        result['Pourcentage'] = (result['Montant'] / total * 100).round(1)
         
-        return category_spending
+        return result.sort_values('Montant', ascending=False)
+    
+    def get_spending_by_category(self) -> pd.DataFrame:
+        """
+        Dépenses regroupées par catégorie
+        Returns: DataFrame avec catégorie, montant, pourcentage
+        """
+        return self._by_category('depense')
     
     def get_income_by_category(self) -> pd.DataFrame:
         """
         Revenus regroupés par catégorie
         Returns: DataFrame avec catégorie, montant, pourcentage
         """
-        if self.df.empty:
-            return pd.DataFrame()
-        
-        df_revenus = self.df[self.df['type'] == 'revenu'].copy()
-        
-        if df_revenus.empty:
-            return pd.DataFrame()
-        
-        category_income = df_revenus.groupby('categorie')['montant'].sum().reset_index()
-        category_income.columns = ['Catégorie', 'Montant']
-        
-        total = category_income['Montant'].sum()
-        category_income['Pourcentage'] = (category_income['Montant'] / total * 100).round(1)
-        
-        category_income = category_income.sort_values('Montant', ascending=False)
-        
-        return category_income
+        return self._by_category('revenu')
     
     def get_daily_trend(self) -> pd.DataFrame:
         """
@@ -123,20 +181,22 @@ class BudgetAnalyzer:
         if self.df.empty:
             return pd.DataFrame()
         
-        df_sorted = self.df.sort_values('date')
-        
-        # Créer des séries pour revenus et dépenses
-        df_revenus = df_sorted[df_sorted['type'] == 'revenu'][['date', 'montant']].copy()
-        df_depenses = df_sorted[df_sorted['type'] == 'depense'][['date', 'montant']].copy()
-        
-        df_revenus = df_revenus.groupby('date')['montant'].sum().cumsum().reset_index()
-        df_revenus.columns = ['Date', 'Revenus Cumulés']
-        
-        df_depenses = df_depenses.groupby('date')['montant'].sum().cumsum().reset_index()
-        df_depenses.columns = ['Date', 'Dépenses Cumulées']
+        cube = self.cube
+        cube = cube[cube['type'].isin(['revenu', 'depense'])]
+        if cube.empty:
+            return pd.DataFrame()
         
-        # Merge et remplir les valeurs manquantes
-        df_trend = pd.merge(df_revenus, df_depenses, on='Date', how='outer').ffill().fillna(0)
+        # Un jour sans transaction d'un type garde le cumul précédent
+        daily = (cube.groupby(['jour', 'type'])['montant'].sum()
+                     .unstack('type', fill_value=0)
+                     .reindex(columns=['revenu', 'depense'], fill_value=0)
+                     .cumsum())
+        
+        df_trend = pd.DataFrame({
+            'Date': daily.index,
+            'Revenus Cumulés': daily['revenu'].to_numpy(),
+            'Dépenses Cumulées': daily['depense'].to_numpy(),
+        })
         df_trend['Solde'] = df_trend['Revenus Cumulés'] - df_trend['Dépenses Cumulées']
         
         return df_trend
@@ -156,22 +216,17 @@ class BudgetAnalyzer:
         if spending.empty:
             return pd.DataFrame()
         
-        status_data = []
-        
-        for categorie, budget in budgets.items():
-            spent = spending[spending['Catégorie'] == categorie]['Montant'].sum()
-            remaining = budget - spent
-            percentage = (spent / budget * 100) if budget > 0 else 0
-            
-            status_data.append({
-                'Catégorie': categorie,
-                'Dépensé': round(spent, 2),
-                'Budget': budget,
-                'Restant': round(remaining, 2),
-                'Pourcentage': round(percentage, 1)
-            })
-        
-        df_status = pd.DataFrame(status_data)
+        budget = pd.Series(budgets)
+        spent = spending.set_index('Catégorie')['Montant'].reindex(budget.index, fill_value=0)
+        percentage = (spent / budget * 100).where(budget > 0, 0)
+        
+        df_status = pd.DataFrame({
+            'Catégorie': budget.index,
+            'Dépensé': spent.round(2).to_numpy(),
+            'Budget': budget.to_numpy(),
+            'Restant': (budget - spent).round(2).to_numpy(),
+            'Pourcentage': percentage.round(1).to_numpy()
+        })
         df_status = df_status.sort_values('Pourcentage', ascending=False)
         
         return df_status
@@ -194,20 +249,19 @@ class BudgetAnalyzer:
         if budget_status.empty:
             return []
         
-        alerts = []
+        danger = budget_status['Pourcentage'] >= danger_threshold
+        flagged = budget_status[danger | (budget_status['Pourcentage'] >= warning_threshold)]
         
-        for _, row in budget_status.iterrows():
-            percentage = row['Pourcentage']
-            categorie = row['Catégorie']
-            spent = row['Dépensé']
-            budget = row['Budget']
-            
-            if percentage >= danger_threshold:
+        alerts = []
+        for is_danger, categorie, spent, budget, percentage in zip(
+                danger[flagged.index], flagged['Catégorie'], flagged['Dépensé'],
+                flagged['Budget'], flagged['Pourcentage']):
+            if is_danger:
                 alerts.append({
                     'level': 'danger',
                     'message': f"Budget dépassé pour {categorie}: {spent}€ / {budget}€ ({percentage}%)"
                 })
-            elif percentage >= warning_threshold:
+            else:
                 alerts.append({
                     'level': 'warning',
                     'message': f"Attention {categorie}: {spent}€ / {budget}€ ({percentage}%)"
@@ -215,6 +269,169 @@ class BudgetAnalyzer:
         
         return alerts
     
+    def get_monthly_series(self, transaction_type: str = 'depense') -> pd.DataFrame:
+        """
+        Montants mensuels par catégorie sur tout l'historique (un seul regroupement)
+        Returns: DataFrame indexé par mois (1er du mois), une colonne par catégorie,
+        mois sans transaction à 0
+        """
+        if self.df.empty:
+            return pd.DataFrame()
+        
+        cube = self.cube
+        cube = cube[cube['type'] == transaction_type]
+        if cube.empty:
+            return pd.DataFrame()
+        
+        monthly = (cube.groupby([pd.Grouper(key='jour', freq='MS'), 'categorie'])['montant'].sum()
+                       .unstack('categorie', fill_value=0)
+                       .asfreq('MS', fill_value=0))
+        monthly.index.name = 'mois'
+        monthly.columns.name = None
+        return monthly
+    
+    def get_rolling_means(self, window: int = 3, transaction_type: str = 'depense') -> pd.DataFrame:
+        """
+        Moyennes mobiles mensuelles par catégorie
+        Args:
+            window: Nombre de mois de la fenêtre
+        """
+        return self.get_monthly_series(transaction_type).rolling(window, min_periods=1).mean()
+    
+    def get_month_over_month(self, transaction_type: str = 'depense',
+                             percent: bool = False) -> pd.DataFrame:
+        """
+        Variation d'un mois sur l'autre par catégorie
+        Args:
+            percent: Variation relative (%) plutôt qu'absolue (€) ; NaN si le mois précédent est à 0
+        """
+        monthly = self.get_monthly_series(transaction_type)
+        if not percent:
+            return monthly.diff()
+        previous = monthly.shift(1)
+        return (monthly - previous) / previous.where(previous != 0) * 100
+    
+    def get_category_trends(self, months: int = 12, window: int = 3,
+                            transaction_type: str = 'depense') -> pd.DataFrame:
+        """
+        Tendances des derniers mois par catégorie (format long, pour affichage)
+        Returns: DataFrame Mois, Catégorie, Montant, Moyenne mobile, Variation, Variation %
+        """
+        monthly = self.get_monthly_series(transaction_type)
+        if monthly.empty:
+            return pd.DataFrame()
+        
+        previous = monthly.shift(1)
+        metrics = {
+            'Montant': monthly,
+            'Moyenne mobile': monthly.rolling(window, min_periods=1).mean(),
+            'Variation': monthly - previous,
+            'Variation %': (monthly - previous) / previous.where(previous != 0) * 100,
+        }
+        trends = pd.concat({name: values.tail(months).stack() for name, values in metrics.items()},
+                           axis=1)
+        trends.index.names = ['Mois', 'Catégorie']
+        trends = trends.round(2).reset_index()
+        trends['Mois'] = trends['Mois'].dt.strftime('%Y-%m')
+        return trends
+    
+    def get_monthly_comparison(self, window: int = 3, months: Optional[int] = None) -> pd.DataFrame:
+        """
+        Revenus et dépenses mensuels avec moyennes mobiles
+        Format attendu par Visualizer.create_monthly_comparison_chart
+        Returns: DataFrame indexé par mois ('AAAA-MM'), colonnes revenu, depense,
+        revenu_moyenne, depense_moyenne
+        """
+        if self.df.empty:
+            return pd.DataFrame()
+        
+        cube = self.cube
+        cube = cube[cube['type'].isin(['revenu', 'depense'])]
+        if cube.empty:
+            return pd.DataFrame()
+        
+        monthly = (cube.groupby([pd.Grouper(key='jour', freq='MS'), 'type'])['montant'].sum()
+                       .unstack('type', fill_value=0)
+                       .reindex(columns=['revenu', 'depense'], fill_value=0)
+                       .asfreq('MS', fill_value=0))
+        rolling = monthly.rolling(window, min_periods=1).mean().add_suffix('_moyenne')
+        monthly = pd.concat([monthly, rolling], axis=1)
+        if months is not None:
+            monthly = monthly.tail(months)
+        monthly.index = monthly.index.strftime('%Y-%m')
+        monthly.index.name = 'YearMonth'
+        monthly.columns.name = None
+        return monthly
+    
+    def forecast_month_end(self, reference_date: Optional[datetime] = None,
+                           transaction_type: str = 'depense',
+                           baseline_months: int = 3) -> pd.DataFrame:
+        """
+        Prévision saisonnière du total de fin de mois par catégorie
+        
+        Prévision = montant déjà dépensé + part restante attendue de la référence
+        saisonnière, où :
+        - référence = moyenne des `baseline_months` derniers mois complets
+          x indice saisonnier du mois (moyenne du même mois calendaire / moyenne
+          de tous les mois, si l'historique couvre au moins un an) ;
+        - part restante = 1 - part habituellement dépensée à cette date du mois
+          (historique de la catégorie, prorata des jours à défaut).
+        
+        Args:
+            reference_date: Date d'arrêt (défaut: aujourd'hui)
+            transaction_type: 'depense' ou 'revenu'
+            baseline_months: Mois complets servant de référence
+        Returns: DataFrame Catégorie, Réalisé, Référence, Avancement attendu (%), Prévision
+        """
+        columns = ['Catégorie', 'Réalisé', 'Référence', 'Avancement attendu (%)', 'Prévision']
+        if self.df.empty:
+            return pd.DataFrame(columns=columns)
+        
+        reference = pd.Timestamp(reference_date or datetime.now()).normalize()
+        month_start = reference.replace(day=1)
+        day = reference.day
+        days_in_month = calendar.monthrange(reference.year, reference.month)[1]
+        
+        cube = self.cube
+        cube = cube[cube['type'] == transaction_type]
+        current = cube[(cube['jour'] >= month_start) & (cube['jour'] <= reference)]
+        realized = current.groupby('categorie')['montant'].sum()
+        
+        # Référence saisonnière sur les mois complets précédents
+        monthly = self.get_monthly_series(transaction_type)
+        if not monthly.empty:
+            monthly = monthly[monthly.index < month_start]
+        if monthly.empty:
+            baseline = pd.Series(dtype=float)
+        else:
+            baseline = monthly.tail(baseline_months).mean()
+            if len(monthly) >= 12:
+                overall = monthly.mean()
+                same_month = monthly[monthly.index.month == reference.month].mean()
+                seasonal_index = (same_month / overall.where(overall != 0)).fillna(1.0)
+                baseline = baseline * seasonal_index
+        
+        # Part habituellement dépensée au même jour du mois
+        history = cube[cube['jour'] < month_start]
+        month_totals = history.groupby('categorie')['montant'].sum()
+        to_date = history[history['jour'].dt.day <= day].groupby('categorie')['montant'].sum()
+        share = (to_date.reindex(month_totals.index, fill_value=0) /
+                 month_totals.where(month_totals > 0))
+        
+        categories = realized.index.union(baseline.index)
+        realized = realized.reindex(categories, fill_value=0.0)
+        baseline = baseline.reindex(categories, fill_value=0.0)
+        share = share.reindex(categories).fillna(day / days_in_month).clip(0, 1)
+        
+        forecast = pd.DataFrame({
+            'Catégorie': categories,
+            'Réalisé': realized.round(2).to_numpy(),
+            'Référence': baseline.round(2).to_numpy(),
+            'Avancement attendu (%)': (share * 100).round(1).to_numpy(),
+            'Prévision': (realized + (1 - share) * baseline).round(2).to_numpy(),
+        }, columns=columns)
+        return forecast.sort_values('Prévision', ascending=False).reset_index(drop=True)
+    
     def compare_periods(self, period1_df: pd.DataFrame, period2_df: pd.DataFrame) -> Dict:
         """
         Compare deux périodes (ex: mois actuel vs mois précédent)
@@ -245,7 +462,7 @@ class BudgetAnalyzer:
         if self.df.empty:
             return pd.DataFrame()
         
-        df_filtered = self.df[self.df['type'] == transaction_type].copy()
+        df_filtered = self.df[self.df['type'] == transaction_type]
         df_top = df_filtered.nlargest(n, 'montant')
         
         return df_top[['date', 'categorie', 'description', 'montant']]
@@ -1,45 +1,60 @@
 """
 Gestionnaire de données pour les transactions
-Gère le CRUD (Create, Read, Update, Delete) en JSON
+Gère le CRUD (Create, Read, Update, Delete) via un moteur de stockage
+(SQLite indexé par défaut, JSON pour les fichiers historiques)
 """
 import json
-import os
 from datetime import datetime
 from typing import List, Dict, Optional
 import uuid
 import pandas as pd
 
+from src.storage import StorageBackend, create_storage, migrate_json_to_storage
+
+# Import en bloc : nombre de transactions écrites par lot
+IMPORT_BATCH_SIZE = 10_000
+# Formats de date acceptés à l'import, essayés dans l'ordre (jour avant mois
+# pour les dates françaises) ; une date qui n'en suit aucun est invalide
+IMPORT_DATE_FORMATS = ('%Y-%m-%d', '%Y-%m-%d %H:%M:%S', '%d/%m/%Y', '%d-%m-%Y', '%d.%m.%Y')
+
 class DataManager:
-    def __init__(self, data_file: str):
+    def __init__(self, data_file: str, storage: Optional[StorageBackend] = None):
+        """
+        data_file: fichier de données (.json -> stockage JSON, sinon SQLite)
+        storage: moteur de stockage explicite (prioritaire sur data_file)
+        """
         self.data_file = data_file
-        self._ensure_file_exists()
+        self.storage = storage or create_storage(data_file)
+        # Incrémenté à chaque écriture : invalide le DataFrame en cache
+        self.version = 0
+        self._frame_cache = None  # (clé de version, DataFrame typé)
     
-    def _ensure_file_exists(self):
-        """Crée le fichier s'il n'existe pas"""
-        if not os.path.exists(self.data_file):
-            os.makedirs(os.path.dirname(self.data_file), exist_ok=True)
-            self._save_data([])
+    def _bump_version(self):
+        """Signale une modification des transactions"""
+        self.version += 1
     
-    def _load_data(self) -> List[Dict]:
-        """Charge les transactions depuis le JSON"""
-        try:
-            with open(self.data_file, 'r', encoding='utf-8') as f:
-                return json.load(f)
-        except (FileNotFoundError, json.JSONDecodeError):
-            return []
-    
-    def _save_data(self, data: List[Dict]):
-        """Sauvegarde les transactions dans le JSON"""
-        with open(self.data_file, 'w', encoding='utf-8') as f:
-            json.dump(data, f, indent=2, ensure_ascii=False)
+    def data_version(self) -> tuple:
+        """
+        Version des données : écritures de ce gestionnaire et modifications
+        faites ailleurs (autre session, autre processus) détectées par le stockage
+        """
+        return (self.version, self.storage.external_version())
+    
+    def migrate_from_json(self, json_file: str) -> int:
+        """
+        Importe une seule fois un ancien fichier JSON dans le stockage courant
+        Returns: Nombre de transactions migrées
+        """
+        imported = migrate_json_to_storage(json_file, self.storage)
+        if imported:
+            self._bump_version()
+        return imported
     
     def add_transaction(self, transaction: Dict) -> str:
         """
         Ajoute une nouvelle transaction
         Returns: ID de la transaction
         """
-        data = self._load_data()
-        
         # Générer un ID unique si non fourni
         if 'id' not in transaction:
             transaction['id'] = str(uuid.uuid4())
@@ -47,37 +62,38 @@ class DataManager:
         # Ajouter timestamp de création
         transaction['created_at'] = datetime.now().isoformat()
         
-        data.append(transaction)
-        self._save_data(data)
+        self.storage.insert(transaction)
+        self._bump_version()
         return transaction['id']
     
     def get_all_transactions(self) -> List[Dict]:
         """Récupère toutes les transactions"""
-        return self._load_data()
+        return self.storage.load_all()
+    
+    def count_transactions(self) -> int:
+        """Nombre de transactions enregistrées"""
+        return self.storage.count()
     
     def get_transaction(self, transaction_id: str) -> Optional[Dict]:
         """Récupère une transaction par ID"""
-        data = self._load_data()
-        for transaction in data:
-            if transaction.get('id') == transaction_id:
-                return transaction
-        return None
+        return self.storage.get(transaction_id)
     
     def update_transaction(self, transaction_id: str, updated_data: Dict) -> bool:
         """
         Met à jour une transaction
         Returns: True si succès, False sinon
         """
-        data = self._load_data()
-        for i, transaction in enumerate(data):
-            if transaction.get('id') == transaction_id:
-                # Garder l'ID et la date de création
-                updated_data['id'] = transaction_id
-                updated_data['created_at'] = transaction.get('created_at')
-                updated_data['updated_at'] = datetime.now().isoformat()
-                data[i] = updated_data
-                self._save_data(data)
-                return True
+        transaction = self.storage.get(transaction_id)
+        if transaction is None:
+            return False
+        
+        # Garder l'ID et la date de création
+        updated_data['id'] = transaction_id
+        updated_data['created_at'] = transaction.get('created_at')
+        updated_data['updated_at'] = datetime.now().isoformat()
+        if self.storage.replace(transaction_id, updated_data):
+            self._bump_version()
+            return True
         return False
     
     def delete_transaction(self, transaction_id: str) -> bool:
@@ -85,22 +101,33 @@ class DataManager:
         Supprime une transaction
         Returns: True si succès, False sinon
         """
-        data = self._load_data()
-        initial_length = len(data)
-        data = [t for t in data if t.get('id') != transaction_id]
-        
-        if len(data) < initial_length:
-            self._save_data(data)
+        if self.storage.delete(transaction_id):
+            self._bump_version()
             return True
         return False
     
     def get_transactions_dataframe(self) -> pd.DataFrame:
-        """Retourne les transactions sous forme de DataFrame Pandas"""
-        data = self._load_data()
-        if not data:
-            return pd.DataFrame()
+        """
+        Retourne les transactions sous forme de DataFrame Pandas
+        (dates et montants typés, tri par date décroissante)
         
-        df = pd.DataFrame(data)
+        Le DataFrame est mis en cache par version des données : tant qu'aucune
+        écriture n'a eu lieu, le même objet est renvoyé. Il ne doit pas être
+        modifié sur place (filtrer ou copier avant toute modification).
+        """
+        version = self.data_version()
+        if self._frame_cache is not None and self._frame_cache[0] == version:
+            return self._frame_cache[1]
+        
+        df = self._load_typed_dataframe()
+        self._frame_cache = (version, df)
+        return df
+    
+    def _load_typed_dataframe(self) -> pd.DataFrame:
+        """Lit les transactions et convertit les types"""
+        df = self.storage.load_dataframe()
+        if df.empty:
+            return pd.DataFrame()
         
         # Convertir la date en datetime
         if 'date' in df.columns:
@@ -113,32 +140,116 @@ class DataManager:
         
         return df
     
-    def import_from_csv(self, csv_file_path: str) -> int:
+    def add_transactions(self, transactions: List[Dict]) -> List[str]:
+        """
+        Ajoute plusieurs transactions en une seule écriture
+        Returns: IDs des transactions
+        """
+        created_at = datetime.now().isoformat()
+        for transaction in transactions:
+            transaction.setdefault('id', str(uuid.uuid4()))
+            transaction['created_at'] = created_at
+        
+        for start in range(0, len(transactions), IMPORT_BATCH_SIZE):
+            self.storage.insert_many(transactions[start:start + IMPORT_BATCH_SIZE])
+        if transactions:
+            self._bump_version()
+        return [t['id'] for t in transactions]
+    
+    def add_transactions_frame(self, df: pd.DataFrame) -> int:
+        """
+        Ajoute des transactions déjà complètes (id, created_at...) depuis un DataFrame
+        Returns: Nombre de transactions ajoutées
+        """
+        count = self.storage.insert_frame(df)
+        if count:
+            self._bump_version()
+        return count
+    
+    @staticmethod
+    def _parse_dates(values: pd.Series) -> pd.Series:
+        """
+        Dates d'import selon IMPORT_DATE_FORMATS ("05/01/2024" = 5 janvier)
+        Returns: Série datetime, NaT pour une date illisible ou d'un autre format
+        """
+        if pd.api.types.is_datetime64_any_dtype(values):
+            return values
+        text = values.astype(str).str.strip()
+        dates = pd.Series(pd.NaT, index=values.index, dtype='datetime64[ns]')
+        for date_format in IMPORT_DATE_FORMATS:
+            missing = dates.isna()
+            if not missing.any():
+                break
+            dates[missing] = pd.to_datetime(text[missing], errors='coerce', format=date_format)
+        return dates
+    
+    @staticmethod
+    def _duplicate_keys(df: pd.DataFrame) -> pd.Series:
+        """Empreinte (date, montant, description) de chaque transaction"""
+        # float64 partout : un montant entier du CSV (int64) doit avoir la même
+        # empreinte que le même montant relu depuis le stockage (10 == 10.0)
+        keys = pd.DataFrame({
+            'date': DataManager._parse_dates(df['date']).dt.strftime('%Y-%m-%d'),
+            'montant': pd.to_numeric(df['montant'], errors='coerce').astype('float64').round(2),
+            'description': df['description'].fillna('').astype(str).str.strip()
+                           if 'description' in df.columns else '',
+        }, index=df.index)
+        return pd.util.hash_pandas_object(keys, index=False)
+    
+    def import_dataframe(self, df: pd.DataFrame, skip_duplicates: bool = True) -> Dict:
+        """
+        Importe en bloc des transactions depuis un DataFrame
+        Validation et normalisation vectorisées, écriture par lots
+        Returns: {'importees', 'doublons', 'invalides'}
+        """
+        required_columns = ['date', 'type', 'montant', 'categorie']
+        missing = [col for col in required_columns if col not in df.columns]
+        if missing:
+            raise ValueError(f"Le CSV doit contenir les colonnes: {required_columns}")
+        
+        dates = self._parse_dates(df['date'])
+        montants = pd.to_numeric(df['montant'], errors='coerce').astype('float64')
+        types = df['type'].astype(str).str.strip().str.lower()
+        clean = pd.DataFrame({
+            'date': dates.dt.strftime('%Y-%m-%d'),
+            'type': types,
+            'montant': montants.round(2),
+            'categorie': df['categorie'].astype(str).str.strip(),
+            'description': df['description'].fillna('').astype(str).str.strip()
+                           if 'description' in df.columns else '',
+            'mode_paiement': df['mode_paiement'].fillna('Carte Bancaire').astype(str).str.strip()
+                             if 'mode_paiement' in df.columns else 'Carte Bancaire',
+        }, index=df.index)
+        
+        # Lignes invalides : date illisible ou ambiguë (hors formats acceptés),
+        # montant illisible, type inconnu
+        valid = dates.notna() & montants.notna() & types.isin(['depense', 'revenu'])
+        invalid_count = int((~valid).sum())
+        clean = clean[valid]
+        
+        duplicate_count = 0
+        if skip_duplicates and len(clean):
+            existing = self.storage.load_columns(['date', 'montant', 'description'])
+            if not existing.empty:
+                existing_counts = self._duplicate_keys(existing).value_counts()
+                keys = self._duplicate_keys(clean)
+                # Une ligne répétée dans le fichier n'est doublon qu'au-delà des occurrences existantes
+                occurrence = keys.groupby(keys).cumcount()
+                duplicated = occurrence < keys.map(existing_counts).fillna(0)
+                duplicate_count = int(duplicated.sum())
+                clean = clean[~duplicated]
+        
+        self.add_transactions(clean.to_dict('records'))
+        return {'importees': len(clean), 'doublons': duplicate_count, 'invalides': invalid_count}
+    
+    def import_from_csv(self, csv_file_path: str, skip_duplicates: bool = True) -> Dict:
         """
-        Importe des transactions depuis un CSV
-        Returns: Nombre de transactions importées
+        Importe des transactions depuis un CSV (import en bloc)
+        Returns: {'importees', 'doublons', 'invalides'} (voir import_dataframe)
         """
         try:
             df = pd.read_csv(csv_file_path)
-            required_columns = ['date', 'type', 'montant', 'categorie']
-            
-            if not all(col in df.columns for col in required_columns):
-                raise ValueError(f"Le CSV doit contenir les colonnes: {required_columns}")
-            
-            count = 0
-            for _, row in df.iterrows():
-                transaction = {
-                    'date': str(row['date']),
-                    'type': str(row['type']),
-                    'montant': float(row['montant']),
-                    'categorie': str(row['categorie']),
-                    'description': str(row.get('description', '')),
-                    'mode_paiement': str(row.get('mode_paiement', 'Carte Bancaire'))
-                }
-                self.add_transaction(transaction)
-                count += 1
-            
-            return count
+            return self.import_dataframe(df, skip_duplicates=skip_duplicates)
         except Exception as e:
             raise Exception(f"Erreur lors de l'import CSV: {str(e)}")
     
@@ -163,12 +274,13 @@ class DataManager:
         Exporte les transactions vers un JSON
         Returns: Chemin du fichier créé
         """
-        data = self._load_data()
+        data = self.storage.load_all()
         with open(output_path, 'w', encoding='utf-8') as f:
             json.dump(data, f, indent=2, ensure_ascii=False)
         return output_path
     
     def clear_all_transactions(self) -> bool:
         """Supprime toutes les transactions"""
-        self._save_data([])
+        self.storage.clear()
+        self._bump_version()
         return True
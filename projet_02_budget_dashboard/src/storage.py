@@ -0,0 +1,344 @@
+"""
+Moteurs de stockage des transactions
+SQLite indexé (par défaut) ou fichier JSON (historique), derrière une même interface
+"""
+import json
+import os
+import sqlite3
+import threading
+import uuid
+from abc import ABC, abstractmethod
+from typing import Dict, List, Optional
+
+import pandas as pd
+
+# Champs stockés dans des colonnes dédiées ; les autres clés vont dans 'extra'
+TRANSACTION_FIELDS = [
+    'id', 'date', 'type', 'montant', 'categorie', 'description',
+    'mode_paiement', 'created_at', 'updated_at'
+]
+
+
+class StorageBackend(ABC):
+    """
+    Interface commune des moteurs de stockage
+    Un moteur qui n'implémente pas toutes les méthodes abstraites ne peut pas être instancié
+    """
+
+    @abstractmethod
+    def load_all(self) -> List[Dict]:
+        """Toutes les transactions, dans l'ordre d'insertion"""
+
+    @abstractmethod
+    def get(self, transaction_id: str) -> Optional[Dict]:
+        """Une transaction par ID (None si absente)"""
+
+    def insert(self, transaction: Dict) -> None:
+        """Ajoute une transaction"""
+        self.insert_many([transaction])
+
+    @abstractmethod
+    def insert_many(self, transactions: List[Dict]) -> int:
+        """Ajoute plusieurs transactions en une écriture ; retourne le nombre ajouté"""
+
+    def insert_frame(self, df: pd.DataFrame) -> int:
+        """Ajoute les transactions d'un DataFrame (colonnes = champs) en une écriture"""
+        return self.insert_many(df.to_dict('records'))
+
+    @abstractmethod
+    def replace(self, transaction_id: str, transaction: Dict) -> bool:
+        """Remplace une transaction existante ; False si absente"""
+
+    @abstractmethod
+    def delete(self, transaction_id: str) -> bool:
+        """Supprime une transaction ; False si absente"""
+
+    @abstractmethod
+    def clear(self) -> None:
+        """Supprime toutes les transactions"""
+
+    def count(self) -> int:
+        """Nombre de transactions"""
+        return len(self.load_all())
+
+    def load_dataframe(self) -> pd.DataFrame:
+        """Transactions sous forme de DataFrame brut (types non convertis)"""
+        return pd.DataFrame(self.load_all())
+
+    def load_columns(self, columns: List[str]) -> pd.DataFrame:
+        """Quelques champs de toutes les transactions (colonnes absentes -> None)"""
+        return self.load_dataframe().reindex(columns=columns)
+
+    def external_version(self):
+        """
+        Marqueur changeant quand les données sont modifiées hors de ce moteur
+        (None = non détectable)
+        """
+        return None
+
+    def close(self) -> None:
+        """Libère les ressources du moteur"""
+
+
+class JSONStorage(StorageBackend):
+    """
+    Stockage dans un fichier JSON unique (comportement historique)
+    Chaque écriture relit et réécrit le fichier complet : O(n) par opération
+    """
+
+    def __init__(self, data_file: str):
+        self.data_file = data_file
+        if not os.path.exists(self.data_file):
+            os.makedirs(os.path.dirname(self.data_file) or '.', exist_ok=True)
+            self._save_data([])
+
+    def _load_data(self) -> List[Dict]:
+        """Charge les transactions depuis le JSON"""
+        try:
+            with open(self.data_file, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return []
+
+    def _save_data(self, data: List[Dict]):
+        """Sauvegarde les transactions dans le JSON"""
+        with open(self.data_file, 'w', encoding='utf-8') as f:
+            json.dump(data, f, indent=2, ensure_ascii=False)
+
+    def load_all(self) -> List[Dict]:
+        return self._load_data()
+
+    def get(self, transaction_id: str) -> Optional[Dict]:
+        for transaction in self._load_data():
+            if transaction.get('id') == transaction_id:
+                return transaction
+        return None
+
+    def insert_many(self, transactions: List[Dict]) -> int:
+        data = self._load_data()
+        data.extend(transactions)
+        self._save_data(data)
+        return len(transactions)
+
+    def replace(self, transaction_id: str, transaction: Dict) -> bool:
+        data = self._load_data()
+        for i, existing in enumerate(data):
+            if existing.get('id') == transaction_id:
+                data[i] = transaction
+                self._save_data(data)
+                return True
+        return False
+
+    def delete(self, transaction_id: str) -> bool:
+        data = self._load_data()
+        remaining = [t for t in data if t.get('id') != transaction_id]
+        if len(remaining) < len(data):
+            self._save_data(remaining)
+            return True
+        return False
+
+    def clear(self) -> None:
+        self._save_data([])
+
+    def external_version(self):
+        """Date de modification du fichier (ns)"""
+        try:
+            return os.stat(self.data_file).st_mtime_ns
+        except OSError:
+            return None
+
+
+class SQLiteStorage(StorageBackend):
+    """
+    Stockage SQLite : une ligne par transaction, index sur date, catégorie et type
+    Chaque opération ne touche que les lignes concernées (journal WAL)
+    """
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS transactions (
+            id TEXT PRIMARY KEY,
+            date TEXT,
+            type TEXT,
+            montant REAL,
+            categorie TEXT,
+            description TEXT,
+            mode_paiement TEXT,
+            created_at TEXT,
+            updated_at TEXT,
+            extra TEXT
+        );
+        CREATE INDEX IF NOT EXISTS idx_transactions_date ON transactions(date);
+        CREATE INDEX IF NOT EXISTS idx_transactions_categorie ON transactions(categorie);
+        CREATE INDEX IF NOT EXISTS idx_transactions_type ON transactions(type);
+    """
+
+    def __init__(self, db_file: str):
+        self.db_file = db_file
+        os.makedirs(os.path.dirname(self.db_file) or '.', exist_ok=True)
+        # Connexion partagée entre les reruns Streamlit (threads différents) : accès sérialisé
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.db_file, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        with self._lock, self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.executescript(self.SCHEMA)
+
+    @staticmethod
+    def _to_row(transaction: Dict) -> tuple:
+        """Transaction -> valeurs des colonnes (clés inconnues sérialisées dans 'extra')"""
+        extra = {k: v for k, v in transaction.items() if k not in TRANSACTION_FIELDS}
+        values = [transaction.get(field) for field in TRANSACTION_FIELDS]
+        values.append(json.dumps(extra, ensure_ascii=False) if extra else None)
+        return tuple(values)
+
+    @staticmethod
+    def _from_row(row: sqlite3.Row) -> Dict:
+        """Ligne SQLite -> transaction (champs absents omis, comme dans le JSON)"""
+        transaction = {field: row[field] for field in TRANSACTION_FIELDS if row[field] is not None}
+        if row['extra']:
+            transaction.update(json.loads(row['extra']))
+        return transaction
+
+    def _insert_sql(self, ignore_existing: bool = False) -> str:
+        columns = TRANSACTION_FIELDS + ['extra']
+        verb = "INSERT OR IGNORE" if ignore_existing else "INSERT"
+        return (f"{verb} INTO transactions ({', '.join(columns)}) "
+                f"VALUES ({', '.join('?' * len(columns))})")
+
+    def load_all(self) -> List[Dict]:
+        with self._lock:
+            rows = self._conn.execute("SELECT * FROM transactions ORDER BY rowid").fetchall()
+        return [self._from_row(row) for row in rows]
+
+    def get(self, transaction_id: str) -> Optional[Dict]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT * FROM transactions WHERE id = ?", (transaction_id,)
+            ).fetchone()
+        return self._from_row(row) if row is not None else None
+
+    def insert_many(self, transactions: List[Dict], ignore_existing: bool = False) -> int:
+        """
+        Ajoute plusieurs transactions dans une seule transaction SQL
+        ignore_existing: ignorer les ID déjà présents (migration rejouable)
+        """
+        with self._lock, self._conn:
+            before = self._conn.total_changes
+            self._conn.executemany(self._insert_sql(ignore_existing),
+                                   (self._to_row(t) for t in transactions))
+            return self._conn.total_changes - before
+
+    def insert_frame(self, df: pd.DataFrame) -> int:
+        """Insertion directe des colonnes, sans dictionnaire intermédiaire par ligne"""
+        extra_columns = [col for col in df.columns if col not in TRANSACTION_FIELDS]
+        if extra_columns:
+            return super().insert_frame(df)
+
+        n_rows = len(df)
+        columns = [df[field].to_numpy(dtype=object) if field in df.columns else [None] * n_rows
+                   for field in TRANSACTION_FIELDS]
+        columns.append([None] * n_rows)  # extra
+        with self._lock, self._conn:
+            before = self._conn.total_changes
+            self._conn.executemany(self._insert_sql(), zip(*columns))
+            return self._conn.total_changes - before
+
+    def replace(self, transaction_id: str, transaction: Dict) -> bool:
+        columns = TRANSACTION_FIELDS[1:] + ['extra']
+        values = self._to_row(transaction)[1:]
+        with self._lock, self._conn:
+            cursor = self._conn.execute(
+                f"UPDATE transactions SET {', '.join(f'{c} = ?' for c in columns)} WHERE id = ?",
+                (*values, transaction_id)
+            )
+        return cursor.rowcount > 0
+
+    def delete(self, transaction_id: str) -> bool:
+        with self._lock, self._conn:
+            cursor = self._conn.execute("DELETE FROM transactions WHERE id = ?", (transaction_id,))
+        return cursor.rowcount > 0
+
+    def clear(self) -> None:
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM transactions")
+
+    def count(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM transactions").fetchone()[0]
+
+    def external_version(self):
+        """PRAGMA data_version : change quand une autre connexion valide une écriture"""
+        with self._lock:
+            return self._conn.execute("PRAGMA data_version").fetchone()[0]
+
+    def load_dataframe(self) -> pd.DataFrame:
+        """Lecture directe en DataFrame, sans passer par des dictionnaires"""
+        with self._lock:
+            df = pd.read_sql_query("SELECT * FROM transactions ORDER BY rowid", self._conn)
+        if df.empty:
+            return pd.DataFrame()
+
+        extra = df.pop('extra')
+        if extra.notna().any():
+            extra_df = pd.DataFrame([json.loads(e) if e else {} for e in extra], index=df.index)
+            df = df.join(extra_df)
+        # Colonnes jamais renseignées (ex: updated_at) absentes, comme avec le JSON
+        return df.dropna(axis=1, how='all')
+
+    def load_columns(self, columns: List[str]) -> pd.DataFrame:
+        """Lecture des seules colonnes demandées (champs dédiés uniquement)"""
+        unknown = [col for col in columns if col not in TRANSACTION_FIELDS]
+        if unknown:
+            return super().load_columns(columns)
+        with self._lock:
+            return pd.read_sql_query(
+                f"SELECT {', '.join(columns)} FROM transactions ORDER BY rowid", self._conn
+            )
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+def create_storage(path: str) -> StorageBackend:
+    """
+    Choisit le moteur d'après l'extension du fichier
+    .json -> JSONStorage, sinon SQLiteStorage
+    """
+    if path.lower().endswith('.json'):
+        return JSONStorage(path)
+    return SQLiteStorage(path)
+
+
+def migrate_json_to_storage(json_file: str, storage: StorageBackend,
+                            archive: bool = True) -> int:
+    """
+    Migration unique d'un fichier JSON historique vers un moteur de stockage
+    Les transactions sans ID en reçoivent un ; le fichier est renommé en .migrated
+    Returns: Nombre de transactions importées
+    """
+    if not os.path.exists(json_file):
+        return 0
+    if isinstance(storage, JSONStorage) and \
+       os.path.abspath(storage.data_file) == os.path.abspath(json_file):
+        return 0
+
+    with open(json_file, 'r', encoding='utf-8') as f:
+        try:
+            data = json.load(f)
+        except json.JSONDecodeError:
+            data = []
+
+    for transaction in data:
+        transaction.setdefault('id', str(uuid.uuid4()))
+
+    if isinstance(storage, SQLiteStorage):
+        imported = storage.insert_many(data, ignore_existing=True)
+    else:
+        existing = {t.get('id') for t in storage.load_all()}
+        imported = storage.insert_many([t for t in data if t['id'] not in existing])
+
+    if archive:
+        os.replace(json_file, f"{json_file}.migrated")
+    return imported
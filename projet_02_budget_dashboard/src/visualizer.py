@@ -237,6 +237,9 @@ class Visualizer:
                                        title: str = "Comparaison Mensuelle") -> go.Figure:
         """
         Crée un graphique de comparaison mensuelle
+        df: transactions brutes (colonnes date, type, montant) ou totaux mensuels
+        déjà agrégés (BudgetAnalyzer.get_monthly_comparison : index mois,
+        colonnes revenu/depense et moyennes mobiles optionnelles)
         """
         if df.empty:
             fig = go.Figure()
@@ -248,16 +251,15 @@ class Visualizer:
             )
             return fig
         
-        # Copier pour éviter les modifications
-        df = df.copy()
-        
-        # Grouper par mois et type
-        df['YearMonth'] = pd.to_datetime(df['date']).dt.to_period('M').astype(str)
-        
-        monthly = df.groupby(['YearMonth', 'type'])['montant'].sum().reset_index()
-        
-        # Pivoter pour avoir revenus et dépenses en colonnes
-        monthly_pivot = monthly.pivot(index='YearMonth', columns='type', values='montant').fillna(0)
+        if 'date' in df.columns:
+            # Grouper par mois et type (sans copier les transactions)
+            year_month = pd.to_datetime(df['date']).dt.to_period('M').astype(str).rename('YearMonth')
+            monthly = df.groupby([year_month, 'type'])['montant'].sum().reset_index()
+            
+            # Pivoter pour avoir revenus et dépenses en colonnes
+            monthly_pivot = monthly.pivot(index='YearMonth', columns='type', values='montant').fillna(0)
+        else:
+            monthly_pivot = df
         
         fig = go.Figure()
         
@@ -283,6 +285,18 @@ class Visualizer:
                 textposition='outside'
             ))
         
+        # Moyennes mobiles (totaux pré-agrégés)
+        for column, name, color in [('revenu_moyenne', 'Revenus (moyenne mobile)', self.colors['revenus']),
+                                    ('depense_moyenne', 'Dépenses (moyenne mobile)', self.colors['depenses'])]:
+            if column in monthly_pivot.columns:
+                fig.add_trace(go.Scatter(
+                    x=monthly_pivot.index,
+                    y=monthly_pivot[column],
+                    name=name,
+                    mode='lines+markers',
+                    line=dict(color=color, dash='dash')
+                ))
+        
         fig.update_layout(
             title=title,
             xaxis_title="Mois",
@@ -0,0 +1,195 @@
+"""
+Tests de l'analyseur de budget : cube (jour, type, catégorie), périodes,
+tendances mensuelles et prévision de fin de mois
+"""
+
+import sys
+import os
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, project_root)
+
+from src.budget_analyzer import BudgetAnalyzer, build_cube
+
+
+def _transactions(rows) -> pd.DataFrame:
+    """DataFrame typé à partir de tuples (date, type, montant, catégorie)"""
+    return pd.DataFrame({
+        'date': pd.to_datetime([row[0] for row in rows]),
+        'type': [row[1] for row in rows],
+        'montant': [float(row[2]) for row in rows],
+        'categorie': [row[3] for row in rows],
+    })
+
+
+TRANSACTIONS = _transactions([
+    ('2024-01-05 09:30', 'depense', 10, 'Alimentation'),
+    ('2024-01-05 18:00', 'depense', 5.5, 'Alimentation'),
+    ('2024-01-05 12:00', 'depense', 40, 'Transport'),
+    ('2024-01-06 08:00', 'revenu', 1500, 'Salaire'),
+    ('2024-01-31 23:00', 'depense', 20, 'Loisirs'),
+    ('2024-02-01 10:00', 'depense', 30, 'Alimentation'),
+])
+
+
+def test_cube_aggregates_by_day_type_and_category():
+    """Une ligne par (jour, type, catégorie), montants sommés et transactions comptées"""
+    cube = build_cube(TRANSACTIONS)
+
+    assert len(cube) == 5
+    food = cube[(cube['jour'] == '2024-01-05') & (cube['categorie'] == 'Alimentation')].iloc[0]
+    assert food['montant'] == 15.5
+    assert food['nombre'] == 2
+    assert set(cube.loc[cube['jour'] == '2024-02-01', ['annee', 'mois']].itertuples(index=False)) == {(2024, 2)}
+    assert build_cube(pd.DataFrame()).empty
+
+
+def test_cube_is_computed_once_and_reused():
+    """Le cube est calculé à la première demande et conservé ; un cube fourni est utilisé tel quel"""
+    analyzer = BudgetAnalyzer(TRANSACTIONS)
+    cube = analyzer.cube
+    assert analyzer.cube is cube
+
+    given = build_cube(TRANSACTIONS)
+    assert BudgetAnalyzer(TRANSACTIONS, cube=given).cube is given
+
+
+def test_filter_period_includes_whole_start_and_end_days():
+    """Bornes incluses au jour près, même avec une heure : le cube est découpé comme les transactions"""
+    analyzer = BudgetAnalyzer(TRANSACTIONS)
+    january = analyzer.filter_period(datetime(2024, 1, 5, 15, 0), datetime(2024, 1, 31, 8, 0))
+
+    assert len(january.df) == 5
+    assert january.cube['montant'].sum() == january.df['montant'].sum() == 1575.5
+    assert january.get_summary_metrics() == BudgetAnalyzer(TRANSACTIONS.iloc[:5]).get_summary_metrics()
+
+    assert len(analyzer.filter_period(start=datetime(2024, 2, 1, 23, 59)).df) == 1
+    assert len(analyzer.filter_period(end=datetime(2024, 1, 5)).df) == 3
+
+
+# Alimentation : 100 le 5 et 200 le 20 de janvier à mars ; Transport : 60 le 15 janvier
+HISTORY = [
+    (f'2024-{month:02d}-{day:02d}', 'depense', amount, 'Alimentation')
+    for month in (1, 2, 3) for day, amount in ((5, 100), (20, 200))
+] + [('2024-01-15', 'depense', 60, 'Transport'), ('2024-02-01', 'revenu', 2000, 'Salaire')]
+
+
+def _forecast(rows, reference) -> pd.DataFrame:
+    return BudgetAnalyzer(_transactions(rows)).forecast_month_end(reference).set_index('Catégorie')
+
+
+def test_forecast_with_short_history_and_new_category():
+    """Moins de 12 mois : référence = moyenne des 3 derniers mois, sans saisonnalité ;
+    catégorie sans historique : prorata des jours, référence nulle"""
+    forecast = _forecast(HISTORY + [('2024-04-03', 'depense', 50, 'Alimentation'),
+                                    ('2024-04-08', 'depense', 80, 'Cadeaux')],
+                         datetime(2024, 4, 10))
+
+    food = forecast.loc['Alimentation']
+    assert food['Réalisé'] == 50
+    assert food['Référence'] == 300
+    assert food['Avancement attendu (%)'] == 33.3  # 100 sur 300 habituellement dépensés au 10
+    assert food['Prévision'] == 250
+
+    gift = forecast.loc['Cadeaux']
+    assert gift['Référence'] == 0
+    assert gift['Avancement attendu (%)'] == 33.3  # 10 jours sur 30
+    assert gift['Prévision'] == 80
+
+    # Catégorie sans dépense ce mois-ci : toute la référence reste à venir
+    transport = forecast.loc['Transport']
+    assert transport['Réalisé'] == 0
+    assert transport['Référence'] == 20
+    assert transport['Prévision'] == 20
+    assert 'Salaire' not in forecast.index
+
+
+def test_forecast_on_first_and_last_day_of_month():
+    """Le 1er, toute la référence reste à venir ; le dernier jour, la prévision est le réalisé"""
+    rows = HISTORY + [('2024-04-01', 'depense', 10, 'Alimentation'),
+                      ('2024-04-01', 'depense', 15, 'Cadeaux')]
+
+    first_day = _forecast(rows, datetime(2024, 4, 1))
+    assert first_day.loc['Alimentation', 'Avancement attendu (%)'] == 0
+    assert first_day.loc['Alimentation', 'Prévision'] == 310
+    assert first_day.loc['Cadeaux', 'Avancement attendu (%)'] == 3.3  # 1 jour sur 30
+
+    last_day = _forecast(rows + [('2024-04-30', 'depense', 70, 'Alimentation')],
+                         datetime(2024, 4, 30, 18, 0))
+    assert last_day.loc['Alimentation', 'Réalisé'] == 80
+    assert last_day.loc['Alimentation', 'Avancement attendu (%)'] == 100
+    assert last_day.loc['Alimentation', 'Prévision'] == 80
+    assert last_day.loc['Cadeaux', 'Prévision'] == 15
+
+
+def test_forecast_applies_seasonal_index_after_a_year():
+    """Au moins 12 mois : la référence est corrigée par l'indice du mois calendaire"""
+    months = pd.date_range('2023-01-01', '2024-11-01', freq='MS') + pd.Timedelta(days=14)
+    rows = [(date.strftime('%Y-%m-%d'), 'depense', 400 if date.month == 12 else 100, 'Chauffage')
+            for date in months]
+
+    forecast = _forecast(rows, datetime(2024, 12, 1))
+    overall = (22 * 100 + 400) / 23
+    assert forecast.loc['Chauffage', 'Référence'] == round(100 * 400 / overall, 2)
+    assert forecast.loc['Chauffage', 'Prévision'] == round(100 * 400 / overall, 2)
+
+
+def test_forecast_without_transactions():
+    """Aucune transaction : tableau vide avec les colonnes attendues"""
+    forecast = BudgetAnalyzer(pd.DataFrame()).forecast_month_end(datetime(2024, 4, 10))
+    assert forecast.empty
+    assert list(forecast.columns) == ['Catégorie', 'Réalisé', 'Référence',
+                                      'Avancement attendu (%)', 'Prévision']
+
+
+def test_category_trends_tail_keeps_previous_month_for_variation():
+    """months= garde les derniers mois ; la variation du premier mois affiché utilise le mois précédent"""
+    rows = HISTORY + [('2024-04-10', 'depense', 450, 'Alimentation')]
+    trends = BudgetAnalyzer(_transactions(rows)).get_category_trends(months=2, window=3)
+
+    assert sorted(trends['Mois'].unique()) == ['2024-03', '2024-04']
+    food = trends[trends['Catégorie'] == 'Alimentation'].set_index('Mois')
+    assert food.loc['2024-03', 'Variation'] == 0
+    assert food.loc['2024-04', 'Variation'] == 150
+    assert food.loc['2024-04', 'Variation %'] == 50
+    assert food.loc['2024-04', 'Moyenne mobile'] == 350
+
+    # Catégorie à 0 le mois précédent : variation relative indéfinie
+    transport = trends[trends['Catégorie'] == 'Transport'].set_index('Mois')
+    assert transport.loc['2024-04', 'Montant'] == 0
+    assert np.isnan(transport.loc['2024-04', 'Variation %'])
+
+
+def test_category_trends_with_single_month():
+    """Un seul mois d'historique : pas de variation ; aucune transaction du type : vide"""
+    analyzer = BudgetAnalyzer(_transactions([('2024-01-05', 'depense', 100, 'Alimentation')]))
+    trends = analyzer.get_category_trends(months=12)
+
+    assert len(trends) == 1
+    assert trends.loc[0, 'Montant'] == 100
+    assert np.isnan(trends.loc[0, 'Variation'])
+    assert analyzer.get_category_trends(transaction_type='revenu').empty
+
+
+def test_monthly_comparison_fills_gaps_and_tails():
+    """Mois sans transaction à 0, moyennes mobiles calculées avant de garder les derniers mois"""
+    rows = [('2024-01-10', 'depense', 300, 'Loyer'), ('2024-01-25', 'revenu', 2000, 'Salaire'),
+            ('2024-03-10', 'depense', 600, 'Loyer')]
+    analyzer = BudgetAnalyzer(_transactions(rows))
+
+    comparison = analyzer.get_monthly_comparison(window=2)
+    assert list(comparison.index) == ['2024-01', '2024-02', '2024-03']
+    assert comparison.loc['2024-02', 'depense'] == 0
+    assert comparison.loc['2024-02', 'revenu_moyenne'] == 1000
+
+    tail = analyzer.get_monthly_comparison(window=3, months=1)
+    assert list(tail.index) == ['2024-03']
+    assert tail.loc['2024-03', 'depense_moyenne'] == 300
+    assert list(tail.columns) == ['revenu', 'depense', 'revenu_moyenne', 'depense_moyenne']
+
+    expenses_only = BudgetAnalyzer(_transactions(rows[:1])).get_monthly_comparison()
+    assert expenses_only.loc['2024-01', 'revenu'] == 0
@@ -0,0 +1,77 @@
+"""
+Tests de l'import en bloc des transactions : détection des doublons
+"""
+
+import sys
+import os
+import tempfile
+
+import pandas as pd
+
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, project_root)
+
+from src.data_manager import DataManager
+
+
+CSV_CONTENT = (
+    "date,type,montant,categorie,description\n"
+    "2024-01-05,depense,10,Alimentation,Boulangerie\n"
+    "2024-01-06,revenu,1500,Salaire,Paie janvier\n"
+)
+
+
+def test_reimporting_same_csv_skips_every_row():
+    """Montants entiers du CSV (int64) et montants relus (float64) ont la même empreinte"""
+    with tempfile.TemporaryDirectory() as tmp:
+        csv_path = os.path.join(tmp, 'export_banque.csv')
+        with open(csv_path, 'w', encoding='utf-8') as f:
+            f.write(CSV_CONTENT)
+        manager = DataManager(os.path.join(tmp, 'budget.db'))
+
+        first = manager.import_dataframe(pd.read_csv(csv_path))
+        second = manager.import_dataframe(pd.read_csv(csv_path))
+
+        assert first == {'importees': 2, 'doublons': 0, 'invalides': 0}
+        assert second == {'importees': 0, 'doublons': 2, 'invalides': 0}
+        assert len(manager.get_transactions_dataframe()) == 2
+
+
+def test_repeated_row_in_file_is_kept_beyond_existing_count():
+    """Deux achats identiques le même jour : seul celui déjà stocké est un doublon"""
+    with tempfile.TemporaryDirectory() as tmp:
+        manager = DataManager(os.path.join(tmp, 'budget.db'))
+        row = {'date': '2024-01-05', 'type': 'depense', 'montant': 10,
+               'categorie': 'Alimentation', 'description': 'Boulangerie'}
+
+        manager.import_dataframe(pd.DataFrame([row]))
+        result = manager.import_dataframe(pd.DataFrame([row, row]))
+
+        assert result['importees'] == 1
+        assert result['doublons'] == 1
+
+
+def test_french_dates_are_read_day_first():
+    """"05/01/2024" est le 5 janvier ; une date hors des formats acceptés est invalide"""
+    with tempfile.TemporaryDirectory() as tmp:
+        manager = DataManager(os.path.join(tmp, 'budget.db'))
+        result = manager.import_dataframe(pd.DataFrame({
+            'date': ['05/01/2024', '31.01.2024', '2024-02-01', '01/13/2024', 'Jan 5, 2024'],
+            'type': 'depense', 'montant': 10, 'categorie': 'Alimentation',
+        }))
+
+        assert result == {'importees': 3, 'doublons': 0, 'invalides': 2}
+        dates = sorted(t['date'] for t in manager.get_all_transactions())
+        assert dates == ['2024-01-05', '2024-01-31', '2024-02-01']
+
+
+def test_import_from_csv_returns_counts():
+    """import_from_csv renvoie les mêmes compteurs que import_dataframe"""
+    with tempfile.TemporaryDirectory() as tmp:
+        csv_path = os.path.join(tmp, 'export_banque.csv')
+        with open(csv_path, 'w', encoding='utf-8') as f:
+            f.write(CSV_CONTENT + "date inconnue,depense,3,Alimentation,Café\n")
+        manager = DataManager(os.path.join(tmp, 'budget.db'))
+
+        assert manager.import_from_csv(csv_path) == {'importees': 2, 'doublons': 0, 'invalides': 1}
+        assert manager.import_from_csv(csv_path) == {'importees': 0, 'doublons': 2, 'invalides': 1}
@@ -16,6 +16,8 @@ from src.scraper import AmazonScraper
 from src.analyzer import PriceAnalyzer
 from src.visualizer import PriceVisualizer
 from src.notifier import EmailNotifier
+from src.events import EVENT_LABELS
+from src.refresh_engine import PriceRefreshEngine, build_price_alerts
 
 
 # Configuration de la page
@@ -95,6 +97,18 @@ def show_dashboard():
                 </div>
             ''', unsafe_allow_html=True)
     
+    # Événements récents (détectés après chaque rafraîchissement)
+    events = db.get_price_events(limit=10)
+    if not events.empty:
+        st.markdown(f"### ⚡ Événements récents ({config.EVENT_DISPLAY_DAYS} derniers jours)")
+        for event in events.itertuples(index=False):
+            change = f" ({event.change_percent:+.1f}%)" if pd.notna(event.change_percent) else ""
+            st.markdown(
+                f"**{EVENT_LABELS.get(event.event_type, event.event_type)}** — "
+                f"[{event.name[:60]}]({event.url}) : {event.price:.2f} €{change} "
+                f"*· {event.created_at:%d/%m %H:%M}*"
+            )
+    
     # Graphique de comparaison
     st.markdown("##  Comparaison des Produits")
     products_df = db.get_all_products()
@@ -226,6 +240,9 @@ def show_products_list():
         st.info("Aucun produit suivi. Ajoutez-en un dans la page 'Ajouter un produit' !")
         return
     
+    # Statistiques et tendances de tous les produits (requêtes groupées)
+    analytics = analyzer.get_portfolio_analytics()
+    
     # Afficher les produits
     for idx, product in products_df.iterrows():
         with st.container():
@@ -256,11 +273,12 @@ def show_products_list():
                 
                 with price_col3:
                     # Tendance
-                    trend = analyzer.get_price_trend(product['id'])
-                    if trend:
-                        stats = analyzer.get_price_stats(product['id'])
-                        if stats:
-                            trend_html = visualizer.create_trend_indicator(trend, stats['variation_percent'])
+                    if product['id'] in analytics.index:
+                        product_stats = analytics.loc[product['id']]
+                        if product_stats['trend']:
+                            trend_html = visualizer.create_trend_indicator(
+                                product_stats['trend'], product_stats['variation_percent']
+                            )
                             st.markdown(trend_html, unsafe_allow_html=True)
                 
                 st.markdown(f"*Dernière vérification: {product['last_checked'] or 'Jamais'}*")
@@ -352,10 +370,24 @@ def show_product_history():
     # Graphique d'évolution
     st.markdown("###  Évolution du Prix")
     
-    history_df = db.get_price_history(product_id, config.DEFAULT_HISTORY_DAYS)
+    period = st.radio(
+        "Période",
+        config.HISTORY_PERIODS,
+        format_func=lambda days: f"{days} jours",
+        horizontal=True,
+        key=f"history_period_{product_id}"
+    )
+    
+    if period > config.DEFAULT_HISTORY_DAYS:
+        # Longue durée : agrégats quotidiens (min/max/clôture)
+        history_df = db.get_daily_prices(product_id, period)
+        chart = visualizer.create_daily_price_chart
+    else:
+        history_df = db.get_price_history(product_id, period)
+        chart = visualizer.create_price_chart
     
     if not history_df.empty:
-        fig = visualizer.create_price_chart(
+        fig = chart(
             history_df,
             product['name'],
             product['target_price']
@@ -366,7 +398,7 @@ def show_product_history():
 
 
 def refresh_all_prices():
-    """Rafraîchit les prix de tous les produits"""
+    """Rafraîchit les prix de tous les produits (requêtes concurrentes, écritures par lots)"""
     products_df = db.get_all_products()
     
     if products_df.empty:
@@ -376,46 +408,27 @@ def refresh_all_prices():
     progress_bar = st.progress(0)
     status_text = st.empty()
     
-    success_count = 0
-    alerts_to_send = []
+    products = {product['id']: product for product in products_df.to_dict('records')}
     
-    for idx, product in products_df.iterrows():
-        status_text.text(f"Rafraîchissement {idx + 1}/{len(products_df)}: {product['name'][:40]}...")
-        
-        # Scraper le prix
-        product_data = scraper.scrape_product(product['url'])
-        
-        if product_data:
-            # Mettre à jour le prix
-            db.update_price(
-                product['id'],
-                product_data['price'],
-                product_data['availability']
-            )
-            success_count += 1
-            
-            # Vérifier si alerte nécessaire
-            if product['target_price'] and product_data['price'] <= product['target_price']:
-                if product['current_price'] is None or product_data['price'] < product['current_price']:
-                    # Nouveau prix sous la cible
-                    alerts_to_send.append({
-                        'name': product['name'],
-                        'url': product['url'],
-                        'current_price': product_data['price'],
-                        'target_price': product['target_price']
-                    })
-        
-        progress_bar.progress((idx + 1) / len(products_df))
+    def on_progress(done, total, result):
+        name = products[result['product_id']]['name']
+        status_text.text(f"Rafraîchissement {done}/{total}: {name[:40]}...")
+        progress_bar.progress(done / total)
+    
+    engine = PriceRefreshEngine(scraper, db)
+    results = engine.refresh(list(products.values()), progress_callback=on_progress)
+    
+    success_count = sum(result['success'] for result in results)
+    alerts_to_send = build_price_alerts(products, results)
     
     progress_bar.empty()
     status_text.empty()
     
-    # Envoyer les alertes
+    # Envoyer les alertes (en arrière-plan : l'interface n'attend pas le serveur SMTP)
     if alerts_to_send and config.SMTP_EMAIL:
-        with st.spinner("📧 Envoi des alertes email..."):
-            sent_count = notifier.send_multiple_alerts(alerts_to_send)
-            if sent_count > 0:
-                st.success(f"✅ {sent_count} alerte(s) envoyée(s) par email")
+        queued_count = notifier.queue_alerts(alerts_to_send)
+        if queued_count > 0:
+            st.success(f"📧 {queued_count} email(s) d'alerte en cours d'envoi")
     
     st.success(f"✅ Rafraîchissement terminé ! {success_count}/{len(products_df)} produits mis à jour")
     st.rerun()
@@ -432,6 +445,8 @@ def show_settings():
     
     if config.SMTP_EMAIL:
         st.success(f"✅ Email configuré: {config.SMTP_EMAIL}")
+        st.markdown(f"**Destinataires:** {', '.join(notifier.recipients)}")
+        st.markdown(f"**Mode digest:** {'un email par destinataire' if notifier.digest else 'un email par alerte'}")
         
         if st.button("Tester la connexion"):
             with st.spinner("Test de connexion..."):
@@ -454,6 +469,8 @@ def show_settings():
         st.markdown(f"**Domaine Amazon:** {config.AMAZON_DOMAIN}")
         st.markdown(f"**Produits max:** {config.MAX_PRODUCTS}")
         st.markdown(f"**Délai entre requêtes:** {config.REQUEST_DELAY}s")
+        st.markdown(f"**Requêtes simultanées:** {config.REFRESH_CONCURRENCY} "
+                    f"({config.REFRESH_HOST_RATE:g} req/s par domaine)")
     
     with col2:
         st.markdown(f"**Historique par défaut:** {config.DEFAULT_HISTORY_DAYS} jours")
@@ -469,6 +486,21 @@ def show_settings():
     
     product_count = db.get_product_count()
     st.markdown(f"**Produits actifs:** {product_count}")
+    
+    st.divider()
+    
+    # Démon de surveillance
+    st.markdown("### ⏱️ Surveillance automatique")
+    
+    schedule = db.get_schedule()
+    if schedule.empty:
+        st.info("Démon inactif. Lancez `python price_watch.py` pour vérifier les prix en arrière-plan.")
+    else:
+        next_check = datetime.fromtimestamp(schedule['next_check_ts'].min())
+        st.markdown(f"**Produits planifiés:** {len(schedule)}")
+        st.markdown(f"**Prochaine vérification:** {next_check.strftime('%d/%m/%Y %H:%M')}")
+        st.markdown(f"**Intervalles:** {schedule['interval_seconds'].min() / 60:.0f} à "
+                    f"{schedule['interval_seconds'].max() / 60:.0f} minutes")
 
 
 def main():
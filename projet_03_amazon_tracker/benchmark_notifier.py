@@ -0,0 +1,167 @@
+"""
+Benchmark de l'envoi des alertes email contre un serveur SMTP local
+Serveur de débogage minimal (à la manière d'aiosmtpd) : accepte tous les
+emails, compte connexions et messages, peut refuser une partie des envois
+(451) pour exercer les nouvelles tentatives de la file en arrière-plan
+
+Utilisation :
+    python benchmark_notifier.py --alerts 50 --recipients 3 --error-rate 0.1
+"""
+import argparse
+import random
+import socketserver
+import sys
+import threading
+import time
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).parent))
+
+from src.notifier import EmailNotifier
+
+
+def start_debug_smtp_server(latency=0.0, error_rate=0.0, reject_first=0):
+    """
+    Démarre un serveur SMTP local (sans TLS ni authentification)
+
+    Args:
+        latency: Délai simulé par commande (secondes)
+        error_rate: Proportion de messages refusés (451, erreur temporaire)
+        reject_first: Nombre de premiers messages refusés (451) quoi qu'il arrive (tests)
+
+    Returns:
+        Tuple (serveur, port, compteurs {'connections', 'messages', 'rejected'}, messages reçus)
+    """
+    counters = {'connections': 0, 'messages': 0, 'rejected': 0}
+    received = []
+    lock = threading.Lock()
+
+    class Handler(socketserver.StreamRequestHandler):
+        def reply(self, line):
+            time.sleep(latency)
+            self.wfile.write(f"{line}\r\n".encode())
+
+        def handle(self):
+            with lock:
+                counters['connections'] += 1
+            self.reply("220 localhost debug SMTP")
+            recipients = []
+            while True:
+                line = self.rfile.readline()
+                if not line:
+                    return
+                command = line.decode(errors='replace').strip()
+                verb = command[:4].upper()
+                if verb in ('EHLO', 'HELO'):
+                    self.reply("250 localhost")
+                elif verb == 'MAIL':
+                    recipients = []
+                    self.reply("250 OK")
+                elif verb == 'RCPT':
+                    recipients.append(command.split(':', 1)[1].strip(' <>'))
+                    self.reply("250 OK")
+                elif verb == 'DATA':
+                    self.reply("354 Fin avec <CRLF>.<CRLF>")
+                    lines = []
+                    while True:
+                        data = self.rfile.readline()
+                        if not data or data in (b".\r\n", b".\n"):
+                            break
+                        lines.append(data)
+                    with lock:
+                        forced = counters['messages'] + counters['rejected'] < reject_first
+                    if forced or random.random() < error_rate:
+                        with lock:
+                            counters['rejected'] += 1
+                        self.reply("451 Erreur temporaire simulée")
+                    else:
+                        with lock:
+                            counters['messages'] += 1
+                            received.append((recipients, b''.join(lines)))
+                        self.reply("250 Message accepté")
+                elif verb == 'RSET' or verb == 'NOOP':
+                    self.reply("250 OK")
+                elif verb == 'QUIT':
+                    self.reply("221 Au revoir")
+                    return
+                else:
+                    self.reply("502 Commande non supportée")
+
+    server = socketserver.ThreadingTCPServer(('127.0.0.1', 0), Handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, server.server_address[1], counters, received
+
+
+def make_alerts(count):
+    """Alertes factices (prix sous la cible)"""
+    return [{
+        'name': f"Produit de test {i}",
+        'url': f"https://www.amazon.fr/dp/B{i:09d}",
+        'current_price': 80.0 + i,
+        'target_price': 100.0 + i,
+    } for i in range(count)]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark de l'envoi des alertes email")
+    parser.add_argument('--alerts', type=int, default=50, help="Nombre d'alertes")
+    parser.add_argument('--recipients', type=int, default=1, help='Nombre de destinataires')
+    parser.add_argument('--latency', type=float, default=0.01, help='Latence SMTP simulée par commande (s)')
+    parser.add_argument('--error-rate', type=float, default=0.1, help='Proportion de messages refusés (451)')
+    args = parser.parse_args(argv)
+
+    server, port, counters, received = start_debug_smtp_server(args.latency)
+    recipients = [f"destinataire{i}@example.invalid" for i in range(args.recipients)]
+    alerts = make_alerts(args.alerts)
+
+    def notifier(**kwargs):
+        return EmailNotifier(host='127.0.0.1', port=port, email='tracker@example.invalid',
+                             password='', use_tls=False, recipients=recipients, **kwargs)
+
+    # Historique : une connexion par alerte
+    legacy = notifier(digest=False)
+    start = time.perf_counter()
+    for alert in alerts:
+        legacy.send_multiple_alerts([alert])
+    legacy_elapsed = time.perf_counter() - start
+    legacy_connections = counters['connections']
+
+    # Une connexion pour tout le lot
+    pooled = notifier(digest=False)
+    start = time.perf_counter()
+    pooled_sent = pooled.send_multiple_alerts(alerts)
+    pooled_elapsed = time.perf_counter() - start
+
+    # Digest : un email par destinataire
+    digest = notifier(digest=True)
+    start = time.perf_counter()
+    digest_sent = digest.send_multiple_alerts(alerts)
+    digest_elapsed = time.perf_counter() - start
+    server.shutdown()
+
+    # File en arrière-plan avec erreurs temporaires : l'appelant ne bloque pas
+    server, port, counters, received = start_debug_smtp_server(args.latency, args.error_rate)
+    background = notifier(digest=False, retry_delay=0.05, retry_max_delay=0.5, max_retries=10)
+    start = time.perf_counter()
+    queued = background.queue_alerts(alerts)
+    queue_elapsed = time.perf_counter() - start
+    background.flush(timeout=60)
+    background_elapsed = time.perf_counter() - start
+    background.close()
+    server.shutdown()
+
+    emails = args.alerts * args.recipients
+    print(f"Alertes / destinataires : {args.alerts} / {args.recipients} ({emails} emails)")
+    print(f"Connexion par alerte    : {legacy_elapsed:.2f}s, {legacy_connections} connexions")
+    print(f"Connexion unique        : {pooled_elapsed:.2f}s, {pooled.stats['connections']} connexion, "
+          f"{pooled_sent} emails")
+    print(f"Digest                  : {digest_elapsed:.2f}s, {digest_sent} email(s)")
+    print(f"File en arrière-plan    : retour en {queue_elapsed * 1000:.1f}ms, {queued} emails livrés en "
+          f"{background_elapsed:.2f}s ({counters['rejected']} refus 451, "
+          f"{background.stats['connections']} connexions, {background.stats['dropped']} abandonnés)")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,86 @@
+"""
+Benchmark de l'extraction des infos produit sur une page HTML enregistrée
+Compare l'analyse historique (page entière, sélecteurs relus à chaque appel),
+l'analyse limitée aux zones produit avec sélecteurs compilés, et le cache
+d'empreinte des pages inchangées
+
+Utilisation :
+    python benchmark_parsing.py --pages 200
+"""
+import argparse
+import sys
+import time
+from pathlib import Path
+
+from bs4 import BeautifulSoup
+
+sys.path.append(str(Path(__file__).parent))
+
+import config
+from src.scraper import PRODUCT_STRAINER, AmazonScraper
+
+FIXTURE = Path(__file__).parent / 'fixtures' / 'amazon_product_page.html'
+URL = 'https://www.amazon.fr/dp/B0CHWRXH8B'
+
+
+def legacy_parse(scraper, content):
+    """Extraction historique : page entière, sélecteurs CSS interprétés à chaque appel"""
+    soup = BeautifulSoup(content, 'lxml')
+    fields = {}
+    for key, selectors in [('name', config.NAME_SELECTORS), ('price', config.PRICE_SELECTORS)]:
+        for selector in selectors:
+            element = soup.select_one(selector)
+            if element is None:
+                continue
+            value = element.get_text(strip=True)
+            if key == 'price':
+                value = scraper._parse_price(value)
+            if value:
+                fields[key] = value
+                break
+    for selector in config.IMAGE_SELECTORS:
+        element = soup.select_one(selector)
+        if element and element.get('src'):
+            fields['image_url'] = element.get('data-old-hires') or element.get('src')
+            break
+    for selector in config.AVAILABILITY_SELECTORS:
+        if soup.select_one(selector):
+            break
+    return fields
+
+
+def measure(func, pages):
+    """Pages traitées par seconde"""
+    start = time.perf_counter()
+    for _ in range(pages):
+        result = func()
+    elapsed = time.perf_counter() - start
+    return pages / elapsed, result
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark de l'extraction HTML")
+    parser.add_argument('--pages', type=int, default=200, help='Pages analysées par mode')
+    args = parser.parse_args(argv)
+
+    content = FIXTURE.read_bytes()
+    scraper = AmazonScraper()
+
+    legacy_rate, legacy = measure(lambda: legacy_parse(scraper, content), args.pages)
+    strained_rate, fields = measure(lambda: scraper._parse_fields(content, PRODUCT_STRAINER), args.pages)
+    scraper.parse_product(content, URL)
+    cached_rate, product = measure(lambda: scraper.parse_product(content, URL), args.pages)
+
+    assert legacy['name'] == fields['name'] == product['name']
+    assert legacy['price'] == fields['price'] == product['price']
+
+    print(f"Page de test       : {FIXTURE.name} ({len(content) // 1024} KB)")
+    print(f"Produit extrait    : {product['name'][:50]} - {product['price']:.2f}€ ({product['availability']})")
+    print(f"Page entière       : {legacy_rate:8.1f} pages/s")
+    print(f"Zones produit      : {strained_rate:8.1f} pages/s (x{strained_rate / legacy_rate:.1f})")
+    print(f"Page inchangée     : {cached_rate:8.1f} pages/s (cache d'empreinte)")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,170 @@
+"""
+Benchmark du rafraîchissement des prix contre un serveur HTTP local
+Sert des pages produit factices (latence, erreurs 503 et ETag simulés), puis
+compare le moteur concurrent au rafraîchissement séquentiel historique ; un
+second passage mesure les requêtes conditionnelles (304 Not Modified)
+
+Utilisation :
+    python benchmark_refresh.py --size 200 --latency 0.3 --error-rate 0.05
+"""
+import argparse
+import hashlib
+import os
+import random
+import re
+import sys
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).parent))
+
+import config
+from src.database import DatabaseManager
+from src.refresh_engine import PriceRefreshEngine
+from src.scraper import AmazonScraper
+
+FIXTURE_PAGE = """<!DOCTYPE html>
+<html lang="fr">
+<head><title>{name}</title></head>
+<body>
+<div id="dp-container">
+  <h1 id="title"><span id="productTitle">{name}</span></h1>
+  <div id="imgTagWrapperId"><img id="landingImage" src="https://example.invalid/{asin}.jpg"></div>
+  <div id="corePrice_feature_div">
+    <span class="a-price"><span class="a-offscreen">{price} €</span></span>
+  </div>
+  <div id="availability"><span class="a-size-medium a-color-success">{availability}</span></div>
+</div>
+</body>
+</html>
+"""
+
+
+def fixture_price(asin):
+    """Prix déterministe d'une page factice (varie selon la minute)"""
+    seed = sum(ord(c) for c in asin) + int(time.time() // 60)
+    return round(20 + (seed * 7.31) % 480, 2)
+
+
+def fixture_page(asin):
+    """HTML d'une page produit factice"""
+    price = f"{fixture_price(asin):.2f}".replace('.', ',')
+    return FIXTURE_PAGE.format(name=f"Produit de test {asin}", asin=asin,
+                               price=price, availability="En stock")
+
+
+def start_fixture_server(latency=0.0, error_rate=0.0, fail_first=0):
+    """
+    Démarre un serveur HTTP local servant /dp/<ASIN>
+
+    Args:
+        latency: Délai de réponse simulé (secondes)
+        error_rate: Proportion de réponses 503
+        fail_first: Nombre de réponses 503 systématiques par ASIN avant la page (tests)
+
+    Returns:
+        Tuple (serveur, URL de base, compteurs {'requests', 'errors', 'not_modified'})
+    """
+    counters = {'requests': 0, 'errors': 0, 'not_modified': 0}
+    requests_by_asin = {}
+    lock = threading.Lock()
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            with lock:
+                counters['requests'] += 1
+            time.sleep(latency)
+            match = re.search(r'/dp/([A-Z0-9]{10})', self.path)
+            if not match:
+                self.send_error(404)
+                return
+            with lock:
+                asin_requests = requests_by_asin.get(match.group(1), 0)
+                requests_by_asin[match.group(1)] = asin_requests + 1
+            if asin_requests < fail_first or random.random() < error_rate:
+                with lock:
+                    counters['errors'] += 1
+                self.send_response(503)
+                self.send_header('Retry-After', '1')
+                self.end_headers()
+                return
+            body = fixture_page(match.group(1)).encode('utf-8')
+            etag = f'"{hashlib.md5(body).hexdigest()}"'
+            if self.headers.get('If-None-Match') == etag:
+                with lock:
+                    counters['not_modified'] += 1
+                self.send_response(304)
+                self.send_header('ETag', etag)
+                self.end_headers()
+                return
+            self.send_response(200)
+            self.send_header('ETag', etag)
+            self.send_header('Content-Type', 'text/html; charset=utf-8')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}", counters
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark du rafraîchissement des prix")
+    parser.add_argument('--size', type=int, default=200, help='Nombre de produits')
+    parser.add_argument('--latency', type=float, default=0.3, help='Latence serveur simulée (s)')
+    parser.add_argument('--error-rate', type=float, default=0.05, help='Proportion de réponses 503')
+    parser.add_argument('--concurrency', type=int, default=config.REFRESH_CONCURRENCY)
+    parser.add_argument('--host-rate', type=float, default=10.0,
+                        help='Requêtes/s par domaine (serveur local, plus permissif que la production)')
+    parser.add_argument('--global-rate', type=float, default=20.0, help='Requêtes/s au total')
+    args = parser.parse_args(argv)
+
+    server, base_url, counters = start_fixture_server(args.latency, args.error_rate)
+    with tempfile.TemporaryDirectory() as workdir:
+        db = DatabaseManager(os.path.join(workdir, 'benchmark.db'))
+        for i in range(args.size):
+            asin = f"B{i:09d}"
+            db.add_product(f"{base_url}/dp/{asin}", f"Produit de test {asin}", 10.0, None, asin=asin)
+        products = db.get_all_products()
+
+        scraper = AmazonScraper()
+        engine = PriceRefreshEngine(scraper, db, concurrency=args.concurrency,
+                                    global_rate=args.global_rate, host_rate=args.host_rate,
+                                    backoff_base=0.5)
+        start = time.perf_counter()
+        results = engine.refresh(products)
+        elapsed = time.perf_counter() - start
+
+        # Second passage : pages inchangées -> 304, ni téléchargement ni analyse
+        first_pass = dict(counters)
+        start = time.perf_counter()
+        second = engine.refresh(products)
+        elapsed_second = time.perf_counter() - start
+
+        refreshed = db.get_all_products()
+    server.shutdown()
+
+    success = sum(r['success'] for r in results)
+    retries = sum(r['attempts'] - 1 for r in results)
+    updated = int((refreshed['current_price'] != 10.0).sum())
+    sequential = args.size * (config.REQUEST_DELAY + args.latency)
+
+    print(f"Produits           : {args.size}")
+    print(f"Succès             : {success} ({updated} prix mis à jour en base)")
+    print(f"Requêtes / 503     : {first_pass['requests']} / {first_pass['errors']} ({retries} nouvelles tentatives)")
+    print(f"Durée concurrente  : {elapsed:.1f}s ({args.size / elapsed:.1f} produits/s)")
+    print(f"Séquentiel estimé  : {sequential:.1f}s (délai fixe de {config.REQUEST_DELAY}s + latence)")
+    print(f"Second passage     : {elapsed_second:.1f}s, {sum(r['success'] for r in second)} succès, "
+          f"{counters['not_modified']} réponses 304, {scraper.stats['parsed']} pages analysées au total")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
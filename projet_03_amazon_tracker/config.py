@@ -44,6 +44,19 @@ AVAILABILITY_SELECTORS = [
     'span.a-size-medium.a-color-price',
 ]
 
+# Zones de la page produit analysées (attribut id) : le reste du document est ignoré
+PRODUCT_REGION_IDS = [
+    'titleSection', 'title', 'productTitle',
+    'corePrice_feature_div', 'corePriceDisplay_desktop_feature_div', 'apex_desktop',
+    'priceblock_ourprice', 'priceblock_dealprice',
+    'main-image-container', 'imgTagWrapperId', 'landingImage',
+    'availability',
+]
+
+# Cache des pages déjà analysées (empreinte du contenu)
+PARSE_CACHE_TTL = 600      # Durée de validité (secondes)
+PARSE_CACHE_SIZE = 1000    # Nombre de pages conservées
+
 # User-Agents pour rotation
 USER_AGENTS = [
     'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
@@ -60,6 +73,15 @@ MAX_RETRIES = 3
 # Timeout pour les requêtes (secondes)
 REQUEST_TIMEOUT = 10
 
+# Rafraîchissement concurrent (voir src/refresh_engine.py)
+REFRESH_CONCURRENCY = 8        # Requêtes simultanées maximum
+REFRESH_GLOBAL_RATE = 4.0      # Requêtes/seconde, tous domaines confondus
+REFRESH_HOST_RATE = 1.0        # Requêtes/seconde par domaine (politesse)
+REFRESH_BURST = 2              # Requêtes autorisées d'affilée avant limitation
+BACKOFF_BASE = 1.0             # Délai de base du backoff exponentiel (secondes)
+BACKOFF_MAX = 60.0             # Délai maximum entre deux tentatives (secondes)
+REFRESH_BATCH_SIZE = 50        # Mises à jour écrites par transaction
+
 
 # ========================================
 # CONFIGURATION EMAIL
@@ -69,6 +91,20 @@ SMTP_EMAIL = os.getenv('SMTP_EMAIL', '')
 SMTP_PASSWORD = os.getenv('SMTP_PASSWORD', '')
 SMTP_HOST = os.getenv('SMTP_HOST', 'smtp.gmail.com')
 SMTP_PORT = int(os.getenv('SMTP_PORT', 587))
+SMTP_USE_TLS = os.getenv('SMTP_USE_TLS', 'true').lower() in ('1', 'true', 'yes')
+SMTP_TIMEOUT = 10
+
+# Destinataires des alertes (séparés par des virgules, défaut : l'expéditeur)
+ALERT_RECIPIENTS = [address.strip() for address in (os.getenv('ALERT_RECIPIENTS') or SMTP_EMAIL).split(',')
+                    if address.strip()]
+
+# Mode digest : un seul email par destinataire regroupant toutes les alertes d'un lot
+EMAIL_DIGEST = os.getenv('EMAIL_DIGEST', 'true').lower() in ('1', 'true', 'yes')
+
+# Envoi en arrière-plan : nouvelles tentatives sur erreur SMTP
+EMAIL_MAX_RETRIES = 5          # Tentatives par email
+EMAIL_RETRY_DELAY = 30.0       # Délai de base du backoff (secondes)
+EMAIL_RETRY_MAX_DELAY = 900.0  # Délai maximum entre deux tentatives (secondes)
 
 # Template email
 EMAIL_SUBJECT = "🔔 Alerte Prix Amazon - {product_name}"
@@ -103,6 +139,48 @@ EMAIL_TEMPLATE = """
 </html>
 """
 
+# Template du digest (plusieurs alertes dans un seul email)
+EMAIL_DIGEST_SUBJECT = "🔔 Alerte Prix Amazon - {count} produit(s) sous votre prix cible"
+EMAIL_DIGEST_ROW = """
+            <tr>
+                <td><a href="{product_url}">{product_name}</a></td>
+                <td class="price">{current_price} €</td>
+                <td class="target">{target_price} €</td>
+                <td><strong>{savings} €</strong></td>
+            </tr>
+"""
+EMAIL_DIGEST_TEMPLATE = """
+<html>
+<head>
+    <style>
+        body {{ font-family: Arial, sans-serif; }}
+        .container {{ max-width: 700px; margin: 0 auto; padding: 20px; }}
+        .header {{ background-color: #FF9900; color: white; padding: 20px; text-align: center; }}
+        .content {{ background-color: #f9f9f9; padding: 20px; }}
+        table {{ width: 100%; border-collapse: collapse; }}
+        th, td {{ padding: 8px; border-bottom: 1px solid #ddd; text-align: left; }}
+        .price {{ font-weight: bold; color: #B12704; }}
+        .target {{ color: #067D62; }}
+    </style>
+</head>
+<body>
+    <div class="container">
+        <div class="header">
+            <h1>Alerte Prix Amazon</h1>
+        </div>
+        <div class="content">
+            <p>{count} produit(s) que vous suivez ont atteint votre objectif !</p>
+            <table>
+                <tr><th>Produit</th><th>Prix actuel</th><th>Prix cible</th><th>Économie</th></tr>
+{rows}
+            </table>
+            <p>Économie potentielle totale : <strong>{total_savings} €</strong></p>
+        </div>
+    </div>
+</body>
+</html>
+"""
+
 
 # ========================================
 # CONFIGURATION BASE DE DONNÉES
@@ -111,6 +189,31 @@ EMAIL_TEMPLATE = """
 DB_PATH = 'data/tracker.db'
 
 
+# ========================================
+# CONFIGURATION DU DÉMON DE SURVEILLANCE (price_watch.py)
+# ========================================
+
+SCHEDULER_MIN_INTERVAL = 30 * 60       # Produits volatils ou proches de la cible (secondes)
+SCHEDULER_MAX_INTERVAL = 12 * 3600     # Produits stables et loin de la cible (secondes)
+SCHEDULER_VOLATILITY_REF = 0.05        # Coefficient de variation jugé très volatil (5%)
+SCHEDULER_TARGET_RANGE = 0.20          # Écart au prix cible sous lequel on accélère (20%)
+SCHEDULER_HISTORY_DAYS = 14            # Historique utilisé pour mesurer la volatilité (jours)
+SCHEDULER_CATCHUP_WINDOW = 30 * 60     # Étalement des vérifications en retard au démarrage (secondes)
+SCHEDULER_SYNC_PERIOD = 300            # Relecture des produits suivis (secondes)
+SCHEDULER_BATCH_MAX = 50               # Produits rafraîchis par cycle au maximum
+SCHEDULER_JITTER = 0.1                 # Variation aléatoire des intervalles (+/- 10%)
+
+
+# ========================================
+# DÉTECTION D'ÉVÉNEMENTS DE PRIX (src/events.py)
+# ========================================
+
+EVENT_LOW_DAYS = 30            # Fenêtre du "plus bas" (jours)
+EVENT_DROP_PERCENT = 10.0      # Baisse signalée au-delà de ce pourcentage...
+EVENT_DROP_HOURS = 24          # ...par rapport au plus haut de cette période (heures)
+EVENT_DISPLAY_DAYS = 7         # Événements affichés sur le dashboard (jours)
+
+
 # ========================================
 # CONFIGURATION INTERFACE
 # ========================================
@@ -122,6 +225,9 @@ APP_ICON = "🛒"
 # Nombre de jours pour l'historique par défaut
 DEFAULT_HISTORY_DAYS = 30
 
+# Périodes proposées pour le graphique (au-delà de DEFAULT_HISTORY_DAYS : agrégats quotidiens)
+HISTORY_PERIODS = [30, 90, 365]
+
 # Limite de produits trackables (MVP)
 MAX_PRODUCTS = 20
 
@@ -0,0 +1,82 @@
+"""
+Démon de surveillance des prix (sans interface)
+Vérifie chaque produit à son échéance : plus souvent pour les prix volatils ou
+proches de la cible. Le planning est conservé dans la base SQLite, un
+redémarrage reprend là où le démon s'était arrêté.
+
+Utilisation :
+    python price_watch.py            # boucle jusqu'à Ctrl+C / SIGTERM
+    python price_watch.py --once     # traite les échéances dépassées puis s'arrête
+    python price_watch.py --status   # affiche le planning
+"""
+import argparse
+import signal
+import sys
+import threading
+from datetime import datetime
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).parent))
+
+import config
+from src.database import DatabaseManager
+from src.notifier import EmailNotifier
+from src.refresh_engine import PriceRefreshEngine
+from src.scheduler import PriceWatchScheduler
+from src.scraper import AmazonScraper
+
+
+def show_status(db):
+    """Affiche le planning des vérifications"""
+    schedule = db.get_schedule()
+    products = db.get_all_products().set_index('id')['name']
+    if schedule.empty:
+        print("Planning vide (le démon n'a pas encore été lancé)")
+        return
+
+    print(f"{'Produit':<50} {'Prochaine vérification':<22} {'Intervalle':>10}")
+    for row in schedule.itertuples(index=False):
+        name = str(products.get(row.product_id, f"#{row.product_id}"))[:48]
+        next_check = datetime.fromtimestamp(row.next_check_ts).strftime('%Y-%m-%d %H:%M:%S')
+        print(f"{name:<50} {next_check:<22} {row.interval_seconds / 60:>8.0f}mn")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Démon de surveillance des prix Amazon")
+    parser.add_argument('--db', default=config.DB_PATH, help='Base SQLite')
+    parser.add_argument('--once', action='store_true', help='Un seul cycle puis arrêt')
+    parser.add_argument('--status', action='store_true', help='Afficher le planning')
+    args = parser.parse_args(argv)
+
+    db = DatabaseManager(args.db)
+    if args.status:
+        show_status(db)
+        return 0
+
+    notifier = EmailNotifier() if config.SMTP_EMAIL else None
+    scheduler = PriceWatchScheduler(db, PriceRefreshEngine(AmazonScraper(), db), notifier)
+
+    if args.once:
+        scheduler.sync(catch_up=False)
+        results = scheduler.run_pending()
+        print(f"✅ {sum(r['success'] for r in results)}/{len(results)} produit(s) vérifié(s)")
+        if notifier is not None:
+            notifier.flush(timeout=config.SMTP_TIMEOUT * 6)
+            notifier.close()
+        return 0
+
+    stop_event = threading.Event()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        signal.signal(sig, lambda *_: stop_event.set())
+
+    print("🛒 Démon de surveillance démarré (Ctrl+C pour arrêter)", flush=True)
+    scheduler.run_forever(stop_event)
+    if notifier is not None:
+        # Dernière tentative sur les alertes en attente
+        notifier.close(timeout=config.SMTP_TIMEOUT * 6)
+    print("Démon arrêté")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -22,6 +22,10 @@ class PriceAnalyzer:
         """
         Calcule les statistiques de prix pour un produit
         
+        Calculées sur l'historique reconstruit : les variations d'une même
+        journée comptent (les agrégats quotidiens servent aux graphiques longue
+        durée uniquement)
+        
         Args:
             product_id: ID du produit
             days: Nombre de jours d'historique
@@ -69,12 +73,12 @@ class PriceAnalyzer:
         if len(df) < 2:
             return None
         
-        # Comparer les 7 derniers jours avec les 7 jours précédents
+        # Comparer les 7 derniers relevés avec les 7 précédents
         if len(df) >= 14:
             recent = df.tail(7)['price'].mean()
             previous = df.iloc[-14:-7]['price'].mean()
         else:
-            # Si moins de 14 jours, comparer première moitié vs deuxième moitié
+            # Si moins de 14 relevés, comparer première moitié vs deuxième moitié
             mid = len(df) // 2
             previous = df.iloc[:mid]['price'].mean()
             recent = df.iloc[mid:]['price'].mean()
@@ -116,6 +120,107 @@ class PriceAnalyzer:
         
         return alerts
     
+    def get_portfolio_analytics(self, days=30, product_ids=None):
+        """
+        Calcule statistiques, tendance et recommandation de tous les produits
+        
+        Deux requêtes au total (produits, puis historique reconstruit de tous
+        les produits) et un seul groupby, au lieu de plusieurs requêtes par
+        produit. Mêmes règles que get_price_stats, get_price_trend et
+        get_best_price_info.
+        
+        Args:
+            days: Nombre de jours d'historique
+            product_ids: Produits à analyser (None = tous les produits actifs)
+            
+        Returns:
+            DataFrame indexé par id produit : min, max, mean, median, std, current,
+            first, count, variation_percent, trend_slope (€/jour), trend, position,
+            recommendation, urgency, is_below_target, days_tracked
+        """
+        products = self.db.get_all_products().set_index('id')
+        if product_ids is not None:
+            products = products[products.index.isin([int(product_id) for product_id in product_ids])]
+        
+        history = self.db.get_price_history_bulk(products.index.tolist(), days)
+        history['price'] = history['price'].astype(float)
+        grouped = history.groupby('product_id')
+        
+        stats = grouped.agg(
+            min=('price', 'min'),
+            max=('price', 'max'),
+            mean=('price', 'mean'),
+            median=('price', 'median'),
+            std=('price', 'std'),
+            current=('price', 'last'),
+            first=('price', 'first'),
+            count=('price', 'size'),
+        )
+        stats['variation_percent'] = ((stats['current'] - stats['first']) / stats['first'] * 100).where(
+            stats['first'] > 0, 0.0
+        )
+        
+        # Pente de la régression linéaire prix ~ date (€/jour), dates relatives au
+        # premier relevé du produit (précision des relevés rapprochés)
+        x = (history['checked_at'] - grouped['checked_at'].transform('min')) / pd.Timedelta(days=1)
+        y = history['price']
+        sums = pd.DataFrame({'x': x, 'y': y, 'xy': x * y, 'xx': x * x,
+                             'product_id': history['product_id']}).groupby('product_id').sum()
+        n = stats['count']
+        denominator = n * sums['xx'] - sums['x'] ** 2
+        stats['trend_slope'] = ((n * sums['xy'] - sums['x'] * sums['y']) / denominator).where(
+            denominator > 0, 0.0
+        )
+        
+        # Tendance : 7 derniers relevés contre les 7 précédents (moitiés si moins de 14)
+        rank = grouped.cumcount()
+        size = grouped['price'].transform('size')
+        long_series = size >= 14
+        recent = (rank >= size - 7).where(long_series, rank >= size // 2)
+        previous = ((rank >= size - 14) & (rank < size - 7)).where(long_series, rank < size // 2)
+        recent_mean = history['price'].where(recent).groupby(history['product_id']).mean()
+        previous_mean = history['price'].where(previous).groupby(history['product_id']).mean()
+        diff = (recent_mean - previous_mean) / previous_mean
+        
+        # Seuil de 2% pour considérer un changement
+        threshold = 0.02
+        stats['trend'] = np.select([diff > threshold, diff < -threshold], ['hausse', 'baisse'], 'stable')
+        stats.loc[stats['count'] < 2, 'trend'] = None
+        
+        df = products[['name', 'current_price', 'target_price']].rename(
+            columns={'current_price': 'product_price'}
+        ).join(stats, how='left')
+        
+        # Position du prix actuel dans la fourchette
+        price_range = df['max'] - df['min']
+        df['position'] = ((df['current'] - df['min']) / price_range * 100).where(price_range > 0, 50.0)
+        
+        # Recommandation
+        current, min_price, mean_price = df['current'], df['min'], df['mean']
+        falling = df['trend'] == 'baisse'
+        conditions = [
+            current <= min_price * 1.05,                 # Dans les 5% du minimum
+            (current <= mean_price) & falling,           # En dessous de la moyenne
+            current <= mean_price,
+            (current <= mean_price * 1.1) & falling,     # Proche de la moyenne
+            current <= mean_price * 1.1,
+        ]
+        df['recommendation'] = np.select(conditions, [
+            "🟢 Excellent prix ! C'est le moment d'acheter",
+            "🟡 Bon prix et en baisse. Vous pouvez attendre encore un peu",
+            "🟢 Bon prix ! Recommandé d'acheter",
+            "🟡 Prix correct et en baisse. Attendez",
+            "🟠 Prix moyen. Vous pouvez attendre",
+        ], "🔴 Prix élevé. Attendez une baisse")
+        df['urgency'] = np.select(conditions, ['high', 'medium', 'high', 'low', 'low'], 'none')
+        
+        no_history = df['count'].isna()
+        df.loc[no_history, ['recommendation', 'urgency']] = None
+        df['is_below_target'] = (df['target_price'] > 0) & (df['current'] <= df['target_price'])
+        df['days_tracked'] = df['count'].fillna(0).astype(int)
+        
+        return df
+    
     def get_best_price_info(self, product_id, days=30):
         """
         Détermine si c'est le bon moment pour acheter
@@ -127,53 +232,18 @@ class PriceAnalyzer:
         Returns:
             Dict avec recommandation
         """
-        stats = self.get_price_stats(product_id, days)
-        trend = self.get_price_trend(product_id, days)
-        product = self.db.get_product_by_id(product_id)
+        df = self.get_portfolio_analytics(days, product_ids=[product_id])
         
-        if not stats or not product:
+        if df.empty or pd.isna(df['count'].iloc[0]):
             return None
         
-        current = stats['current']
-        min_price = stats['min']
-        max_price = stats['max']
-        mean_price = stats['mean']
-        
-        # Calculer la position du prix actuel
-        price_range = max_price - min_price
-        if price_range > 0:
-            position = ((current - min_price) / price_range) * 100
-        else:
-            position = 50
-        
-        # Recommandation
-        if current <= min_price * 1.05:  # Dans les 5% du minimum
-            recommendation = "🟢 Excellent prix ! C'est le moment d'acheter"
-            urgency = "high"
-        elif current <= mean_price:  # En dessous de la moyenne
-            if trend == 'baisse':
-                recommendation = "🟡 Bon prix et en baisse. Vous pouvez attendre encore un peu"
-                urgency = "medium"
-            else:
-                recommendation = "🟢 Bon prix ! Recommandé d'acheter"
-                urgency = "high"
-        elif current <= mean_price * 1.1:  # Proche de la moyenne
-            if trend == 'baisse':
-                recommendation = "🟡 Prix correct et en baisse. Attendez"
-                urgency = "low"
-            else:
-                recommendation = "🟠 Prix moyen. Vous pouvez attendre"
-                urgency = "low"
-        else:  # Au-dessus de la moyenne
-            recommendation = "🔴 Prix élevé. Attendez une baisse"
-            urgency = "none"
-        
+        row = df.iloc[0]
         return {
-            'recommendation': recommendation,
-            'urgency': urgency,
-            'position': position,
-            'is_below_target': current <= product['target_price'] if product['target_price'] else False,
-            'days_tracked': stats['count']
+            'recommendation': row['recommendation'],
+            'urgency': row['urgency'],
+            'position': row['position'],
+            'is_below_target': bool(row['is_below_target']),
+            'days_tracked': int(row['days_tracked'])
         }
     
     def calculate_savings_potential(self):
@@ -2,6 +2,7 @@
 Module de gestion de la base de données SQLite
 """
 import sqlite3
+import threading
 import pandas as pd
 from datetime import datetime
 from pathlib import Path
@@ -19,57 +20,281 @@ class DatabaseManager:
             db_path: Chemin vers le fichier de base de données
         """
         self.db_path = db_path or config.DB_PATH
+        self._local = threading.local()
+        self._connections = []  # (thread, connexion)
+        self._connections_lock = threading.Lock()
         self._init_database()
     
-    def _init_database(self):
-        """Crée les tables si elles n'existent pas"""
-        # Créer le dossier data si nécessaire
-        Path(self.db_path).parent.mkdir(parents=True, exist_ok=True)
+    def _get_connection(self):
+        """
+        Connexion persistante du thread courant (ouverte au premier appel)
         
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
+        Mode WAL : les lectures ne bloquent pas l'écriture en cours d'un autre thread
         
-        # Table products
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS products (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                url TEXT UNIQUE NOT NULL,
-                asin TEXT,
-                name TEXT NOT NULL,
-                current_price REAL,
-                target_price REAL,
-                image_url TEXT,
-                added_date TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                last_checked TIMESTAMP,
-                is_active BOOLEAN DEFAULT 1
-            )
-        ''')
+        Returns:
+            Connexion SQLite
+        """
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_path, timeout=30, check_same_thread=False)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            self._local.conn = conn
+            with self._connections_lock:
+                # Fermer les connexions des threads terminés (un thread par rerun Streamlit)
+                alive = []
+                for thread, other in self._connections:
+                    if thread.is_alive():
+                        alive.append((thread, other))
+                    else:
+                        other.close()
+                alive.append((threading.current_thread(), conn))
+                self._connections = alive
+        return conn
+    
+    def close(self):
+        """Ferme toutes les connexions ouvertes par ce gestionnaire"""
+        with self._connections_lock:
+            for _, conn in self._connections:
+                conn.close()
+            self._connections.clear()
+        self._local = threading.local()
+    
+    @staticmethod
+    def _compact_price_history(cursor):
+        """
+        Fusionne les relevés consécutifs identiques (prix et disponibilité)
         
-        # Table price_history
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS price_history (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                product_id INTEGER NOT NULL,
-                price REAL NOT NULL,
-                checked_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                availability TEXT DEFAULT 'In Stock',
-                FOREIGN KEY (product_id) REFERENCES products(id) ON DELETE CASCADE
+        La première ligne de chaque série est conservée et sa validité prolongée
+        jusqu'au dernier relevé identique ; les doublons sont supprimés.
+        
+        Args:
+            cursor: Curseur de la transaction en cours
+        """
+        df = pd.read_sql_query('''
+            SELECT id, product_id, price, availability, checked_at
+            FROM price_history
+            ORDER BY product_id, checked_at, id
+        ''', cursor.connection)
+        if df.empty:
+            return
+        
+        # Numéro de série : incrémenté à chaque changement de produit, prix ou disponibilité
+        changed = (df[['product_id', 'price', 'availability']]
+                   .ne(df[['product_id', 'price', 'availability']].shift()).any(axis=1))
+        runs = df.groupby(changed.cumsum()).agg(id=('id', 'first'), valid_until=('checked_at', 'last'))
+        
+        cursor.executemany('UPDATE price_history SET valid_until = ? WHERE id = ?',
+                           list(zip(runs['valid_until'], runs['id'].astype(int).tolist())))
+        duplicates = df.loc[~df['id'].isin(runs['id']), 'id'].astype(int).tolist()
+        cursor.executemany('DELETE FROM price_history WHERE id = ?', [(i,) for i in duplicates])
+    
+    @staticmethod
+    def _rebuild_daily_rollups(cursor, product_ids=None):
+        """
+        Recalcule les agrégats quotidiens depuis price_history
+        
+        Args:
+            cursor: Curseur de la transaction en cours
+            product_ids: Produits concernés (None = tous)
+        """
+        where = ''
+        params = ()
+        if product_ids is not None:
+            params = tuple(int(product_id) for product_id in product_ids)
+            if not params:
+                return
+            where = f"WHERE product_id IN ({', '.join('?' * len(params))})"
+            cursor.execute(f'DELETE FROM price_daily {where}', params)
+        
+        cursor.execute(f'''
+            INSERT OR REPLACE INTO price_daily
+                (product_id, day, min_price, max_price, close_price, checks)
+            SELECT product_id, day, MIN(price), MAX(price), close_price, COUNT(*)
+            FROM (
+                SELECT product_id, price, date(checked_at) AS day,
+                       LAST_VALUE(price) OVER (
+                           PARTITION BY product_id, date(checked_at)
+                           ORDER BY checked_at, id
+                           ROWS BETWEEN UNBOUNDED PRECEDING AND UNBOUNDED FOLLOWING
+                       ) AS close_price
+                FROM price_history
+                {where}
             )
-        ''')
+            GROUP BY product_id, day
+        ''', params)
+    
+    @staticmethod
+    def _record_prices(cursor, updates):
+        """
+        Enregistre des relevés de prix (stockage par points de changement)
         
-        # Index pour performance
-        cursor.execute('''
-            CREATE INDEX IF NOT EXISTS idx_product_id 
-            ON price_history(product_id)
-        ''')
+        Une ligne n'est ajoutée à price_history que si le prix ou la disponibilité
+        change ; sinon la validité (valid_until) de la dernière ligne est prolongée.
+        Les agrégats quotidiens sont mis à jour dans la même transaction.
         
-        cursor.execute('''
-            CREATE INDEX IF NOT EXISTS idx_checked_at 
-            ON price_history(checked_at)
-        ''')
+        Args:
+            cursor: Curseur de la transaction en cours
+            updates: Liste de tuples (product_id, prix, disponibilité)
+        """
+        # Dernière ligne de chaque produit : (id, prix, disponibilité)
+        last = {}
+        product_ids = list({int(product_id) for product_id, _, _ in updates})
+        for start in range(0, len(product_ids), 900):
+            chunk = product_ids[start:start + 900]
+            cursor.execute(f'''
+                SELECT product_id, id, price, availability
+                FROM price_history
+                WHERE id IN (
+                    SELECT MAX(id) FROM price_history
+                    WHERE product_id IN ({', '.join('?' * len(chunk))})
+                    GROUP BY product_id
+                )
+            ''', chunk)
+            for product_id, row_id, price, availability in cursor.fetchall():
+                last[product_id] = (row_id, price, availability)
+        
+        inserted = []
+        extended = []
+        for product_id, price, availability in updates:
+            product_id = int(product_id)
+            previous = last.get(product_id)
+            if previous is not None and previous[1:] == (price, availability):
+                # Ligne ajoutée par ce même lot (id None) : déjà valide jusqu'à maintenant
+                if previous[0] is not None:
+                    extended.append((previous[0],))
+                continue
+            inserted.append((product_id, price, availability))
+            last[product_id] = (None, price, availability)
+        
+        cursor.executemany('''
+            INSERT INTO price_history (product_id, price, availability, valid_until)
+            VALUES (?, ?, ?, CURRENT_TIMESTAMP)
+        ''', inserted)
+        
+        cursor.executemany('''
+            UPDATE price_history SET valid_until = CURRENT_TIMESTAMP WHERE id = ?
+        ''', extended)
+        
+        cursor.executemany('''
+            INSERT INTO price_daily (product_id, day, min_price, max_price, close_price, checks)
+            VALUES (?, date('now'), ?, ?, ?, 1)
+            ON CONFLICT (product_id, day) DO UPDATE SET
+                min_price = MIN(min_price, excluded.min_price),
+                max_price = MAX(max_price, excluded.max_price),
+                close_price = excluded.close_price,
+                checks = checks + 1
+        ''', [(product_id, price, price, price) for product_id, price, _ in updates])
+    
+    def _init_database(self):
+        """Crée les tables si elles n'existent pas"""
+        # Créer le dossier data si nécessaire
+        Path(self.db_path).parent.mkdir(parents=True, exist_ok=True)
         
-        conn.commit()
-        conn.close()
+        conn = self._get_connection()
+        with conn:
+            cursor = conn.cursor()
+            
+            # Table products
+            cursor.execute('''
+                CREATE TABLE IF NOT EXISTS products (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    url TEXT UNIQUE NOT NULL,
+                    asin TEXT,
+                    name TEXT NOT NULL,
+                    current_price REAL,
+                    target_price REAL,
+                    image_url TEXT,
+                    added_date TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                    last_checked TIMESTAMP,
+                    is_active BOOLEAN DEFAULT 1
+                )
+            ''')
+            
+            # Table price_history
+            cursor.execute('''
+                CREATE TABLE IF NOT EXISTS price_history (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    product_id INTEGER NOT NULL,
+                    price REAL NOT NULL,
+                    checked_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                    availability TEXT DEFAULT 'In Stock',
+                    valid_until TIMESTAMP,
+                    FOREIGN KEY (product_id) REFERENCES products(id) ON DELETE CASCADE
+                )
+            ''')
+            
+            # Table price_daily (agrégats quotidiens pour les graphiques longue durée)
+            cursor.execute('''
+                CREATE TABLE IF NOT EXISTS price_daily (
+                    product_id INTEGER NOT NULL,
+                    day DATE NOT NULL,
+                    min_price REAL NOT NULL,
+                    max_price REAL NOT NULL,
+                    close_price REAL NOT NULL,
+                    checks INTEGER NOT NULL DEFAULT 1,
+                    PRIMARY KEY (product_id, day),
+                    FOREIGN KEY (product_id) REFERENCES products(id) ON DELETE CASCADE
+                ) WITHOUT ROWID
+            ''')
+            
+            # Bases antérieures : une ligne par vérification -> points de changement
+            columns = [row[1] for row in cursor.execute('PRAGMA table_info(price_history)')]
+            if 'valid_until' not in columns:
+                cursor.execute('ALTER TABLE price_history ADD COLUMN valid_until TIMESTAMP')
+                self._rebuild_daily_rollups(cursor)
+                self._compact_price_history(cursor)
+            
+            # Index pour performance
+            cursor.execute('''
+                CREATE INDEX IF NOT EXISTS idx_product_id 
+                ON price_history(product_id)
+            ''')
+            
+            cursor.execute('''
+                CREATE INDEX IF NOT EXISTS idx_checked_at 
+                ON price_history(checked_at)
+            ''')
+            
+            # Table price_events (événements détectés après chaque lot de relevés)
+            cursor.execute('''
+                CREATE TABLE IF NOT EXISTS price_events (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    product_id INTEGER NOT NULL,
+                    event_type TEXT NOT NULL,
+                    price REAL NOT NULL,
+                    reference_price REAL,
+                    change_percent REAL,
+                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                    FOREIGN KEY (product_id) REFERENCES products(id) ON DELETE CASCADE
+                )
+            ''')
+            
+            cursor.execute('''
+                CREATE INDEX IF NOT EXISTS idx_events_created_at 
+                ON price_events(created_at)
+            ''')
+            
+            cursor.execute('''
+                CREATE INDEX IF NOT EXISTS idx_events_product 
+                ON price_events(product_id, created_at)
+            ''')
+            
+            # Table check_schedule (planning du démon de surveillance, horodatage Unix)
+            cursor.execute('''
+                CREATE TABLE IF NOT EXISTS check_schedule (
+                    product_id INTEGER PRIMARY KEY,
+                    next_check_ts REAL NOT NULL,
+                    interval_seconds REAL NOT NULL,
+                    last_run_ts REAL,
+                    FOREIGN KEY (product_id) REFERENCES products(id) ON DELETE CASCADE
+                )
+            ''')
+            
+            cursor.execute('''
+                CREATE INDEX IF NOT EXISTS idx_schedule_next_check 
+                ON check_schedule(next_check_ts)
+            ''')
     
     def add_product(self, url, name, price, target_price, asin=None, image_url=None):
         """
@@ -87,27 +312,22 @@ class DatabaseManager:
             ID du produit créé ou None si erreur
         """
         try:
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
-            
-            now = datetime.now()
-            
-            cursor.execute('''
-                INSERT INTO products (url, asin, name, current_price, target_price, 
-                                     image_url, last_checked)
-                VALUES (?, ?, ?, ?, ?, ?, ?)
-            ''', (url, asin, name, price, target_price, image_url, now))
-            
-            product_id = cursor.lastrowid
-            
-            # Ajouter le premier enregistrement de prix
-            cursor.execute('''
-                INSERT INTO price_history (product_id, price, availability)
-                VALUES (?, ?, ?)
-            ''', (product_id, price, 'In Stock'))
-            
-            conn.commit()
-            conn.close()
+            conn = self._get_connection()
+            with conn:
+                cursor = conn.cursor()
+                
+                now = datetime.now()
+                
+                cursor.execute('''
+                    INSERT INTO products (url, asin, name, current_price, target_price, 
+                                         image_url, last_checked)
+                    VALUES (?, ?, ?, ?, ?, ?, ?)
+                ''', (url, asin, name, price, target_price, image_url, now))
+                
+                product_id = cursor.lastrowid
+                
+                # Ajouter le premier enregistrement de prix
+                self._record_prices(cursor, [(product_id, price, 'In Stock')])
             
             return product_id
         except sqlite3.IntegrityError:
@@ -124,7 +344,7 @@ class DatabaseManager:
         Returns:
             DataFrame avec tous les produits
         """
-        conn = sqlite3.connect(self.db_path)
+        conn = self._get_connection()
         query = '''
             SELECT id, url, asin, name, current_price, target_price, 
                    image_url, added_date, last_checked, is_active
@@ -133,7 +353,6 @@ class DatabaseManager:
             ORDER BY added_date DESC
         '''
         df = pd.read_sql_query(query, conn)
-        conn.close()
         
         return df
     
@@ -147,7 +366,7 @@ class DatabaseManager:
         Returns:
             Dict avec les infos du produit ou None
         """
-        conn = sqlite3.connect(self.db_path)
+        conn = self._get_connection()
         cursor = conn.cursor()
         
         cursor.execute('''
@@ -158,7 +377,6 @@ class DatabaseManager:
         ''', (product_id,))
         
         result = cursor.fetchone()
-        conn.close()
         
         if result:
             return {
@@ -177,61 +395,397 @@ class DatabaseManager:
     
     def update_price(self, product_id, new_price, availability='In Stock'):
         """
-        Met à jour le prix d'un produit et ajoute un enregistrement à l'historique
+        Met à jour le prix d'un produit et enregistre le relevé dans l'historique
         
         Args:
             product_id: ID du produit
             new_price: Nouveau prix
             availability: Disponibilité du produit
         """
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
+        self.update_prices_bulk([(product_id, new_price, availability)])
+    
+    def update_prices_bulk(self, updates):
+        """
+        Met à jour plusieurs produits et leur historique en une seule transaction
         
-        now = datetime.now()
+        Args:
+            updates: Liste de tuples (product_id, nouveau prix, disponibilité)
         
-        # Mettre à jour le produit
-        cursor.execute('''
-            UPDATE products
-            SET current_price = ?, last_checked = ?
-            WHERE id = ?
-        ''', (new_price, now, product_id))
+        Returns:
+            Nombre de produits mis à jour
+        """
+        if not updates:
+            return 0
         
-        # Ajouter à l'historique
-        cursor.execute('''
-            INSERT INTO price_history (product_id, price, availability)
-            VALUES (?, ?, ?)
-        ''', (product_id, new_price, availability))
+        conn = self._get_connection()
+        with conn:
+            cursor = conn.cursor()
+            
+            now = datetime.now()
+            
+            cursor.executemany('''
+                UPDATE products
+                SET current_price = ?, last_checked = ?
+                WHERE id = ?
+            ''', [(price, now, product_id) for product_id, price, _ in updates])
+            
+            self._record_prices(cursor, updates)
         
-        conn.commit()
-        conn.close()
+        return len(updates)
     
     def get_price_history(self, product_id, days=30):
         """
         Récupère l'historique des prix d'un produit
         
+        La série est reconstruite depuis les points de changement : chaque ligne
+        donne un point à son début (checked_at, borné au début de la période) et
+        un autre à sa dernière confirmation (valid_until).
+        
         Args:
             product_id: ID du produit
             days: Nombre de jours d'historique
             
         Returns:
-            DataFrame avec l'historique
+            DataFrame avec l'historique (price, checked_at, availability)
         """
-        conn = sqlite3.connect(self.db_path)
-        query = '''
-            SELECT price, checked_at, availability
-            FROM price_history
-            WHERE product_id = ?
-            AND checked_at >= datetime('now', '-' || ? || ' days')
-            ORDER BY checked_at ASC
+        df = self.get_price_history_bulk([product_id], days)
+        return df.drop(columns='product_id')
+    
+    def get_price_history_bulk(self, product_ids, days=30):
+        """
+        Récupère l'historique reconstruit de plusieurs produits en une requête
+        
+        Même reconstruction que get_price_history : toutes les vérifications de
+        la période, y compris plusieurs changements dans la même journée.
+        
+        Args:
+            product_ids: Liste d'IDs de produits
+            days: Nombre de jours d'historique
+            
+        Returns:
+            DataFrame (product_id, price, checked_at, availability) trié par
+            produit puis date
+        """
+        columns = ['product_id', 'price', 'checked_at', 'availability']
+        empty = pd.DataFrame(columns=columns).astype({
+            'product_id': int, 'price': float, 'checked_at': 'datetime64[ns]', 'availability': object
+        })
+        product_ids = [int(product_id) for product_id in product_ids]
+        if not product_ids:
+            return empty
+        
+        conn = self._get_connection()
+        frames = []
+        # Limite SQLite du nombre de paramètres par requête
+        for start in range(0, len(product_ids), 900):
+            chunk = product_ids[start:start + 900]
+            query = f'''
+                SELECT product_id, price,
+                       MAX(checked_at, datetime('now', '-' || ? || ' days')) AS checked_at,
+                       COALESCE(valid_until, checked_at) AS valid_until,
+                       availability
+                FROM price_history
+                WHERE product_id IN ({', '.join('?' * len(chunk))})
+                AND COALESCE(valid_until, checked_at) >= datetime('now', '-' || ? || ' days')
+                ORDER BY product_id, checked_at ASC, id ASC
+            '''
+            frames.append(pd.read_sql_query(query, conn, params=(days, *chunk, days)))
+        df = pd.concat(frames, ignore_index=True)
+        
+        if df.empty:
+            return empty
+        
+        df['checked_at'] = pd.to_datetime(df['checked_at'], format='ISO8601')
+        df['valid_until'] = pd.to_datetime(df['valid_until'], format='ISO8601')
+        
+        # Fin de validité de chaque palier (prix inchangé jusqu'à cette date)
+        ends = df[df['valid_until'] > df['checked_at']].assign(checked_at=lambda d: d['valid_until'])
+        df = (pd.concat([df, ends])
+              .sort_values(['product_id', 'checked_at'], kind='stable')
+              .reset_index(drop=True))
+        
+        return df[columns]
+    
+    def get_daily_prices(self, product_id, days=365):
+        """
+        Récupère les agrégats quotidiens d'un produit (graphiques longue durée)
+        
+        Les jours sans vérification reprennent la clôture précédente.
+        
+        Args:
+            product_id: ID du produit
+            days: Nombre de jours d'historique
+            
+        Returns:
+            DataFrame (day, min_price, max_price, close_price, checks), un jour par ligne
+        """
+        df = self.get_daily_prices_bulk([product_id], days)
+        return df.drop(columns='product_id')
+    
+    def get_daily_prices_bulk(self, product_ids, days=30):
+        """
+        Récupère les agrégats quotidiens de plusieurs produits en une requête
+        
+        Les jours sans vérification reprennent la clôture précédente (y compris
+        celle du dernier jour connu avant la période).
+        
+        Args:
+            product_ids: Liste d'IDs de produits
+            days: Nombre de jours d'historique
+            
+        Returns:
+            DataFrame (product_id, day, min_price, max_price, close_price, checks)
+            trié par produit puis jour, un jour par ligne
+        """
+        columns = ['product_id', 'day', 'min_price', 'max_price', 'close_price', 'checks']
+        empty = pd.DataFrame(columns=columns).astype({
+            'product_id': int, 'day': 'datetime64[ns]', 'min_price': float,
+            'max_price': float, 'close_price': float, 'checks': int
+        })
+        product_ids = [int(product_id) for product_id in product_ids]
+        if not product_ids:
+            return empty
+        
+        conn = self._get_connection()
+        today, start = conn.execute(
+            "SELECT date('now'), date('now', '-' || ? || ' days')", (days,)
+        ).fetchone()
+        
+        frames = []
+        # Limite SQLite du nombre de paramètres par requête
+        for chunk_start in range(0, len(product_ids), 900):
+            chunk = product_ids[chunk_start:chunk_start + 900]
+            # Inclut le dernier jour connu avant la période (valeur de départ)
+            query = f'''
+                SELECT d.product_id, d.day, d.min_price, d.max_price, d.close_price, d.checks
+                FROM price_daily d
+                WHERE d.product_id IN ({', '.join('?' * len(chunk))})
+                AND d.day >= COALESCE(
+                    (SELECT MAX(p.day) FROM price_daily p
+                     WHERE p.product_id = d.product_id AND p.day <= ?), ?
+                )
+            '''
+            frames.append(pd.read_sql_query(query, conn, params=(*chunk, start, start)))
+        df = pd.concat(frames, ignore_index=True)
+        
+        if df.empty:
+            return empty
+        
+        # Calendrier complet (jour x produit), clôtures propagées aux jours sans vérification
+        df['day'] = pd.to_datetime(df['day'])
+        calendar = pd.date_range(df['day'].min(), max(pd.Timestamp(today), df['day'].max()), freq='D')
+        close = df.pivot(index='day', columns='product_id', values='close_price').reindex(calendar).ffill()
+        
+        full = close.rename_axis('day').stack().rename('close_price').reset_index()
+        full = full.merge(df.drop(columns='close_price'), on=['day', 'product_id'], how='left')
+        full['min_price'] = full['min_price'].fillna(full['close_price'])
+        full['max_price'] = full['max_price'].fillna(full['close_price'])
+        full['checks'] = full['checks'].fillna(0).astype(int)
+        
+        full = full[full['day'] >= pd.Timestamp(start)]
+        return full[columns].sort_values(['product_id', 'day']).reset_index(drop=True)
+    
+    def get_recent_prices(self, product_ids, days=14):
+        """
+        Récupère l'historique récent de plusieurs produits en une requête
+        
+        Une ligne par point de changement encore valide pendant la période.
+        
+        Args:
+            product_ids: Liste d'IDs de produits
+            days: Nombre de jours d'historique
+            
+        Returns:
+            DataFrame (product_id, price, checked_at) trié par produit puis date
+        """
+        product_ids = [int(product_id) for product_id in product_ids]
+        if not product_ids:
+            return pd.DataFrame(columns=['product_id', 'price', 'checked_at'])
+        
+        conn = self._get_connection()
+        frames = []
+        # Limite SQLite du nombre de paramètres par requête
+        for start in range(0, len(product_ids), 900):
+            chunk = product_ids[start:start + 900]
+            query = f'''
+                SELECT product_id, price, checked_at
+                FROM price_history
+                WHERE product_id IN ({', '.join('?' * len(chunk))})
+                AND COALESCE(valid_until, checked_at) >= datetime('now', '-' || ? || ' days')
+                ORDER BY product_id, checked_at ASC
+            '''
+            frames.append(pd.read_sql_query(query, conn, params=(*chunk, days)))
+        
+        return pd.concat(frames, ignore_index=True)
+    
+    def get_price_baselines(self, product_ids, low_days=config.EVENT_LOW_DAYS,
+                            drop_hours=config.EVENT_DROP_HOURS):
+        """
+        Référence de chaque produit pour la détection d'événements (une requête)
+        
+        À lire avant d'enregistrer un lot de relevés : dernier prix et dernière
+        disponibilité connus, plus bas de la période, plus haut des dernières heures.
+        
+        Args:
+            product_ids: Liste d'IDs de produits
+            low_days: Fenêtre du plus bas (jours)
+            drop_hours: Fenêtre du plus haut récent (heures)
+            
+        Returns:
+            DataFrame (product_id, low_price, recent_high, last_price,
+            last_availability, target_price)
+        """
+        columns = ['product_id', 'low_price', 'recent_high', 'last_price',
+                   'last_availability', 'target_price']
+        product_ids = [int(product_id) for product_id in product_ids]
+        if not product_ids:
+            return pd.DataFrame(columns=columns)
+        
+        conn = self._get_connection()
+        frames = []
+        # Limite SQLite du nombre de paramètres par requête
+        for start in range(0, len(product_ids), 900):
+            chunk = product_ids[start:start + 900]
+            query = f'''
+                WITH recent AS (
+                    SELECT product_id, price, availability,
+                           COALESCE(valid_until, checked_at) AS seen_at,
+                           ROW_NUMBER() OVER (
+                               PARTITION BY product_id ORDER BY checked_at DESC, id DESC
+                           ) AS recency
+                    FROM price_history
+                    WHERE product_id IN ({', '.join('?' * len(chunk))})
+                )
+                SELECT r.product_id,
+                       MIN(CASE WHEN r.seen_at >= datetime('now', '-' || ? || ' days')
+                           THEN r.price END) AS low_price,
+                       MAX(CASE WHEN r.seen_at >= datetime('now', '-' || ? || ' hours')
+                           THEN r.price END) AS recent_high,
+                       MAX(CASE WHEN r.recency = 1 THEN r.price END) AS last_price,
+                       MAX(CASE WHEN r.recency = 1 THEN r.availability END) AS last_availability,
+                       p.target_price
+                FROM recent r
+                JOIN products p ON p.id = r.product_id
+                GROUP BY r.product_id
+            '''
+            frames.append(pd.read_sql_query(query, conn, params=(*chunk, low_days, drop_hours)))
+        
+        return pd.concat(frames, ignore_index=True)
+    
+    def record_price_events(self, events):
+        """
+        Enregistre des événements de prix en une transaction
+        
+        Args:
+            events: DataFrame (product_id, event_type, price, reference_price, change_percent)
+            
+        Returns:
+            Nombre d'événements enregistrés
+        """
+        if events is None or events.empty:
+            return 0
+        
+        rows = [
+            (int(row.product_id), row.event_type, float(row.price),
+             None if pd.isna(row.reference_price) else float(row.reference_price),
+             None if pd.isna(row.change_percent) else float(row.change_percent))
+            for row in events.itertuples(index=False)
+        ]
+        conn = self._get_connection()
+        with conn:
+            conn.executemany('''
+                INSERT INTO price_events
+                    (product_id, event_type, price, reference_price, change_percent)
+                VALUES (?, ?, ?, ?, ?)
+            ''', rows)
+        
+        return len(rows)
+    
+    def get_price_events(self, days=config.EVENT_DISPLAY_DAYS, event_types=None, limit=100):
+        """
+        Récupère les derniers événements de prix des produits actifs
+        
+        Args:
+            days: Nombre de jours d'historique
+            event_types: Types d'événements à garder (None = tous)
+            limit: Nombre maximum d'événements
+            
+        Returns:
+            DataFrame (id, product_id, name, url, event_type, price, reference_price,
+            change_percent, created_at), du plus récent au plus ancien
+        """
+        conditions = ["e.created_at >= datetime('now', '-' || ? || ' days')", "p.is_active = 1"]
+        params = [days]
+        if event_types:
+            conditions.append(f"e.event_type IN ({', '.join('?' * len(event_types))})")
+            params.extend(event_types)
+        
+        conn = self._get_connection()
+        query = f'''
+            SELECT e.id, e.product_id, p.name, p.url, e.event_type, e.price,
+                   e.reference_price, e.change_percent, e.created_at
+            FROM price_events e
+            JOIN products p ON p.id = e.product_id
+            WHERE {' AND '.join(conditions)}
+            ORDER BY e.created_at DESC, e.id DESC
+            LIMIT ?
         '''
-        df = pd.read_sql_query(query, conn, params=(product_id, days))
-        conn.close()
+        df = pd.read_sql_query(query, conn, params=(*params, limit))
         
         if not df.empty:
-            df['checked_at'] = pd.to_datetime(df['checked_at'])
+            df['created_at'] = pd.to_datetime(df['created_at'])
+        
+        return df
+    
+    def get_schedule(self):
+        """
+        Récupère le planning des vérifications
+        
+        Returns:
+            DataFrame (product_id, next_check_ts, interval_seconds, last_run_ts)
+        """
+        conn = self._get_connection()
+        df = pd.read_sql_query('''
+            SELECT product_id, next_check_ts, interval_seconds, last_run_ts
+            FROM check_schedule
+            ORDER BY next_check_ts
+        ''', conn)
         
         return df
     
+    def save_schedule(self, entries):
+        """
+        Enregistre (ou remplace) des entrées du planning en une transaction
+        
+        Args:
+            entries: Liste de tuples (product_id, next_check_ts, interval_seconds, last_run_ts)
+        """
+        if not entries:
+            return
+        
+        conn = self._get_connection()
+        with conn:
+            conn.executemany('''
+                INSERT OR REPLACE INTO check_schedule
+                    (product_id, next_check_ts, interval_seconds, last_run_ts)
+                VALUES (?, ?, ?, ?)
+            ''', entries)
+    
+    def delete_schedule(self, product_ids):
+        """
+        Retire des produits du planning
+        
+        Args:
+            product_ids: Liste d'IDs de produits
+        """
+        if not product_ids:
+            return
+        
+        conn = self._get_connection()
+        with conn:
+            conn.executemany('DELETE FROM check_schedule WHERE product_id = ?',
+                             [(int(product_id),) for product_id in product_ids])
+    
     def get_products_below_target(self):
         """
         Récupère les produits dont le prix est inférieur ou égal au prix cible
@@ -239,7 +793,7 @@ class DatabaseManager:
         Returns:
             Liste de dictionnaires avec les infos des produits
         """
-        conn = sqlite3.connect(self.db_path)
+        conn = self._get_connection()
         cursor = conn.cursor()
         
         cursor.execute('''
@@ -252,7 +806,6 @@ class DatabaseManager:
         ''')
         
         results = cursor.fetchall()
-        conn.close()
         
         products = []
         for row in results:
@@ -273,17 +826,15 @@ class DatabaseManager:
         Args:
             product_id: ID du produit
         """
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        cursor.execute('''
-            UPDATE products
-            SET is_active = 0
-            WHERE id = ?
-        ''', (product_id,))
-        
-        conn.commit()
-        conn.close()
+        conn = self._get_connection()
+        with conn:
+            cursor = conn.cursor()
+            
+            cursor.execute('''
+                UPDATE products
+                SET is_active = 0
+                WHERE id = ?
+            ''', (product_id,))
     
     def get_product_count(self):
         """
@@ -292,13 +843,12 @@ class DatabaseManager:
         Returns:
             Nombre de produits
         """
-        conn = sqlite3.connect(self.db_path)
+        conn = self._get_connection()
         cursor = conn.cursor()
         
         cursor.execute('SELECT COUNT(*) FROM products WHERE is_active = 1')
         count = cursor.fetchone()[0]
         
-        conn.close()
         return count
     
     def add_demo_products(self):
@@ -351,41 +901,42 @@ class DatabaseManager:
             },
         ]
         
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        for product in demo_products:
-            try:
-                now = datetime.now()
-                
-                # Ajouter le produit
-                cursor.execute('''
-                    INSERT OR IGNORE INTO products (url, asin, name, current_price, target_price, 
-                                         image_url, last_checked)
-                    VALUES (?, ?, ?, ?, ?, ?, ?)
-                ''', (product['url'], product['asin'], product['name'], 
-                      product['current_price'], product['target_price'], 
-                      product['image_url'], now))
-                
-                product_id = cursor.lastrowid
-                
-                if product_id > 0:
-                    # Générer un historique de prix sur 30 jours
-                    base_price = product['current_price']
+        conn = self._get_connection()
+        with conn:
+            cursor = conn.cursor()
+            
+            for product in demo_products:
+                try:
+                    now = datetime.now()
+                    
+                    # Ajouter le produit
+                    cursor.execute('''
+                        INSERT OR IGNORE INTO products (url, asin, name, current_price, target_price, 
+                                             image_url, last_checked)
+                        VALUES (?, ?, ?, ?, ?, ?, ?)
+                    ''', (product['url'], product['asin'], product['name'], 
+                          product['current_price'], product['target_price'], 
+                          product['image_url'], now))
+                    
+                    product_id = cursor.lastrowid
                     
-                    for i in range(30, -1, -1):
-                        # Variation aléatoire de +/- 10%
-                        variation = random.uniform(-0.10, 0.10)
-                        price = round(base_price * (1 + variation), 2)
-                        date = now - timedelta(days=i)
+                    if product_id > 0:
+                        # Générer un historique de prix sur 30 jours
+                        base_price = product['current_price']
                         
-                        cursor.execute('''
-                            INSERT INTO price_history (product_id, price, checked_at, availability)
-                            VALUES (?, ?, ?, ?)
-                        ''', (product_id, price, date, 'In Stock'))
+                        for i in range(30, -1, -1):
+                            # Variation aléatoire de +/- 10%
+                            variation = random.uniform(-0.10, 0.10)
+                            price = round(base_price * (1 + variation), 2)
+                            date = now - timedelta(days=i)
+                            
+                            cursor.execute('''
+                                INSERT INTO price_history (product_id, price, checked_at, availability)
+                                VALUES (?, ?, ?, ?)
+                            ''', (product_id, price, date, 'In Stock'))
+                        
+                        self._rebuild_daily_rollups(cursor, [product_id])
+                
+                except Exception as e:
+                    print(f"Erreur lors de l'ajout du produit démo: {e}")
             
-            except Exception as e:
-                print(f"Erreur lors de l'ajout du produit démo: {e}")
-        
-        conn.commit()
-        conn.close()
@@ -0,0 +1,91 @@
+"""
+Module de détection des événements de prix
+Calcul vectorisé sur tout un lot de produits : prix cible atteint, plus bas
+sur la période, forte baisse récente, retour en stock
+"""
+import numpy as np
+import pandas as pd
+
+import config
+
+
+EVENT_TYPES = ('target_reached', 'new_low', 'price_drop', 'back_in_stock')
+
+EVENT_LABELS = {
+    'target_reached': "🎯 Prix cible atteint",
+    'new_low': f"📉 Plus bas sur {config.EVENT_LOW_DAYS} jours",
+    'price_drop': "🔻 Forte baisse",
+    'back_in_stock': "📦 De retour en stock",
+}
+
+EVENT_COLUMNS = ['product_id', 'event_type', 'price', 'reference_price', 'change_percent']
+
+
+def detect_price_events(updates, baselines, drop_percent=config.EVENT_DROP_PERCENT):
+    """
+    Détecte les événements d'un lot de relevés, pour tous les produits à la fois
+
+    Un événement n'est signalé que si le relevé fait baisser le prix (ou, pour
+    le retour en stock, change la disponibilité) : une nouvelle vérification au
+    même prix ne le répète pas.
+
+    Args:
+        updates: Liste de tuples (product_id, prix, disponibilité) venant d'être relevés
+        baselines: DataFrame de DatabaseManager.get_price_baselines, lu avant l'écriture
+            (product_id, low_price, recent_high, last_price, last_availability, target_price)
+        drop_percent: Baisse minimale par rapport au plus haut récent (%)
+
+    Returns:
+        DataFrame (product_id, event_type, price, reference_price, change_percent)
+    """
+    if not updates:
+        return pd.DataFrame(columns=EVENT_COLUMNS)
+
+    df = pd.DataFrame(updates, columns=['product_id', 'price', 'availability'])
+    df = df.drop_duplicates('product_id', keep='last').astype({'product_id': int})
+    df = df.merge(baselines, on='product_id', how='left')
+
+    price = df['price'].astype(float)
+    lower = price < df['last_price']
+
+    # Même règle que les alertes historiques : sous la cible et en baisse
+    # (colonne object si aucun produit du lot n'a de prix cible)
+    target_price = pd.to_numeric(df['target_price'], errors='coerce')
+    target = target_price.where(target_price > 0)
+    target_reached = (price <= target) & (lower | df['last_price'].isna())
+
+    new_low = lower & (price < df['low_price'])
+
+    drop = (df['recent_high'] - price) / df['recent_high'] * 100
+    price_drop = lower & (drop >= drop_percent)
+
+    back_in_stock = (df['last_availability'] == 'Out of Stock') & (df['availability'] == 'In Stock')
+
+    signals = {
+        'target_reached': (target_reached, target),
+        'new_low': (new_low, df['low_price']),
+        'price_drop': (price_drop, df['recent_high']),
+        'back_in_stock': (back_in_stock, df['last_price']),
+    }
+    frames = []
+    for event_type, (mask, reference) in signals.items():
+        mask = mask.fillna(False).astype(bool)
+        if not mask.any():
+            continue
+        frames.append(pd.DataFrame({
+            'product_id': df.loc[mask, 'product_id'],
+            'event_type': event_type,
+            'price': price[mask],
+            'reference_price': reference[mask],
+        }))
+
+    if not frames:
+        return pd.DataFrame(columns=EVENT_COLUMNS)
+
+    events = pd.concat(frames, ignore_index=True)
+    events['change_percent'] = np.where(
+        events['reference_price'] > 0,
+        (events['price'] - events['reference_price']) / events['reference_price'] * 100,
+        np.nan
+    )
+    return events[EVENT_COLUMNS]
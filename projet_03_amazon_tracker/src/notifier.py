@@ -1,100 +1,365 @@
 """
 Module de notification par email
+Une connexion SMTP authentifiée par lot, mode digest (un email par
+destinataire), envoi depuis une file en arrière-plan avec nouvelles tentatives
 """
+import queue
 import smtplib
+import threading
+import time
 from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
 import config
+from src.retry import backoff_delay
 
 
 class EmailNotifier:
     """Gestionnaire des notifications par email"""
     
-    def __init__(self):
-        """Initialise le notifier"""
-        self.email = config.SMTP_EMAIL
-        self.password = config.SMTP_PASSWORD
-        self.host = config.SMTP_HOST
-        self.port = config.SMTP_PORT
+    def __init__(self, host=None, port=None, email=None, password=None, use_tls=None,
+                 recipients=None, digest=config.EMAIL_DIGEST, max_retries=config.EMAIL_MAX_RETRIES,
+                 retry_delay=config.EMAIL_RETRY_DELAY, retry_max_delay=config.EMAIL_RETRY_MAX_DELAY,
+                 timeout=config.SMTP_TIMEOUT):
+        """
+        Initialise le notifier (paramètres de config.py par défaut)
+        
+        Args:
+            host: Serveur SMTP
+            port: Port SMTP
+            email: Adresse de l'expéditeur (et identifiant SMTP)
+            password: Mot de passe SMTP (vide = pas d'authentification)
+            use_tls: Chiffrer la connexion avec STARTTLS
+            recipients: Destinataires par défaut des alertes
+            digest: Regrouper les alertes d'un lot en un email par destinataire
+            max_retries: Tentatives par email (envoi en arrière-plan)
+            retry_delay: Délai de base du backoff (secondes)
+            retry_max_delay: Délai maximum entre deux tentatives (secondes)
+            timeout: Timeout de la connexion SMTP (secondes)
+        """
+        self.email = config.SMTP_EMAIL if email is None else email
+        self.password = config.SMTP_PASSWORD if password is None else password
+        self.host = host or config.SMTP_HOST
+        self.port = port or config.SMTP_PORT
+        self.use_tls = config.SMTP_USE_TLS if use_tls is None else use_tls
+        self.recipients = list(recipients or config.ALERT_RECIPIENTS or [self.email])
+        self.digest = digest
+        self.max_retries = max_retries
+        self.retry_delay = retry_delay
+        self.retry_max_delay = retry_max_delay
+        self.timeout = timeout
+        
+        self.stats = {'connections': 0, 'sent': 0, 'failed': 0, 'dropped': 0}
+        self._queue = queue.Queue()
+        self._pending = 0
+        self._pending_lock = threading.Condition()
+        self._worker = None
+        self._stop = object()
+    
+    def _connect(self):
+        """
+        Ouvre une connexion SMTP (STARTTLS et authentification si configurés)
+        
+        Returns:
+            Connexion smtplib.SMTP prête à envoyer
+        """
+        server = smtplib.SMTP(self.host, self.port, timeout=self.timeout)
+        try:
+            if self.use_tls:
+                server.starttls()
+            if self.password:
+                server.login(self.email, self.password)
+        except Exception:
+            server.close()
+            raise
+        self.stats['connections'] += 1
+        return server
+    
+    def build_alert_message(self, alert, recipient):
+        """
+        Construit l'email d'une alerte
+        
+        Args:
+            alert: Dict (name, url, current_price, target_price)
+            recipient: Adresse du destinataire
+        
+        Returns:
+            Message MIME
+        """
+        # Calculer les économies
+        savings = alert['target_price'] - alert['current_price']
+        
+        msg = MIMEMultipart('alternative')
+        msg['From'] = self.email
+        msg['To'] = recipient
+        msg['Subject'] = config.EMAIL_SUBJECT.format(product_name=alert['name'])
+        
+        # Corps HTML
+        html_body = config.EMAIL_TEMPLATE.format(
+            product_name=alert['name'],
+            current_price=f"{alert['current_price']:.2f}",
+            target_price=f"{alert['target_price']:.2f}",
+            savings=f"{savings:.2f}",
+            product_url=alert['url']
+        )
+        msg.attach(MIMEText(html_body, 'html'))
+        return msg
+    
+    def build_digest_message(self, alerts, recipient):
+        """
+        Construit un email récapitulatif regroupant plusieurs alertes
+        
+        Args:
+            alerts: Liste de dicts (name, url, current_price, target_price)
+            recipient: Adresse du destinataire
+        
+        Returns:
+            Message MIME
+        """
+        rows = []
+        total_savings = 0
+        for alert in alerts:
+            savings = alert['target_price'] - alert['current_price']
+            total_savings += savings
+            rows.append(config.EMAIL_DIGEST_ROW.format(
+                product_name=alert['name'],
+                product_url=alert['url'],
+                current_price=f"{alert['current_price']:.2f}",
+                target_price=f"{alert['target_price']:.2f}",
+                savings=f"{savings:.2f}"
+            ))
+        
+        msg = MIMEMultipart('alternative')
+        msg['From'] = self.email
+        msg['To'] = recipient
+        msg['Subject'] = config.EMAIL_DIGEST_SUBJECT.format(count=len(alerts))
+        
+        html_body = config.EMAIL_DIGEST_TEMPLATE.format(
+            count=len(alerts),
+            rows=''.join(rows),
+            total_savings=f"{total_savings:.2f}"
+        )
+        msg.attach(MIMEText(html_body, 'html'))
+        return msg
+    
+    def build_messages(self, alerts):
+        """
+        Construit les emails d'un lot d'alertes
+        
+        Chaque alerte peut préciser ses destinataires (clé 'recipients'), sinon
+        les destinataires par défaut sont utilisés. En mode digest, un seul email
+        par destinataire ; sinon un email par alerte et par destinataire.
+        
+        Args:
+            alerts: Liste de dicts (name, url, current_price, target_price)
+        
+        Returns:
+            Liste de messages MIME
+        """
+        by_recipient = {}
+        for alert in alerts:
+            for recipient in alert.get('recipients') or self.recipients:
+                by_recipient.setdefault(recipient, []).append(alert)
+        
+        messages = []
+        for recipient, recipient_alerts in by_recipient.items():
+            if self.digest and len(recipient_alerts) > 1:
+                messages.append(self.build_digest_message(recipient_alerts, recipient))
+            else:
+                messages.extend(self.build_alert_message(alert, recipient) for alert in recipient_alerts)
+        return messages
+    
+    def deliver(self, messages):
+        """
+        Envoie des emails sur une seule connexion SMTP
+        
+        Args:
+            messages: Liste de messages MIME
+        
+        Returns:
+            Liste des messages non envoyés (vide si tout est parti)
+        """
+        if not messages:
+            return []
+        
+        try:
+            server = self._connect()
+        except smtplib.SMTPAuthenticationError:
+            print("❌ Erreur d'authentification email")
+            self.stats['failed'] += len(messages)
+            return list(messages)
+        except (smtplib.SMTPException, OSError) as e:
+            print(f"❌ Connexion SMTP impossible: {e}")
+            self.stats['failed'] += len(messages)
+            return list(messages)
+        
+        failed = []
+        with server:
+            for index, msg in enumerate(messages):
+                try:
+                    server.send_message(msg)
+                    self.stats['sent'] += 1
+                except smtplib.SMTPServerDisconnected as e:
+                    # Connexion perdue : le reste du lot sera renvoyé
+                    print(f"❌ Connexion SMTP interrompue: {e}")
+                    failed.extend(messages[index:])
+                    break
+                except (smtplib.SMTPException, OSError) as e:
+                    print(f"❌ Erreur lors de l'envoi de l'email à {msg['To']}: {e}")
+                    failed.append(msg)
+        
+        self.stats['failed'] += len(failed)
+        return failed
     
     def send_price_alert(self, product_name, current_price, target_price, product_url):
         """
-        Envoie une alerte par email
+        Envoie une alerte par email (bloquant)
         
         Args:
             product_name: Nom du produit
             current_price: Prix actuel
             target_price: Prix cible
             product_url: URL du produit
-            
+        
         Returns:
             True si succès, False sinon
         """
-        if not self.email or not self.password:
+        if not self.email:
             print("⚠️  Configuration email manquante")
             return False
         
-        try:
-            # Calculer les économies
-            savings = target_price - current_price
-            
-            # Créer le message
-            msg = MIMEMultipart('alternative')
-            msg['From'] = self.email
-            msg['To'] = self.email  # Envoyer à soi-même pour MVP
-            msg['Subject'] = config.EMAIL_SUBJECT.format(product_name=product_name)
-            
-            # Corps HTML
-            html_body = config.EMAIL_TEMPLATE.format(
-                product_name=product_name,
-                current_price=f"{current_price:.2f}",
-                target_price=f"{target_price:.2f}",
-                savings=f"{savings:.2f}",
-                product_url=product_url
-            )
-            
-            # Attacher le corps HTML
-            html_part = MIMEText(html_body, 'html')
-            msg.attach(html_part)
-            
-            # Envoyer l'email
-            with smtplib.SMTP(self.host, self.port) as server:
-                server.starttls()
-                server.login(self.email, self.password)
-                server.send_message(msg)
-            
-            print(f"✅ Email envoyé pour {product_name}")
-            return True
-            
-        except smtplib.SMTPAuthenticationError:
-            print("❌ Erreur d'authentification email")
-            return False
-        except Exception as e:
-            print(f"❌ Erreur lors de l'envoi de l'email: {e}")
+        alert = {'name': product_name, 'url': product_url,
+                 'current_price': current_price, 'target_price': target_price}
+        messages = self.build_messages([alert])
+        if self.deliver(messages):
             return False
+        
+        print(f"✅ Email envoyé pour {product_name}")
+        return True
     
     def send_multiple_alerts(self, alerts):
         """
-        Envoie plusieurs alertes groupées
+        Envoie plusieurs alertes groupées (bloquant, une seule connexion SMTP)
         
         Args:
             alerts: Liste de dicts avec les infos des produits
-            
+        
         Returns:
             Nombre d'emails envoyés avec succès
         """
-        success_count = 0
+        if not self.email:
+            print("⚠️  Configuration email manquante")
+            return 0
         
-        for alert in alerts:
-            if self.send_price_alert(
-                alert['name'],
-                alert['current_price'],
-                alert['target_price'],
-                alert['url']
-            ):
-                success_count += 1
-        
-        return success_count
+        messages = self.build_messages(alerts)
+        return len(messages) - len(self.deliver(messages))
+    
+    def queue_alerts(self, alerts):
+        """
+        Met des alertes en file d'envoi (retour immédiat, envoi en arrière-plan)
+        
+        Args:
+            alerts: Liste de dicts avec les infos des produits
+        
+        Returns:
+            Nombre d'emails mis en file
+        """
+        if not self.email:
+            print("⚠️  Configuration email manquante")
+            return 0
+        
+        messages = self.build_messages(alerts)
+        if not messages:
+            return 0
+        
+        with self._pending_lock:
+            self._pending += len(messages)
+            if self._worker is None or not self._worker.is_alive():
+                self._worker = threading.Thread(target=self._run_worker, name='email-notifier',
+                                                daemon=True)
+                self._worker.start()
+        self._queue.put(messages)
+        return len(messages)
+    
+    def _done(self, count):
+        """Décompte des emails traités (envoyés ou abandonnés)"""
+        with self._pending_lock:
+            self._pending -= count
+            self._pending_lock.notify_all()
+    
+    def _run_worker(self):
+        """Boucle d'envoi : regroupe la file sur une connexion, replanifie les échecs"""
+        retries = []  # (prêt à partir à, tentative, message)
+        
+        while True:
+            timeout = None
+            if retries:
+                timeout = max(min(entry[0] for entry in retries) - time.monotonic(), 0)
+            
+            # Attendre un lot (ou la prochaine nouvelle tentative), puis vider la file
+            batch = []
+            stopping = False
+            try:
+                item = self._queue.get(timeout=timeout)
+                while True:
+                    if item is self._stop:
+                        stopping = True
+                    else:
+                        batch.extend((0, msg) for msg in item)
+                    item = self._queue.get_nowait()
+            except queue.Empty:
+                pass
+            
+            now = time.monotonic()
+            due = [entry for entry in retries if entry[0] <= now]
+            retries = [entry for entry in retries if entry[0] > now]
+            batch.extend((attempt, msg) for _, attempt, msg in due)
+            
+            if batch:
+                messages = [msg for _, msg in batch]
+                failed = {id(msg) for msg in self.deliver(messages)}
+                dropped = 0
+                for attempt, msg in batch:
+                    if id(msg) not in failed:
+                        continue
+                    if attempt + 1 < self.max_retries:
+                        delay = backoff_delay(attempt, self.retry_delay, self.retry_max_delay)
+                        retries.append((now + delay, attempt + 1, msg))
+                    else:
+                        print(f"❌ Email abandonné après {self.max_retries} tentatives: {msg['Subject']}")
+                        dropped += 1
+                self.stats['dropped'] += dropped
+                self._done(len(batch) - len(failed) + dropped)
+            
+            if stopping:
+                if retries:
+                    print(f"⚠️  {len(retries)} email(s) non envoyé(s) à l'arrêt")
+                    self.stats['dropped'] += len(retries)
+                    self._done(len(retries))
+                return
+    
+    def flush(self, timeout=None):
+        """
+        Attend que la file d'envoi soit vide (envoyés ou abandonnés)
+        
+        Args:
+            timeout: Attente maximum en secondes (None = illimitée)
+        
+        Returns:
+            True si la file est vide, False si le délai est écoulé
+        """
+        with self._pending_lock:
+            return self._pending_lock.wait_for(lambda: self._pending <= 0, timeout)
+    
+    def close(self, timeout=None):
+        """
+        Arrête l'envoi en arrière-plan après une dernière tentative sur la file
+        
+        Args:
+            timeout: Attente maximum en secondes (None = illimitée)
+        """
+        if self._worker is not None and self._worker.is_alive():
+            self._queue.put(self._stop)
+            self._worker.join(timeout)
     
     def test_connection(self):
         """
@@ -103,13 +368,12 @@ class EmailNotifier:
         Returns:
             True si connexion réussie, False sinon
         """
-        if not self.email or not self.password:
+        if not self.email:
             return False
         
         try:
-            with smtplib.SMTP(self.host, self.port, timeout=5) as server:
-                server.starttls()
-                server.login(self.email, self.password)
+            with self._connect():
+                pass
             return True
         except Exception as e:
             print(f"❌ Test de connexion échoué: {e}")
@@ -0,0 +1,304 @@
+"""
+Module de rafraîchissement concurrent des prix
+Requêtes simultanées sous limite de débit globale et par domaine, backoff
+exponentiel avec jitter sur les réponses 503/429, écritures en base par lots
+suivies de la détection des événements de prix
+"""
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlparse
+
+import requests
+
+import config
+from src.events import detect_price_events
+from src.retry import backoff_delay, parse_retry_after
+
+
+# Statuts HTTP signalant une surcharge : on réessaie après un délai
+RETRY_STATUSES = (429, 503)
+
+
+class RateLimiter:
+    """Limiteur de débit asynchrone (seau à jetons)"""
+    
+    def __init__(self, rate, burst=1):
+        """
+        Initialise le limiteur
+        
+        Args:
+            rate: Requêtes par seconde (None ou 0 = illimité)
+            burst: Requêtes autorisées d'affilée
+        """
+        self.rate = rate
+        self.burst = max(burst, 1)
+        self._tokens = float(self.burst)
+        self._updated = time.monotonic()
+        self._paused_until = 0.0
+        self._lock = asyncio.Lock()
+    
+    def pause(self, delay):
+        """
+        Suspend le limiteur (ex: domaine surchargé)
+        
+        Args:
+            delay: Durée de la pause en secondes
+        """
+        self._paused_until = max(self._paused_until, time.monotonic() + delay)
+    
+    async def acquire(self):
+        """Attend qu'une requête soit autorisée (ordre d'arrivée respecté)"""
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                if now < self._paused_until:
+                    await asyncio.sleep(self._paused_until - now)
+                    continue
+                if not self.rate:
+                    return
+                
+                self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                await asyncio.sleep((1 - self._tokens) / self.rate)
+
+
+class PriceRefreshEngine:
+    """Rafraîchit les prix de nombreux produits en parallèle, poliment"""
+    
+    def __init__(self, scraper, db, concurrency=config.REFRESH_CONCURRENCY,
+                 global_rate=config.REFRESH_GLOBAL_RATE, host_rate=config.REFRESH_HOST_RATE,
+                 burst=config.REFRESH_BURST, max_retries=config.MAX_RETRIES,
+                 backoff_base=config.BACKOFF_BASE, backoff_max=config.BACKOFF_MAX,
+                 batch_size=config.REFRESH_BATCH_SIZE, timeout=config.REQUEST_TIMEOUT):
+        """
+        Initialise le moteur
+        
+        Args:
+            scraper: Instance d'AmazonScraper (en-têtes HTTP et extraction)
+            db: Instance de DatabaseManager
+            concurrency: Requêtes simultanées maximum
+            global_rate: Requêtes/seconde tous domaines confondus
+            host_rate: Requêtes/seconde par domaine
+            burst: Requêtes autorisées d'affilée par limiteur
+            max_retries: Tentatives par produit
+            backoff_base: Délai de base du backoff (secondes)
+            backoff_max: Délai maximum entre deux tentatives (secondes)
+            batch_size: Mises à jour écrites par transaction
+            timeout: Timeout des requêtes (secondes)
+        """
+        self.scraper = scraper
+        self.db = db
+        self.concurrency = concurrency
+        self.global_rate = global_rate
+        self.host_rate = host_rate
+        self.burst = burst
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.batch_size = batch_size
+        self.timeout = timeout
+        self._local = threading.local()
+    
+    def _session(self):
+        """Session HTTP propre au thread courant (connexions keep-alive réutilisées)"""
+        session = getattr(self._local, 'session', None)
+        if session is None:
+            session = requests.Session()
+            self._local.session = session
+        return session
+    
+    def _fetch(self, url):
+        """
+        Effectue une requête HTTP unique (appelée dans un thread)
+        
+        Returns:
+            Tuple (statut, contenu, en-têtes)
+        """
+        response = self._session().get(url, headers=self.scraper.request_headers(url),
+                                       timeout=self.timeout)
+        return response.status_code, response.content, response.headers
+    
+    async def _refresh_one(self, product, global_limiter, host_limiters, executor):
+        """
+        Récupère le prix d'un produit, avec tentatives et backoff
+        
+        Returns:
+            Dict résultat (product_id, url, success, price, availability, attempts, error, events)
+        """
+        loop = asyncio.get_running_loop()
+        url = product['url']
+        host = urlparse(url).netloc.lower()
+        if host not in host_limiters:
+            host_limiters[host] = RateLimiter(self.host_rate, self.burst)
+        host_limiter = host_limiters[host]
+        
+        result = {
+            'product_id': product['id'],
+            'url': url,
+            'success': False,
+            'price': None,
+            'availability': None,
+            'attempts': 0,
+            'error': None,
+            'events': []
+        }
+        
+        for attempt in range(self.max_retries):
+            await host_limiter.acquire()
+            await global_limiter.acquire()
+            result['attempts'] = attempt + 1
+            overloaded = False
+            retry_after = None
+            
+            try:
+                status, content, headers = await loop.run_in_executor(executor, self._fetch, url)
+            except requests.exceptions.RequestException as e:
+                result['error'] = str(e)
+            else:
+                if status in (200, 304):
+                    product_data = await loop.run_in_executor(
+                        executor, self.scraper.product_from_response, url, status, content, headers
+                    )
+                    if product_data:
+                        result.update(success=True, error=None, price=product_data['price'],
+                                      availability=product_data['availability'])
+                    else:
+                        result['error'] = "Nom ou prix introuvable"
+                    return result
+                
+                result['error'] = f"HTTP {status}"
+                if status not in RETRY_STATUSES:
+                    return result
+                overloaded = True
+                retry_after = parse_retry_after(headers.get('Retry-After'))
+            
+            if attempt + 1 < self.max_retries:
+                delay = backoff_delay(attempt, self.backoff_base, self.backoff_max, retry_after)
+                if overloaded:
+                    # Domaine surchargé : toutes ses requêtes attendent
+                    host_limiter.pause(delay)
+                await asyncio.sleep(delay)
+        
+        return result
+    
+    def _write_batch(self, updates):
+        """
+        Écrit un lot de relevés puis enregistre ses événements (appelée dans un thread)
+        
+        Les références (dernier prix, plus bas, plus haut récent) sont lues avant
+        l'écriture pour comparer les nouveaux prix à l'état précédent.
+        
+        Args:
+            updates: Liste de tuples (product_id, prix, disponibilité)
+        
+        Returns:
+            DataFrame des événements détectés
+        """
+        baselines = self.db.get_price_baselines([product_id for product_id, _, _ in updates])
+        self.db.update_prices_bulk(updates)
+        events = detect_price_events(updates, baselines)
+        self.db.record_price_events(events)
+        return events
+    
+    async def refresh_async(self, products, progress_callback=None):
+        """
+        Rafraîchit une liste de produits (version asynchrone)
+        
+        Args:
+            products: Liste de dicts (ou DataFrame) avec au moins 'id' et 'url'
+            progress_callback: Appelée avec (terminés, total, résultat) à chaque produit
+        
+        Returns:
+            Liste des résultats, dans l'ordre d'achèvement
+        """
+        if hasattr(products, 'to_dict'):
+            products = products.to_dict('records')
+        total = len(products)
+        if total == 0:
+            return []
+        
+        loop = asyncio.get_running_loop()
+        semaphore = asyncio.Semaphore(self.concurrency)
+        global_limiter = RateLimiter(self.global_rate, self.burst)
+        host_limiters = {}
+        results = []
+        pending = []
+        
+        async def flush():
+            updates = [(r['product_id'], r['price'], r['availability']) for r in pending]
+            events = await loop.run_in_executor(executor, self._write_batch, updates)
+            by_product = events.groupby('product_id')['event_type'].agg(list).to_dict()
+            for result in pending:
+                result['events'] = by_product.get(result['product_id'], [])
+            pending.clear()
+        
+        with ThreadPoolExecutor(max_workers=self.concurrency) as executor:
+            
+            async def run(product):
+                async with semaphore:
+                    return await self._refresh_one(product, global_limiter, host_limiters, executor)
+            
+            tasks = [asyncio.create_task(run(product)) for product in products]
+            for next_done in asyncio.as_completed(tasks):
+                result = await next_done
+                results.append(result)
+                
+                if result['success']:
+                    pending.append(result)
+                if len(pending) >= self.batch_size:
+                    await flush()
+                
+                if progress_callback:
+                    progress_callback(len(results), total, result)
+            
+            if pending:
+                await flush()
+        
+        return results
+    
+    def refresh(self, products, progress_callback=None):
+        """
+        Rafraîchit une liste de produits (bloquant)
+        
+        Args:
+            products: Liste de dicts (ou DataFrame) avec au moins 'id' et 'url'
+            progress_callback: Appelée avec (terminés, total, résultat) à chaque produit
+        
+        Returns:
+            Liste des résultats, dans l'ordre d'achèvement
+        """
+        return asyncio.run(self.refresh_async(products, progress_callback))
+
+
+def build_price_alerts(products, results):
+    """
+    Alertes à envoyer après un rafraîchissement : événements "prix cible atteint"
+    
+    Args:
+        products: Dict {product_id: produit} tel qu'avant le rafraîchissement
+        results: Résultats de PriceRefreshEngine.refresh (clé 'events')
+        
+    Returns:
+        Liste de dicts (name, url, current_price, target_price, events)
+    """
+    alerts = []
+    for result in results:
+        if 'target_reached' not in result.get('events', ()):
+            continue
+        product = products[result['product_id']]
+        
+        # Nouveau prix sous la cible
+        alerts.append({
+            'name': product['name'],
+            'url': product['url'],
+            'current_price': result['price'],
+            'target_price': product['target_price'],
+            'events': result['events']
+        })
+    
+    return alerts
@@ -0,0 +1,54 @@
+"""
+Module des nouvelles tentatives
+Backoff exponentiel avec jitter complet et interprétation de l'en-tête
+Retry-After, partagés par le rafraîchissement des prix et les alertes email
+"""
+import random
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+
+import config
+
+
+def parse_retry_after(value):
+    """
+    Interprète un en-tête Retry-After
+    
+    Args:
+        value: Nombre de secondes ou date HTTP
+    
+    Returns:
+        Délai en secondes ou None
+    """
+    if not value:
+        return None
+    try:
+        return max(float(value), 0.0)
+    except ValueError:
+        pass
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if retry_at.tzinfo is None:
+        retry_at = retry_at.replace(tzinfo=timezone.utc)
+    return max((retry_at - datetime.now(timezone.utc)).total_seconds(), 0.0)
+
+
+def backoff_delay(attempt, base=config.BACKOFF_BASE, cap=config.BACKOFF_MAX, retry_after=None):
+    """
+    Délai avant une nouvelle tentative (backoff exponentiel, jitter complet)
+    
+    Args:
+        attempt: Numéro de la tentative échouée (0 = première)
+        base: Délai de base en secondes
+        cap: Délai maximum en secondes
+        retry_after: Délai demandé par le serveur (Retry-After), respecté si présent
+    
+    Returns:
+        Délai en secondes, tiré dans [0, min(cap, base * 2^attempt)]
+    """
+    delay = random.uniform(0, min(cap, base * (2 ** attempt)))
+    if retry_after is not None:
+        delay = max(delay, min(retry_after, cap))
+    return delay
@@ -0,0 +1,242 @@
+"""
+Module de planification des vérifications de prix
+File de priorité ordonnée par échéance, intervalles adaptés à la volatilité et
+à la proximité du prix cible, planning persisté dans SQLite
+"""
+import heapq
+import random
+import threading
+import time
+
+import pandas as pd
+
+import config
+from src.refresh_engine import build_price_alerts
+
+
+def compute_check_intervals(products, history, min_interval=config.SCHEDULER_MIN_INTERVAL,
+                            max_interval=config.SCHEDULER_MAX_INTERVAL,
+                            volatility_ref=config.SCHEDULER_VOLATILITY_REF,
+                            target_range=config.SCHEDULER_TARGET_RANGE):
+    """
+    Calcule l'intervalle de vérification de chaque produit
+
+    L'urgence (entre 0 et 1) combine la volatilité de l'historique (coefficient
+    de variation) et la proximité du prix cible. L'intervalle va de max_interval
+    (urgence nulle) à min_interval (urgence maximale) sur une échelle géométrique.
+
+    Args:
+        products: DataFrame des produits (id, current_price, target_price)
+        history: DataFrame (product_id, price) de l'historique récent
+        min_interval: Intervalle le plus court (secondes)
+        max_interval: Intervalle le plus long (secondes)
+        volatility_ref: Coefficient de variation donnant la volatilité maximale
+        target_range: Écart relatif au prix cible en deçà duquel on accélère
+
+    Returns:
+        Series {product_id: intervalle en secondes}
+    """
+    products = products.set_index('id')
+
+    if history.empty:
+        cv = pd.Series(0.0, index=products.index)
+    else:
+        prices = history.groupby('product_id')['price']
+        cv = (prices.std(ddof=0) / prices.mean()).reindex(products.index).fillna(0.0)
+    volatility = (cv / volatility_ref).clip(0, 1)
+
+    # Écart au prix cible : <= 0 (cible atteinte) -> proximité maximale
+    target_price = pd.to_numeric(products['target_price'], errors='coerce')
+    target = target_price.where(target_price > 0)
+    gap = (pd.to_numeric(products['current_price'], errors='coerce') - target) / target
+    proximity = (1 - gap / target_range).clip(0, 1).fillna(0.0)
+
+    urgency = 1 - (1 - volatility) * (1 - proximity)
+    return max_interval * (min_interval / max_interval) ** urgency
+
+
+class PriceWatchScheduler:
+    """Planificateur des vérifications de prix (démon sans interface)"""
+
+    def __init__(self, db, engine, notifier=None, min_interval=config.SCHEDULER_MIN_INTERVAL,
+                 max_interval=config.SCHEDULER_MAX_INTERVAL,
+                 catchup_window=config.SCHEDULER_CATCHUP_WINDOW,
+                 sync_period=config.SCHEDULER_SYNC_PERIOD, batch_max=config.SCHEDULER_BATCH_MAX,
+                 jitter=config.SCHEDULER_JITTER, history_days=config.SCHEDULER_HISTORY_DAYS,
+                 clock=time.time):
+        """
+        Initialise le planificateur
+
+        Args:
+            db: Instance de DatabaseManager (produits, historique, planning)
+            engine: Instance de PriceRefreshEngine
+            notifier: Instance d'EmailNotifier (None = pas d'alerte email)
+            min_interval: Intervalle le plus court (secondes)
+            max_interval: Intervalle le plus long (secondes)
+            catchup_window: Étalement des vérifications en retard au démarrage (secondes)
+            sync_period: Relecture des produits suivis (secondes)
+            batch_max: Produits rafraîchis par cycle au maximum
+            jitter: Variation aléatoire relative des intervalles
+            history_days: Historique utilisé pour la volatilité (jours)
+            clock: Horloge (horodatage Unix)
+        """
+        self.db = db
+        self.engine = engine
+        self.notifier = notifier
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.catchup_window = catchup_window
+        self.sync_period = sync_period
+        self.batch_max = batch_max
+        self.jitter = jitter
+        self.history_days = history_days
+        self.clock = clock
+
+        self._heap = []        # (next_check_ts, product_id)
+        self._next_check = {}  # product_id -> échéance courante (entrées du tas périmées sinon)
+        self._products = {}    # product_id -> produit actif
+
+    def _intervals(self, product_ids):
+        """Intervalles recalculés pour quelques produits (une requête d'historique)"""
+        products = pd.DataFrame([self._products[product_id] for product_id in product_ids])
+        history = self.db.get_recent_prices(product_ids, self.history_days)
+        return compute_check_intervals(products, history, self.min_interval, self.max_interval)
+
+    def _push(self, product_id, next_check_ts):
+        """Ajoute une échéance à la file de priorité"""
+        self._next_check[product_id] = next_check_ts
+        heapq.heappush(self._heap, (next_check_ts, product_id))
+
+    def sync(self, catch_up=False):
+        """
+        Aligne la file sur les produits actifs et le planning persisté
+
+        Les nouveaux produits sont répartis uniformément sur leur intervalle.
+        Avec catch_up (démarrage), les vérifications en retard sont étalées sur
+        catchup_window au lieu d'être toutes lancées en même temps.
+
+        Args:
+            catch_up: Étaler les échéances dépassées
+
+        Returns:
+            Nombre de produits planifiés
+        """
+        now = self.clock()
+        products_df = self.db.get_all_products()
+        self._products = {product['id']: product for product in products_df.to_dict('records')}
+        schedule = self.db.get_schedule()
+
+        removed = [pid for pid in schedule['product_id'] if pid not in self._products]
+        self.db.delete_schedule(removed)
+        schedule = schedule[schedule['product_id'].isin(list(self._products))]
+
+        entries = []
+
+        # Nouveaux produits : premières vérifications réparties sur l'intervalle
+        scheduled = set(schedule['product_id'])
+        new_ids = [pid for pid in self._products if pid not in scheduled]
+        if new_ids:
+            intervals = self._intervals(new_ids)
+            random.shuffle(new_ids)
+            for rank, product_id in enumerate(new_ids):
+                interval = float(intervals[product_id])
+                next_ts = now + interval * (rank + 0.5) / len(new_ids)
+                entries.append((product_id, next_ts, interval, None))
+
+        # Échéances dépassées (redémarrage) : étalées dans l'ordre d'échéance
+        if catch_up:
+            overdue = schedule[schedule['next_check_ts'] < now].sort_values('next_check_ts')
+            for rank, row in enumerate(overdue.itertuples(index=False)):
+                next_ts = now + self.catchup_window * rank / len(overdue)
+                entries.append((row.product_id, next_ts, row.interval_seconds, row.last_run_ts))
+
+        self.db.save_schedule(entries)
+
+        # Reconstruire la file depuis le planning persisté
+        planned = {row.product_id: row.next_check_ts for row in schedule.itertuples(index=False)}
+        planned.update({entry[0]: entry[1] for entry in entries})
+        self._heap = [(next_ts, product_id) for product_id, next_ts in planned.items()]
+        heapq.heapify(self._heap)
+        self._next_check = planned
+
+        return len(planned)
+
+    def next_due(self):
+        """Horodatage de la prochaine vérification (None si file vide)"""
+        while self._heap:
+            next_ts, product_id = self._heap[0]
+            if self._next_check.get(product_id) == next_ts:
+                return next_ts
+            heapq.heappop(self._heap)
+        return None
+
+    def run_pending(self):
+        """
+        Vérifie les produits arrivés à échéance puis les replanifie
+
+        Returns:
+            Résultats du rafraîchissement (liste vide si rien à faire)
+        """
+        now = self.clock()
+        due = []
+        while len(due) < self.batch_max:
+            next_ts = self.next_due()
+            if next_ts is None or next_ts > now:
+                break
+            _, product_id = heapq.heappop(self._heap)
+            del self._next_check[product_id]
+            if product_id in self._products:
+                due.append(product_id)
+
+        if not due:
+            return []
+
+        products = {product_id: self._products[product_id] for product_id in due}
+        results = self.engine.refresh(list(products.values()))
+
+        alerts = build_price_alerts(products, results)
+        if alerts and self.notifier is not None:
+            self.notifier.queue_alerts(alerts)
+
+        for result in results:
+            if result['success']:
+                products[result['product_id']]['current_price'] = result['price']
+
+        # Replanifier avec les intervalles mis à jour
+        finished = self.clock()
+        intervals = self._intervals(due)
+        entries = []
+        for product_id in due:
+            interval = float(intervals[product_id])
+            next_ts = finished + interval * random.uniform(1 - self.jitter, 1 + self.jitter)
+            entries.append((product_id, next_ts, interval, finished))
+            self._push(product_id, next_ts)
+        self.db.save_schedule(entries)
+
+        return results
+
+    def run_forever(self, stop_event=None):
+        """
+        Boucle du démon : vérifie les échéances, dort jusqu'à la suivante
+
+        Args:
+            stop_event: threading.Event arrêtant la boucle (signal, tests)
+        """
+        stop_event = stop_event or threading.Event()
+        count = self.sync(catch_up=True)
+        print(f"⏱️  {count} produit(s) planifié(s)", flush=True)
+        last_sync = self.clock()
+
+        while not stop_event.is_set():
+            if self.clock() - last_sync >= self.sync_period:
+                self.sync()
+                last_sync = self.clock()
+
+            results = self.run_pending()
+            if results:
+                success = sum(result['success'] for result in results)
+                print(f"✅ {success}/{len(results)} produit(s) vérifié(s)", flush=True)
+
+            next_ts = self.next_due()
+            wait = self.sync_period if next_ts is None else next_ts - self.clock()
+            stop_event.wait(min(max(wait, 0), self.sync_period))
@@ -1,21 +1,50 @@
 """
 Module de scraping Amazon
 """
+import hashlib
 import re
+import threading
 import time
+from collections import OrderedDict
 import requests
-from bs4 import BeautifulSoup
+import soupsieve
+from bs4 import BeautifulSoup, SoupStrainer
 from fake_useragent import UserAgent
 import config
 
 
+# Analyse limitée aux zones utiles de la page produit
+PRODUCT_STRAINER = SoupStrainer(id=list(config.PRODUCT_REGION_IDS))
+
+
 class AmazonScraper:
     """Scraper pour extraire les informations des produits Amazon"""
     
-    def __init__(self):
-        """Initialise le scraper"""
+    def __init__(self, cache_ttl=config.PARSE_CACHE_TTL, cache_size=config.PARSE_CACHE_SIZE):
+        """
+        Initialise le scraper
+        
+        Args:
+            cache_ttl: Durée de validité d'une page analysée (secondes)
+            cache_size: Nombre de pages analysées conservées
+        """
         self.ua = UserAgent()
         self.session = requests.Session()
+        
+        # Sélecteurs CSS compilés une seule fois
+        self._price_selectors = [soupsieve.compile(s) for s in config.PRICE_SELECTORS]
+        self._name_selectors = [soupsieve.compile(s) for s in config.NAME_SELECTORS]
+        self._image_selectors = [soupsieve.compile(s) for s in config.IMAGE_SELECTORS]
+        self._availability_selectors = [soupsieve.compile(s) for s in config.AVAILABILITY_SELECTORS]
+        
+        # Cache des pages analysées (empreinte du contenu -> infos extraites)
+        # et validateurs HTTP par URL (ETag, Last-Modified, dernières infos)
+        self.cache_ttl = cache_ttl
+        self.cache_size = cache_size
+        self._parse_cache = OrderedDict()
+        self._validators = {}
+        self._cache_lock = threading.Lock()
+        self.stats = {'parsed': 0, 'cache_hits': 0, 'not_modified': 0}
     
     def _get_headers(self):
         """
@@ -38,6 +67,27 @@ class AmazonScraper:
             'Cache-Control': 'max-age=0',
         }
     
+    def request_headers(self, url):
+        """
+        Headers HTTP d'une requête, conditionnelle si la page a déjà été vue
+        
+        Args:
+            url: URL demandée
+            
+        Returns:
+            Dict avec les headers
+        """
+        headers = self._get_headers()
+        with self._cache_lock:
+            validators = self._validators.get(url)
+        if validators:
+            if validators['etag']:
+                headers['If-None-Match'] = validators['etag']
+            if validators['last_modified']:
+                headers['If-Modified-Since'] = validators['last_modified']
+            headers.pop('Cache-Control', None)
+        return headers
+    
     def _make_request(self, url, retries=config.MAX_RETRIES):
         """
         Effectue une requête HTTP avec retry logic
@@ -55,11 +105,11 @@ class AmazonScraper:
                 
                 response = self.session.get(
                     url,
-                    headers=self._get_headers(),
+                    headers=self.request_headers(url),
                     timeout=config.REQUEST_TIMEOUT
                 )
                 
-                if response.status_code == 200:
+                if response.status_code in (200, 304):
                     return response
                 elif response.status_code == 503:
                     # Service temporairement indisponible, réessayer
@@ -102,8 +152,8 @@ class AmazonScraper:
         Returns:
             Prix (float) ou None
         """
-        for selector in config.PRICE_SELECTORS:
-            element = soup.select_one(selector)
+        for selector in self._price_selectors:
+            element = selector.select_one(soup)
             if element:
                 price_text = element.get_text(strip=True)
                 # Nettoyer et parser le prix
@@ -142,8 +192,8 @@ class AmazonScraper:
         Returns:
             Nom du produit ou None
         """
-        for selector in config.NAME_SELECTORS:
-            element = soup.select_one(selector)
+        for selector in self._name_selectors:
+            element = selector.select_one(soup)
             if element:
                 return element.get_text(strip=True)
         return None
@@ -158,8 +208,8 @@ class AmazonScraper:
         Returns:
             URL de l'image ou None
         """
-        for selector in config.IMAGE_SELECTORS:
-            element = soup.select_one(selector)
+        for selector in self._image_selectors:
+            element = selector.select_one(soup)
             if element:
                 # Essayer plusieurs attributs
                 for attr in ['data-old-hires', 'data-a-dynamic-image', 'src']:
@@ -187,14 +237,15 @@ class AmazonScraper:
         Returns:
             String de disponibilité
         """
-        for selector in config.AVAILABILITY_SELECTORS:
-            element = soup.select_one(selector)
+        for selector in self._availability_selectors:
+            element = selector.select_one(soup)
             if element:
-                text = element.get_text(strip=True)
-                if 'stock' in text.lower() or 'disponible' in text.lower():
-                    return 'In Stock'
-                elif 'indisponible' in text.lower():
+                text = element.get_text(strip=True).lower()
+                # 'indisponible' contient 'disponible' : tester l'indisponibilité d'abord
+                if any(word in text for word in ('indisponible', 'unavailable', 'rupture', 'out of stock')):
                     return 'Out of Stock'
+                elif 'stock' in text or 'disponible' in text:
+                    return 'In Stock'
         
         return 'Unknown'
     
@@ -215,31 +266,120 @@ class AmazonScraper:
             print("❌ Impossible de récupérer la page")
             return None
         
-        soup = BeautifulSoup(response.content, 'lxml')
+        product_data = self.product_from_response(
+            url, response.status_code, response.content, response.headers
+        )
+        if product_data:
+            print(f"✅ Produit trouvé: {product_data['name']} - {product_data['price']}€")
+        
+        return product_data
+    
+    def product_from_response(self, url, status_code, content, headers):
+        """
+        Infos produit d'une réponse HTTP (200 ou 304 Not Modified)
+        
+        Args:
+            url: URL demandée
+            status_code: Statut HTTP
+            content: Corps de la réponse
+            headers: Headers de la réponse
+            
+        Returns:
+            Dict avec les infos ou None
+        """
+        if status_code == 304:
+            # Page inchangée : dernières infos connues, sans téléchargement ni analyse
+            with self._cache_lock:
+                validators = self._validators.get(url)
+                self.stats['not_modified'] += 1
+            return dict(validators['product']) if validators else None
+        
+        product_data = self.parse_product(content, url)
+        
+        etag = headers.get('ETag')
+        last_modified = headers.get('Last-Modified')
+        with self._cache_lock:
+            if product_data and (etag or last_modified):
+                self._validators[url] = {
+                    'etag': etag,
+                    'last_modified': last_modified,
+                    'product': product_data
+                }
+            else:
+                self._validators.pop(url, None)
+        
+        return product_data
+    
+    def _parse_fields(self, content, parse_only):
+        """
+        Analyse le HTML et extrait nom, prix, image et disponibilité
+        
+        Args:
+            content: HTML de la page
+            parse_only: SoupStrainer limitant l'analyse (None = page entière)
+            
+        Returns:
+            Dict des champs extraits (valeurs None si introuvables)
+        """
+        soup = BeautifulSoup(content, 'lxml', parse_only=parse_only)
+        return {
+            'name': self._extract_name(soup),
+            'price': self._extract_price(soup),
+            'image_url': self._extract_image(soup),
+            'availability': self._extract_availability(soup)
+        }
+    
+    def parse_product(self, content, url):
+        """
+        Extrait les informations d'un produit depuis le HTML d'une page
+        
+        Seules les zones produit (config.PRODUCT_REGION_IDS) sont analysées ; la
+        page entière sert de repli si le nom ou le prix n'y figurent pas. Une page
+        identique à une page récemment analysée n'est pas réanalysée.
         
-        # Extraire les informations
-        asin = self._extract_asin(url)
-        name = self._extract_name(soup)
-        price = self._extract_price(soup)
-        image_url = self._extract_image(soup)
-        availability = self._extract_availability(soup)
+        Args:
+            content: HTML de la page (bytes ou str)
+            url: URL du produit
+            
+        Returns:
+            Dict avec les infos ou None si nom/prix introuvables
+        """
+        raw = content.encode('utf-8') if isinstance(content, str) else content
+        content_hash = hashlib.blake2b(raw, digest_size=16).digest()
+        now = time.monotonic()
+        
+        with self._cache_lock:
+            cached = self._parse_cache.get(content_hash)
+            if cached and now - cached[0] <= self.cache_ttl:
+                self._parse_cache.move_to_end(content_hash)
+                self.stats['cache_hits'] += 1
+                fields = cached[1]
+            else:
+                fields = None
+        
+        if fields is None:
+            fields = self._parse_fields(raw, PRODUCT_STRAINER)
+            if not fields['name'] or not fields['price']:
+                fields = self._parse_fields(raw, None)
+            
+            with self._cache_lock:
+                self.stats['parsed'] += 1
+                self._parse_cache[content_hash] = (now, fields)
+                self._parse_cache.move_to_end(content_hash)
+                while len(self._parse_cache) > self.cache_size:
+                    self._parse_cache.popitem(last=False)
         
         # Vérifier que les infos essentielles sont présentes
-        if not name or not price:
+        if not fields['name'] or not fields['price']:
             print("❌ Impossible d'extraire le nom ou le prix")
             return None
         
         product_data = {
             'url': url,
-            'asin': asin,
-            'name': name,
-            'price': price,
-            'image_url': image_url,
-            'availability': availability
+            'asin': self._extract_asin(url),
+            **fields
         }
         
-        print(f"✅ Produit trouvé: {name} - {price}€")
-        
         return product_data
     
     def validate_url(self, url):
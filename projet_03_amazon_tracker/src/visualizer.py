@@ -74,6 +74,85 @@ class PriceVisualizer:
         
         return fig
     
+    @staticmethod
+    def create_daily_price_chart(df, product_name, target_price=None):
+        """
+        Crée un graphique longue durée depuis les agrégats quotidiens
+        
+        Args:
+            df: DataFrame avec colonnes 'day', 'min_price', 'max_price' et 'close_price'
+            product_name: Nom du produit
+            target_price: Prix cible (optionnel)
+            
+        Returns:
+            Figure Plotly
+        """
+        if df.empty:
+            fig = go.Figure()
+            fig.add_annotation(
+                text="Pas de données disponibles",
+                xref="paper", yref="paper",
+                x=0.5, y=0.5,
+                showarrow=False,
+                font=dict(size=16)
+            )
+            return fig
+        
+        dates = df['day'].tolist()
+        
+        fig = go.Figure()
+        
+        # Fourchette min/max de chaque jour
+        fig.add_trace(go.Scatter(
+            x=dates,
+            y=df['max_price'].tolist(),
+            mode='lines',
+            line=dict(width=0),
+            showlegend=False,
+            hoverinfo='skip'
+        ))
+        fig.add_trace(go.Scatter(
+            x=dates,
+            y=df['min_price'].tolist(),
+            mode='lines',
+            name='Min / max du jour',
+            line=dict(width=0),
+            fill='tonexty',
+            fillcolor='rgba(255, 153, 0, 0.2)',
+            hoverinfo='skip'
+        ))
+        
+        # Prix de clôture
+        fig.add_trace(go.Scatter(
+            x=dates,
+            y=df['close_price'].tolist(),
+            mode='lines',
+            name='Prix (clôture)',
+            line=dict(color='#FF9900', width=2, shape='hv'),
+            hovertemplate='<b>%{y:.2f} €</b><br>%{x|%d/%m/%Y}<extra></extra>'
+        ))
+        
+        if target_price:
+            fig.add_trace(go.Scatter(
+                x=[dates[0], dates[-1]],
+                y=[target_price, target_price],
+                mode='lines',
+                name='Prix cible',
+                line=dict(color=config.COLOR_SUCCESS, width=2, dash='dash'),
+                hovertemplate='<b>Cible: %{y:.2f} €</b><extra></extra>'
+            ))
+        
+        fig.update_layout(
+            title=f"Évolution du prix - {product_name}",
+            xaxis_title="Date",
+            yaxis_title="Prix (€)",
+            hovermode='x unified',
+            template='plotly_white',
+            height=400
+        )
+        
+        return fig
+    
     @staticmethod
     def create_comparison_chart(products_df):
         """
@@ -0,0 +1,59 @@
+"""
+Tests des statistiques de prix : historique reconstruit (variations d'une
+même journée comprises) pour les fenêtres courtes
+"""
+
+import os
+import sys
+import tempfile
+
+import pytest
+
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, project_root)
+
+from src.analyzer import PriceAnalyzer
+from src.database import DatabaseManager
+
+
+@pytest.fixture
+def db():
+    with tempfile.TemporaryDirectory() as workdir:
+        yield DatabaseManager(os.path.join(workdir, 'test.db'))
+
+
+def test_same_day_drop_counts_in_stats_and_trend(db):
+    """100 puis 80 le même jour : variation de -20 %, deux relevés, tendance à la baisse"""
+    product_id = db.add_product("https://www.amazon.fr/dp/B000000001", "Casque", 100.0, 90.0,
+                                asin="B000000001")
+    db.update_prices_bulk([(product_id, 80.0, "En stock")])
+    analyzer = PriceAnalyzer(db)
+
+    stats = analyzer.get_price_stats(product_id)
+    assert stats['first'] == 100.0
+    assert stats['current'] == 80.0
+    assert stats['variation_percent'] == pytest.approx(-20.0)
+    assert stats['count'] == 2
+    assert stats['min'] == 80.0 and stats['max'] == 100.0
+    assert analyzer.get_price_trend(product_id) == 'baisse'
+
+
+def test_portfolio_analytics_matches_single_product_rules(db):
+    """L'analyse groupée reprend les statistiques et la tendance par produit"""
+    dropped = db.add_product("https://www.amazon.fr/dp/B000000001", "Casque", 100.0, 90.0,
+                             asin="B000000001")
+    steady = db.add_product("https://www.amazon.fr/dp/B000000002", "Clavier", 50.0, None,
+                            asin="B000000002")
+    db.update_prices_bulk([(dropped, 80.0, "En stock"), (steady, 50.0, "En stock")])
+    analyzer = PriceAnalyzer(db)
+
+    analytics = analyzer.get_portfolio_analytics()
+    for product_id in (dropped, steady):
+        stats = analyzer.get_price_stats(product_id)
+        row = analytics.loc[product_id]
+        for key in ('min', 'max', 'mean', 'current', 'first', 'count', 'variation_percent'):
+            assert row[key] == pytest.approx(stats[key])
+        assert row['trend'] == analyzer.get_price_trend(product_id)
+
+    assert analytics.loc[dropped, 'is_below_target']
+    assert analytics.loc[steady, 'days_tracked'] == 2
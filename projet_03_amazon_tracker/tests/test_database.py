@@ -0,0 +1,163 @@
+"""
+Tests du stockage des prix : écriture en lot par points de changement,
+connexions par thread et migration des anciennes bases
+"""
+
+import os
+import sqlite3
+import sys
+import tempfile
+import threading
+
+import pytest
+
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, project_root)
+
+from src.database import DatabaseManager
+
+
+@pytest.fixture
+def workdir():
+    with tempfile.TemporaryDirectory() as path:
+        yield path
+
+
+@pytest.fixture
+def db(workdir):
+    manager = DatabaseManager(os.path.join(workdir, 'test.db'))
+    yield manager
+    manager.close()
+
+
+def _history(db, product_id):
+    return db._get_connection().execute(
+        'SELECT price, availability, valid_until IS NOT NULL FROM price_history '
+        'WHERE product_id = ? ORDER BY id', (product_id,)
+    ).fetchall()
+
+
+def test_bulk_update_stores_change_points_only(db):
+    """Un relevé identique prolonge la dernière ligne ; un changement (prix ou disponibilité) en ajoute une"""
+    first = db.add_product("https://www.amazon.fr/dp/B000000001", "Casque", 100.0, None, asin="B000000001")
+    second = db.add_product("https://www.amazon.fr/dp/B000000002", "Clavier", 50.0, None, asin="B000000002")
+
+    updated = db.update_prices_bulk([(first, 100.0, 'In Stock'), (second, 45.0, 'In Stock'),
+                                     (second, 40.0, 'In Stock'), (second, 40.0, 'In Stock')])
+    db.update_prices_bulk([(first, 100.0, 'Out of Stock'), (second, 40.0, 'In Stock')])
+
+    assert updated == 4
+    assert _history(db, first) == [(100.0, 'In Stock', 1), (100.0, 'Out of Stock', 1)]
+    assert _history(db, second) == [(50.0, 'In Stock', 1), (45.0, 'In Stock', 1), (40.0, 'In Stock', 1)]
+    assert db.get_product_by_id(second)['current_price'] == 40.0
+
+    # Agrégats quotidiens : chaque vérification compte
+    day = db._get_connection().execute(
+        'SELECT min_price, max_price, close_price, checks FROM price_daily WHERE product_id = ?', (second,)
+    ).fetchone()
+    assert day == (40.0, 50.0, 40.0, 5)
+    assert db.update_prices_bulk([]) == 0
+
+
+def test_connections_are_per_thread(db):
+    """Une connexion persistante par thread ; celles des threads terminés sont fermées"""
+    main = db._get_connection()
+    assert db._get_connection() is main
+
+    opened = []
+    worker = threading.Thread(target=lambda: opened.append(db._get_connection()))
+    worker.start()
+    worker.join()
+    assert opened[0] is not main
+
+    # La connexion suivante d'un nouveau thread ferme celle du thread terminé
+    worker = threading.Thread(target=db._get_connection)
+    worker.start()
+    worker.join()
+    with pytest.raises(sqlite3.ProgrammingError):
+        opened[0].execute('SELECT 1')
+
+    db.close()
+    with pytest.raises(sqlite3.ProgrammingError):
+        main.execute('SELECT 1')
+    assert db._get_connection() is not main
+
+
+def test_concurrent_bulk_updates_from_threads(db):
+    """Écritures simultanées depuis plusieurs threads (une connexion chacun)"""
+    product_ids = [db.add_product(f"https://www.amazon.fr/dp/B{i:09d}", f"Produit {i}", 10.0, None,
+                                  asin=f"B{i:09d}") for i in range(8)]
+    errors = []
+
+    def refresh(product_id):
+        try:
+            for step in range(20):
+                db.update_prices_bulk([(product_id, 10.0 + step % 3, 'In Stock')])
+        except Exception as error:
+            errors.append(error)
+
+    workers = [threading.Thread(target=refresh, args=(product_id,)) for product_id in product_ids]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+
+    assert errors == []
+    checks = db._get_connection().execute('SELECT SUM(checks) FROM price_daily').fetchone()[0]
+    assert checks == 8 * 21
+
+
+def test_legacy_history_is_compacted_on_open(workdir):
+    """Ancienne base (une ligne par vérification) : séries identiques fusionnées, agrégats recalculés"""
+    path = os.path.join(workdir, 'legacy.db')
+    conn = sqlite3.connect(path)
+    conn.executescript('''
+        CREATE TABLE products (
+            id INTEGER PRIMARY KEY AUTOINCREMENT, url TEXT UNIQUE NOT NULL, asin TEXT,
+            name TEXT NOT NULL, current_price REAL, target_price REAL, image_url TEXT,
+            added_date TIMESTAMP DEFAULT CURRENT_TIMESTAMP, last_checked TIMESTAMP,
+            is_active BOOLEAN DEFAULT 1
+        );
+        CREATE TABLE price_history (
+            id INTEGER PRIMARY KEY AUTOINCREMENT, product_id INTEGER NOT NULL, price REAL NOT NULL,
+            checked_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP, availability TEXT DEFAULT 'In Stock'
+        );
+        INSERT INTO products (url, name, current_price) VALUES ('https://www.amazon.fr/dp/B1', 'Casque', 100);
+        INSERT INTO price_history (product_id, price, checked_at, availability) VALUES
+            (1, 100, '2024-01-01 10:00:00', 'In Stock'),
+            (1, 100, '2024-01-01 12:00:00', 'In Stock'),
+            (1, 100, '2024-01-02 09:00:00', 'In Stock'),
+            (1, 90, '2024-01-02 10:00:00', 'In Stock'),
+            (1, 100, '2024-01-03 10:00:00', 'In Stock'),
+            (1, 100, '2024-01-03 11:00:00', 'Out of Stock');
+    ''')
+    conn.close()
+
+    db = DatabaseManager(path)
+    try:
+        conn = db._get_connection()
+        rows = conn.execute(
+            'SELECT price, availability, checked_at, valid_until FROM price_history ORDER BY checked_at'
+        ).fetchall()
+        assert rows == [
+            (100.0, 'In Stock', '2024-01-01 10:00:00', '2024-01-02 09:00:00'),
+            (90.0, 'In Stock', '2024-01-02 10:00:00', '2024-01-02 10:00:00'),
+            (100.0, 'In Stock', '2024-01-03 10:00:00', '2024-01-03 10:00:00'),
+            (100.0, 'Out of Stock', '2024-01-03 11:00:00', '2024-01-03 11:00:00'),
+        ]
+
+        daily = conn.execute(
+            'SELECT day, min_price, max_price, close_price, checks FROM price_daily ORDER BY day'
+        ).fetchall()
+        assert daily == [('2024-01-01', 100.0, 100.0, 100.0, 2),
+                         ('2024-01-02', 90.0, 100.0, 90.0, 2),
+                         ('2024-01-03', 100.0, 100.0, 100.0, 2)]
+    finally:
+        db.close()
+
+    # Réouverture : la migration n'est pas rejouée
+    db = DatabaseManager(path)
+    try:
+        assert db._get_connection().execute('SELECT COUNT(*) FROM price_history').fetchone()[0] == 4
+    finally:
+        db.close()
@@ -0,0 +1,130 @@
+"""
+Tests des événements de prix : détection vectorisée, références lues en base
+et enregistrement
+"""
+
+import os
+import sys
+import tempfile
+from datetime import datetime, timedelta
+
+import numpy as np
+import pandas as pd
+import pytest
+
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, project_root)
+
+from src.database import DatabaseManager
+from src.events import EVENT_COLUMNS, detect_price_events
+
+
+def _baselines(*rows) -> pd.DataFrame:
+    """Références (product_id, low_price, recent_high, last_price, last_availability, target_price)"""
+    return pd.DataFrame(list(rows), columns=['product_id', 'low_price', 'recent_high', 'last_price',
+                                             'last_availability', 'target_price'])
+
+
+def _events_of(events: pd.DataFrame, event_type: str) -> pd.DataFrame:
+    return events[events['event_type'] == event_type].set_index('product_id')
+
+
+@pytest.fixture
+def db():
+    with tempfile.TemporaryDirectory() as workdir:
+        yield DatabaseManager(os.path.join(workdir, 'test.db'))
+
+
+def test_target_reached_only_when_price_goes_down():
+    """Sous la cible et en baisse (ou premier relevé) ; pas de répétition au même prix"""
+    baselines = _baselines((1, 80, 100, 100, 'In Stock', 90.0),
+                           (2, 80, 80, 80, 'In Stock', 90.0),
+                           (3, np.nan, np.nan, np.nan, None, 90.0),
+                           (4, 80, 100, 100, 'In Stock', None))
+    events = detect_price_events([(1, 85.0, 'In Stock'), (2, 80.0, 'In Stock'),
+                                  (3, 70.0, 'In Stock'), (4, 85.0, 'In Stock')], baselines)
+
+    target = _events_of(events, 'target_reached')
+    assert sorted(target.index) == [1, 3]
+    assert target.loc[1, 'reference_price'] == 90
+    assert target.loc[1, 'change_percent'] == pytest.approx((85 - 90) / 90 * 100)
+
+
+def test_new_low_and_price_drop():
+    """Plus bas de la période battu ; baisse d'au moins drop_percent sous le plus haut récent"""
+    baselines = _baselines((1, 75, 100, 90, 'In Stock', None),
+                           (2, 75, 100, 98, 'In Stock', None),
+                           (3, 75, 100, 75, 'In Stock', None))
+    events = detect_price_events([(1, 70.0, 'In Stock'), (2, 95.0, 'In Stock'),
+                                  (3, 75.0, 'In Stock')], baselines, drop_percent=10)
+
+    new_low = _events_of(events, 'new_low')
+    assert list(new_low.index) == [1]
+    assert new_low.loc[1, 'reference_price'] == 75
+
+    drop = _events_of(events, 'price_drop')
+    assert list(drop.index) == [1]  # produit 2 : 5 % seulement ; produit 3 : prix inchangé
+    assert drop.loc[1, 'change_percent'] == pytest.approx(-30)
+
+
+def test_back_in_stock_only_on_availability_change():
+    """Retour en stock même au même prix ; rien si le produit était déjà en stock"""
+    baselines = _baselines((1, 50, 50, 50, 'Out of Stock', None),
+                           (2, 50, 50, 50, 'In Stock', None))
+    events = detect_price_events([(1, 50.0, 'In Stock'), (2, 50.0, 'In Stock')], baselines)
+
+    assert list(events['event_type']) == ['back_in_stock']
+    assert events.loc[0, 'product_id'] == 1
+    assert events.loc[0, 'change_percent'] == 0
+
+
+def test_no_updates_or_no_event():
+    """Lot vide ou sans changement : tableau vide avec les colonnes attendues"""
+    baselines = _baselines((1, 50, 50, 50, 'In Stock', None))
+    for updates in ([], [(1, 50.0, 'In Stock')]):
+        events = detect_price_events(updates, baselines)
+        assert events.empty
+        assert list(events.columns) == EVENT_COLUMNS
+
+
+def test_price_baselines_use_their_windows(db):
+    """Plus bas sur low_days, plus haut sur drop_hours, dernier relevé par date de vérification"""
+    product_id = db.add_product("https://www.amazon.fr/dp/B000000001", "Casque", 100.0, 90.0,
+                                asin="B000000001")
+    conn = db._get_connection()
+    with conn:
+        conn.executemany(
+            "INSERT INTO price_history (product_id, price, checked_at, availability) VALUES (?, ?, ?, ?)",
+            [(product_id, 60.0, datetime.now() - timedelta(days=40), 'In Stock'),
+             (product_id, 120.0, datetime.now() - timedelta(days=2), 'Out of Stock')]
+        )
+
+    baseline = db.get_price_baselines([product_id]).set_index('product_id').loc[product_id]
+    assert baseline['low_price'] == 100      # 60 hors des 30 jours
+    assert baseline['recent_high'] == 100    # 120 hors des 24 heures
+    assert baseline['last_price'] == 100
+    assert baseline['last_availability'] == 'In Stock'
+    assert baseline['target_price'] == 90
+    assert db.get_price_baselines([]).empty
+
+
+def test_events_are_recorded_once_per_change(db):
+    """Références lues avant l'écriture : une baisse crée ses événements, la même vérification ensuite aucun"""
+    product_id = db.add_product("https://www.amazon.fr/dp/B000000001", "Casque", 100.0, 90.0,
+                                asin="B000000001")
+
+    def refresh(price):
+        baselines = db.get_price_baselines([product_id])
+        updates = [(product_id, price, 'In Stock')]
+        db.update_prices_bulk(updates)
+        return db.record_price_events(detect_price_events(updates, baselines))
+
+    assert refresh(80.0) == 3  # cible atteinte, plus bas, forte baisse
+    assert refresh(80.0) == 0
+    assert db.record_price_events(None) == 0
+
+    stored = db.get_price_events()
+    assert sorted(stored['event_type']) == ['new_low', 'price_drop', 'target_reached']
+    assert (stored['name'] == "Casque").all()
+    assert stored.loc[stored['event_type'] == 'target_reached', 'reference_price'].iloc[0] == 90
+    assert list(db.get_price_events(event_types=['new_low'])['event_type']) == ['new_low']
@@ -0,0 +1,91 @@
+"""
+Tests de l'envoi des alertes email contre le serveur SMTP local du benchmark
+"""
+
+import os
+import sys
+from email import message_from_bytes
+
+import pytest
+
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, project_root)
+
+from benchmark_notifier import make_alerts, start_debug_smtp_server
+from src.notifier import EmailNotifier
+
+
+RECIPIENTS = ['alice@example.invalid', 'bob@example.invalid']
+
+
+def _notifier(port, **kwargs):
+    return EmailNotifier(host='127.0.0.1', port=port, email='tracker@example.invalid',
+                         password='', use_tls=False, recipients=RECIPIENTS,
+                         retry_delay=0.01, retry_max_delay=0.05, **kwargs)
+
+
+@pytest.fixture
+def smtp_sink(request):
+    """Serveur SMTP local ; request.param = nombre de premiers messages refusés (451)"""
+    server, port, counters, received = start_debug_smtp_server(reject_first=getattr(request, 'param', 0))
+    yield port, counters, received
+    server.shutdown()
+
+
+@pytest.mark.parametrize('smtp_sink', [1], indirect=True)
+def test_deliver_returns_refused_messages(smtp_sink):
+    """Un message refusé (451) est rendu à l'appelant, les autres partent sur la même connexion"""
+    port, counters, received = smtp_sink
+    notifier = _notifier(port, digest=False)
+    messages = notifier.build_messages(make_alerts(2))
+
+    failed = notifier.deliver(messages)
+
+    assert failed == messages[:1]
+    assert len(received) == len(messages) - 1
+    assert notifier.stats == {'connections': 1, 'sent': 3, 'failed': 1, 'dropped': 0}
+
+
+def test_digest_sends_one_email_per_recipient(smtp_sink):
+    """En mode digest, toutes les alertes d'un lot tiennent dans un email par destinataire"""
+    port, counters, received = smtp_sink
+    notifier = _notifier(port, digest=True)
+
+    assert notifier.send_multiple_alerts(make_alerts(3)) == len(RECIPIENTS)
+    assert sorted(recipients[0] for recipients, _ in received) == sorted(RECIPIENTS)
+    subjects = {message_from_bytes(data)['Subject'] for _, data in received}
+    assert len(subjects) == 1
+    assert notifier.stats['connections'] == 1
+
+
+@pytest.mark.parametrize('smtp_sink', [3], indirect=True)
+def test_queue_retries_until_delivered(smtp_sink):
+    """Les refus temporaires sont réessayés en arrière-plan jusqu'à l'envoi"""
+    port, counters, received = smtp_sink
+    notifier = _notifier(port, digest=False, max_retries=5)
+    try:
+        assert notifier.queue_alerts(make_alerts(2)) == 4
+        assert notifier.flush(timeout=10)
+    finally:
+        notifier.close(timeout=5)
+
+    assert len(received) == 4
+    assert counters['rejected'] == 3
+    assert notifier.stats['sent'] == 4
+    assert notifier.stats['dropped'] == 0
+
+
+@pytest.mark.parametrize('smtp_sink', [2], indirect=True)
+def test_queue_drops_after_max_retries(smtp_sink):
+    """Sans tentative supplémentaire, les emails refusés sont comptés comme abandonnés"""
+    port, counters, received = smtp_sink
+    notifier = _notifier(port, digest=False, max_retries=1)
+    try:
+        assert notifier.queue_alerts(make_alerts(2)) == 4
+        assert notifier.flush(timeout=10)
+    finally:
+        notifier.close(timeout=5)
+
+    assert len(received) == 2
+    assert notifier.stats['sent'] == 2
+    assert notifier.stats['dropped'] == 2
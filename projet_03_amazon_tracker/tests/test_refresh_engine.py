@@ -0,0 +1,107 @@
+"""
+Tests du moteur de rafraîchissement concurrent contre le serveur HTTP local
+du benchmark (pages factices, réponses 503 et ETag)
+"""
+
+import asyncio
+import os
+import random
+import sys
+import tempfile
+import time
+
+import pytest
+
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, project_root)
+
+import benchmark_refresh
+from benchmark_refresh import start_fixture_server
+from src.database import DatabaseManager
+from src.refresh_engine import PriceRefreshEngine, RateLimiter
+from src.retry import backoff_delay, parse_retry_after
+from src.scraper import AmazonScraper
+
+
+PRODUCT_COUNT = 12
+
+
+@pytest.fixture
+def fixture_server(monkeypatch):
+    """Serveur local : une réponse 503 (Retry-After) par ASIN, puis la page ; prix fixes"""
+    monkeypatch.setattr(benchmark_refresh, 'fixture_price',
+                        lambda asin: 20 + int(asin[1:]) * 1.5)
+    server, base_url, counters = start_fixture_server(fail_first=1)
+    yield base_url, counters
+    server.shutdown()
+
+
+def test_refresh_retries_and_writes_every_product(fixture_server, monkeypatch):
+    """Chaque produit est réessayé après un 503, puis écrit via update_prices_bulk ; les 304 réutilisent le cache"""
+    base_url, counters = fixture_server
+    with tempfile.TemporaryDirectory() as workdir:
+        db = DatabaseManager(os.path.join(workdir, 'test.db'))
+        for i in range(PRODUCT_COUNT):
+            asin = f"B{i:09d}"
+            db.add_product(f"{base_url}/dp/{asin}", f"Produit de test {asin}", 10.0, None, asin=asin)
+        products = db.get_all_products()
+
+        written = []
+        update_prices_bulk = db.update_prices_bulk
+        monkeypatch.setattr(db, 'update_prices_bulk',
+                            lambda updates: written.extend(updates) or update_prices_bulk(updates))
+
+        scraper = AmazonScraper()
+        engine = PriceRefreshEngine(scraper, db, concurrency=4, global_rate=None, host_rate=None,
+                                    backoff_base=0.01, backoff_max=0.05, batch_size=5)
+        results = engine.refresh(products)
+
+        assert len(results) == PRODUCT_COUNT
+        assert all(r['success'] for r in results)
+        assert all(r['attempts'] == 2 for r in results)
+        assert counters['errors'] == PRODUCT_COUNT
+        assert sorted(product_id for product_id, _, _ in written) == sorted(products['id'])
+
+        refreshed = db.get_all_products().set_index('id')
+        expected = {row['id']: 20 + int(row['asin'][1:]) * 1.5 for _, row in products.iterrows()}
+        for product_id, price in expected.items():
+            assert refreshed.loc[product_id, 'current_price'] == pytest.approx(price)
+
+        # Second passage : pages inchangées -> 304, produit repris du cache sans analyse
+        parsed = scraper.stats['parsed']
+        second = engine.refresh(products)
+        assert counters['not_modified'] == PRODUCT_COUNT
+        assert scraper.stats['parsed'] == parsed
+        assert all(r['success'] and r['attempts'] == 1 for r in second)
+        assert {r['product_id']: r['price'] for r in second} == pytest.approx(expected)
+
+
+def test_rate_limiter_spacing_and_pause():
+    """Le seau à jetons espace les requêtes ; une pause retarde la suivante"""
+    async def timed_acquires(limiter, count):
+        start = time.monotonic()
+        for _ in range(count):
+            await limiter.acquire()
+        return time.monotonic() - start
+
+    assert asyncio.run(timed_acquires(RateLimiter(20, burst=1), 5)) >= 4 / 20 * 0.9
+    assert asyncio.run(timed_acquires(RateLimiter(20, burst=5), 5)) < 0.05
+    assert asyncio.run(timed_acquires(RateLimiter(None), 100)) < 0.05
+
+    limiter = RateLimiter(None)
+    limiter.pause(0.1)
+    assert asyncio.run(timed_acquires(limiter, 1)) >= 0.09
+
+
+def test_backoff_delay_bounds():
+    """Jitter borné par min(cap, base * 2^tentative) ; Retry-After respecté dans la limite du cap"""
+    random.seed(0)
+    for attempt in range(10):
+        for _ in range(50):
+            assert 0 <= backoff_delay(attempt, base=0.5, cap=4) <= min(4, 0.5 * 2 ** attempt)
+
+    assert backoff_delay(0, base=0.1, cap=5, retry_after=2) >= 2
+    assert backoff_delay(0, base=0.1, cap=5, retry_after=100) <= 5
+    assert parse_retry_after('3') == 3.0
+    assert parse_retry_after('Wed, 21 Oct 2015 07:28:00 GMT') == 0.0
+    assert parse_retry_after('bientôt') is None
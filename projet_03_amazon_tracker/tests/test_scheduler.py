@@ -0,0 +1,229 @@
+"""
+Tests du planificateur : intervalles adaptatifs, étalement des premières
+vérifications, rattrapage au démarrage et replanification (horloge simulée)
+"""
+
+import os
+import sys
+import tempfile
+
+import pandas as pd
+import pytest
+
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, project_root)
+
+from src.database import DatabaseManager
+from src.scheduler import PriceWatchScheduler, compute_check_intervals
+
+
+MIN_INTERVAL = 100
+MAX_INTERVAL = 1600
+START = 1_000_000.0
+
+
+class FakeClock:
+    """Horloge simulée avancée à la main"""
+
+    def __init__(self, now=START):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+class FakeEngine:
+    """Moteur de rafraîchissement simulé : prix inchangé, appels enregistrés"""
+
+    def __init__(self):
+        self.calls = []
+
+    def refresh(self, products):
+        self.calls.append([product['id'] for product in products])
+        return [{'product_id': product['id'], 'success': True,
+                 'price': product['current_price'], 'events': []} for product in products]
+
+
+def _products(*rows) -> pd.DataFrame:
+    """Produits (id, current_price, target_price)"""
+    return pd.DataFrame(list(rows), columns=['id', 'current_price', 'target_price'])
+
+
+def _history(*rows) -> pd.DataFrame:
+    """Historique (product_id, price)"""
+    return pd.DataFrame(list(rows), columns=['product_id', 'price'])
+
+
+def _add_products(db, count, target_price=None):
+    return [db.add_product(f'https://www.amazon.fr/dp/B{index:09d}', f'Produit {index}',
+                           100.0, target_price) for index in range(count)]
+
+
+@pytest.fixture
+def db():
+    with tempfile.TemporaryDirectory() as workdir:
+        manager = DatabaseManager(os.path.join(workdir, 'test.db'))
+        yield manager
+        manager.close()
+
+
+@pytest.fixture
+def clock():
+    return FakeClock()
+
+
+@pytest.fixture
+def engine():
+    return FakeEngine()
+
+
+def _scheduler(db, engine, clock, **kwargs):
+    options = dict(min_interval=MIN_INTERVAL, max_interval=MAX_INTERVAL, catchup_window=300,
+                   batch_max=50, jitter=0.0, clock=clock)
+    options.update(kwargs)
+    return PriceWatchScheduler(db, engine, **options)
+
+
+def test_intervals_stable_product_far_from_target():
+    """Historique stable, pas de cible ou cible lointaine -> intervalle maximal"""
+    intervals = compute_check_intervals(_products((1, 100.0, None), (2, 100.0, 50.0)),
+                                        _history((1, 100.0), (1, 100.0), (2, 100.0)),
+                                        MIN_INTERVAL, MAX_INTERVAL)
+
+    assert intervals[1] == pytest.approx(MAX_INTERVAL)
+    assert intervals[2] == pytest.approx(MAX_INTERVAL)
+
+
+def test_intervals_target_reached_or_volatile():
+    """Cible atteinte ou coefficient de variation >= référence -> intervalle minimal"""
+    intervals = compute_check_intervals(_products((1, 90.0, 100.0), (2, 100.0, None)),
+                                        _history((2, 80.0), (2, 120.0)),
+                                        MIN_INTERVAL, MAX_INTERVAL, volatility_ref=0.05)
+
+    assert intervals[1] == pytest.approx(MIN_INTERVAL)
+    assert intervals[2] == pytest.approx(MIN_INTERVAL)
+
+
+def test_intervals_geometric_scale():
+    """Urgence 0.5 (prix à mi-chemin de la plage cible) -> moyenne géométrique"""
+    intervals = compute_check_intervals(_products((1, 110.0, 100.0)), _history(),
+                                        MIN_INTERVAL, MAX_INTERVAL, target_range=0.20)
+
+    assert intervals[1] == pytest.approx((MIN_INTERVAL * MAX_INTERVAL) ** 0.5)
+
+
+def test_sync_staggers_new_products(db, engine, clock):
+    """Premières vérifications réparties uniformément sur l'intervalle, puis persistées"""
+    product_ids = _add_products(db, 4)
+    scheduler = _scheduler(db, engine, clock)
+
+    assert scheduler.sync() == 4
+
+    schedule = db.get_schedule()
+    assert sorted(schedule['product_id']) == sorted(product_ids)
+    offsets = sorted(schedule['next_check_ts'] - START)
+    assert offsets == pytest.approx([MAX_INTERVAL * (rank + 0.5) / 4 for rank in range(4)])
+    assert (schedule['interval_seconds'] == MAX_INTERVAL).all()
+    assert schedule['last_run_ts'].isna().all()
+    assert scheduler.next_due() == pytest.approx(START + MAX_INTERVAL / 8)
+
+
+def test_sync_catch_up_spreads_overdue_checks(db, engine, clock):
+    """Au démarrage, les échéances dépassées sont étalées sur catchup_window dans l'ordre"""
+    product_ids = _add_products(db, 4)
+    db.save_schedule([(product_ids[0], START - 10, MAX_INTERVAL, START - 2000),
+                      (product_ids[1], START - 500, MAX_INTERVAL, START - 2000),
+                      (product_ids[2], START - 100, MAX_INTERVAL, START - 2000),
+                      (product_ids[3], START + 50, MAX_INTERVAL, START - 2000)])
+    scheduler = _scheduler(db, engine, clock, catchup_window=300)
+
+    scheduler.sync(catch_up=True)
+
+    schedule = db.get_schedule().set_index('product_id')
+    assert schedule.loc[product_ids[1], 'next_check_ts'] == pytest.approx(START)
+    assert schedule.loc[product_ids[2], 'next_check_ts'] == pytest.approx(START + 100)
+    assert schedule.loc[product_ids[0], 'next_check_ts'] == pytest.approx(START + 200)
+    # Échéance à venir : inchangée
+    assert schedule.loc[product_ids[3], 'next_check_ts'] == pytest.approx(START + 50)
+    assert (schedule['last_run_ts'] == START - 2000).all()
+
+
+def test_sync_without_catch_up_keeps_overdue_checks(db, engine, clock):
+    """Hors démarrage, les échéances dépassées restent dues immédiatement"""
+    product_ids = _add_products(db, 2)
+    db.save_schedule([(product_ids[0], START - 500, MAX_INTERVAL, None),
+                      (product_ids[1], START - 100, MAX_INTERVAL, None)])
+    scheduler = _scheduler(db, engine, clock)
+
+    scheduler.sync()
+
+    assert scheduler.run_pending() and engine.calls == [[product_ids[0], product_ids[1]]]
+
+
+def test_sync_drops_removed_products(db, engine, clock):
+    """Les produits supprimés sortent du planning persisté et de la file"""
+    product_ids = _add_products(db, 3)
+    scheduler = _scheduler(db, engine, clock)
+    scheduler.sync()
+
+    db.delete_product(product_ids[0])
+
+    assert scheduler.sync() == 2
+    assert sorted(db.get_schedule()['product_id']) == sorted(product_ids[1:])
+
+    clock.now += MAX_INTERVAL
+    scheduler.run_pending()
+    assert sorted(engine.calls[0]) == sorted(product_ids[1:])
+
+
+def test_run_pending_waits_for_due_time(db, engine, clock):
+    """Rien n'est rafraîchi avant l'échéance ; ensuite dans l'ordre d'échéance"""
+    product_ids = _add_products(db, 1)
+    scheduler = _scheduler(db, engine, clock)
+    scheduler.sync()
+
+    clock.now = START + MAX_INTERVAL / 2 - 1
+    assert scheduler.run_pending() == []
+    assert engine.calls == []
+
+    clock.now = START + MAX_INTERVAL / 2
+    results = scheduler.run_pending()
+    assert [result['product_id'] for result in results] == product_ids
+    assert engine.calls == [product_ids]
+
+
+def test_run_pending_limits_batch_and_reschedules(db, engine, clock):
+    """Au plus batch_max produits par cycle, replanifiés à fin + intervalle"""
+    product_ids = _add_products(db, 5)
+    scheduler = _scheduler(db, engine, clock, batch_max=2)
+    scheduler.sync()
+
+    clock.now = START + MAX_INTERVAL
+    scheduler.run_pending()
+    assert len(engine.calls[0]) == 2
+
+    schedule = db.get_schedule().set_index('product_id')
+    for product_id in engine.calls[0]:
+        assert schedule.loc[product_id, 'next_check_ts'] == pytest.approx(clock.now + MAX_INTERVAL)
+        assert schedule.loc[product_id, 'last_run_ts'] == pytest.approx(clock.now)
+
+    scheduler.run_pending()
+    scheduler.run_pending()
+    assert [len(call) for call in engine.calls] == [2, 2, 1]
+    assert sorted(sum(engine.calls, [])) == sorted(product_ids)
+    assert scheduler.run_pending() == []
+    assert scheduler.next_due() == pytest.approx(clock.now + MAX_INTERVAL)
+
+
+def test_run_pending_shortens_interval_near_target(db, engine, clock):
+    """Cible atteinte : le produit est replanifié à l'intervalle minimal"""
+    product_ids = _add_products(db, 1, target_price=120.0)
+    scheduler = _scheduler(db, engine, clock)
+    scheduler.sync()
+
+    assert db.get_schedule()['interval_seconds'].iloc[0] == pytest.approx(MIN_INTERVAL)
+
+    clock.now = START + MIN_INTERVAL
+    scheduler.run_pending()
+    assert engine.calls == [product_ids]
+    assert scheduler.next_due() == pytest.approx(clock.now + MIN_INTERVAL)
@@ -35,9 +35,14 @@ def init_managers():
     return loader, analyzer, visualizer
 
 
-@st.cache_data(ttl=3600)  # Cache 1h
+@st.cache_resource(ttl=3600)  # Cache 1h
 def load_covid_data(force_refresh=False):
-    """Charge les données COVID avec cache"""
+    """
+    Charge les données COVID avec cache
+    
+    Un seul DataFrame partagé, en lecture seule (cache_data en renverrait une
+    copie à chaque exécution) : l'index des pays reste valide pour ce tableau.
+    """
     loader, _, _ = init_managers()
     return loader.load_data(force_refresh=force_refresh)
 
@@ -226,7 +231,7 @@ def main():
             st.warning("Sélectionnez au moins 2 pays pour la comparaison")
         else:
             # Graphique de comparaison temporelle
-            compare_df = df[df['location'].isin(compare_countries)]
+            compare_df = loader.get_countries_data(df, compare_countries)
             compare_df = analyzer.filter_by_date_range(compare_df, start_date, end_date)
             
             metric_compare = st.selectbox(
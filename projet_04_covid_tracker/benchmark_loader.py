@@ -0,0 +1,143 @@
+"""
+Benchmark du chargement des données COVID-19 (sans réseau)
+Génère un jeu de données synthétique au format Our World in Data, puis compare
+l'ancien cache CSV (relu et renettoyé à chaque démarrage) à l'instantané Parquet,
+et l'accès à un pays par l'index des positions au filtrage booléen
+
+Utilisation :
+    python benchmark_loader.py --countries 250 --days 1400
+"""
+import argparse
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+sys.path.append(str(Path(__file__).parent))
+
+import config
+from src.data_loader import CovidDataLoader, country_slice
+
+
+def make_owid_frame(countries=250, days=1400, seed=0):
+    """
+    Jeu de données synthétique avec les colonnes de config.COLUMNS_TO_LOAD
+
+    Args:
+        countries: Nombre de pays (plus l'agrégat 'World')
+        days: Nombre de jours par pays
+        seed: Graine aléatoire
+
+    Returns:
+        DataFrame brut (texte en object, métriques en float64, valeurs manquantes)
+    """
+    rng = np.random.default_rng(seed)
+    continents = ['Africa', 'Asia', 'Europe', 'North America', 'Oceania', 'South America']
+    names = [f"Country {i:03d}" for i in range(countries)] + ['World']
+    populations = np.append(rng.integers(100_000, 300_000_000, countries), 8_000_000_000)
+
+    n = len(names) * days
+    location = np.repeat(names, days)
+    population = np.repeat(populations, days).astype(float)
+    new_cases = rng.poisson(np.repeat(populations / 20_000, days)).astype(float)
+    new_deaths = rng.poisson(new_cases / 100).astype(float)
+    new_cases[-days:] *= 50  # 'World' : cumuls au-delà de 2^24
+    total_cases = pd.Series(new_cases).groupby(location).cumsum().to_numpy()
+    total_deaths = pd.Series(new_deaths).groupby(location).cumsum().to_numpy()
+    vaccinations = np.clip(np.arange(n) % days - days / 3, 0, None) * population / days
+
+    df = pd.DataFrame({
+        'iso_code': np.repeat([f"C{i:02X}" for i in range(countries)] + ['OWID_WRL'], days),
+        'continent': np.append(rng.choice(continents, countries), None).repeat(days),
+        'location': location,
+        'date': np.tile(pd.date_range('2020-01-01', periods=days, freq='D'), len(names)),
+        'total_cases': total_cases,
+        'new_cases': new_cases,
+        'total_deaths': total_deaths,
+        'new_deaths': new_deaths,
+        'total_vaccinations': vaccinations * 2,
+        'people_vaccinated': vaccinations,
+        'people_fully_vaccinated': vaccinations * 0.9,
+        'population': population,
+        'total_cases_per_million': total_cases / population * 1_000_000,
+        'total_deaths_per_million': total_deaths / population * 1_000_000,
+    })
+
+    # Valeurs manquantes comme dans les données réelles
+    for column in ['total_vaccinations', 'people_vaccinated', 'people_fully_vaccinated']:
+        df.loc[rng.random(n) < 0.3, column] = np.nan
+    return df.sample(frac=1, random_state=seed)[config.COLUMNS_TO_LOAD]
+
+
+def legacy_load(path):
+    """Chargement d'avant l'instantané Parquet : relecture CSV puis nettoyage complet"""
+    df = pd.read_csv(path, parse_dates=['date'])
+    df = df.dropna(subset=['location'])
+    df = df.sort_values(['location', 'date'])
+    numeric_cols = df.select_dtypes(include=['float64', 'int64']).columns
+    df[numeric_cols] = df[numeric_cols].fillna(0)
+    return df
+
+
+def timed(func, repeat=3):
+    """Meilleur temps sur quelques exécutions (résultat, secondes)"""
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        best = min(best, time.perf_counter() - start)
+    return result, best
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark du chargement des données COVID-19")
+    parser.add_argument('--countries', type=int, default=250, help='Nombre de pays')
+    parser.add_argument('--days', type=int, default=1400, help='Nombre de jours par pays')
+    args = parser.parse_args(argv)
+
+    raw = make_owid_frame(args.countries, args.days)
+
+    with tempfile.TemporaryDirectory() as workdir:
+        loader = CovidDataLoader()
+        loader.data_path = Path(workdir) / 'covid_data.parquet'
+        loader.legacy_path = Path(workdir) / 'covid_data.csv'
+        raw.to_csv(loader.legacy_path, index=False)
+        csv_size = loader.legacy_path.stat().st_size
+
+        legacy, legacy_time = timed(lambda: legacy_load(loader.legacy_path))
+
+        # Premier chargement : conversion de l'ancien cache CSV en Parquet
+        start = time.perf_counter()
+        loader.load_data()
+        convert_time = time.perf_counter() - start
+        parquet_size = loader.data_path.stat().st_size
+
+        snapshot, snapshot_time = timed(loader.load_data)
+
+    legacy_memory = legacy.memory_usage(deep=True).sum()
+    snapshot_memory = snapshot.memory_usage(deep=True).sum()
+    float32_columns = [c for c in snapshot.columns if snapshot[c].dtype == 'float32']
+
+    # Accès à chaque pays : filtrage booléen historique contre l'index des positions
+    countries = loader.get_available_countries(snapshot)
+    _, scan_time = timed(lambda: [snapshot[snapshot['location'] == c] for c in countries], repeat=1)
+    _, slice_time = timed(lambda: [country_slice(snapshot, c) for c in countries])
+
+    print(f"Lignes              : {len(snapshot):,}")
+    print(f"Cache CSV           : {csv_size / 1e6:.1f} Mo, chargement + nettoyage {legacy_time:.2f}s")
+    print(f"Conversion Parquet  : {convert_time:.2f}s (une seule fois)")
+    print(f"Cache Parquet       : {parquet_size / 1e6:.1f} Mo, chargement {snapshot_time:.2f}s "
+          f"({legacy_time / snapshot_time:.0f}x plus rapide)")
+    print(f"Mémoire             : {legacy_memory / 1e6:.0f} Mo -> {snapshot_memory / 1e6:.0f} Mo "
+          f"({legacy_memory / snapshot_memory:.1f}x moins)")
+    print(f"Colonnes float32    : {len(float32_columns)}/{len(config.COLUMNS_TO_LOAD) - 4}")
+    print(f"Accès par pays      : filtrage {scan_time * 1000 / len(countries):.2f}ms, "
+          f"index {slice_time * 1000 / len(countries):.3f}ms ({scan_time / slice_time:.0f}x plus rapide)")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -27,8 +27,12 @@ COLUMNS_TO_LOAD = [
     'total_deaths_per_million',
 ]
 
-# Cache local
-DATA_CACHE_PATH = 'data/covid_data.csv'
+# Colonnes texte stockées en catégories
+CATEGORICAL_COLUMNS = ['iso_code', 'continent', 'location']
+
+# Cache local : instantané Parquet des données nettoyées
+DATA_CACHE_PATH = 'data/covid_data.parquet'
+LEGACY_CSV_CACHE_PATH = 'data/covid_data.csv'  # Ancien cache, converti au premier chargement
 CACHE_EXPIRY_HOURS = 24  # Recharger les données après 24h
 
 
@@ -4,6 +4,7 @@ Module d'analyse des données COVID-19
 import pandas as pd
 import numpy as np
 import config
+from src.data_loader import country_slice
 
 
 class CovidAnalyzer:
@@ -75,12 +76,18 @@ class CovidAnalyzer:
         """
         Calcule les variations quotidiennes
         
+        Les moyennes mobiles précalculées au chargement (CovidDataLoader) sont
+        réutilisées telles quelles ; elles ne sont recalculées que si absentes.
+        
         Args:
             df: DataFrame d'un pays
             
         Returns:
             DataFrame avec colonnes de variation ajoutées
         """
+        if {'new_cases_ma', 'new_deaths_ma'}.issubset(df.columns):
+            return df
+        
         df = df.copy()
         
         # Variations quotidiennes
@@ -119,20 +126,23 @@ class CovidAnalyzer:
         Compare les dernières données de plusieurs pays
         
         Args:
-            df: DataFrame complet
+            df: DataFrame complet (index des pays et pics précalculés si chargé
+                par CovidDataLoader)
             countries: Liste de pays à comparer
             
         Returns:
             DataFrame de comparaison
         """
         comparison = []
+        peaks = df.attrs.get('country_peaks', {})
         
         for country in countries:
-            country_df = df[df['location'] == country]
+            # Seule la dernière ligne sert aux métriques
+            country_df = country_slice(df, country).tail(1)
             if not country_df.empty:
                 metrics = CovidAnalyzer.calculate_metrics(country_df)
                 if metrics:
-                    comparison.append({
+                    row = {
                         'Pays': country,
                         'Cas totaux': metrics['total_cases'],
                         'Décès totaux': metrics['total_deaths'],
@@ -140,7 +150,11 @@ class CovidAnalyzer:
                         'Décès/Million': round(metrics['deaths_per_million'], 2),
                         'Taux vaccination (%)': round(metrics['vaccination_rate'], 2),
                         'Taux mortalité (%)': round(metrics['mortality_rate'], 2),
-                    })
+                    }
+                    if country in peaks:
+                        row['Pic cas/jour'] = peaks[country][1]
+                        row['Pic décès/jour'] = peaks[country][3]
+                    comparison.append(row)
         
         return pd.DataFrame(comparison)
     
@@ -1,6 +1,11 @@
 """
 Module de chargement et mise en cache des données COVID-19
+Le cache est un instantané Parquet des données déjà nettoyées (colonnes
+texte en catégories, métriques en float32). Au chargement, les métriques
+dérivées sont calculées pour tous les pays et les lignes de chaque pays sont
+indexées (début, fin) pour un accès direct.
 """
+import numpy as np
 import pandas as pd
 import requests
 from pathlib import Path
@@ -8,14 +13,107 @@ from datetime import datetime, timedelta
 import config
 
 
+class _SharedDict(dict):
+    """
+    Dictionnaire partagé par les DataFrames dérivés
+    
+    pandas copie df.attrs en profondeur à chaque sélection (iloc, filtrage) :
+    l'index et les pics, calculés une fois et jamais modifiés, ne sont pas
+    recopiés.
+    """
+    
+    codes = None  # Index des pays : codes 'location' du tableau indexé
+    
+    def __deepcopy__(self, memo):
+        return self
+
+
+def build_country_index(df):
+    """
+    Calcule la position (début, fin) des lignes de chaque pays
+    
+    Les données doivent être triées par pays puis par date (voir _clean_data).
+    
+    Args:
+        df: DataFrame trié, index 0..n-1
+        
+    Returns:
+        Dict {pays: (début, fin)} utilisable avec df.iloc[début:fin]
+    """
+    locations = df['location'].astype('category')
+    codes = locations.cat.codes.to_numpy()
+    starts = np.concatenate(([0], np.flatnonzero(codes[1:] != codes[:-1]) + 1))
+    stops = np.append(starts[1:], len(codes))
+    names = locations.cat.categories[codes[starts]]
+    index = _SharedDict((name, (int(start), int(stop))) for name, start, stop in zip(names, starts, stops))
+    if isinstance(df['location'].dtype, pd.CategoricalDtype):
+        # Tableau de codes du DataFrame lui-même (astype en fait une copie) : identifie ses lignes
+        index.codes = df['location'].cat.codes.to_numpy()
+    return index
+
+
+def _is_indexed_frame(df, index):
+    """
+    Vérifie que df est le tableau indexé (ou une vue complète de celui-ci)
+    
+    Les attrs suivent les DataFrames dérivés (tri, filtrage, copie) : seul un
+    DataFrame dont la colonne 'location' partage le tableau de codes indexé,
+    même adresse et même longueur, a les lignes dans l'ordre de l'index.
+    
+    Args:
+        df: DataFrame des données COVID
+        index: Index des pays trouvé dans df.attrs
+        
+    Returns:
+        bool: True si l'index s'applique à df
+    """
+    if index.codes is None or not isinstance(df['location'].dtype, pd.CategoricalDtype):
+        return False
+    codes = df['location'].cat.codes.to_numpy()
+    return (len(codes) == len(index.codes)
+            and codes.__array_interface__['data'][0] == index.codes.__array_interface__['data'][0])
+
+
+def country_slice(df, country):
+    """
+    Lignes d'un pays : accès direct par l'index des pays si le DataFrame est
+    celui indexé au chargement, filtrage complet sinon
+    
+    Args:
+        df: DataFrame des données COVID
+        country: Nom du pays
+        
+    Returns:
+        DataFrame des lignes de ce pays (vue, à copier avant modification)
+    """
+    index = df.attrs.get('country_index')
+    if index is not None and _is_indexed_frame(df, index):
+        start, stop = index.get(country, (0, 0))
+        return df.iloc[start:stop]
+    return df[df['location'] == country]
+
+
 class CovidDataLoader:
     """Gestionnaire de chargement des données COVID-19"""
     
     def __init__(self):
         """Initialise le loader"""
         self.data_path = Path(config.DATA_CACHE_PATH)
+        self.legacy_path = Path(config.LEGACY_CSV_CACHE_PATH)
         self.data_path.parent.mkdir(parents=True, exist_ok=True)
     
+    def _cache_file(self):
+        """
+        Fichier de cache disponible (instantané Parquet, sinon ancien cache CSV)
+        
+        Returns:
+            Path ou None si aucun cache
+        """
+        for path in (self.data_path, self.legacy_path):
+            if path.exists():
+                return path
+        return None
+    
     def _is_cache_valid(self):
         """
         Vérifie si le cache est encore valide
@@ -23,21 +121,22 @@ class CovidDataLoader:
         Returns:
             bool: True si le cache est valide
         """
-        if not self.data_path.exists():
+        cache_file = self._cache_file()
+        if cache_file is None:
             return False
         
         # Vérifier l'âge du fichier
-        file_time = datetime.fromtimestamp(self.data_path.stat().st_mtime)
+        file_time = datetime.fromtimestamp(cache_file.stat().st_mtime)
         expiry_time = datetime.now() - timedelta(hours=config.CACHE_EXPIRY_HOURS)
         
         return file_time > expiry_time
     
     def _download_data(self):
         """
-        Télécharge les données depuis Our World in Data
+        Télécharge les données depuis Our World in Data, les nettoie et les met en cache
         
         Returns:
-            DataFrame ou None si erreur
+            DataFrame nettoyé ou None si erreur
         """
         try:
             print("📥 Téléchargement des données COVID-19...")
@@ -47,29 +146,57 @@ class CovidDataLoader:
                 config.COVID_DATA_URL,
                 usecols=config.COLUMNS_TO_LOAD,
                 parse_dates=['date'],
-                dtype={'iso_code': 'object', 'continent': 'object', 'location': 'object'}
+                dtype={column: 'category' for column in config.CATEGORICAL_COLUMNS}
             )
-            
-            # Sauvegarder dans le cache
-            df.to_csv(self.data_path, index=False)
-            
             print(f"✅ Données téléchargées : {len(df)} lignes")
+            
+            df = self._clean_data(df)
+            self._save_cache(df)
             return df
             
         except Exception as e:
             print(f"❌ Erreur lors du téléchargement : {e}")
             return None
     
+    def _save_cache(self, df):
+        """
+        Enregistre l'instantané Parquet des données nettoyées
+        
+        Écriture dans un fichier temporaire puis renommage : un chargement
+        concurrent ne lit jamais un fichier incomplet.
+        
+        Args:
+            df: DataFrame nettoyé
+        """
+        tmp_path = self.data_path.with_suffix('.tmp')
+        df.to_parquet(tmp_path, index=False)
+        tmp_path.replace(self.data_path)
+        if self.legacy_path.exists():
+            self.legacy_path.unlink()
+    
     def _load_from_cache(self):
         """
         Charge les données depuis le cache local
         
+        L'instantané Parquet est déjà nettoyé ; un ancien cache CSV est nettoyé
+        puis converti en Parquet.
+        
         Returns:
-            DataFrame ou None si erreur
+            DataFrame nettoyé ou None si erreur
         """
+        cache_file = self._cache_file()
+        if cache_file is None:
+            return None
+        
         try:
             print("📂 Chargement depuis le cache local...")
-            df = pd.read_csv(self.data_path, parse_dates=['date'])
+            if cache_file == self.data_path:
+                df = pd.read_parquet(cache_file)
+            else:
+                df = pd.read_csv(cache_file, parse_dates=['date'],
+                                 dtype={column: 'category' for column in config.CATEGORICAL_COLUMNS})
+                df = self._clean_data(df)
+                self._save_cache(df)
             print(f"✅ Données chargées : {len(df)} lignes")
             return df
         except Exception as e:
@@ -100,20 +227,17 @@ class CovidDataLoader:
         if df is None:
             raise Exception("Impossible de charger les données COVID-19")
         
-        # Nettoyage basique
-        df = self._clean_data(df)
-        
-        return df
+        return self._prepare_data(df)
     
     def _clean_data(self, df):
         """
-        Nettoie et prépare les données
+        Nettoie et prépare les données (une fois, avant mise en cache)
         
         Args:
             df: DataFrame brut
             
         Returns:
-            DataFrame nettoyé
+            DataFrame nettoyé, trié par pays et date, types compacts
         """
         # Supprimer les lignes sans pays
         df = df.dropna(subset=['location'])
@@ -122,13 +246,60 @@ class CovidDataLoader:
         if not pd.api.types.is_datetime64_any_dtype(df['date']):
             df['date'] = pd.to_datetime(df['date'])
         
+        # Colonnes texte en catégories (catégories triées : même ordre que le texte)
+        for column in config.CATEGORICAL_COLUMNS:
+            values = df[column].astype('category')
+            df[column] = values.cat.reorder_categories(sorted(values.cat.categories))
+        
         # Trier par pays et date
-        df = df.sort_values(['location', 'date'])
+        df = df.sort_values(['location', 'date']).reset_index(drop=True)
         
         # Remplir les valeurs manquantes pour les colonnes numériques
         numeric_cols = df.select_dtypes(include=['float64', 'int64']).columns
         df[numeric_cols] = df[numeric_cols].fillna(0)
         
+        # float32 quand la conversion est exacte à l'unité près (les grands
+        # cumuls mondiaux, au-delà de 2^24, restent en float64)
+        for column in numeric_cols:
+            values = df[column].to_numpy(dtype='float64')
+            downcast = values.astype('float32')
+            if np.abs(downcast - values).max(initial=0) < 0.5:
+                df[column] = downcast
+        
+        return df
+    
+    def _prepare_data(self, df):
+        """
+        Calcule une fois pour tous les pays les métriques dérivées et l'index des pays
+        
+        Moyennes mobiles par pays (rolling groupé), pics de cas et de décès.
+        
+        Args:
+            df: DataFrame nettoyé (trié par pays et date)
+            
+        Returns:
+            DataFrame enrichi, index des pays dans df.attrs
+        """
+        df = df.reset_index(drop=True)
+        grouped = df.groupby('location', observed=True, sort=False)
+        
+        # Moyennes mobiles : la fenêtre ne déborde pas d'un pays sur l'autre
+        for column in ['new_cases', 'new_deaths']:
+            rolling = grouped[column].rolling(window=config.ROLLING_WINDOW, min_periods=1).mean()
+            df[f'{column}_ma'] = rolling.reset_index(level=0, drop=True).astype('float32')
+        
+        # Pics (toute la période) : {pays: (date pic cas, cas, date pic décès, décès)}
+        peak_cases = df.loc[grouped['new_cases'].idxmax(), ['location', 'date', 'new_cases']]
+        peak_deaths = df.loc[grouped['new_deaths'].idxmax(), ['location', 'date', 'new_deaths']]
+        peaks = peak_cases.merge(peak_deaths, on='location', suffixes=('_cases', '_deaths'))
+        
+        df.attrs['country_index'] = build_country_index(df)
+        df.attrs['country_peaks'] = _SharedDict(
+            (row.location, (row.date_cases.strftime('%Y-%m-%d'), int(row.new_cases),
+                            row.date_deaths.strftime('%Y-%m-%d'), int(row.new_deaths)))
+            for row in peaks.itertuples(index=False)
+        )
+        
         return df
     
     def get_available_countries(self, df):
@@ -141,6 +312,9 @@ class CovidDataLoader:
         Returns:
             Liste triée des pays
         """
+        index = df.attrs.get('country_index')
+        if index is not None:
+            return sorted(index)
         return sorted(df['location'].unique().tolist())
     
     def get_country_data(self, df, country):
@@ -154,7 +328,27 @@ class CovidDataLoader:
         Returns:
             DataFrame filtré pour ce pays
         """
-        return df[df['location'] == country].copy()
+        return country_slice(df, country).copy()
+    
+    def get_countries_data(self, df, countries):
+        """
+        Récupère les données de plusieurs pays (accès direct par pays)
+        
+        Args:
+            df: DataFrame des données COVID
+            countries: Liste de pays
+            
+        Returns:
+            DataFrame des lignes de ces pays
+        """
+        slices = [country_slice(df, country) for country in countries]
+        if not slices:
+            return df.iloc[0:0].copy()
+        combined = pd.concat(slices)
+        if isinstance(combined['location'].dtype, pd.CategoricalDtype):
+            # Légendes des graphiques : seulement les pays demandés
+            combined['location'] = combined['location'].cat.remove_unused_categories()
+        return combined
     
     def get_date_range(self, df):
         """